@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the risk computation kernels.
+Compares current implementations against the previous pandas versions on
+the real data files.
+
+Usage:
+    python benchmark.py            # run all benchmarks
+    python benchmark.py ewma       # run one benchmark
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict
+
+import numpy as np
+import pandas as pd
+
+# Add current directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from data_loader import DATA_DIR, load_return_series
+from risk_engine import calculate_ewma_covariance, ewma_shrinkage_cov
+
+
+def _time_it(fn: Callable, repeat: int = 20) -> float:
+    """Best-of-N wall time in milliseconds."""
+    fn()  # warm up caches
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def _report(label: str, baseline_ms: float, current_ms: float) -> None:
+    print(f"  {label:<38} {baseline_ms:9.3f} ms -> {current_ms:9.3f} ms   ({baseline_ms / current_ms:5.1f}x)")
+
+
+def load_instruments_matrix(n_assets: int = 1000) -> pd.DataFrame:
+    """
+    Dense instruments return matrix with n_assets columns.
+
+    Uses instruments_returns_proxied.csv (gaps filled with 0). The file has
+    fewer than 1,000 instruments, so extra columns are resampled from the
+    real ones with small noise to reach the requested width.
+    """
+    df = pd.read_csv(DATA_DIR / "Returns" / "instruments_returns_proxied.csv", index_col=0, encoding="latin-1")
+    df = df.apply(pd.to_numeric, errors="coerce").fillna(0.0)
+
+    if df.shape[1] < n_assets:
+        rng = np.random.default_rng(0)
+        picks = rng.integers(0, df.shape[1], n_assets - df.shape[1])
+        extra = df.iloc[:, picks].values + rng.normal(0, 1e-3, (len(df), len(picks)))
+        extra = pd.DataFrame(extra, index=df.index, columns=[f"synthetic_{i}" for i in range(len(picks))])
+        df = pd.concat([df, extra], axis=1)
+
+    return df.iloc[:, :n_assets]
+
+
+# ============================================================================
+# EWMA covariance
+# ============================================================================
+
+def _legacy_ewma_covariance(returns: pd.DataFrame, decay: float = 0.94) -> pd.DataFrame:
+    """Previous pandas implementation of calculate_ewma_covariance."""
+    n_obs = len(returns)
+    weights = np.array([(1 - decay) * (decay ** i) for i in range(n_obs)])
+    weights = weights[::-1]
+    weights = weights / weights.sum()
+
+    centered = returns - returns.mean()
+    weighted_returns = centered.multiply(np.sqrt(weights), axis=0)
+    cov_matrix = weighted_returns.T @ weighted_returns
+
+    return pd.DataFrame(cov_matrix, index=returns.columns, columns=returns.columns)
+
+
+def _legacy_ewma_shrinkage_cov(returns: pd.DataFrame, lambda_: float = 0.94, shrink_alpha: float = 0.1) -> pd.DataFrame:
+    """Previous pandas implementation of ewma_shrinkage_cov (diagonal target)."""
+    ewma_cov = _legacy_ewma_covariance(returns, lambda_)
+    target = pd.DataFrame(np.diag(np.diag(ewma_cov.values)), index=ewma_cov.index, columns=ewma_cov.columns)
+    return (1 - shrink_alpha) * ewma_cov + shrink_alpha * target
+
+
+def bench_ewma() -> None:
+    """EWMA covariance: pandas list-comprehension version vs NumPy kernel."""
+    datasets: Dict[str, pd.DataFrame] = {
+        "return_series.csv": load_return_series("USD"),
+        "instruments (1,000 assets)": load_instruments_matrix(1000),
+    }
+
+    print("\nEWMA covariance")
+    for name, returns in datasets.items():
+        print(f" {name}: {returns.shape[0]} periods x {returns.shape[1]} assets")
+
+        np.testing.assert_allclose(
+            calculate_ewma_covariance(returns).values,
+            _legacy_ewma_covariance(returns).values,
+            rtol=1e-9, atol=1e-14
+        )
+
+        _report(
+            "calculate_ewma_covariance",
+            _time_it(lambda: _legacy_ewma_covariance(returns)),
+            _time_it(lambda: calculate_ewma_covariance(returns))
+        )
+        _report(
+            "ewma_shrinkage_cov",
+            _time_it(lambda: _legacy_ewma_shrinkage_cov(returns)),
+            _time_it(lambda: ewma_shrinkage_cov(returns))
+        )
+
+
+# ============================================================================
+# Event loop responsiveness
+# ============================================================================
+
+def bench_executor(n_frontiers: int = 4, n_probes: int = 50) -> None:
+    """/health latency while frontier requests are in flight."""
+    import asyncio
+    import httpx
+    from main import app
+
+    async def run() -> np.ndarray:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            async def probe() -> list:
+                # Time sleep + request, so event loop stalls show up as latency
+                latencies = []
+                for _ in range(n_probes):
+                    start = time.perf_counter()
+                    await asyncio.sleep(0.01)
+                    await client.get("/health")
+                    latencies.append(time.perf_counter() - start - 0.01)
+                return latencies
+
+            probes = asyncio.ensure_future(probe())
+            await asyncio.sleep(0)
+            await asyncio.gather(*[
+                client.post("/api/optimization/frontier", json={"n_points": 50})
+                for _ in range(n_frontiers)
+            ])
+            latencies = await probes
+        return np.array(latencies) * 1000
+
+    latencies = asyncio.run(run())
+    print(f"\n/health under {n_frontiers} concurrent frontier requests")
+    print(f"  p50 {np.percentile(latencies, 50):8.2f} ms   p99 {np.percentile(latencies, 99):8.2f} ms")
+
+
+# ============================================================================
+# Efficient frontier cache
+# ============================================================================
+
+def bench_frontier() -> None:
+    """Frontier request cost: cold solve, warm-started solve, cache hit."""
+    from data_loader import load_cma_data, load_correlation_matrix
+    from frontier_cache import clear_frontier_cache, get_frontier
+
+    cma, corr = load_cma_data(), load_correlation_matrix()
+    loop = asyncio.new_event_loop()
+
+    def frontier(n_points):
+        return loop.run_until_complete(get_frontier(cma, corr, n_points=n_points))
+
+    def cold():
+        clear_frontier_cache()
+        return frontier(30)
+
+    def warm_started():
+        clear_frontier_cache()
+        frontier(5)
+        start = time.perf_counter()
+        frontier(30)
+        return time.perf_counter() - start
+
+    cold_ms = _time_it(cold, repeat=3)
+    warm_ms = min(warm_started() for _ in range(3)) * 1000
+    frontier(30)
+    hit_ms = _time_it(lambda: frontier(30), repeat=1000)
+
+    print("\nEfficient frontier (30 points, unconstrained)")
+    _report("miss, warm-started from cache", cold_ms, warm_ms)
+    _report("cache hit", cold_ms, hit_ms)
+    loop.close()
+
+
+def bench_qp() -> None:
+    """Frontier solve time: SLSQP vs active-set backend."""
+    from data_loader import load_cma_data, load_correlation_matrix
+    from optimization_engine import compute_efficient_frontier
+
+    cma, corr = load_cma_data(), load_correlation_matrix()
+
+    print("\nQP backend (30-point frontier)")
+    for mode in ("unconstrained", "core", "core_private"):
+        slsqp = compute_efficient_frontier(cma, corr, mode=mode)
+        exact = compute_efficient_frontier(cma, corr, mode=mode, solver="active_set")
+        print(f" {mode}: {slsqp['n_portfolios']} -> {exact['n_portfolios']} points")
+        _report(
+            "compute_efficient_frontier",
+            _time_it(lambda: compute_efficient_frontier(cma, corr, mode=mode), repeat=3),
+            _time_it(lambda: compute_efficient_frontier(cma, corr, mode=mode, solver="active_set"), repeat=3)
+        )
+
+
+def bench_cla() -> None:
+    """Dense frontiers: 30 vs 500 points, lambda sweep vs Critical Line Algorithm."""
+    from data_loader import load_cma_data, load_correlation_matrix
+    from optimization_engine import compute_efficient_frontier
+
+    cma, corr = load_cma_data(), load_correlation_matrix()
+
+    print("\nCritical Line Algorithm (unconstrained)")
+    cla = compute_efficient_frontier(cma, corr, solver="cla")
+    print(f" {len(cla['corners']['returns'])} corner portfolios")
+    for n_points in (30, 500):
+        _report(
+            f"{n_points} points, active_set sweep -> cla",
+            _time_it(lambda: compute_efficient_frontier(cma, corr, n_points=n_points, solver="active_set"), repeat=3),
+            _time_it(lambda: compute_efficient_frontier(cma, corr, n_points=n_points, solver="cla"), repeat=3)
+        )
+
+
+# ============================================================================
+# Compiled data store
+# ============================================================================
+
+def bench_startup() -> None:
+    """Startup data load: parsing the CSVs vs memory-mapping the compiled store."""
+    import data_store
+    from data_loader import (
+        load_cma_data,
+        load_correlation_matrix,
+        load_beta_matrix,
+        load_factor_covariance,
+        load_portfolio_universe,
+    )
+
+    def load_everything():
+        data_store.clear_data_store_cache()
+        load_cma_data()
+        load_correlation_matrix()
+        for currency in ("USD", "EUR", "GBP"):
+            load_return_series(currency)
+        load_beta_matrix()
+        load_factor_covariance()
+        load_portfolio_universe("portfolio")
+        load_portfolio_universe("benchmark")
+
+    mode = data_store.DATA_STORE_MODE
+    try:
+        data_store.DATA_STORE_MODE = "off"
+        parse_ms = _time_it(load_everything, repeat=5)
+        data_store.DATA_STORE_MODE = "auto"
+        store_ms = _time_it(load_everything, repeat=5)
+    finally:
+        data_store.DATA_STORE_MODE = mode
+
+    print("\nStartup data load (CMA, correlation, 3 return series, betas, factor cov, universes)")
+    _report("CSV parse -> compiled store", parse_ms, store_ms)
+
+
+# ============================================================================
+# Security-level covariance
+# ============================================================================
+
+def bench_pairwise() -> None:
+    """Pairwise-complete covariance on ragged histories: pandas .cov() vs masked NumPy."""
+    from data_loader import load_instrument_returns
+    from risk_engine import pairwise_covariance
+
+    raw = load_instrument_returns()
+    # Widen to 1,500 instruments, resampling real columns with their gaps
+    rng = np.random.default_rng(0)
+    picks = rng.integers(0, raw.shape[1], 1500 - raw.shape[1])
+    extra = raw.iloc[:, picks] + rng.normal(0, 1e-3, (len(raw), len(picks)))
+    extra.columns = [f"synthetic_{i}" for i in range(len(picks))]
+    datasets = {
+        "instruments_returns.csv": raw,
+        "instruments (1,500 assets)": pd.concat([raw, extra], axis=1),
+    }
+
+    print("\nPairwise-complete covariance")
+    for name, returns in datasets.items():
+        coverage = returns.notna().to_numpy().mean()
+        print(f" {name}: {returns.shape[0]} periods x {returns.shape[1]} assets, {coverage:.0%} observed")
+        _report(
+            "pairwise_covariance",
+            _time_it(lambda: returns.cov(min_periods=12), repeat=3),
+            _time_it(lambda: pairwise_covariance(returns), repeat=3)
+        )
+
+
+def bench_factor_model() -> None:
+    """Contributions for a 1,000-security portfolio: dense covariance vs factor model."""
+    from data_loader import load_beta_matrix, load_factor_covariance
+    from risk_engine import calculate_contributions, factor_model_arrays
+
+    betas = load_beta_matrix()
+    factor_cov = load_factor_covariance()
+    rng = np.random.default_rng(0)
+    picks = rng.integers(0, len(betas), 1000)
+    betas = pd.DataFrame(
+        betas.values[picks] + rng.normal(0, 0.01, (1000, betas.shape[1])),
+        index=[f"security_{i}" for i in range(1000)], columns=betas.columns
+    )
+    residual_var = pd.Series(rng.uniform(1e-5, 1e-4, 1000), index=betas.index)
+    weights = pd.Series(rng.random(1000), index=betas.index)
+
+    # The N x N matrix the dense path needs (built once, as a cache would)
+    B, F, eps = factor_model_arrays(betas.index, betas, factor_cov, residual_var)
+    dense = pd.DataFrame(B @ F @ B.T + np.diag(eps), index=betas.index, columns=betas.index)
+    returns = pd.DataFrame(columns=betas.index)
+
+    print(f"\nFactor-model contributions: 1,000 securities x {betas.shape[1]} factors")
+    _report(
+        "calculate_contributions",
+        _time_it(lambda: calculate_contributions(returns, weights, cov_matrix=dense)),
+        _time_it(lambda: calculate_contributions(
+            None, weights, betas=betas, factor_cov=factor_cov, residual_var=residual_var
+        ))
+    )
+
+
+def _legacy_diversification(weights: pd.Series, returns: pd.DataFrame, cov: pd.DataFrame) -> Dict:
+    """Previous compute_diversification_metrics: separate .corr() and a pairwise .iloc loop."""
+    w = weights / weights.sum()
+    individual_vols = np.sqrt(np.diag(cov.values))
+    weighted_avg_vol = np.sum(w.values * individual_vols)
+    portfolio_vol = np.sqrt(w.values @ cov.values @ w.values)
+
+    corr = returns.corr()
+    total_weight = 0
+    weighted_corr = 0
+    for i in range(len(w)):
+        for j in range(i + 1, len(w)):
+            pair_weight = w.iloc[i] * w.iloc[j]
+            weighted_corr += pair_weight * corr.iloc[i, j]
+            total_weight += pair_weight
+
+    return {
+        'diversification_ratio': weighted_avg_vol / portfolio_vol,
+        'weighted_avg_correlation': weighted_corr / total_weight,
+    }
+
+
+def bench_diversification() -> None:
+    """Diversification metrics for a 500-asset portfolio: pairwise loop vs closed form."""
+    from risk_engine import compute_diversification_metrics
+
+    returns = load_instruments_matrix(500)
+    cov = calculate_ewma_covariance(returns)
+    weights = pd.Series(np.random.default_rng(0).random(500), index=returns.columns)
+
+    print("\nDiversification metrics: 500 assets")
+    _report(
+        "compute_diversification_metrics",
+        _time_it(lambda: _legacy_diversification(weights, returns, cov), repeat=1),
+        _time_it(lambda: compute_diversification_metrics(weights, returns, cov_matrix=cov))
+    )
+
+
+BENCHMARKS: Dict[str, Callable[[], None]] = {
+    "ewma": bench_ewma,
+    "executor": bench_executor,
+    "frontier": bench_frontier,
+    "qp": bench_qp,
+    "cla": bench_cla,
+    "startup": bench_startup,
+    "pairwise": bench_pairwise,
+    "factor_model": bench_factor_model,
+    "diversification": bench_diversification,
+}
+
+
+if __name__ == "__main__":
+    selected = sys.argv[1:] or list(BENCHMARKS)
+    for name in selected:
+        if name not in BENCHMARKS:
+            print(f"Unknown benchmark '{name}'. Available: {', '.join(BENCHMARKS)}")
+            sys.exit(1)
+        BENCHMARKS[name]()
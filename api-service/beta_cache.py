@@ -0,0 +1,253 @@
+"""
+LASSO Beta Cache
+Persistent store for factor betas and residual variance from compute_lasso_betas
+
+Entries are keyed by a content hash of the date-aligned security/factor
+returns plus the fit parameters, so a key only changes when the input data
+does. Entries live in memory and are persisted to disk as .npz files, which
+are reloaded at startup. Both are bounded to the MAX_ENTRIES most recently
+used fits, so data reloads do not pile up stale entries.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data_loader import CACHE_DIR, frame_fingerprint
+from risk_engine import compute_lasso_betas
+
+# Bump when compute_lasso_betas changes in a way that alters its output
+CACHE_FORMAT_VERSION = 1
+
+BETA_CACHE_DIR = CACHE_DIR / "lasso_betas"
+
+# Worker count for cache-miss fits (1 = serial, -1 = all cores)
+LASSO_N_JOBS = int(os.environ.get("LASSO_N_JOBS", "1"))
+
+# Fits kept in memory and on disk (one per data version and parameter set)
+MAX_ENTRIES = 8
+
+_MEMORY_CACHE: "OrderedDict[str, Tuple[pd.DataFrame, pd.Series]]" = OrderedDict()
+_KEY_LOCKS: Dict[str, threading.Lock] = {}
+_CACHE_LOCK = threading.Lock()
+_STATS = {"hits": 0, "disk_hits": 0, "misses": 0}
+
+
+def lasso_cache_key(
+    security_returns: pd.DataFrame,
+    factor_returns: pd.DataFrame,
+    min_observations: int = 24,
+    cv_folds: int = 5
+) -> str:
+    """
+    Build the cache key for a LASSO beta fit.
+
+    Only the date-aligned data enters the hash, so e.g. regenerated date
+    labels that cover the same observations map to the same entry.
+
+    Args:
+        security_returns: DataFrame of security returns (dates x securities)
+        factor_returns: DataFrame of factor returns (dates x factors)
+        min_observations: Minimum overlapping observations required
+        cv_folds: Number of cross-validation folds
+
+    Returns:
+        Hex digest identifying the fit
+    """
+    common_dates = security_returns.index.intersection(factor_returns.index)
+    data_hash = frame_fingerprint(
+        security_returns.loc[common_dates],
+        factor_returns.loc[common_dates],
+        include_index=False
+    )
+    return f"v{CACHE_FORMAT_VERSION}-{data_hash[:32]}-m{min_observations}-cv{cv_folds}"
+
+
+def _entry_path(key: str, cache_dir: Path) -> Path:
+    return cache_dir / f"{key}.npz"
+
+
+def _save_entry(key: str, betas: pd.DataFrame, residual_var: pd.Series, cache_dir: Path) -> None:
+    """Persist one entry atomically (write to temp file, then rename)."""
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    path = _entry_path(key, cache_dir)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp.npz")
+    np.savez(
+        tmp_path,
+        betas=betas.values.astype(float),
+        residual_var=residual_var.reindex(betas.index).values.astype(float),
+        securities=np.array([str(s) for s in betas.index]),
+        factors=np.array([str(f) for f in betas.columns])
+    )
+    os.replace(tmp_path, path)
+
+
+def _persisted_entries(cache_dir: Path) -> List[Path]:
+    """Entry files of the current format, most recently used first."""
+    paths = [p for p in cache_dir.glob(f"v{CACHE_FORMAT_VERSION}-*.npz") if ".tmp" not in p.name]
+    return sorted(paths, key=lambda p: p.stat().st_mtime, reverse=True)
+
+
+def _prune_entries(cache_dir: Path) -> None:
+    """Delete all but the MAX_ENTRIES most recently used entry files."""
+    try:
+        for path in _persisted_entries(cache_dir)[MAX_ENTRIES:]:
+            path.unlink(missing_ok=True)
+    except OSError as e:
+        print(f"Warning: Could not prune beta cache entries: {e}")
+
+
+def _remember(key: str, entry: Tuple[pd.DataFrame, pd.Series]) -> None:
+    """Insert an entry, evicting the least recently used. Call with _CACHE_LOCK held."""
+    _MEMORY_CACHE[key] = entry
+    _MEMORY_CACHE.move_to_end(key)
+    while len(_MEMORY_CACHE) > MAX_ENTRIES:
+        evicted, _ = _MEMORY_CACHE.popitem(last=False)
+        _KEY_LOCKS.pop(evicted, None)
+
+
+def _load_entry(path: Path) -> Tuple[pd.DataFrame, pd.Series]:
+    with np.load(path, allow_pickle=False) as data:
+        securities = data["securities"].tolist()
+        betas = pd.DataFrame(data["betas"], index=securities, columns=data["factors"].tolist())
+        residual_var = pd.Series(data["residual_var"], index=securities)
+    return betas, residual_var
+
+
+def get_lasso_betas(
+    security_returns: pd.DataFrame,
+    factor_returns: pd.DataFrame,
+    min_observations: int = 24,
+    cv_folds: int = 5,
+    cache_dir: Optional[Path] = None,
+    n_jobs: Optional[int] = None
+) -> Tuple[pd.DataFrame, pd.Series]:
+    """
+    Cached drop-in for compute_lasso_betas.
+
+    Looks the fit up in memory, then on disk, and only runs the LASSO fits
+    when neither has it. Concurrent callers for the same key wait for a
+    single computation.
+
+    Args:
+        security_returns: DataFrame of security returns (dates x securities)
+        factor_returns: DataFrame of factor returns (dates x factors)
+        min_observations: Minimum overlapping observations required
+        cv_folds: Number of cross-validation folds
+        cache_dir: Optional persistence directory. Defaults to BETA_CACHE_DIR.
+        n_jobs: Worker count for a cache miss. Defaults to LASSO_N_JOBS.
+
+    Returns:
+        Tuple of (betas DataFrame, residual variance Series)
+    """
+    cache_dir = Path(cache_dir) if cache_dir else BETA_CACHE_DIR
+    key = lasso_cache_key(security_returns, factor_returns, min_observations, cv_folds)
+
+    with _CACHE_LOCK:
+        if key in _MEMORY_CACHE:
+            _MEMORY_CACHE.move_to_end(key)
+            _STATS["hits"] += 1
+            return _MEMORY_CACHE[key]
+        key_lock = _KEY_LOCKS.setdefault(key, threading.Lock())
+
+    with key_lock:
+        # Another caller may have filled the entry while we waited
+        with _CACHE_LOCK:
+            if key in _MEMORY_CACHE:
+                _STATS["hits"] += 1
+                return _MEMORY_CACHE[key]
+
+        path = _entry_path(key, cache_dir)
+        if path.exists():
+            try:
+                entry = _load_entry(path)
+                os.utime(path)  # Mark as recently used for pruning
+                with _CACHE_LOCK:
+                    _remember(key, entry)
+                    _STATS["disk_hits"] += 1
+                return entry
+            except Exception as e:
+                print(f"Warning: Discarding unreadable beta cache entry {path.name}: {e}")
+
+        betas, residual_var = compute_lasso_betas(
+            security_returns=security_returns,
+            factor_returns=factor_returns,
+            min_observations=min_observations,
+            cv_folds=cv_folds,
+            n_jobs=LASSO_N_JOBS if n_jobs is None else n_jobs
+        )
+
+        try:
+            _save_entry(key, betas, residual_var, cache_dir)
+        except OSError as e:
+            print(f"Warning: Could not persist beta cache entry: {e}")
+        _prune_entries(cache_dir)
+
+        with _CACHE_LOCK:
+            _remember(key, (betas, residual_var))
+            _STATS["misses"] += 1
+
+    return betas, residual_var
+
+
+def load_persisted_betas(cache_dir: Optional[Path] = None) -> int:
+    """
+    Reload the MAX_ENTRIES most recently used persisted entries into memory
+    (call at startup) and delete older files.
+
+    Args:
+        cache_dir: Optional persistence directory. Defaults to BETA_CACHE_DIR.
+
+    Returns:
+        Number of entries loaded
+    """
+    cache_dir = Path(cache_dir) if cache_dir else BETA_CACHE_DIR
+    if not cache_dir.exists():
+        return 0
+
+    _prune_entries(cache_dir)
+
+    loaded = 0
+    # Oldest first, so the most recently used entry ends up last in the LRU order
+    for path in reversed(_persisted_entries(cache_dir)):
+        try:
+            entry = _load_entry(path)
+        except Exception as e:
+            print(f"Warning: Skipping unreadable beta cache entry {path.name}: {e}")
+            continue
+        with _CACHE_LOCK:
+            _remember(path.stem, entry)
+        loaded += 1
+
+    return loaded
+
+
+def clear_beta_cache(cache_dir: Optional[Path] = None, persisted: bool = False) -> None:
+    """
+    Drop in-memory entries and optionally the persisted files.
+
+    Args:
+        cache_dir: Optional persistence directory. Defaults to BETA_CACHE_DIR.
+        persisted: Also delete the .npz files on disk
+    """
+    with _CACHE_LOCK:
+        _MEMORY_CACHE.clear()
+        _KEY_LOCKS.clear()
+        for name in _STATS:
+            _STATS[name] = 0
+
+    if persisted:
+        cache_dir = Path(cache_dir) if cache_dir else BETA_CACHE_DIR
+        for path in cache_dir.glob("*.npz"):
+            path.unlink(missing_ok=True)
+
+
+def beta_cache_stats() -> Dict:
+    """Hit/miss counters and current entry count."""
+    with _CACHE_LOCK:
+        return {**_STATS, "entries": len(_MEMORY_CACHE)}
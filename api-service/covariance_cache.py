@@ -0,0 +1,245 @@
+"""
+Covariance Matrix Cache
+Full-universe covariance matrices shared across risk endpoints
+
+One PSD-repaired covariance is built per (currency, method, decay,
+shrinkage) over every column of the return series. Requests slice the
+sub-block they need with risk_engine.slice_covariance, so neither the
+covariance nor the eigendecomposition in ensure_psd is redone per request.
+
+EWMA entries also keep an EWMACovarianceState. When a reloaded return
+series is the old one plus appended periods, the entry is rolled forward
+with one rank-one update per new period instead of rebuilt from the
+full history.
+"""
+
+import copy
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+
+import numpy as np
+
+from risk_engine import (
+    EWMACovarianceState,
+    calculate_ewma_covariance,
+    ewma_shrinkage_cov,
+    ensure_psd,
+    pairwise_covariance,
+)
+
+# Distinct (currency, method, decay, shrinkage) combinations kept in memory
+MAX_ENTRIES = 32
+
+CovKey = Tuple[str, str, float, float]
+
+# key -> (source returns frame, covariance, EWMA state or None)
+_CACHE: "OrderedDict[CovKey, Tuple[pd.DataFrame, pd.DataFrame, Optional[EWMACovarianceState]]]" = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+_STATS = {"hits": 0, "misses": 0, "updates": 0}
+
+# Below this many periods calculate_ewma_covariance falls back to the sample covariance
+MIN_EWMA_PERIODS = 12
+
+
+def build_covariance(
+    returns: pd.DataFrame,
+    method: str = "ewma",
+    decay: float = 0.94,
+    shrinkage: float = 0.0
+) -> pd.DataFrame:
+    """
+    Build a PSD-repaired covariance matrix over all columns of returns.
+
+    Returns with gaps (the security-level universes) get a pairwise-complete
+    estimate, with shrinkage applied to it the same way.
+
+    Args:
+        returns: DataFrame of asset returns (dates x assets)
+        method: "ewma" | "sample"
+        decay: EWMA decay factor (ignored for "sample")
+        shrinkage: Diagonal shrinkage intensity for EWMA (0 = none)
+
+    Returns:
+        Covariance matrix (assets x assets) as DataFrame
+    """
+    if method not in ("ewma", "sample"):
+        raise ValueError(f"Unknown covariance method: {method}")
+
+    if np.isnan(returns.to_numpy(dtype=np.float64)).any():
+        cov = pairwise_covariance(returns, method=method, decay=decay)
+        if method == "ewma" and shrinkage > 0:
+            # Shrink toward the diagonal: off-diagonal terms scale by (1 - shrinkage)
+            shrunk = cov.values * (1 - shrinkage)
+            np.fill_diagonal(shrunk, np.diag(cov.values))
+            cov = pd.DataFrame(shrunk, index=cov.index, columns=cov.columns)
+    elif method == "ewma":
+        if shrinkage > 0:
+            cov = ewma_shrinkage_cov(returns, lambda_=decay, shrink_target="diagonal", shrink_alpha=shrinkage)
+        else:
+            cov = calculate_ewma_covariance(returns, decay=decay)
+    else:
+        cov = returns.cov()
+
+    return pd.DataFrame(ensure_psd(cov.values), index=cov.index, columns=cov.columns)
+
+
+def appended_rows(old: pd.DataFrame, new: pd.DataFrame) -> Optional[np.ndarray]:
+    """
+    Rows new adds to old, if new is old with periods appended.
+
+    Only values are compared (generated date labels shift every month).
+    O(T*N), versus O(T*N^2) for rebuilding a covariance.
+
+    Returns:
+        Array of appended rows (possibly empty), or None if new is not an extension of old
+    """
+    if not old.columns.equals(new.columns) or len(new) < len(old):
+        return None
+    old_values = old.to_numpy(dtype=np.float64)
+    new_values = new.to_numpy(dtype=np.float64)
+    if not np.array_equal(old_values, new_values[:len(old)], equal_nan=True):
+        return None
+    return new_values[len(old):]
+
+
+def _ewma_entry(
+    returns: pd.DataFrame,
+    decay: float,
+    shrinkage: float,
+    previous: Optional[Tuple[pd.DataFrame, pd.DataFrame, Optional[EWMACovarianceState]]] = None
+) -> Optional[Tuple[pd.DataFrame, EWMACovarianceState]]:
+    """
+    EWMA covariance and state from a streaming state: rolled forward from
+    previous when returns extends its source, otherwise seeded fresh.
+
+    None when the state does not apply (gaps, or too few periods for EWMA).
+    """
+    X = returns.to_numpy(dtype=np.float64)
+    if len(X) < MIN_EWMA_PERIODS or np.isnan(X).any():
+        return None
+
+    state = None
+    if previous is not None and previous[2] is not None:
+        new_rows = appended_rows(previous[0], returns)
+        if new_rows is not None and len(new_rows) == 0:
+            # Same data in a new frame: the matrix itself is still valid
+            return previous[1], previous[2]
+        if new_rows is not None:
+            state = copy.deepcopy(previous[2])
+            state.update(new_rows)
+            with _CACHE_LOCK:
+                _STATS["updates"] += 1
+
+    if state is None:
+        state = EWMACovarianceState.from_returns(X, decay)
+
+    cov = state.covariance()
+    if shrinkage > 0:
+        # Diagonal target: off-diagonal terms scale by (1 - shrinkage)
+        shrunk = cov * (1 - shrinkage)
+        np.fill_diagonal(shrunk, np.diag(cov))
+        cov = shrunk
+
+    cov = pd.DataFrame(ensure_psd(cov), index=returns.columns, columns=returns.columns)
+    return cov, state
+
+
+def get_covariance(
+    returns: pd.DataFrame,
+    currency: str = "USD",
+    method: str = "ewma",
+    decay: float = 0.94,
+    shrinkage: float = 0.0
+) -> pd.DataFrame:
+    """
+    Cached full-universe covariance for a return series.
+
+    An entry is reused as long as it was built from the same returns
+    object. A reloaded frame for the currency rebuilds it, except that
+    EWMA entries are rolled forward when only new periods were appended.
+
+    Args:
+        returns: DataFrame of asset returns for the currency
+        currency: Currency code of the return series (part of the key)
+        method: "ewma" | "sample"
+        decay: EWMA decay factor
+        shrinkage: Diagonal shrinkage intensity for EWMA
+
+    Returns:
+        PSD covariance matrix (assets x assets). Treat as read-only.
+    """
+    if method == "sample":
+        decay = 0.0  # Decay has no effect on the sample covariance
+    key = (currency.upper(), method, float(decay), float(shrinkage))
+
+    with _CACHE_LOCK:
+        entry = _CACHE.get(key)
+        if entry is not None and entry[0] is returns:
+            _CACHE.move_to_end(key)
+            _STATS["hits"] += 1
+            return entry[1]
+
+    streamed = _ewma_entry(returns, decay, shrinkage, entry) if method == "ewma" else None
+    if streamed is not None:
+        cov, state = streamed
+    else:
+        cov, state = build_covariance(returns, method=method, decay=decay, shrinkage=shrinkage), None
+
+    with _CACHE_LOCK:
+        _CACHE[key] = (returns, cov, state)
+        _CACHE.move_to_end(key)
+        while len(_CACHE) > MAX_ENTRIES:
+            _CACHE.popitem(last=False)
+        _STATS["misses"] += 1
+
+    return cov
+
+
+def warm_covariance_cache(
+    returns_by_currency: Dict[str, pd.DataFrame],
+    methods: Iterable[str] = ("ewma", "sample"),
+    decay: float = 0.94
+) -> int:
+    """
+    Pre-build the default covariance matrices (call at startup).
+
+    Args:
+        returns_by_currency: Mapping of currency code -> returns DataFrame
+        methods: Covariance methods to build
+        decay: EWMA decay factor
+
+    Returns:
+        Number of matrices built
+    """
+    built = 0
+    for currency, returns in returns_by_currency.items():
+        for method in methods:
+            get_covariance(returns, currency=currency, method=method, decay=decay)
+            built += 1
+    return built
+
+
+def clear_covariance_cache(currency: Optional[str] = None) -> None:
+    """
+    Drop cached matrices, for one currency or all of them.
+
+    Args:
+        currency: Optional currency code. If None, clears everything.
+    """
+    with _CACHE_LOCK:
+        if currency is None:
+            _CACHE.clear()
+            for name in _STATS:
+                _STATS[name] = 0
+        else:
+            for key in [k for k in _CACHE if k[0] == currency.upper()]:
+                del _CACHE[key]
+
+
+def covariance_cache_stats() -> Dict:
+    """Hit/miss counters and current entry count."""
+    with _CACHE_LOCK:
+        return {**_STATS, "entries": len(_CACHE)}
@@ -3,10 +3,12 @@ Data Loading Utilities for Risk and Optimization Engines
 Loads CMA data, correlation matrices, and return series from the data directory.
 """
 
+import os
+import hashlib
 import pandas as pd
 import numpy as np
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple, Union
 import warnings
 
 warnings.filterwarnings('ignore')
@@ -14,6 +16,68 @@ warnings.filterwarnings('ignore')
 # Data directory relative to this file
 DATA_DIR = Path(__file__).parent.parent / "data"
 
+# Directory for derived, recomputable artifacts (beta caches etc.)
+CACHE_DIR = Path(os.environ.get("RISK_CACHE_DIR", Path(__file__).parent / ".cache"))
+
+
+# Default source files, in lookup order
+CMA_FILES = ["cma_data.csv", "cma_input3.xlsx", "CMA_data.csv"]
+CORRELATION_FILES = ["correlation_matrix.csv", "cma_input3.xlsx", "corr_matrix.csv"]
+FACTOR_RETURNS_FILE = Path("Returns") / "factor_returns.csv"
+FACTOR_METADATA_FILE = Path("Returns") / "metadata_factors.csv"
+INSTRUMENT_RETURNS_FILE = Path("Returns") / "instruments_returns.csv"
+INSTRUMENT_RETURNS_PROXIED_FILE = Path("Returns") / "instruments_returns_proxied.csv"
+
+
+def _first_existing(directory: Path, names: List[str]) -> Optional[Path]:
+    """First of the candidate file names that exists in directory."""
+    for name in names:
+        path = directory / name
+        if path.exists():
+            return path
+    return None
+
+
+def _stored_frame(kind: str, path: Path) -> Optional[Tuple[pd.DataFrame, Optional[int]]]:
+    """
+    Look a parsed source file up in the compiled data store.
+
+    Returns:
+        Tuple of (memory-mapped DataFrame, row count for undated return
+        series) or None when the store is disabled, stale or lacks the file
+    """
+    # Imported here: data_store builds on the parsers in this module
+    from data_store import get_data_store
+
+    store = get_data_store()
+    if store is None:
+        return None
+    return store.frame(kind, path)
+
+
+def frame_fingerprint(*frames: Union[pd.DataFrame, pd.Series], include_index: bool = True) -> str:
+    """
+    Content hash of one or more DataFrames/Series.
+
+    Hashes values, column labels and (optionally) the index, so two frames
+    with identical content produce the same key across processes and restarts.
+
+    Args:
+        frames: DataFrames or Series to hash (order matters)
+        include_index: Include index labels in the hash
+
+    Returns:
+        Hex digest string
+    """
+    h = hashlib.sha256()
+    for frame in frames:
+        if isinstance(frame, pd.Series):
+            frame = frame.to_frame()
+        h.update(repr(frame.shape).encode())
+        h.update("\x1f".join(map(str, frame.columns)).encode())
+        h.update(pd.util.hash_pandas_object(frame, index=include_index).values.tobytes())
+    return h.hexdigest()
+
 
 def load_cma_data(file_path: Optional[str] = None) -> pd.DataFrame:
     """
@@ -27,25 +91,21 @@ def load_cma_data(file_path: Optional[str] = None) -> pd.DataFrame:
     Returns:
         DataFrame with CMA data
     """
-    if file_path:
-        path = Path(file_path)
-    else:
-        # Try multiple possible file locations
-        possible_paths = [
-            DATA_DIR / "cma_data.csv",
-            DATA_DIR / "cma_input3.xlsx",
-            DATA_DIR / "CMA_data.csv",
-        ]
-        path = None
-        for p in possible_paths:
-            if p.exists():
-                path = p
-                break
+    path = Path(file_path) if file_path else _first_existing(DATA_DIR, CMA_FILES)
 
     if path is None or not path.exists():
         # Return mock CMA data for development
         return _generate_mock_cma_data()
 
+    stored = _stored_frame("cma", path)
+    if stored is not None:
+        return stored[0]
+
+    return _parse_cma_data(path)
+
+
+def _parse_cma_data(path: Path) -> pd.DataFrame:
+    """Read and normalize a CMA file."""
     if path.suffix == '.xlsx':
         df = pd.read_excel(path, sheet_name='RR')
     else:
@@ -91,23 +151,20 @@ def load_correlation_matrix(file_path: Optional[str] = None) -> pd.DataFrame:
     Returns:
         DataFrame with correlation matrix (assets x assets)
     """
-    if file_path:
-        path = Path(file_path)
-    else:
-        possible_paths = [
-            DATA_DIR / "correlation_matrix.csv",
-            DATA_DIR / "cma_input3.xlsx",
-            DATA_DIR / "corr_matrix.csv",
-        ]
-        path = None
-        for p in possible_paths:
-            if p.exists():
-                path = p
-                break
+    path = Path(file_path) if file_path else _first_existing(DATA_DIR, CORRELATION_FILES)
 
     if path is None or not path.exists():
         return _generate_mock_correlation_matrix()
 
+    stored = _stored_frame("correlation", path)
+    if stored is not None:
+        return stored[0]
+
+    return _parse_correlation_matrix(path)
+
+
+def _parse_correlation_matrix(path: Path) -> pd.DataFrame:
+    """Read a correlation file and repair it to a valid correlation matrix."""
     if path.suffix == '.xlsx':
         df = pd.read_excel(path, sheet_name='CORR', index_col=0)
     else:
@@ -160,21 +217,46 @@ def load_return_series(
     if file_path:
         path = Path(file_path)
     else:
-        suffix = "" if currency.upper() == "USD" else f"_{currency.lower()}"
-        possible_paths = [
-            DATA_DIR / f"return_series{suffix}.csv",
-            DATA_DIR / f"returns{suffix}.csv",
-            DATA_DIR / "cma_input3.xlsx",
-        ]
-        path = None
-        for p in possible_paths:
-            if p.exists():
-                path = p
-                break
+        path = _first_existing(DATA_DIR, return_series_files(currency))
 
     if path is None or not path.exists():
         return _generate_mock_returns()
 
+    stored = _stored_frame("returns", path)
+    df, n_rows = stored if stored is not None else _parse_return_series(path)
+
+    # Undated files: label rows with month-ends up to the last complete month
+    if n_rows is not None:
+        df.index = recent_month_ends(n_rows)[df.index.to_numpy()]
+        df.index.name = 'Date'
+        df.attrs["generated_dates"] = True
+
+    return df
+
+
+def return_series_files(currency: str = "USD") -> List[str]:
+    """Candidate return series files for a currency, in lookup order."""
+    suffix = "" if currency.upper() == "USD" else f"_{currency.lower()}"
+    return [f"return_series{suffix}.csv", f"returns{suffix}.csv", "cma_input3.xlsx"]
+
+
+def recent_month_ends(n_periods: int) -> pd.DatetimeIndex:
+    """Monthly dates ending at the most recent complete month-end."""
+    now = pd.Timestamp.now()
+    end_date = now.replace(day=1) - pd.DateOffset(days=1)
+    return pd.date_range(end=end_date.normalize(), periods=n_periods, freq='ME')
+
+
+def _parse_return_series(path: Path) -> Tuple[pd.DataFrame, Optional[int]]:
+    """
+    Read a return series file.
+
+    Files without dates keep their original row numbers as the index, so
+    the caller can attach month-end labels relative to today.
+
+    Returns:
+        Tuple of (returns DataFrame, row count before cleaning or None if dated)
+    """
     if path.suffix == '.xlsx':
         df = pd.read_excel(path, sheet_name='RETURNS')
     else:
@@ -211,21 +293,11 @@ def load_return_series(
                 except (ValueError, TypeError):
                     continue
 
-    # If still no dates, generate monthly date index
-    # Assume data ends at current month and goes back n_periods
-    if not has_dates:
-        n_periods = len(df)
-        # Generate dates ending at the most recent month-end
-        # Use current date minus 1 month to get last complete month
-        now = pd.Timestamp.now()
-        end_date = now.replace(day=1) - pd.DateOffset(days=1)
-        dates = pd.date_range(end=end_date, periods=n_periods, freq='ME')
-        df.index = dates
-        df.index.name = 'Date'
+    # If still no dates, the caller generates a monthly date index
+    n_rows = None if has_dates else len(df)
 
     # Ensure all columns are numeric
-    for col in df.columns:
-        df[col] = pd.to_numeric(df[col], errors='coerce')
+    df = df.apply(pd.to_numeric, errors='coerce')
 
     # Drop rows with all NaN values
     df = df.dropna(how='all')
@@ -233,7 +305,7 @@ def load_return_series(
     # Sort by date
     df = df.sort_index()
 
-    return df
+    return df, n_rows
 
 
 def load_beta_matrix(date: Optional[str] = None) -> pd.DataFrame:
@@ -265,18 +337,25 @@ def load_beta_matrix(date: Optional[str] = None) -> pd.DataFrame:
     if not path.exists():
         return _generate_mock_betas()
 
-    # Try different encodings
+    stored = _stored_frame("betas", path)
+    if stored is not None:
+        return stored[0]
+
+    df = _parse_beta_matrix(path)
+    return df if df is not None else _generate_mock_betas()
+
+
+def _parse_beta_matrix(path: Path) -> Optional[pd.DataFrame]:
+    """Read a beta file, trying several encodings. None if unreadable."""
     for encoding in ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']:
         try:
-            df = pd.read_csv(path, index_col=0, encoding=encoding)
-            return df
+            return pd.read_csv(path, index_col=0, encoding=encoding)
         except (UnicodeDecodeError, Exception) as e:
             if encoding == 'iso-8859-1':  # Last attempt
                 print(f"Warning: Could not load beta matrix from {path}: {e}")
-                return _generate_mock_betas()
             continue
 
-    return _generate_mock_betas()
+    return None
 
 
 def load_factor_covariance(date: Optional[str] = None) -> pd.DataFrame:
@@ -305,9 +384,251 @@ def load_factor_covariance(date: Optional[str] = None) -> pd.DataFrame:
     if not path.exists():
         return _generate_mock_factor_cov()
 
+    stored = _stored_frame("factor_cov", path)
+    if stored is not None:
+        return stored[0]
+
+    return _parse_factor_covariance(path)
+
+
+def _parse_factor_covariance(path: Path) -> pd.DataFrame:
+    """Read a factor covariance file."""
     return pd.read_csv(path, index_col=0)
 
 
+def load_factor_returns(file_path: Optional[str] = None) -> pd.DataFrame:
+    """
+    Load monthly factor returns (Returns/factor_returns.csv).
+
+    Args:
+        file_path: Optional path to a factor returns file.
+
+    Returns:
+        DataFrame of float64 returns (dates x factors), sorted by date
+    """
+    path = Path(file_path) if file_path else DATA_DIR / FACTOR_RETURNS_FILE
+
+    if not path.exists():
+        return _generate_mock_factor_returns()
+
+    stored = _stored_frame("factor_returns", path)
+    if stored is not None:
+        return stored[0]
+
+    return _parse_dated_returns(path)
+
+
+def _parse_dated_returns(path: Path) -> pd.DataFrame:
+    """Read a returns file with day-first dates in the first column."""
+    df = _read_csv_any_encoding(path, index_col=0)
+    df.index = pd.to_datetime(df.index, dayfirst=True)
+    df.index.name = 'Date'
+    df.columns = df.columns.str.strip()
+
+    df = df.apply(pd.to_numeric, errors='coerce').astype(np.float64)
+    df = df.dropna(how='all')
+    # A re-exported month replaces the earlier row
+    df = df[~df.index.duplicated(keep='last')]
+
+    return df.sort_index()
+
+
+def load_factor_metadata(file_path: Optional[str] = None) -> pd.DataFrame:
+    """
+    Load factor metadata (Returns/metadata_factors.csv).
+
+    Args:
+        file_path: Optional path to a metadata file.
+
+    Returns:
+        DataFrame indexed by factor name (Asset Class, Region, Group, Ticker);
+        empty if the file is missing
+    """
+    path = Path(file_path) if file_path else DATA_DIR / FACTOR_METADATA_FILE
+
+    if not path.exists():
+        return pd.DataFrame()
+
+    stored = _stored_frame("factor_metadata", path)
+    if stored is not None:
+        return stored[0]
+
+    return _parse_factor_metadata(path)
+
+
+def _parse_factor_metadata(path: Path) -> pd.DataFrame:
+    """Read factor metadata, one row per factor."""
+    df = _read_csv_any_encoding(path, dtype=str)
+    df.columns = df.columns.str.strip()
+    if "Factor" not in df.columns:
+        raise ValueError(f"{path.name} must have a Factor column")
+
+    df["Factor"] = df["Factor"].str.strip()
+    df = df.dropna(subset=["Factor"]).drop_duplicates("Factor", keep="last")
+    return df.set_index("Factor")
+
+
+def load_instrument_returns(
+    proxied: bool = False,
+    file_path: Optional[str] = None,
+    min_observations: int = 12
+) -> pd.DataFrame:
+    """
+    Load security-level monthly returns (Returns/instruments_returns*.csv).
+
+    Histories start at different dates, so the frame is sparse: NaN before
+    a fund's inception. The proxied file back-fills those gaps with proxy
+    index returns.
+
+    Args:
+        proxied: Load instruments_returns_proxied.csv instead
+        file_path: Optional path to a file in the same format.
+        min_observations: Drop instruments with fewer monthly returns
+
+    Returns:
+        DataFrame of float64 returns (dates x instruments); empty if the file is missing
+    """
+    if file_path:
+        path = Path(file_path)
+    else:
+        path = DATA_DIR / (INSTRUMENT_RETURNS_PROXIED_FILE if proxied else INSTRUMENT_RETURNS_FILE)
+
+    if not path.exists():
+        return pd.DataFrame(dtype=float)
+
+    stored = _stored_frame("instruments", path)
+    df = stored[0] if stored is not None else _parse_dated_returns(path)
+
+    return df.loc[:, df.notna().sum().to_numpy() >= min_observations]
+
+
+def align_factor_returns(
+    factor_returns: pd.DataFrame,
+    security_returns: pd.DataFrame,
+    metadata: Optional[pd.DataFrame] = None,
+    by_position: Optional[bool] = None,
+    dtype=np.float64
+) -> pd.DataFrame:
+    """
+    Put factor returns on the date index of the security returns.
+
+    Dated security returns are matched by calendar month, so month-end
+    conventions (last business day vs calendar month-end) don't matter.
+    Security returns whose dates were generated (undated source files)
+    carry no calendar information; they are matched by position instead,
+    the last security row against the last factor row.
+
+    Months with no factor data are NaN rows; the LASSO fit drops them per
+    security.
+
+    Args:
+        factor_returns: Factor returns (dates x factors)
+        security_returns: Security returns whose index the result takes
+        metadata: Optional factor metadata; factors are ordered as listed
+            there, with unlisted factors after them
+        by_position: Force positional (True) or calendar (False) matching.
+            Defaults to positional when the security dates are generated.
+        dtype: Float dtype of the result (float64 or float32)
+
+    Returns:
+        DataFrame (security dates x factors) backed by one C-contiguous array
+    """
+    factors = list(factor_returns.columns)
+    if metadata is not None and not metadata.empty:
+        listed = [f for f in metadata.index if f in factor_returns.columns]
+        factors = listed + [f for f in factors if f not in set(listed)]
+
+    target = security_returns.index
+    if by_position is None:
+        by_position = (
+            bool(security_returns.attrs.get("generated_dates"))
+            or not isinstance(target, pd.DatetimeIndex)
+        )
+
+    values = np.full((len(target), len(factors)), np.nan, dtype=dtype)
+    source = factor_returns[factors].sort_index()
+
+    if by_position:
+        n = min(len(target), len(source))
+        if n:
+            values[len(target) - n:] = source.to_numpy(dtype=dtype)[len(source) - n:]
+    else:
+        monthly = source.set_axis(source.index.to_period('M'))
+        monthly = monthly[~monthly.index.duplicated(keep='last')]
+        positions = monthly.index.get_indexer(target.to_period('M'))
+        found = positions >= 0
+        values[found] = monthly.to_numpy(dtype=dtype)[positions[found]]
+
+    return pd.DataFrame(np.ascontiguousarray(values), index=target, columns=factors)
+
+
+def _read_csv_any_encoding(path: Path, **kwargs) -> pd.DataFrame:
+    """Read a CSV, trying the encodings seen in exported data files."""
+    for encoding in ['utf-8', 'latin-1', 'cp1252']:
+        try:
+            return pd.read_csv(path, encoding=encoding, **kwargs)
+        except UnicodeDecodeError:
+            continue
+    return pd.read_csv(path, encoding='latin-1', encoding_errors='replace', **kwargs)
+
+
+def load_portfolio_universe(
+    kind: str = "portfolio",
+    file_path: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    Load model portfolio or benchmark weights from the universe files.
+
+    The files are in long format (Tier4, Weight, Portfolio/Benchmark Name);
+    this pivots them to one row per portfolio.
+
+    Args:
+        kind: "portfolio" (Portfolio Universe.csv) or "benchmark" (Benchmark Universe.csv)
+        file_path: Optional path to a universe file in the same format.
+
+    Returns:
+        DataFrame of weights (portfolios x securities), 0 where not held
+    """
+    if kind not in ("portfolio", "benchmark"):
+        raise ValueError(f"Unknown universe kind: {kind}")
+
+    if file_path:
+        path = Path(file_path)
+    else:
+        path = DATA_DIR / "Portfolios" / f"{kind.capitalize()} Universe.csv"
+
+    if not path.exists():
+        return pd.DataFrame(dtype=float)
+
+    stored = _stored_frame("universe", path)
+    if stored is not None:
+        return stored[0]
+
+    return _parse_portfolio_universe(path)
+
+
+def _parse_portfolio_universe(path: Path) -> pd.DataFrame:
+    """Read a long-format universe file and pivot it to portfolios x securities."""
+    df = _read_csv_any_encoding(path)
+    df.columns = df.columns.str.strip()
+
+    name_col = next((c for c in df.columns if c.lower().endswith("name")), None)
+    if name_col is None or "Tier4" not in df.columns or "Weight" not in df.columns:
+        raise ValueError(f"{path.name} must have Tier4, Weight and a name column")
+
+    df["Weight"] = pd.to_numeric(df["Weight"], errors="coerce")
+    df = df.dropna(subset=["Tier4", "Weight", name_col])
+
+    # Same security listed twice in one portfolio: add the weights
+    wide = df.pivot_table(
+        index=name_col, columns="Tier4", values="Weight", aggfunc="sum", fill_value=0.0, sort=False
+    )
+    wide.index.name = "Portfolio"
+    wide.columns.name = None
+
+    return wide.astype(float)
+
+
 def load_all_data() -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
     """
     Load all data files at once.
@@ -397,7 +718,9 @@ def _generate_mock_returns(n_periods: int = 60) -> pd.DataFrame:
     for i, (ret, vol) in enumerate(zip(expected_rets, vols)):
         returns[:, i] = np.random.normal(ret, vol, n_periods)
 
-    return pd.DataFrame(returns, index=dates, columns=assets)
+    df = pd.DataFrame(returns, index=dates, columns=assets)
+    df.attrs["generated_dates"] = True
+    return df
 
 
 def _generate_mock_betas() -> pd.DataFrame:
@@ -434,3 +757,14 @@ def _generate_mock_factor_cov() -> pd.DataFrame:
     cov = np.outer(vols, vols) * corr
 
     return pd.DataFrame(cov, index=factors, columns=factors)
+
+
+def _generate_mock_factor_returns(n_periods: int = 60) -> pd.DataFrame:
+    """Generate mock factor returns drawn from the mock factor covariance."""
+    np.random.seed(789)
+
+    cov = _generate_mock_factor_cov()
+    dates = recent_month_ends(n_periods)
+    returns = np.random.multivariate_normal(np.zeros(len(cov)), cov.values, n_periods)
+
+    return pd.DataFrame(returns, index=dates, columns=cov.columns)
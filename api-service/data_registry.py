@@ -0,0 +1,389 @@
+"""
+Data Registry
+Lazily loaded, memoized datasets for the API service
+
+Each dataset is registered with a loader and an optional fallback.
+Nothing is read until the first get_dataset() call; the result is then
+memoized and the load timed. Startup costs nothing, and datasets no
+request touches (other currencies, older beta snapshots) are never parsed.
+
+Loaded values live in an immutable snapshot tied to a version of the
+files under DATA_DIR. reload_datasets() (run by the data watcher, or on
+demand) builds a new snapshot, loads whatever the old one had loaded and
+only then swaps it in. Requests holding frames from the old snapshot
+finish on them; swap listeners invalidate dependent caches.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+import data_loader
+from data_loader import (
+    load_cma_data,
+    load_correlation_matrix,
+    load_return_series,
+    load_beta_matrix,
+    load_factor_covariance,
+    load_portfolio_universe,
+    load_factor_returns,
+    load_factor_metadata,
+    load_instrument_returns,
+    align_factor_returns,
+    _generate_mock_cma_data,
+    _generate_mock_correlation_matrix,
+    _generate_mock_returns,
+    _generate_mock_betas,
+    _generate_mock_factor_cov,
+    _generate_mock_factor_returns,
+)
+from data_store import source_signature, clear_data_store_cache
+from risk_engine import factor_residual_variance
+
+# Seconds between checks of DATA_DIR for new or changed files (0 = off)
+DATA_POLL_SECONDS = float(os.environ.get("DATA_POLL_SECONDS", "30"))
+
+# name -> (loader, fallback used if the loader raises)
+_LOADERS: Dict[str, Callable[[], object]] = {}
+_FALLBACKS: Dict[str, Optional[Callable[[], object]]] = {}
+
+_REGISTRY_LOCK = threading.Lock()
+_RELOAD_LOCK = threading.Lock()
+_SWAP_LISTENERS: List[Callable[["DataSnapshot", "DataSnapshot"], None]] = []
+_STATS = {"reloads": 0, "last_check": None, "last_reload_ms": None}
+
+# Snapshot a loader is filling on this thread, so dependent datasets
+# resolve against the same snapshot rather than the current one
+_LOADING = threading.local()
+
+
+def data_version(data_dir=None) -> str:
+    """Version id of the source files: a hash of their names, sizes and mtimes."""
+    signature = source_signature(data_dir or data_loader.DATA_DIR)
+    return hashlib.sha256(json.dumps(signature).encode()).hexdigest()[:16]
+
+
+class DataSnapshot:
+    """Datasets loaded from one version of the source files."""
+
+    def __init__(self, version: str):
+        self.version = version
+        self.created_at = time.time()
+        self._values: Dict[str, object] = {}
+        self._timings: Dict[str, Dict] = {}
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def loaded(self) -> List[str]:
+        with self._lock:
+            return list(self._values)
+
+    def get(self, name: str):
+        """Dataset by name, loading it into this snapshot on first use."""
+        with self._lock:
+            if name in self._values:
+                return self._values[name]
+            if name not in _LOADERS:
+                raise KeyError(f"Unknown dataset: {name}")
+            key_lock = self._key_locks.setdefault(name, threading.Lock())
+
+        with key_lock:
+            # Another caller may have loaded it while we waited
+            if name in self._values:
+                return self._values[name]
+
+            outer = getattr(_LOADING, "snapshot", None)
+            _LOADING.snapshot = self
+            start = time.perf_counter()
+            fallback_used = False
+            try:
+                value = _LOADERS[name]()
+            except Exception as e:
+                if _FALLBACKS[name] is None:
+                    raise
+                print(f"✗ Error loading {name}: {e}. Falling back to mock data.")
+                value = _FALLBACKS[name]()
+                fallback_used = True
+            finally:
+                _LOADING.snapshot = outer
+            elapsed_ms = (time.perf_counter() - start) * 1000
+
+            with self._lock:
+                self._values[name] = value
+                self._timings[name] = {
+                    "load_ms": round(elapsed_ms, 3),
+                    "loaded_at": time.time(),
+                    "fallback": fallback_used,
+                    "shape": list(value.shape) if hasattr(value, "shape") else None,
+                }
+
+        return value
+
+    def drop(self, names: Optional[Iterable[str]] = None) -> None:
+        with self._lock:
+            for name in list(self._values) if names is None else list(names):
+                self._values.pop(name, None)
+                self._timings.pop(name, None)
+
+    def timings(self) -> Dict[str, Dict]:
+        with self._lock:
+            return dict(self._timings)
+
+
+_CURRENT: Optional[DataSnapshot] = None
+
+
+def current_snapshot() -> DataSnapshot:
+    """Snapshot new requests read from."""
+    global _CURRENT
+    with _REGISTRY_LOCK:
+        if _CURRENT is None:
+            _CURRENT = DataSnapshot(data_version())
+        return _CURRENT
+
+
+def register_dataset(
+    name: str,
+    loader: Callable[[], object],
+    fallback: Optional[Callable[[], object]] = None
+) -> None:
+    """
+    Register (or replace) a dataset. Drops any value already loaded for it.
+
+    Args:
+        name: Dataset name used with get_dataset
+        loader: Zero-argument callable producing the dataset
+        fallback: Optional zero-argument callable used if loader raises
+    """
+    with _REGISTRY_LOCK:
+        _LOADERS[name] = loader
+        _FALLBACKS[name] = fallback
+        snapshot = _CURRENT
+    if snapshot is not None:
+        snapshot.drop([name])
+
+
+def get_dataset(name: str):
+    """
+    Dataset by name, loading it on first use.
+
+    Concurrent first calls for the same dataset wait for a single load.
+
+    Args:
+        name: Registered dataset name
+
+    Returns:
+        The memoized dataset (usually a DataFrame)
+    """
+    snapshot = getattr(_LOADING, "snapshot", None) or current_snapshot()
+    return snapshot.get(name)
+
+
+def get_datasets(*names: str) -> Tuple:
+    """Several datasets, all from the same snapshot."""
+    snapshot = getattr(_LOADING, "snapshot", None) or current_snapshot()
+    return tuple(snapshot.get(name) for name in names)
+
+
+def preload_datasets(names: Iterable[str]) -> None:
+    """Load datasets ahead of their first request (e.g. from a startup task)."""
+    for name in names:
+        try:
+            get_dataset(name)
+        except Exception as e:
+            print(f"Warning: Could not preload {name}: {e}")
+
+
+def clear_datasets(names: Optional[Iterable[str]] = None) -> None:
+    """
+    Forget loaded values so the next get_dataset reloads them.
+
+    Args:
+        names: Datasets to drop. Defaults to all.
+    """
+    current_snapshot().drop(names)
+
+
+def dataset_stats() -> Dict:
+    """Registered datasets, and load timings for the ones loaded so far."""
+    timings = current_snapshot().timings()
+    with _REGISTRY_LOCK:
+        return {
+            name: {"loaded": name in timings, **timings.get(name, {})}
+            for name in _LOADERS
+        }
+
+
+# ============================================================================
+# Hot reload
+# ============================================================================
+
+def add_swap_listener(callback: Callable[[DataSnapshot, DataSnapshot], None]) -> None:
+    """Call callback(old, new) after every snapshot swap (e.g. to drop caches)."""
+    with _REGISTRY_LOCK:
+        _SWAP_LISTENERS.append(callback)
+
+
+def reload_datasets(force: bool = False, prewarm: bool = True) -> bool:
+    """
+    Swap in a new snapshot if the source files changed.
+
+    The new snapshot is filled before the swap, so requests keep reading
+    the old one until the new data is ready.
+
+    Args:
+        force: Swap even if the source version is unchanged
+        prewarm: Load every dataset the old snapshot had loaded before swapping
+
+    Returns:
+        True if a new snapshot was swapped in
+    """
+    with _RELOAD_LOCK:
+        old = current_snapshot()
+        version = data_version()
+        _STATS["last_check"] = time.time()
+        if version == old.version and not force:
+            return False
+
+        start = time.perf_counter()
+        # The compiled store is opened once per process; re-check it
+        clear_data_store_cache()
+
+        new = DataSnapshot(version)
+        if prewarm:
+            for name in old.loaded():
+                try:
+                    new.get(name)
+                except Exception as e:
+                    print(f"Warning: Could not reload {name}: {e}")
+
+        global _CURRENT
+        with _REGISTRY_LOCK:
+            _CURRENT = new
+            listeners = list(_SWAP_LISTENERS)
+        _STATS["reloads"] += 1
+        _STATS["last_reload_ms"] = round((time.perf_counter() - start) * 1000, 3)
+
+    print(f"✓ Data snapshot {old.version} -> {new.version}")
+    for callback in listeners:
+        try:
+            callback(old, new)
+        except Exception as e:
+            print(f"Warning: Snapshot swap listener failed: {e}")
+    return True
+
+
+class _DataWatcher(threading.Thread):
+    """Daemon thread polling DATA_DIR and reloading on change."""
+
+    def __init__(self, interval: float):
+        super().__init__(name="data-watcher", daemon=True)
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            try:
+                reload_datasets()
+            except Exception as e:
+                print(f"Warning: Data reload failed: {e}")
+
+
+_WATCHER: Optional[_DataWatcher] = None
+
+
+def start_data_watcher(interval: Optional[float] = None) -> bool:
+    """
+    Start polling DATA_DIR for changes (no-op if already running).
+
+    Args:
+        interval: Seconds between checks. Defaults to DATA_POLL_SECONDS; 0 disables.
+
+    Returns:
+        True if a watcher is running
+    """
+    global _WATCHER
+    interval = DATA_POLL_SECONDS if interval is None else interval
+    if interval <= 0:
+        return False
+    with _REGISTRY_LOCK:
+        if _WATCHER is None or not _WATCHER.is_alive():
+            _WATCHER = _DataWatcher(interval)
+            _WATCHER.start()
+    return True
+
+
+def stop_data_watcher() -> None:
+    """Stop the polling thread, if any."""
+    global _WATCHER
+    with _REGISTRY_LOCK:
+        watcher, _WATCHER = _WATCHER, None
+    if watcher is not None:
+        watcher.stopped.set()
+
+
+def snapshot_stats() -> Dict:
+    """Current data version, reload counters and watcher state."""
+    snapshot = current_snapshot()
+    with _REGISTRY_LOCK:
+        watching = _WATCHER is not None and _WATCHER.is_alive()
+        return {
+            "version": snapshot.version,
+            "created_at": snapshot.created_at,
+            "watching": watching,
+            "poll_seconds": _WATCHER.interval if watching else 0,
+            **_STATS,
+        }
+
+
+# ============================================================================
+# Service datasets
+# ============================================================================
+
+def _aligned_factor_returns() -> pd.DataFrame:
+    """Factor returns on the USD return dates, in metadata order."""
+    returns, raw, metadata = get_datasets("returns_usd", "factor_returns_raw", "factor_metadata")
+    return align_factor_returns(raw, returns, metadata)
+
+
+def _factor_residual_var() -> pd.Series:
+    """Residual variance of the instruments under the latest beta file."""
+    returns, raw, betas = get_datasets("instrument_returns", "factor_returns_raw", "betas")
+    return factor_residual_variance(returns, align_factor_returns(raw, returns), betas)
+
+
+register_dataset("cma", load_cma_data, _generate_mock_cma_data)
+register_dataset("correlation", load_correlation_matrix, _generate_mock_correlation_matrix)
+for _currency in ("USD", "EUR", "GBP"):
+    register_dataset(
+        f"returns_{_currency.lower()}",
+        lambda currency=_currency: load_return_series(currency),
+        _generate_mock_returns
+    )
+register_dataset("betas", load_beta_matrix, _generate_mock_betas)
+register_dataset("factor_cov", load_factor_covariance, _generate_mock_factor_cov)
+register_dataset(
+    "portfolio_universe",
+    lambda: load_portfolio_universe("portfolio"),
+    lambda: pd.DataFrame(dtype=float)
+)
+register_dataset(
+    "benchmark_universe",
+    lambda: load_portfolio_universe("benchmark"),
+    lambda: pd.DataFrame(dtype=float)
+)
+register_dataset("factor_returns_raw", load_factor_returns, _generate_mock_factor_returns)
+register_dataset("factor_metadata", load_factor_metadata, pd.DataFrame)
+register_dataset("factor_returns", _aligned_factor_returns)
+register_dataset("factor_residual_var", _factor_residual_var)
+register_dataset("instrument_returns", load_instrument_returns, lambda: pd.DataFrame(dtype=float))
+register_dataset(
+    "instrument_returns_proxied",
+    lambda: load_instrument_returns(proxied=True),
+    lambda: pd.DataFrame(dtype=float)
+)
@@ -0,0 +1,436 @@
+"""
+Compiled Data Store
+Versioned binary copy of the source files under data/
+
+compile_data_store() parses every CSV/Excel source once with the
+data_loader parsers and writes each frame as a .npy array plus a JSON
+manifest. The loaders in data_loader then memory-map those arrays instead
+of re-parsing the files, so uvicorn workers share the same pages and a
+cold start only costs a manifest read.
+
+The store is versioned by a content hash of the sources. A store is only
+used while the size and mtime of every source file still match what was
+compiled; otherwise it is recompiled (DATA_STORE=auto), ignored
+(DATA_STORE=readonly) or never used at all (DATA_STORE=off).
+
+Usage:
+    python data_store.py            # compile if stale
+    python data_store.py --force    # always recompile
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+import data_loader
+from data_loader import (
+    CACHE_DIR,
+    CMA_FILES,
+    CORRELATION_FILES,
+    FACTOR_RETURNS_FILE,
+    FACTOR_METADATA_FILE,
+    INSTRUMENT_RETURNS_FILE,
+    INSTRUMENT_RETURNS_PROXIED_FILE,
+    _first_existing,
+    _parse_cma_data,
+    _parse_correlation_matrix,
+    _parse_return_series,
+    _parse_beta_matrix,
+    _parse_factor_covariance,
+    _parse_dated_returns,
+    _parse_factor_metadata,
+    _parse_portfolio_universe,
+)
+
+# Bump when the on-disk layout or any parser's output changes
+STORE_FORMAT_VERSION = 1
+
+STORE_DIR = Path(os.environ.get("DATA_STORE_DIR", CACHE_DIR / "data_store"))
+
+# "auto" = use, recompile when stale; "readonly" = use only if fresh; "off"
+DATA_STORE_MODE = os.environ.get("DATA_STORE", "auto").lower()
+
+# Files whose size/mtime decide whether a compiled store is still fresh
+SOURCE_GLOBS = ["*.csv", "*.xlsx", "Covariance_Matrix/*.csv", "Portfolios/*.csv", "Returns/*.csv"]
+
+_STORES: Dict[Tuple[str, str], Optional["DataStore"]] = {}
+_STORE_LOCK = threading.Lock()
+_STATS = {"compiles": 0, "compile_ms": 0.0, "open_ms": 0.0}
+
+
+class DataStore:
+    """One compiled, immutable store version."""
+
+    def __init__(self, path: Path, data_dir: Path, manifest: Dict):
+        self.path = path
+        self.data_dir = data_dir.resolve()
+        self.manifest = manifest
+
+    @property
+    def version(self) -> str:
+        return self.manifest["version"]
+
+    def keys(self) -> List[str]:
+        return list(self.manifest["frames"])
+
+    def frame(self, kind: str, source: Path) -> Optional[Tuple[pd.DataFrame, Optional[int]]]:
+        """
+        Memory-mapped frame compiled from a source file.
+
+        Args:
+            kind: Parser the file was compiled with ("cma", "returns", ...)
+            source: Path of the source file
+
+        Returns:
+            Tuple of (DataFrame, row count for undated return series), or
+            None if the file is outside the data directory or not compiled
+        """
+        try:
+            rel = Path(source).resolve().relative_to(self.data_dir)
+        except ValueError:
+            return None
+
+        entry = self.manifest["frames"].get(_frame_key(kind, rel))
+        if entry is None:
+            return None
+
+        try:
+            return _read_frame(self.path, entry), entry.get("n_rows")
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not read {rel} from data store {self.version}: {e}")
+            return None
+
+
+def _frame_key(kind: str, rel: Path) -> str:
+    return f"{kind}:{rel.as_posix()}"
+
+
+# ============================================================================
+# Frame encoding
+# ============================================================================
+
+def _encode_index(index: pd.Index) -> Dict:
+    if isinstance(index, pd.RangeIndex):
+        encoded = {"kind": "range", "values": [index.start, index.stop, index.step]}
+    elif isinstance(index, pd.DatetimeIndex):
+        encoded = {"kind": "datetime", "values": [ts.isoformat() for ts in index]}
+    elif pd.api.types.is_integer_dtype(index.dtype):
+        encoded = {"kind": "int", "values": [int(i) for i in index]}
+    else:
+        encoded = {"kind": "labels", "values": [None if pd.isna(i) else str(i) for i in index]}
+    encoded["name"] = index.name
+    return encoded
+
+
+def _decode_index(encoded: Dict) -> pd.Index:
+    if encoded["kind"] == "range":
+        index = pd.RangeIndex(*encoded["values"])
+    elif encoded["kind"] == "datetime":
+        index = pd.DatetimeIndex(pd.to_datetime(encoded["values"]))
+    elif encoded["kind"] == "int":
+        index = pd.Index(np.asarray(encoded["values"], dtype=np.int64))
+    else:
+        index = pd.Index(encoded["values"], dtype=object)
+    index.name = encoded["name"]
+    return index
+
+
+def _write_frame(frame: pd.DataFrame, directory: Path, name: str) -> Dict:
+    """
+    Write one frame: numeric columns as a single float64 .npy block, any
+    text columns inline in the manifest entry.
+    """
+    numeric = [
+        col for col in frame.columns
+        if pd.api.types.is_numeric_dtype(frame[col]) and not pd.api.types.is_bool_dtype(frame[col])
+    ]
+    values = np.ascontiguousarray(frame[numeric].to_numpy(dtype=np.float64))
+    np.save(directory / f"{name}.npy", values, allow_pickle=False)
+
+    return {
+        "file": f"{name}.npy",
+        "shape": list(values.shape),
+        "index": _encode_index(frame.index),
+        "columns": [str(col) for col in frame.columns],
+        "numeric": [str(col) for col in numeric],
+        "dtypes": {
+            str(col): str(frame[col].dtype) for col in numeric if frame[col].dtype != np.float64
+        },
+        "objects": {
+            str(col): [None if pd.isna(v) else v for v in frame[col].tolist()]
+            for col in frame.columns if col not in numeric
+        },
+    }
+
+
+def _read_frame(directory: Path, entry: Dict) -> pd.DataFrame:
+    # Copy-on-write mapping: pages are shared until a caller writes to them
+    mmap_mode = "c" if np.prod(entry["shape"]) > 0 else None
+    values = np.load(directory / entry["file"], mmap_mode=mmap_mode, allow_pickle=False)
+
+    df = pd.DataFrame(values, index=_decode_index(entry["index"]), columns=entry["numeric"], copy=False)
+    for col, dtype in entry["dtypes"].items():
+        df[col] = df[col].astype(dtype)
+
+    if entry["objects"]:
+        for col, column_values in entry["objects"].items():
+            df[col] = column_values
+        df = df[entry["columns"]]
+
+    return df
+
+
+# ============================================================================
+# Compilation
+# ============================================================================
+
+def source_signature(data_dir: Path) -> Dict[str, List[int]]:
+    """Size and mtime of every source file, keyed by path relative to data_dir."""
+    signature = {}
+    for pattern in SOURCE_GLOBS:
+        for path in data_dir.glob(pattern):
+            stat = path.stat()
+            signature[path.relative_to(data_dir).as_posix()] = [stat.st_size, stat.st_mtime_ns]
+    return dict(sorted(signature.items()))
+
+
+def _content_version(data_dir: Path, signature: Dict[str, List[int]]) -> str:
+    h = hashlib.sha256(f"format-{STORE_FORMAT_VERSION}".encode())
+    for rel in signature:
+        h.update(rel.encode())
+        h.update((data_dir / rel).read_bytes())
+    return h.hexdigest()[:16]
+
+
+def _collect_sources(data_dir: Path) -> List[Tuple[str, Path]]:
+    """(kind, path) for every file the default loaders can read."""
+    sources = []
+
+    for kind, names in (("cma", CMA_FILES), ("correlation", CORRELATION_FILES)):
+        path = _first_existing(data_dir, names)
+        if path is not None:
+            sources.append((kind, path))
+
+    for pattern in ("return_series*.csv", "returns*.csv"):
+        sources.extend(("returns", path) for path in sorted(data_dir.glob(pattern)))
+
+    cov_dir = data_dir / "Covariance_Matrix"
+    sources.extend(("betas", path) for path in sorted(cov_dir.glob("betas_*.csv")))
+    sources.extend(("factor_cov", path) for path in sorted(cov_dir.glob("factor_cov_*.csv")))
+
+    for kind in ("portfolio", "benchmark"):
+        path = data_dir / "Portfolios" / f"{kind.capitalize()} Universe.csv"
+        if path.exists():
+            sources.append(("universe", path))
+
+    for kind, rel in (
+        ("factor_returns", FACTOR_RETURNS_FILE),
+        ("factor_metadata", FACTOR_METADATA_FILE),
+        ("instruments", INSTRUMENT_RETURNS_FILE),
+        ("instruments", INSTRUMENT_RETURNS_PROXIED_FILE),
+    ):
+        if (data_dir / rel).exists():
+            sources.append((kind, data_dir / rel))
+
+    return sources
+
+
+def _parse_source(kind: str, path: Path) -> Tuple[Optional[pd.DataFrame], Optional[int]]:
+    if kind == "returns":
+        return _parse_return_series(path)
+    parser = {
+        "cma": _parse_cma_data,
+        "correlation": _parse_correlation_matrix,
+        "betas": _parse_beta_matrix,
+        "factor_cov": _parse_factor_covariance,
+        "universe": _parse_portfolio_universe,
+        "factor_returns": _parse_dated_returns,
+        "instruments": _parse_dated_returns,
+        "factor_metadata": _parse_factor_metadata,
+    }[kind]
+    return parser(path), None
+
+
+def _write_current(store_dir: Path, pointer: Dict) -> None:
+    """Point the store at a version (write to temp file, then rename)."""
+    tmp_path = store_dir / f"CURRENT.{os.getpid()}.tmp"
+    tmp_path.write_text(json.dumps(pointer))
+    os.replace(tmp_path, store_dir / "CURRENT")
+
+
+def compile_data_store(
+    data_dir: Optional[Path] = None,
+    store_dir: Optional[Path] = None,
+    force: bool = False
+) -> DataStore:
+    """
+    Parse every source file and write a new store version.
+
+    Versions are content-addressed, so recompiling unchanged data (e.g.
+    after a checkout touched mtimes) reuses the existing version. Versions
+    are written to a temp directory and renamed into place, so concurrent
+    workers never see a partial store.
+
+    Args:
+        data_dir: Source directory. Defaults to data_loader.DATA_DIR.
+        store_dir: Store directory. Defaults to STORE_DIR.
+        force: Rewrite the version even if it already exists
+
+    Returns:
+        The compiled DataStore
+    """
+    data_dir = Path(data_dir) if data_dir else data_loader.DATA_DIR
+    store_dir = Path(store_dir) if store_dir else STORE_DIR
+    start = time.perf_counter()
+
+    signature = source_signature(data_dir)
+    version = _content_version(data_dir, signature)
+    version_dir = store_dir / version
+
+    if force or not (version_dir / "manifest.json").exists():
+        store_dir.mkdir(parents=True, exist_ok=True)
+        tmp_dir = store_dir / f".{version}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir()
+
+        frames = {}
+        for i, (kind, path) in enumerate(_collect_sources(data_dir)):
+            try:
+                df, n_rows = _parse_source(kind, path)
+            except Exception as e:
+                print(f"Warning: Not compiling {path.name}: {e}")
+                continue
+            if df is None:
+                continue
+            entry = _write_frame(df, tmp_dir, f"{i:03d}")
+            if n_rows is not None:
+                entry["n_rows"] = n_rows
+            frames[_frame_key(kind, path.relative_to(data_dir))] = entry
+
+        manifest = {"version": version, "format": STORE_FORMAT_VERSION, "frames": frames}
+        (tmp_dir / "manifest.json").write_text(json.dumps(manifest))
+
+        if force:
+            shutil.rmtree(version_dir, ignore_errors=True)
+        try:
+            os.replace(tmp_dir, version_dir)
+        except OSError:
+            # Another worker finished the same version first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    _write_current(store_dir, {
+        "version": version,
+        "format": STORE_FORMAT_VERSION,
+        "data_dir": str(data_dir.resolve()),
+        "sources": signature,
+    })
+
+    with _STORE_LOCK:
+        _STATS["compiles"] += 1
+        _STATS["compile_ms"] = (time.perf_counter() - start) * 1000
+
+    manifest = json.loads((version_dir / "manifest.json").read_text())
+    return DataStore(version_dir, data_dir, manifest)
+
+
+def open_data_store(data_dir: Optional[Path] = None, store_dir: Optional[Path] = None) -> Optional[DataStore]:
+    """
+    Open the current store version if it is fresh.
+
+    Args:
+        data_dir: Source directory. Defaults to data_loader.DATA_DIR.
+        store_dir: Store directory. Defaults to STORE_DIR.
+
+    Returns:
+        DataStore, or None if missing, from another format or stale
+    """
+    data_dir = Path(data_dir) if data_dir else data_loader.DATA_DIR
+    store_dir = Path(store_dir) if store_dir else STORE_DIR
+
+    try:
+        pointer = json.loads((store_dir / "CURRENT").read_text())
+    except (OSError, ValueError):
+        return None
+
+    if (
+        pointer.get("format") != STORE_FORMAT_VERSION
+        or pointer.get("data_dir") != str(data_dir.resolve())
+        or pointer.get("sources") != source_signature(data_dir)
+    ):
+        return None
+
+    version_dir = store_dir / pointer["version"]
+    try:
+        manifest = json.loads((version_dir / "manifest.json").read_text())
+    except (OSError, ValueError):
+        return None
+
+    return DataStore(version_dir, data_dir, manifest)
+
+
+def get_data_store(data_dir: Optional[Path] = None, store_dir: Optional[Path] = None) -> Optional[DataStore]:
+    """
+    Store used by the data_loader functions, opened once per process.
+
+    Returns:
+        DataStore, or None if DATA_STORE=off or no fresh store is available
+    """
+    if DATA_STORE_MODE == "off":
+        return None
+
+    data_dir = Path(data_dir) if data_dir else data_loader.DATA_DIR
+    store_dir = Path(store_dir) if store_dir else STORE_DIR
+    key = (str(data_dir), str(store_dir))
+
+    with _STORE_LOCK:
+        if key in _STORES:
+            return _STORES[key]
+
+        start = time.perf_counter()
+        store = open_data_store(data_dir, store_dir)
+        _STATS["open_ms"] = (time.perf_counter() - start) * 1000
+
+    if store is None and DATA_STORE_MODE == "auto" and data_dir.exists():
+        try:
+            store = compile_data_store(data_dir, store_dir)
+        except OSError as e:
+            print(f"Warning: Could not compile data store: {e}")
+
+    with _STORE_LOCK:
+        return _STORES.setdefault(key, store)
+
+
+def clear_data_store_cache() -> None:
+    """Forget opened stores so the next load re-checks freshness."""
+    with _STORE_LOCK:
+        _STORES.clear()
+        for name in _STATS:
+            _STATS[name] = 0
+
+
+def data_store_stats() -> Dict:
+    """Mode, opened versions and compile/open timings."""
+    with _STORE_LOCK:
+        stores = [store for store in _STORES.values() if store is not None]
+        return {
+            "mode": DATA_STORE_MODE,
+            "versions": [store.version for store in stores],
+            "frames": sum(len(store.keys()) for store in stores),
+            **_STATS,
+        }
+
+
+if __name__ == "__main__":
+    store = compile_data_store(force="--force" in sys.argv[1:])
+    print(f"Data store {store.version}: {len(store.keys())} frames in {store.path}")
+    for key in store.keys():
+        print(f"  {key}")
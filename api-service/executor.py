@@ -0,0 +1,272 @@
+"""
+Compute Executor
+Runs blocking NumPy/SciPy/sklearn work off the asyncio event loop
+
+Two pools are used:
+- a thread pool for BLAS-heavy work (NumPy releases the GIL in matrix products)
+- a process pool for pure-Python-heavy solvers such as SLSQP
+
+Every call is tagged with an endpoint group that has its own concurrency
+limit, and the total number of admitted calls (running + waiting) is
+bounded. When the bound is hit the call is rejected with ComputeBusyError
+instead of queueing indefinitely.
+
+Configuration (environment variables):
+    COMPUTE_EXECUTOR          "pool" (default) or "inline" (run on the event loop)
+    COMPUTE_THREAD_WORKERS    Thread pool size
+    COMPUTE_PROCESS_WORKERS   Process pool size
+    COMPUTE_MAX_QUEUE         Max admitted calls across all endpoints
+    COMPUTE_LIMITS            Per-endpoint limits, e.g. "frontier=2,lasso=1"
+    COMPUTE_MP_START          multiprocessing start method (default "forkserver")
+"""
+
+import asyncio
+import collections
+import functools
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Iterator, Optional
+
+
+def _parse_limits(spec: str) -> Dict[str, int]:
+    """Parse "name=limit,name=limit" into a dict."""
+    limits = {}
+    for item in spec.split(","):
+        if "=" in item:
+            name, value = item.split("=", 1)
+            limits[name.strip()] = int(value)
+    return limits
+
+
+CPU_COUNT = os.cpu_count() or 1
+
+EXECUTOR_MODE = os.environ.get("COMPUTE_EXECUTOR", "pool")
+THREAD_WORKERS = int(os.environ.get("COMPUTE_THREAD_WORKERS", min(32, CPU_COUNT + 4)))
+PROCESS_WORKERS = int(os.environ.get("COMPUTE_PROCESS_WORKERS", CPU_COUNT))
+MAX_QUEUE_DEPTH = int(os.environ.get("COMPUTE_MAX_QUEUE", 64))
+MP_START_METHOD = os.environ.get("COMPUTE_MP_START", "forkserver")
+
+# Max concurrent calls per endpoint group
+ENDPOINT_LIMITS: Dict[str, int] = {
+    "risk": 16,
+    "batch": 4,
+    "lasso": 2,
+    "stress": 8,
+    "simulation": 4,
+    "frontier": max(1, PROCESS_WORKERS),
+    **_parse_limits(os.environ.get("COMPUTE_LIMITS", "")),
+}
+DEFAULT_LIMIT = 8
+
+
+class ComputeBusyError(RuntimeError):
+    """Raised when the compute queue is full; maps to HTTP 503."""
+
+
+_thread_pool: Optional[ThreadPoolExecutor] = None
+_process_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+# Semaphores are bound to an event loop, so keep one set per loop
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+_admitted = 0
+_stats_lock = threading.Lock()
+_stats: Dict[str, Dict[str, float]] = {}
+
+
+def _get_pool(kind: str):
+    """Create pools lazily so importing this module is free."""
+    global _thread_pool, _process_pool
+
+    with _pool_lock:
+        if kind == "process":
+            if _process_pool is None:
+                methods = multiprocessing.get_all_start_methods()
+                method = MP_START_METHOD if MP_START_METHOD in methods else "spawn"
+                _process_pool = ProcessPoolExecutor(
+                    max_workers=PROCESS_WORKERS,
+                    mp_context=multiprocessing.get_context(method)
+                )
+            return _process_pool
+
+        if _thread_pool is None:
+            _thread_pool = ThreadPoolExecutor(max_workers=THREAD_WORKERS, thread_name_prefix="compute")
+        return _thread_pool
+
+
+def _get_semaphore(endpoint: str) -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    per_loop = _semaphores.setdefault(loop, {})
+    if endpoint not in per_loop:
+        per_loop[endpoint] = asyncio.Semaphore(ENDPOINT_LIMITS.get(endpoint, DEFAULT_LIMIT))
+    return per_loop[endpoint]
+
+
+def _record(endpoint: str, field: str, value: float = 1) -> None:
+    with _stats_lock:
+        entry = _stats.setdefault(endpoint, {
+            "completed": 0, "failed": 0, "rejected": 0, "running": 0, "total_ms": 0.0, "max_ms": 0.0
+        })
+        if field == "elapsed_ms":
+            entry["total_ms"] += value
+            entry["max_ms"] = max(entry["max_ms"], value)
+        else:
+            entry[field] += value
+
+
+async def run_compute(
+    endpoint: str,
+    fn: Callable,
+    *args,
+    kind: str = "thread",
+    **kwargs
+) -> Any:
+    """
+    Run a blocking function in the compute pools and await its result.
+
+    Args:
+        endpoint: Endpoint group used for the concurrency limit and stats
+        fn: Function to run. Must be a picklable module-level function for kind="process".
+        args: Positional arguments for fn
+        kind: "thread" (BLAS/NumPy work) or "process" (pure-Python solvers)
+        kwargs: Keyword arguments for fn
+
+    Returns:
+        Whatever fn returns
+
+    Raises:
+        ComputeBusyError: The compute queue is full
+    """
+    global _admitted
+
+    if EXECUTOR_MODE == "inline":
+        return fn(*args, **kwargs)
+
+    with _stats_lock:
+        if _admitted >= MAX_QUEUE_DEPTH:
+            busy = True
+        else:
+            busy = False
+            _admitted += 1
+    if busy:
+        _record(endpoint, "rejected")
+        raise ComputeBusyError(f"Compute queue full ({MAX_QUEUE_DEPTH} requests in flight)")
+
+    try:
+        async with _get_semaphore(endpoint):
+            _record(endpoint, "running")
+            start = time.perf_counter()
+            try:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(_get_pool(kind), functools.partial(fn, *args, **kwargs))
+            except BrokenProcessPool:
+                _reset_process_pool()
+                _record(endpoint, "failed")
+                raise
+            except Exception:
+                _record(endpoint, "failed")
+                raise
+            finally:
+                _record(endpoint, "running", -1)
+            # Timed on success only, so avg_ms and max_ms describe completed calls
+            _record(endpoint, "elapsed_ms", (time.perf_counter() - start) * 1000)
+            _record(endpoint, "completed")
+            return result
+    finally:
+        with _stats_lock:
+            _admitted -= 1
+
+
+def process_map(fn: Callable, *iterables, max_pending: Optional[int] = None) -> Iterator:
+    """
+    Lazily map fn over iterables in the shared process pool.
+
+    For fanning out one call that run_compute already admitted (run it with
+    kind="thread"); the pieces bypass the endpoint limits. At most
+    max_pending calls (default twice the process workers) are submitted
+    ahead of the consumer, so results never pile up in memory. Results
+    arrive in order. Runs in-process in inline mode.
+
+    Args:
+        fn: Picklable module-level function
+        iterables: Argument iterables, as for map()
+        max_pending: Max calls submitted but not yet consumed
+
+    Returns:
+        Iterator over the results
+    """
+    if EXECUTOR_MODE == "inline":
+        yield from map(fn, *iterables)
+        return
+
+    pool = _get_pool("process")
+    limit = max(1, max_pending or 2 * PROCESS_WORKERS)
+    arguments = zip(*iterables)
+    pending: "collections.deque[Future]" = collections.deque()
+    try:
+        for args in itertools.islice(arguments, limit):
+            pending.append(pool.submit(fn, *args))
+        while pending:
+            result = pending.popleft().result()
+            for args in itertools.islice(arguments, 1):
+                pending.append(pool.submit(fn, *args))
+            yield result
+    except BrokenProcessPool:
+        _reset_process_pool()
+        raise
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def _reset_process_pool() -> None:
+    """Drop a broken process pool so the next call starts a fresh one."""
+    global _process_pool
+    with _pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+            _process_pool = None
+
+
+def executor_stats() -> Dict:
+    """Pool configuration, queue depth and per-endpoint counters."""
+    with _stats_lock:
+        endpoints = {
+            name: {
+                **{k: v for k, v in entry.items() if k not in ("total_ms",)},
+                "avg_ms": entry["total_ms"] / entry["completed"] if entry["completed"] else 0.0,
+            }
+            for name, entry in _stats.items()
+        }
+        admitted = _admitted
+
+    return {
+        "mode": EXECUTOR_MODE,
+        "thread_workers": THREAD_WORKERS,
+        "process_workers": PROCESS_WORKERS,
+        "max_queue_depth": MAX_QUEUE_DEPTH,
+        "in_flight": admitted,
+        "limits": dict(ENDPOINT_LIMITS),
+        "endpoints": endpoints,
+    }
+
+
+def shutdown_executors(wait: bool = True) -> None:
+    """Shut down both pools (call on application shutdown)."""
+    global _thread_pool, _process_pool
+    with _pool_lock:
+        if _thread_pool is not None:
+            _thread_pool.shutdown(wait=wait)
+            _thread_pool = None
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=wait)
+            _process_pool = None
@@ -0,0 +1,242 @@
+"""
+Efficient Frontier Cache
+Memoized compute_efficient_frontier results shared by the optimization endpoints
+
+Entries are keyed by the frontier parameters plus a content fingerprint of
+the CMA and correlation data, so a data reload never serves a stale
+frontier. A cache miss is warm-started from a cached frontier over the same
+asset universe (e.g. one computed with a different n_points), which cuts
+the solver iterations needed for the first lambda.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data_loader import frame_fingerprint
+from optimization_engine import compute_efficient_frontier
+
+# Distinct frontiers kept in memory
+MAX_ENTRIES = 64
+
+# (mode, caps_template, custom_assets, n_points, lambdas, solver, data_version)
+FrontierKey = Tuple[str, str, Optional[Tuple[str, ...]], int, Optional[Tuple[float, ...]], str, str]
+
+_CACHE: "OrderedDict[FrontierKey, Dict]" = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+_STATS = {"hits": 0, "misses": 0}
+
+# Last (cma_data, correlation_matrix, fingerprint), so unchanged inputs are not rehashed
+_VERSION: List = [None, None, None]
+
+
+def data_version(cma_data: pd.DataFrame, correlation_matrix: pd.DataFrame) -> str:
+    """
+    Content fingerprint of the optimizer inputs.
+
+    The hash is recomputed only when different frame objects are passed.
+
+    Args:
+        cma_data: CMA data
+        correlation_matrix: Asset correlation matrix
+
+    Returns:
+        Short hex digest
+    """
+    with _CACHE_LOCK:
+        if _VERSION[0] is cma_data and _VERSION[1] is correlation_matrix:
+            return _VERSION[2]
+
+    version = frame_fingerprint(cma_data, correlation_matrix)[:16]
+
+    with _CACHE_LOCK:
+        _VERSION[:] = [cma_data, correlation_matrix, version]
+    return version
+
+
+def frontier_cache_key(
+    cma_data: pd.DataFrame,
+    correlation_matrix: pd.DataFrame,
+    mode: str = "unconstrained",
+    caps_template: str = "std",
+    custom_assets: Optional[List[str]] = None,
+    n_points: int = 30,
+    lambdas: Optional[np.ndarray] = None,
+    solver: str = "slsqp"
+) -> FrontierKey:
+    """
+    Build the cache key for a frontier request.
+
+    Custom asset lists are upper-cased and sorted, matching how
+    compute_efficient_frontier selects them. Lists with fewer than two
+    assets fall back to the mode universe, so they are keyed as None.
+
+    Args:
+        cma_data: CMA data
+        correlation_matrix: Asset correlation matrix
+        mode: "core" | "core_private" | "unconstrained"
+        caps_template: "tight" | "loose" | "std"
+        custom_assets: Optional list of asset names
+        n_points: Number of frontier points
+        lambdas: Optional array of risk aversion parameters
+        solver: "slsqp" | "active_set" | "cla"
+
+    Returns:
+        Hashable key
+    """
+    assets = None
+    if custom_assets and len(custom_assets) >= 2:
+        assets = tuple(sorted({a.upper() for a in custom_assets}))
+
+    lams = None
+    if lambdas is not None:
+        lams = tuple(float(lam) for lam in np.asarray(lambdas).ravel())
+        n_points = len(lams)  # n_points is ignored when lambdas are given
+
+    return (mode, caps_template, assets, int(n_points), lams, solver, data_version(cma_data, correlation_matrix))
+
+
+def get_cached_frontier(key: FrontierKey) -> Optional[Dict]:
+    """
+    Look up a frontier and count the hit or miss.
+
+    Args:
+        key: Key from frontier_cache_key
+
+    Returns:
+        Cached frontier dict (treat as read-only), or None
+    """
+    with _CACHE_LOCK:
+        entry = _CACHE.get(key)
+        if entry is None:
+            _STATS["misses"] += 1
+            return None
+        _CACHE.move_to_end(key)
+        _STATS["hits"] += 1
+        return entry
+
+
+def store_frontier(key: FrontierKey, frontier: Dict) -> None:
+    """
+    Insert a computed frontier, evicting the least recently used entries.
+
+    Frontiers that failed to build (no points) are not cached.
+
+    Args:
+        key: Key from frontier_cache_key
+        frontier: Result of compute_efficient_frontier
+    """
+    if not frontier.get("risks"):
+        return
+
+    with _CACHE_LOCK:
+        _CACHE[key] = frontier
+        _CACHE.move_to_end(key)
+        while len(_CACHE) > MAX_ENTRIES:
+            _CACHE.popitem(last=False)
+
+
+def warm_start_for(key: FrontierKey) -> Optional[np.ndarray]:
+    """
+    Initial weights for a cache miss, taken from a cached frontier on the same universe.
+
+    The sweep starts at the lowest lambda, so the first (highest-return)
+    portfolio of any frontier over the same assets and data is a close guess.
+
+    Args:
+        key: Key of the frontier about to be computed
+
+    Returns:
+        Weights in universe order, or None if nothing suitable is cached
+    """
+    mode, caps_template, assets, _, _, _, version = key
+
+    with _CACHE_LOCK:
+        for other in reversed(_CACHE):
+            if other[:3] == (mode, caps_template, assets) and other[6] == version:
+                frontier = _CACHE[other]
+                first = frontier["weights"][0]
+                return np.array([first[a] for a in frontier["assets"]])
+    return None
+
+
+async def _solve_inline(**kwargs) -> Dict:
+    """Solve a frontier on the calling thread."""
+    return compute_efficient_frontier(**kwargs)
+
+
+async def get_frontier(
+    cma_data: pd.DataFrame,
+    correlation_matrix: pd.DataFrame,
+    mode: str = "unconstrained",
+    caps_template: str = "std",
+    custom_assets: Optional[List[str]] = None,
+    n_points: int = 30,
+    lambdas: Optional[np.ndarray] = None,
+    solver: str = "slsqp",
+    solve: Callable[..., Awaitable[Dict]] = _solve_inline
+) -> Dict:
+    """
+    Cached drop-in for compute_efficient_frontier.
+
+    On a miss, solve is awaited with compute_efficient_frontier's keyword
+    arguments (plus a warm start) and the result is stored. The API passes
+    a solve that runs in the process pool; the default solves inline.
+
+    Args:
+        cma_data: CMA data
+        correlation_matrix: Asset correlation matrix
+        mode: "core" | "core_private" | "unconstrained"
+        caps_template: "tight" | "loose" | "std"
+        custom_assets: Optional list of asset names
+        n_points: Number of frontier points
+        lambdas: Optional array of risk aversion parameters
+        solver: "slsqp" | "active_set" | "cla"
+        solve: Coroutine function taking compute_efficient_frontier's arguments
+
+    Returns:
+        Frontier dict (treat as read-only)
+    """
+    key = frontier_cache_key(
+        cma_data, correlation_matrix, mode, caps_template, custom_assets, n_points, lambdas, solver
+    )
+    frontier = get_cached_frontier(key)
+    if frontier is not None:
+        return frontier
+
+    frontier = await solve(
+        cma_data=cma_data,
+        correlation_matrix=correlation_matrix,
+        mode=mode,
+        caps_template=caps_template,
+        custom_assets=custom_assets,
+        n_points=n_points,
+        lambdas=lambdas,
+        x0=warm_start_for(key),
+        solver=solver
+    )
+    store_frontier(key, frontier)
+    return frontier
+
+
+def clear_frontier_cache() -> None:
+    """Drop all cached frontiers and reset the counters."""
+    with _CACHE_LOCK:
+        _CACHE.clear()
+        _VERSION[:] = [None, None, None]
+        for name in _STATS:
+            _STATS[name] = 0
+
+
+def frontier_cache_stats() -> Dict:
+    """Hit/miss counters and current entry count."""
+    with _CACHE_LOCK:
+        lookups = _STATS["hits"] + _STATS["misses"]
+        return {
+            **_STATS,
+            "entries": len(_CACHE),
+            "hit_rate": _STATS["hits"] / lookups if lookups else 0.0,
+        }
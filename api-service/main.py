@@ -3,22 +3,27 @@ Risk Contribution API Service
 FastAPI backend for portfolio risk analysis
 """
 
+import asyncio
+import functools
 import os
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, Iterator, List, Optional
 import pandas as pd
-import numpy as np
 import io
+import json
 
 from risk_engine import (
     calculate_contributions,
-    compute_lasso_betas,
     compute_factor_risk_decomposition,
     compute_tracking_error,
     compute_performance_stats,
     compute_diversification_metrics,
+    calculate_batch_contributions,
+    calculate_rolling_risk,
     calculate_ewma_covariance,
     # Extended risk functions
     calculate_var_cvar,
@@ -33,28 +38,134 @@ from optimization_engine import (
     calculate_blended_benchmark,
     detect_inefficiencies,
     find_optimal_portfolio,
+    FRONTIER_SOLVERS,
 )
 
-from data_loader import (
-    load_cma_data,
-    load_correlation_matrix,
-    load_return_series,
+from data_registry import (
+    get_dataset,
+    get_datasets,
+    preload_datasets,
+    dataset_stats,
+    add_swap_listener,
+    reload_datasets,
+    snapshot_stats,
+    start_data_watcher,
+    stop_data_watcher,
+)
+from beta_cache import get_lasso_betas, load_persisted_betas, beta_cache_stats
+from covariance_cache import (
+    get_covariance,
+    warm_covariance_cache,
+    clear_covariance_cache,
+    covariance_cache_stats,
+)
+from frontier_cache import (
+    get_frontier,
+    clear_frontier_cache,
+    frontier_cache_stats,
+)
+from data_store import data_store_stats
+from executor import ComputeBusyError, run_compute, process_map, executor_stats, shutdown_executors
+
+from simulation_engine import (
+    run_monte_carlo,
+    stream_monte_carlo,
+    run_multi_asset_monte_carlo,
+    run_bootstrap_monte_carlo,
+    BOOTSTRAP_CHUNK_PATHS,
+    clear_cholesky_cache,
+    cholesky_cache_stats,
 )
 
 from stress_engine import (
     HISTORICAL_SCENARIOS,
     apply_stress_scenario,
+    batch_stress_test,
     apply_custom_scenario,
     compute_stress_contribution,
+    stress_contribution_arrays,
     generate_hypothetical_scenarios,
     rank_scenarios_by_impact,
     get_scenario_summary,
 )
 
+# Datasets loaded in the background at startup; everything else loads on first use
+DATA_PRELOAD = [name for name in os.environ.get("DATA_PRELOAD", "returns_usd").split(",") if name]
+
+# Upper bound on paths x quarters per request (memory for the wealth matrix)
+MAX_SIMULATION_CELLS = int(os.environ.get("MAX_SIMULATION_CELLS", 50_000_000))
+
+# Upper bound on the paths returned for charting
+MAX_SAMPLE_PATHS = int(os.environ.get("MAX_SAMPLE_PATHS", 1000))
+
+# Streamed and bootstrap simulations keep no paths, so only the path count is capped
+MAX_STREAM_SIMULATIONS = int(os.environ.get("MAX_STREAM_SIMULATIONS", 10_000_000))
+
+# Horizon cap for those runs: chunk buffers and sketches grow with the quarters
+MAX_SIMULATION_YEARS = int(os.environ.get("MAX_SIMULATION_YEARS", 100))
+
+# Security-level return universes, by request level
+SECURITY_LEVELS = {
+    "security": "instrument_returns",
+    "security_proxied": "instrument_returns_proxied",
+}
+
+
+def _preload_data() -> None:
+    """Load DATA_PRELOAD datasets and warm the caches that depend on them."""
+    preload_datasets(DATA_PRELOAD)
+    if "returns_usd" in DATA_PRELOAD:
+        # Build the default full-universe covariance matrices once
+        warm_covariance_cache({"USD": get_dataset("returns_usd")})
+
+    # Reload LASSO betas persisted by previous runs
+    n_cached_betas = load_persisted_betas()
+    if n_cached_betas:
+        print(f"✓ Reloaded {n_cached_betas} cached LASSO beta fits")
+
+
+def _on_snapshot_swap(old, new) -> None:
+    """
+    Drop caches built from the previous data snapshot and refresh the covariances.
+
+    Currencies whose returns the new snapshot has loaded keep their entries:
+    get_covariance rolls EWMA matrices forward over appended periods and
+    rebuilds the rest.
+    """
+    loaded = new.loaded()
+    refreshed = {}
+    for currency in ("USD", "EUR", "GBP"):
+        name = f"returns_{currency.lower()}"
+        if name in loaded:
+            refreshed[currency] = new.get(name)
+        else:
+            clear_covariance_cache(currency)
+    for level in SECURITY_LEVELS:
+        clear_covariance_cache(level.upper())
+    clear_frontier_cache()
+    clear_cholesky_cache()
+    if refreshed:
+        warm_covariance_cache(refreshed)
+
+
+add_swap_listener(_on_snapshot_swap)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Not awaited: /health answers while the data loads
+    asyncio.get_running_loop().run_in_executor(None, _preload_data)
+    start_data_watcher()
+    yield
+    stop_data_watcher()
+    shutdown_executors(wait=False)
+
+
 app = FastAPI(
     title="Risk Contribution API",
     description="Portfolio risk analysis and factor decomposition",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS for Next.js frontend - configurable via CORS_ORIGINS env var
@@ -71,79 +182,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# ============================================================================
-# Load Real Data
-# ============================================================================
-
-from data_loader import (
-    load_cma_data,
-    load_correlation_matrix,
-    load_return_series,
-    load_beta_matrix,
-    load_factor_covariance,
-)
-
-# Load real data at startup
-try:
-    print("Loading CMA data...")
-    CMA_DATA = load_cma_data()
-    print(f"✓ Loaded CMA data: {CMA_DATA.shape[0]} assets")
-
-    print("Loading correlation matrix...")
-    CORRELATION_MATRIX = load_correlation_matrix()
-    print(f"✓ Loaded correlation matrix: {CORRELATION_MATRIX.shape[0]}x{CORRELATION_MATRIX.shape[1]}")
-
-    print("Loading return series...")
-    RETURNS_USD = load_return_series("USD")
-    RETURNS_EUR = load_return_series("EUR")
-    RETURNS_GBP = load_return_series("GBP")
-    print(f"✓ Loaded return series: {RETURNS_USD.shape[0]} periods, {RETURNS_USD.shape[1]} assets (USD)")
-
-    print("Loading beta matrix...")
-    BETA_MATRIX = load_beta_matrix()
-    print(f"✓ Loaded beta matrix: {BETA_MATRIX.shape[0]} securities, {BETA_MATRIX.shape[1]} factors")
-
-    print("Loading factor covariance...")
-    FACTOR_COVARIANCE = load_factor_covariance()
-    print(f"✓ Loaded factor covariance: {FACTOR_COVARIANCE.shape[0]}x{FACTOR_COVARIANCE.shape[1]}")
-
-    # Generate factor returns by computing from betas
-    # For now, use a simple approach: factor returns are derived from asset returns
-    # In a full implementation, these would be loaded or computed via regression
-    FACTOR_RETURNS = pd.DataFrame(
-        np.zeros((len(RETURNS_USD), len(FACTOR_COVARIANCE))),
-        index=RETURNS_USD.index,
-        columns=FACTOR_COVARIANCE.columns
-    )
-
-    print("\n✓ All data loaded successfully!\n")
-
-except Exception as e:
-    print(f"\n✗ Error loading data: {e}")
-    print("Falling back to mock data...\n")
-
-    # Fallback to mock data if real data fails to load
-    from data_loader import (
-        _generate_mock_cma_data,
-        _generate_mock_correlation_matrix,
-        _generate_mock_returns,
-        _generate_mock_betas,
-        _generate_mock_factor_cov,
-    )
-
-    CMA_DATA = _generate_mock_cma_data()
-    CORRELATION_MATRIX = _generate_mock_correlation_matrix()
-    RETURNS_USD = _generate_mock_returns()
-    RETURNS_EUR = _generate_mock_returns()
-    RETURNS_GBP = _generate_mock_returns()
-    BETA_MATRIX = _generate_mock_betas()
-    FACTOR_COVARIANCE = _generate_mock_factor_cov()
-    FACTOR_RETURNS = pd.DataFrame(
-        np.zeros((len(RETURNS_USD), len(FACTOR_COVARIANCE))),
-        index=RETURNS_USD.index,
-        columns=FACTOR_COVARIANCE.columns
-    )
-
 # ============================================================================
 # Request/Response Models
 # ============================================================================
@@ -158,18 +196,38 @@ class ContributionsRequest(BaseModel):
     portfolio: Dict[str, float]
     use_ewma: bool = True
     ewma_decay: float = 0.94
+    level: str = "asset_class"  # "asset_class" | "security" | "security_proxied" | "factor"
 
 class TrackingErrorRequest(BaseModel):
     portfolio: Dict[str, float]
     benchmark: Dict[str, float]
     use_ewma: bool = True
+    level: str = "asset_class"
 
 class FactorDecompositionRequest(BaseModel):
     portfolio: Dict[str, float]
 
 class DiversificationRequest(BaseModel):
+    portfolio: Optional[Dict[str, float]] = None
+    portfolios: Optional[Dict[str, Dict[str, float]]] = None  # name -> {asset: weight}
+    use_ewma: bool = True
+
+class BatchRiskRequest(BaseModel):
+    portfolios: Optional[Dict[str, Dict[str, float]]] = None  # name -> {asset: weight}
+    universe: Optional[str] = None  # "portfolio" | "benchmark" to use a universe file
+    # "asset_class" | "security" | "security_proxied"; default "security" with a
+    # universe (whose files hold fund names), else "asset_class"
+    level: Optional[str] = None
+    use_ewma: bool = True
+    ewma_decay: float = 0.94
+
+class RollingRiskRequest(BaseModel):
     portfolio: Dict[str, float]
+    benchmark: Optional[Dict[str, float]] = None
+    window: int = 36  # periods (months) per window
     use_ewma: bool = True
+    ewma_decay: float = 0.94
+    stream: bool = False  # newline-delimited JSON, one line per window
 
 class PerformanceRequest(BaseModel):
     portfolio: Dict[str, float]
@@ -182,6 +240,15 @@ class StressScenarioRequest(BaseModel):
     use_default_scenarios: bool = True
 
 
+class BatchStressRequest(BaseModel):
+    portfolios: Optional[Dict[str, Dict[str, float]]] = None  # name -> {asset: weight}
+    universe: Optional[str] = "portfolio"  # "portfolio" | "benchmark" universe file, or None
+    benchmarks: Optional[Dict[str, str]] = None  # portfolio name -> Benchmark Universe name
+    default_benchmark: Optional[str] = None  # for portfolios not in benchmarks
+    scenarios: Optional[List[Dict[str, str]]] = None  # List of {name, start, end}
+    level: str = "security"  # "asset_class" | "security" | "security_proxied"
+
+
 class CustomScenarioRequest(BaseModel):
     portfolio: Dict[str, float]
     benchmark: Optional[Dict[str, float]] = None
@@ -197,8 +264,76 @@ class HypotheticalScenarioRequest(BaseModel):
 
 class StressContributionRequest(BaseModel):
     portfolio: Dict[str, float]
-    scenario_start: str
-    scenario_end: str
+    scenario_start: Optional[str] = None
+    scenario_end: Optional[str] = None
+    scenarios: Optional[List[Dict[str, str]]] = None  # List of {name, start, end}; columnar result
+    level: str = "asset_class"  # "asset_class" | "security" | "security_proxied"
+
+
+class MonteCarloRequest(BaseModel):
+    initial_value: float
+    annual_return: float  # decimal, e.g. 0.07
+    annual_volatility: float
+    quarterly_fixed_spending: float = 0.0
+    quarterly_percent_spending: float = 0.0
+    duration_years: int = 30
+    num_simulations: int = 10000
+    inflation_rate: float = 0.025
+    after_tax_rate: float = 0.0
+    one_time_spend: float = 0.0
+    one_time_quarter: int = 1
+    custom_spending: Optional[Dict[int, float]] = None  # quarter -> amount
+    # Piecewise regimes (return/vol change in update1_year and update2_year)
+    use_piecewise: bool = False
+    return_update1: Optional[float] = None
+    return_update2: Optional[float] = None
+    vol_update1: Optional[float] = None
+    vol_update2: Optional[float] = None
+    update1_year: Optional[int] = None
+    update2_year: Optional[int] = None
+    start_year: Optional[int] = None
+    seed: Optional[int] = None
+    percentiles: List[float] = [5, 25, 50, 75, 95]
+    sample_paths: int = 0  # paths returned for charting
+
+
+class MultiAssetMonteCarloRequest(BaseModel):
+    portfolio: Dict[str, float]  # CMA asset class -> target weight
+    initial_value: float
+    quarterly_fixed_spending: float = 0.0
+    quarterly_percent_spending: float = 0.0
+    duration_years: int = 30
+    num_simulations: int = 10000
+    inflation_rate: float = 0.025
+    after_tax_rate: float = 0.0
+    one_time_spend: float = 0.0
+    one_time_quarter: int = 1
+    custom_spending: Optional[Dict[int, float]] = None  # quarter -> amount
+    rebalance_quarters: int = 4  # 0 = buy and hold
+    shortfall_thresholds: Optional[List[float]] = None  # default: initial value and half of it
+    seed: Optional[int] = None
+    percentiles: List[float] = [5, 25, 50, 75, 95]
+    sample_paths: int = 0
+
+
+class BootstrapMonteCarloRequest(BaseModel):
+    portfolio: Dict[str, float]  # return series name -> weight
+    currency: str = "USD"  # "USD" | "EUR" | "GBP"
+    initial_value: float
+    quarterly_fixed_spending: float = 0.0
+    quarterly_percent_spending: float = 0.0
+    duration_years: int = 30
+    num_simulations: int = 10000
+    inflation_rate: float = 0.025
+    after_tax_rate: float = 0.0
+    one_time_spend: float = 0.0
+    one_time_quarter: int = 1
+    custom_spending: Optional[Dict[int, float]] = None  # quarter -> amount
+    block_length: float = 12.0  # mean block length in months; 1 = i.i.d. months
+    parallel: bool = True  # spread chunks over the process pool
+    seed: Optional[int] = None
+    percentiles: List[float] = [5, 25, 50, 75, 95]
+    sample_paths: int = 0
 
 
 # Extended Risk Request Models
@@ -212,6 +347,7 @@ class PCTERequest(BaseModel):
     portfolio: Dict[str, float]
     benchmark: Dict[str, float]
     use_ewma: bool = True
+    level: str = "asset_class"
 
 
 class FullDecompositionRequest(BaseModel):
@@ -234,6 +370,7 @@ class FrontierRequest(BaseModel):
     caps_template: str = "std"    # "std" | "tight" | "loose"
     custom_assets: Optional[List[str]] = None
     n_points: int = 30
+    solver: str = "slsqp"         # "slsqp" | "active_set" | "cla"
 
 
 class BenchmarkRequest(BaseModel):
@@ -254,11 +391,80 @@ class OptimalPortfolioRequest(BaseModel):
     risk_free_rate: float = 0.03
     mode: str = "unconstrained"
     caps_template: str = "std"
+    solver: str = "slsqp"
 
 # ============================================================================
 # API Endpoints
 # ============================================================================
 
+def _usd_covariance(
+    use_ewma: bool,
+    ewma_decay: float = 0.94,
+    returns: Optional[pd.DataFrame] = None
+) -> pd.DataFrame:
+    """
+    Cached full-universe USD covariance for the requested method.
+
+    Pass the returns the request already holds so both come from the same
+    data snapshot.
+    """
+    if returns is None:
+        returns = get_dataset("returns_usd")
+    return get_covariance(
+        returns,
+        currency="USD",
+        method="ewma" if use_ewma else "sample",
+        decay=ewma_decay
+    )
+
+
+def _check_level(level: str) -> None:
+    if level not in ("asset_class", "factor") and level not in SECURITY_LEVELS:
+        raise HTTPException(status_code=400, detail=f"Unknown level: {level}")
+
+
+async def _risk_inputs(
+    level: str,
+    use_ewma: bool,
+    ewma_decay: float = 0.94
+) -> Dict:
+    """
+    Risk-model keyword arguments for calculate_contributions,
+    compute_tracking_error and calculate_pcte at a risk level.
+
+    - "asset_class": USD asset-class returns and their cached covariance
+    - "security" / "security_proxied": the instrument universe (700+ funds
+      with ragged histories) and its pairwise-complete covariance; the
+      first build runs in the compute pool rather than on the event loop
+    - "factor": betas, factor covariance and residual variance, so the
+      securities' covariance is never formed
+    """
+    if level == "asset_class":
+        returns = get_dataset("returns_usd")
+        return {"returns": returns, "cov_matrix": _usd_covariance(use_ewma, ewma_decay, returns=returns)}
+
+    if level == "factor":
+        betas, factor_cov, residual_var = get_datasets("betas", "factor_cov", "factor_residual_var")
+        return {"returns": None, "betas": betas, "factor_cov": factor_cov, "residual_var": residual_var}
+
+    returns = get_dataset(SECURITY_LEVELS[level])
+    cov_matrix = await run_compute(
+        "risk",
+        get_covariance,
+        returns,
+        currency=level.upper(),
+        method="ewma" if use_ewma else "sample",
+        decay=ewma_decay
+    )
+    return {"returns": returns, "cov_matrix": cov_matrix}
+
+
+@app.exception_handler(ComputeBusyError)
+async def compute_busy_handler(request: Request, exc: ComputeBusyError):
+    """Shed load with 503 when the compute queue is full."""
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+
 @app.get("/")
 async def root():
     return {"message": "Risk Contribution API", "version": "1.0.0"}
@@ -269,15 +475,56 @@ async def health():
     return {"status": "healthy"}
 
 
+@app.get("/api/system/executor")
+async def get_executor_stats():
+    """Compute pool configuration, queue depth and per-endpoint timings."""
+    return {"success": True, "data": executor_stats()}
+
+
+@app.get("/api/system/data")
+async def get_data_stats():
+    """Registered datasets and how long each took to load."""
+    return {"success": True, "data": dataset_stats()}
+
+
+@app.get("/api/system/data/version")
+async def get_data_version():
+    """Data snapshot in use and hot-reload counters."""
+    return {"success": True, "data": snapshot_stats()}
+
+
+@app.post("/api/system/data/reload")
+async def reload_data(force: bool = False):
+    """Swap in a new data snapshot now if the files under DATA_DIR changed."""
+    reloaded = await asyncio.get_running_loop().run_in_executor(None, reload_datasets, force)
+    return {"success": True, "data": {"reloaded": reloaded, **snapshot_stats()}}
+
+
+@app.get("/api/system/caches")
+async def get_cache_stats():
+    """Hit/miss counters for the LASSO beta, covariance, frontier and Cholesky caches."""
+    return {
+        "success": True,
+        "data": {
+            "data_store": data_store_stats(),
+            "lasso_betas": beta_cache_stats(),
+            "covariance": covariance_cache_stats(),
+            "frontier": frontier_cache_stats(),
+            "cholesky": cholesky_cache_stats(),
+        }
+    }
+
+
 @app.get("/assets")
 async def get_available_assets():
     """Get list of available assets for portfolio construction."""
+    returns, factor_returns = get_datasets("returns_usd", "factor_returns")
     return {
-        "assets": list(RETURNS_USD.columns),
-        "factors": list(FACTOR_RETURNS.columns),
+        "assets": list(returns.columns),
+        "factors": list(factor_returns.columns),
         "date_range": {
-            "start": str(RETURNS_USD.index[0].date()),
-            "end": str(RETURNS_USD.index[-1].date())
+            "start": str(returns.index[0].date()),
+            "end": str(returns.index[-1].date())
         }
     }
 
@@ -286,8 +533,13 @@ async def get_available_assets():
 async def calculate_risk_contributions(request: ContributionsRequest):
     """
     Calculate PCTR (Percentage Contribution to Risk) and MCTR.
+
+    level="security" or "security_proxied" runs on the instrument universe,
+    level="factor" on the securities in the beta file via the factor model.
     """
+    _check_level(request.level)
     try:
+        risk_model = await _risk_inputs(request.level, request.use_ewma, request.ewma_decay)
         weights = pd.Series(request.portfolio)
 
         # Validate weights
@@ -295,15 +547,16 @@ async def calculate_risk_contributions(request: ContributionsRequest):
             raise HTTPException(status_code=400, detail="Weights must sum to a positive value")
 
         # Filter to available assets
-        available = weights.index.intersection(RETURNS_USD.columns)
+        universe = risk_model["betas"].index if "betas" in risk_model else risk_model["returns"].columns
+        available = weights.index.intersection(universe)
         if len(available) == 0:
             raise HTTPException(status_code=400, detail="No matching assets found in returns data")
 
-        result = calculate_contributions(
-            returns=RETURNS_USD,
+        result = await run_compute(
+            "risk",
+            calculate_contributions,
             weights=weights,
-            use_ewma=request.use_ewma,
-            ewma_decay=request.ewma_decay
+            **risk_model
         )
 
         return {
@@ -311,24 +564,130 @@ async def calculate_risk_contributions(request: ContributionsRequest):
             "data": result
         }
 
+    except ComputeBusyError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/risk/batch")
+async def calculate_batch_risk(request: BatchRiskRequest):
+    """
+    Calculate vol, MCTR, PCTR and diversification for many portfolios in one call.
+
+    Accepts explicit portfolios, a universe file reference, or both. The
+    universe files hold fund names, so they are evaluated against the
+    instrument covariance (level "security") unless level says otherwise.
+    """
+    level = request.level or ("security" if request.universe else "asset_class")
+    if level != "asset_class" and level not in SECURITY_LEVELS:
+        raise HTTPException(status_code=400, detail=f"Unknown level: {level}")
+
+    frames = []
+    if request.universe:
+        if request.universe not in ("portfolio", "benchmark"):
+            raise HTTPException(status_code=400, detail=f"Unknown universe: {request.universe}")
+        frames.append(get_dataset(f"{request.universe}_universe"))
+    if request.portfolios:
+        frames.append(pd.DataFrame.from_dict(request.portfolios, orient="index").fillna(0.0))
+
+    if not frames:
+        raise HTTPException(status_code=400, detail="Provide portfolios or a universe")
+
+    try:
+        weights = pd.concat(frames).fillna(0.0)
+        risk_inputs = await _risk_inputs(level, request.use_ewma, request.ewma_decay)
+
+        result = await run_compute(
+            "batch",
+            calculate_batch_contributions,
+            weights=weights,
+            cov_matrix=risk_inputs["cov_matrix"]
+        )
+        result["level"] = level
+
+        return {
+            "success": True,
+            "data": result
+        }
+
+    except ComputeBusyError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _rolling_rows(result: Dict) -> Iterator[str]:
+    """NDJSON lines for a rolling risk result: a header, then one row per window."""
+    header = {key: result[key] for key in ("window", "assets", "te_assets") if key in result}
+    yield json.dumps(header) + "\n"
+    series = [key for key in (
+        "portfolio_vol", "portfolio_vol_annualized", "pctr", "tracking_error", "te_contributions"
+    ) if key in result]
+    for i, date in enumerate(result["dates"]):
+        yield json.dumps({"date": date, **{key: result[key][i] for key in series}}) + "\n"
+
+
+@app.post("/api/risk/rolling")
+async def calculate_rolling_risk_endpoint(request: RollingRiskRequest):
+    """
+    Rolling volatility, PCTR and tracking error over every window of the USD returns.
+
+    All windows are computed in one pass. With stream=true the series is
+    sent as newline-delimited JSON (a header line, then one line per window
+    end date) instead of one columnar payload.
+    """
+    returns = get_dataset("returns_usd")
+    weights = pd.Series(request.portfolio, dtype=float)
+    if weights.sum() <= 0:
+        raise HTTPException(status_code=400, detail="Weights must sum to a positive value")
+    if len(weights.index.intersection(returns.columns)) == 0:
+        raise HTTPException(status_code=400, detail="No matching assets found in returns data")
+    if request.window < 2 or request.window > len(returns):
+        raise HTTPException(status_code=400, detail=f"Window must be between 2 and {len(returns)} periods")
+
+    try:
+        result = await run_compute(
+            "risk",
+            calculate_rolling_risk,
+            returns=returns,
+            weights=weights,
+            benchmark_weights=pd.Series(request.benchmark, dtype=float) if request.benchmark else None,
+            window=request.window,
+            use_ewma=request.use_ewma,
+            ewma_decay=request.ewma_decay
+        )
+    except ComputeBusyError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if request.stream:
+        return StreamingResponse(_rolling_rows(result), media_type="application/x-ndjson")
+
+    return {
+        "success": True,
+        "data": result
+    }
+
+
 @app.post("/api/risk/tracking-error")
 async def calculate_tracking_error(request: TrackingErrorRequest):
     """
     Calculate tracking error between portfolio and benchmark.
     """
+    _check_level(request.level)
     try:
+        risk_model = await _risk_inputs(request.level, request.use_ewma)
         portfolio = pd.Series(request.portfolio)
         benchmark = pd.Series(request.benchmark)
 
-        result = compute_tracking_error(
+        result = await run_compute(
+            "risk",
+            compute_tracking_error,
             portfolio_weights=portfolio,
             benchmark_weights=benchmark,
-            returns=RETURNS_USD,
-            use_ewma=request.use_ewma
+            **risk_model
         )
 
         return {
@@ -336,6 +695,8 @@ async def calculate_tracking_error(request: TrackingErrorRequest):
             "data": result
         }
 
+    except ComputeBusyError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -346,19 +707,25 @@ async def calculate_factor_decomposition(request: FactorDecompositionRequest):
     Decompose portfolio risk into systematic (factor) and specific components.
     """
     try:
+        returns, factor_returns, factor_cov = get_datasets("returns_usd", "factor_returns", "factor_cov")
         weights = pd.Series(request.portfolio)
 
-        # Compute betas via LASSO
-        betas, residual_var = compute_lasso_betas(
-            security_returns=RETURNS_USD,
-            factor_returns=FACTOR_RETURNS,
+        # LASSO betas (computed once per returns snapshot, then cached).
+        # Cache lookups stay in this process; misses fan out via LASSO_N_JOBS
+        betas, residual_var = await run_compute(
+            "lasso",
+            get_lasso_betas,
+            security_returns=returns,
+            factor_returns=factor_returns,
             min_observations=12
         )
 
-        result = compute_factor_risk_decomposition(
+        result = await run_compute(
+            "risk",
+            compute_factor_risk_decomposition,
             weights=weights,
             betas=betas,
-            factor_cov=FACTOR_COVARIANCE,
+            factor_cov=factor_cov,
             residual_var=residual_var
         )
 
@@ -367,6 +734,8 @@ async def calculate_factor_decomposition(request: FactorDecompositionRequest):
             "data": result
         }
 
+    except ComputeBusyError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -375,14 +744,26 @@ async def calculate_factor_decomposition(request: FactorDecompositionRequest):
 async def calculate_diversification(request: DiversificationRequest):
     """
     Calculate portfolio diversification metrics.
+
+    Pass "portfolios" instead of "portfolio" to evaluate many at once; the
+    metrics then come back as per-portfolio lists.
     """
-    try:
-        weights = pd.Series(request.portfolio)
+    if request.portfolio is None and not request.portfolios:
+        raise HTTPException(status_code=400, detail="Provide portfolio or portfolios")
 
-        result = compute_diversification_metrics(
+    try:
+        returns = get_dataset("returns_usd")
+        if request.portfolios:
+            weights = pd.DataFrame.from_dict(request.portfolios, orient="index").fillna(0.0)
+        else:
+            weights = pd.Series(request.portfolio)
+
+        result = await run_compute(
+            "risk",
+            compute_diversification_metrics,
             weights=weights,
-            returns=RETURNS_USD,
-            use_ewma=request.use_ewma
+            returns=returns,
+            cov_matrix=_usd_covariance(request.use_ewma, returns=returns)
         )
 
         return {
@@ -390,6 +771,8 @@ async def calculate_diversification(request: DiversificationRequest):
             "data": result
         }
 
+    except ComputeBusyError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -400,12 +783,13 @@ async def calculate_performance(request: PerformanceRequest):
     Calculate portfolio performance statistics.
     """
     try:
+        returns = get_dataset("returns_usd")
         weights = pd.Series(request.portfolio)
         weights = weights / weights.sum()
 
         # Calculate portfolio returns
-        common = weights.index.intersection(RETURNS_USD.columns)
-        portfolio_returns = (RETURNS_USD[common] * weights[common]).sum(axis=1)
+        common = weights.index.intersection(returns.columns)
+        portfolio_returns = (returns[common] * weights[common]).sum(axis=1)
 
         result = {
             "portfolio": compute_performance_stats(portfolio_returns)
@@ -415,8 +799,8 @@ async def calculate_performance(request: PerformanceRequest):
         if request.benchmark:
             bench_weights = pd.Series(request.benchmark)
             bench_weights = bench_weights / bench_weights.sum()
-            common_bench = bench_weights.index.intersection(RETURNS_USD.columns)
-            benchmark_returns = (RETURNS_USD[common_bench] * bench_weights[common_bench]).sum(axis=1)
+            common_bench = bench_weights.index.intersection(returns.columns)
+            benchmark_returns = (returns[common_bench] * bench_weights[common_bench]).sum(axis=1)
             result["benchmark"] = compute_performance_stats(benchmark_returns)
 
             # Excess return stats
@@ -438,27 +822,34 @@ async def full_risk_analysis(request: ContributionsRequest):
     Run complete risk analysis: contributions, diversification, and performance.
     """
     try:
+        returns = get_dataset("returns_usd")
         weights = pd.Series(request.portfolio)
 
+        # One covariance shared by contributions and diversification
+        cov_matrix = _usd_covariance(request.use_ewma, request.ewma_decay, returns=returns)
+
         # Risk contributions
-        contributions = calculate_contributions(
-            returns=RETURNS_USD,
+        contributions = await run_compute(
+            "risk",
+            calculate_contributions,
+            returns=returns,
             weights=weights,
-            use_ewma=request.use_ewma,
-            ewma_decay=request.ewma_decay
+            cov_matrix=cov_matrix
         )
 
         # Diversification
-        diversification = compute_diversification_metrics(
+        diversification = await run_compute(
+            "risk",
+            compute_diversification_metrics,
             weights=weights,
-            returns=RETURNS_USD,
-            use_ewma=request.use_ewma
+            returns=returns,
+            cov_matrix=cov_matrix
         )
 
         # Performance
         weights_norm = weights / weights.sum()
-        common = weights_norm.index.intersection(RETURNS_USD.columns)
-        portfolio_returns = (RETURNS_USD[common] * weights_norm[common]).sum(axis=1)
+        common = weights_norm.index.intersection(returns.columns)
+        portfolio_returns = (returns[common] * weights_norm[common]).sum(axis=1)
         performance = compute_performance_stats(portfolio_returns)
 
         return {
@@ -470,6 +861,8 @@ async def full_risk_analysis(request: ContributionsRequest):
             }
         }
 
+    except ComputeBusyError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -494,6 +887,7 @@ async def apply_stress_scenarios_endpoint(request: StressScenarioRequest):
     Apply stress scenarios to portfolio (historical or custom).
     """
     try:
+        returns = get_dataset("returns_usd")
         portfolio = pd.Series(request.portfolio)
 
         benchmark = None
@@ -504,9 +898,11 @@ async def apply_stress_scenarios_endpoint(request: StressScenarioRequest):
         scenarios = request.scenarios if request.scenarios else HISTORICAL_SCENARIOS
 
         # Apply scenarios using stress engine
-        results = apply_stress_scenario(
+        results = await run_compute(
+            "stress",
+            apply_stress_scenario,
             portfolio_weights=portfolio,
-            returns=RETURNS_USD,
+            returns=returns,
             scenarios=scenarios,
             benchmark_weights=benchmark
         )
@@ -526,6 +922,65 @@ async def apply_stress_scenarios_endpoint(request: StressScenarioRequest):
             }
         }
 
+    except ComputeBusyError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/stress/batch")
+async def batch_stress_endpoint(request: BatchStressRequest):
+    """
+    Scenarios x portfolios stress grid in one call.
+
+    Defaults to every HISTORICAL_SCENARIOS entry against every model
+    portfolio in the portfolio universe, on the instrument returns. Each
+    portfolio is compared with its benchmark from the benchmark universe
+    (benchmarks mapping, else default_benchmark).
+    """
+    if request.level != "asset_class" and request.level not in SECURITY_LEVELS:
+        raise HTTPException(status_code=400, detail=f"Unknown level: {request.level}")
+
+    frames = []
+    if request.universe:
+        if request.universe not in ("portfolio", "benchmark"):
+            raise HTTPException(status_code=400, detail=f"Unknown universe: {request.universe}")
+        frames.append(get_dataset(f"{request.universe}_universe"))
+    if request.portfolios:
+        frames.append(pd.DataFrame.from_dict(request.portfolios, orient="index").fillna(0.0))
+    if not frames:
+        raise HTTPException(status_code=400, detail="Provide portfolios or a universe")
+
+    returns_name = "returns_usd" if request.level == "asset_class" else SECURITY_LEVELS[request.level]
+    returns, benchmark_universe = get_datasets(returns_name, "benchmark_universe")
+
+    weights = pd.concat(frames).fillna(0.0)
+    benchmark_map = {
+        str(name): (request.benchmarks or {}).get(str(name), request.default_benchmark)
+        for name in weights.index
+    }
+    unknown = sorted({b for b in benchmark_map.values() if b is not None} - set(benchmark_universe.index))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown benchmarks: {unknown}")
+
+    try:
+        result = await run_compute(
+            "stress",
+            batch_stress_test,
+            portfolio_weights=weights,
+            returns=returns,
+            scenarios=request.scenarios if request.scenarios else HISTORICAL_SCENARIOS,
+            benchmark_weights=benchmark_universe,
+            benchmark_map=benchmark_map
+        )
+
+        return {
+            "success": True,
+            "data": result
+        }
+
+    except ComputeBusyError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -617,14 +1072,39 @@ async def apply_hypothetical_scenario_endpoint(request: HypotheticalScenarioRequ
 async def calculate_stress_contribution_endpoint(request: StressContributionRequest):
     """
     Calculate asset-level contribution to stress scenario.
+
+    With scenarios, every scenario is evaluated at once and the result is
+    columnar: assets, weights and (scenarios x assets) contribution grids.
+    level selects the USD asset-class returns or the instrument universe.
     """
+    if request.scenarios is None and (request.scenario_start is None or request.scenario_end is None):
+        raise HTTPException(status_code=400, detail="Provide scenario_start and scenario_end, or scenarios")
+    if request.level != "asset_class" and request.level not in SECURITY_LEVELS:
+        raise HTTPException(status_code=400, detail=f"Unknown level: {request.level}")
+
     try:
+        returns = get_dataset("returns_usd" if request.level == "asset_class" else SECURITY_LEVELS[request.level])
         portfolio = pd.Series(request.portfolio)
 
+        if request.scenarios is not None:
+            result = await run_compute(
+                "stress",
+                stress_contribution_arrays,
+                portfolio_weights=portfolio,
+                returns=returns,
+                scenarios=request.scenarios
+            )
+            return {
+                "success": True,
+                "data": result
+            }
+
         # Calculate contributions
-        contributions = compute_stress_contribution(
+        contributions = await run_compute(
+            "stress",
+            compute_stress_contribution,
             portfolio_weights=portfolio,
-            returns=RETURNS_USD,
+            returns=returns,
             scenario_start=request.scenario_start,
             scenario_end=request.scenario_end
         )
@@ -640,6 +1120,275 @@ async def calculate_stress_contribution_endpoint(request: StressContributionRequ
             "data": contributions.to_dict(orient="records")
         }
 
+    except ComputeBusyError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# ============================================================================
+# Monte Carlo Simulation
+# ============================================================================
+
+def _piecewise_params(request: MonteCarloRequest) -> Optional[Dict]:
+    """Regime changes of a Monte Carlo request, or None when not piecewise."""
+    if not request.use_piecewise:
+        return None
+    return {
+        "return_update1": request.return_update1,
+        "return_update2": request.return_update2,
+        "vol_update1": request.vol_update1,
+        "vol_update2": request.vol_update2,
+        "update1_year": request.update1_year,
+        "update2_year": request.update2_year,
+        "start_year": request.start_year,
+    }
+
+
+def _sse(event: str, data: Dict) -> str:
+    """One Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _simulation_events(updates: Iterator[Dict]) -> AsyncIterator[str]:
+    """
+    SSE stream over simulation updates.
+
+    Each chunk runs as its own compute call, so a long stream shares the
+    simulation limit with other requests between chunks. Sends "progress"
+    per chunk, "complete" for the last one and "error" if a chunk fails.
+    """
+    while True:
+        try:
+            update = await run_compute("simulation", next, updates, None)
+        except Exception as e:
+            yield _sse("error", {"detail": str(e)})
+            return
+        if update is None:
+            return
+        done = update["paths_completed"] >= update["num_simulations"]
+        yield _sse("complete" if done else "progress", update)
+
+
+@app.post("/api/simulation/monte-carlo")
+async def monte_carlo_endpoint(request: MonteCarloRequest):
+    """
+    Monte Carlo wealth simulation with spending (runSimulation /
+    runSimulationPiecewise on the server).
+
+    Returns percentile bands per quarter, outcome probabilities and
+    optionally a few sample paths; pass seed for reproducible results.
+    """
+    if request.num_simulations < 1 or request.duration_years < 1:
+        raise HTTPException(status_code=400, detail="num_simulations and duration_years must be positive")
+    if request.num_simulations * (request.duration_years * 4 + 1) > MAX_SIMULATION_CELLS:
+        raise HTTPException(status_code=400, detail="Too many paths for this horizon")
+    if any(p < 0 or p > 100 for p in request.percentiles):
+        raise HTTPException(status_code=400, detail="Percentiles must be between 0 and 100")
+    if request.sample_paths < 0 or request.sample_paths > MAX_SAMPLE_PATHS:
+        raise HTTPException(status_code=400, detail=f"sample_paths must be between 0 and {MAX_SAMPLE_PATHS}")
+
+    try:
+        result = await run_compute(
+            "simulation",
+            run_monte_carlo,
+            initial_value=request.initial_value,
+            annual_return=request.annual_return,
+            annual_volatility=request.annual_volatility,
+            quarterly_fixed_spending=request.quarterly_fixed_spending,
+            quarterly_percent_spending=request.quarterly_percent_spending,
+            duration_years=request.duration_years,
+            num_simulations=request.num_simulations,
+            inflation_rate=request.inflation_rate,
+            after_tax_rate=request.after_tax_rate,
+            one_time_spend=request.one_time_spend,
+            one_time_quarter=request.one_time_quarter,
+            custom_spending=request.custom_spending,
+            piecewise=_piecewise_params(request),
+            seed=request.seed,
+            percentiles=request.percentiles,
+            sample_paths=request.sample_paths
+        )
+
+        return {
+            "success": True,
+            "data": result
+        }
+
+    except ComputeBusyError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/simulation/monte-carlo/stream")
+async def monte_carlo_stream_endpoint(request: MonteCarloRequest):
+    """
+    Monte Carlo simulation streamed as Server-Sent Events.
+
+    Emits a "progress" event with the percentile bands and outcome
+    probabilities so far after every chunk of paths, and "complete" with
+    the final result. Bands come from per-quarter t-digests, so server
+    memory stays O(quarters) however many paths are run, and the horizon
+    is capped at MAX_SIMULATION_YEARS; sample_paths is not supported.
+    """
+    if request.num_simulations < 1 or request.duration_years < 1:
+        raise HTTPException(status_code=400, detail="num_simulations and duration_years must be positive")
+    if request.num_simulations > MAX_STREAM_SIMULATIONS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_STREAM_SIMULATIONS} paths can be streamed")
+    if request.duration_years > MAX_SIMULATION_YEARS:
+        raise HTTPException(status_code=400, detail=f"duration_years must be at most {MAX_SIMULATION_YEARS}")
+    if any(p < 0 or p > 100 for p in request.percentiles):
+        raise HTTPException(status_code=400, detail="Percentiles must be between 0 and 100")
+
+    updates = stream_monte_carlo(
+        initial_value=request.initial_value,
+        annual_return=request.annual_return,
+        annual_volatility=request.annual_volatility,
+        quarterly_fixed_spending=request.quarterly_fixed_spending,
+        quarterly_percent_spending=request.quarterly_percent_spending,
+        duration_years=request.duration_years,
+        num_simulations=request.num_simulations,
+        inflation_rate=request.inflation_rate,
+        after_tax_rate=request.after_tax_rate,
+        one_time_spend=request.one_time_spend,
+        one_time_quarter=request.one_time_quarter,
+        custom_spending=request.custom_spending,
+        piecewise=_piecewise_params(request),
+        seed=request.seed,
+        percentiles=request.percentiles
+    )
+    return StreamingResponse(
+        _simulation_events(updates),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.post("/api/simulation/multi-asset")
+async def multi_asset_monte_carlo_endpoint(request: MultiAssetMonteCarloRequest):
+    """
+    Monte Carlo simulation of a multi-asset portfolio from the CMA assumptions.
+
+    Asset returns are drawn jointly from the CMA returns, risks and
+    correlation matrix, and holdings are rebalanced to the target weights
+    every rebalance_quarters quarters. Returns the percentile bands,
+    outcome probabilities and shortfall probabilities.
+    """
+    if not request.portfolio:
+        raise HTTPException(status_code=400, detail="Portfolio must contain at least one asset")
+    if request.num_simulations < 1 or request.duration_years < 1:
+        raise HTTPException(status_code=400, detail="num_simulations and duration_years must be positive")
+    if request.num_simulations * (request.duration_years * 4 + 1) > MAX_SIMULATION_CELLS:
+        raise HTTPException(status_code=400, detail="Too many paths for this horizon")
+    if any(p < 0 or p > 100 for p in request.percentiles):
+        raise HTTPException(status_code=400, detail="Percentiles must be between 0 and 100")
+    if request.sample_paths < 0 or request.sample_paths > MAX_SAMPLE_PATHS:
+        raise HTTPException(status_code=400, detail=f"sample_paths must be between 0 and {MAX_SAMPLE_PATHS}")
+    if request.rebalance_quarters < 0:
+        raise HTTPException(status_code=400, detail="rebalance_quarters must be non-negative")
+
+    cma_data, correlation_matrix = get_datasets("cma", "correlation")
+    try:
+        result = await run_compute(
+            "simulation",
+            run_multi_asset_monte_carlo,
+            cma_data=cma_data,
+            correlation_matrix=correlation_matrix,
+            weights=request.portfolio,
+            initial_value=request.initial_value,
+            quarterly_fixed_spending=request.quarterly_fixed_spending,
+            quarterly_percent_spending=request.quarterly_percent_spending,
+            duration_years=request.duration_years,
+            num_simulations=request.num_simulations,
+            inflation_rate=request.inflation_rate,
+            after_tax_rate=request.after_tax_rate,
+            one_time_spend=request.one_time_spend,
+            one_time_quarter=request.one_time_quarter,
+            custom_spending=request.custom_spending,
+            rebalance_quarters=request.rebalance_quarters,
+            shortfall_thresholds=request.shortfall_thresholds,
+            seed=request.seed,
+            percentiles=request.percentiles,
+            sample_paths=request.sample_paths
+        )
+
+        return {
+            "success": True,
+            "data": result
+        }
+
+    except ComputeBusyError:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/simulation/bootstrap")
+async def bootstrap_monte_carlo_endpoint(request: BootstrapMonteCarloRequest):
+    """
+    Historical simulation by stationary block bootstrap (runSimulationBootstrap
+    on the server).
+
+    Resamples blocks of months from the return series of the chosen
+    currency, keeping cross-asset and serial correlation. Large runs are
+    split into chunks that run in the process pool and are folded into
+    quantile sketches as they finish, so memory does not grow with the
+    number of paths; a seed reproduces the result either way.
+    """
+    currency = request.currency.upper()
+    if currency not in ("USD", "EUR", "GBP"):
+        raise HTTPException(status_code=400, detail="Currency must be USD, EUR or GBP")
+    if not request.portfolio:
+        raise HTTPException(status_code=400, detail="Portfolio must contain at least one asset")
+    if request.num_simulations < 1 or request.duration_years < 1:
+        raise HTTPException(status_code=400, detail="num_simulations and duration_years must be positive")
+    if request.num_simulations > MAX_STREAM_SIMULATIONS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_STREAM_SIMULATIONS} paths can be simulated")
+    if request.duration_years > MAX_SIMULATION_YEARS:
+        raise HTTPException(status_code=400, detail=f"duration_years must be at most {MAX_SIMULATION_YEARS}")
+    if any(p < 0 or p > 100 for p in request.percentiles):
+        raise HTTPException(status_code=400, detail="Percentiles must be between 0 and 100")
+    if request.sample_paths < 0 or request.sample_paths > MAX_SAMPLE_PATHS:
+        raise HTTPException(status_code=400, detail=f"sample_paths must be between 0 and {MAX_SAMPLE_PATHS}")
+
+    returns = get_dataset(f"returns_{currency.lower()}")
+    parallel = request.parallel and request.num_simulations > BOOTSTRAP_CHUNK_PATHS
+    try:
+        result = await run_compute(
+            "simulation",
+            run_bootstrap_monte_carlo,
+            returns=returns,
+            weights=request.portfolio,
+            initial_value=request.initial_value,
+            quarterly_fixed_spending=request.quarterly_fixed_spending,
+            quarterly_percent_spending=request.quarterly_percent_spending,
+            duration_years=request.duration_years,
+            num_simulations=request.num_simulations,
+            inflation_rate=request.inflation_rate,
+            after_tax_rate=request.after_tax_rate,
+            one_time_spend=request.one_time_spend,
+            one_time_quarter=request.one_time_quarter,
+            custom_spending=request.custom_spending,
+            block_length=request.block_length,
+            seed=request.seed,
+            percentiles=request.percentiles,
+            sample_paths=request.sample_paths,
+            map_fn=process_map if parallel else map
+        )
+        result["currency"] = currency
+
+        return {
+            "success": True,
+            "data": result
+        }
+
+    except ComputeBusyError:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -698,12 +1447,13 @@ async def calculate_var_cvar_endpoint(request: VaRRequest):
     Calculate Value at Risk (VaR) and Conditional VaR (CVaR).
     """
     try:
+        returns = get_dataset("returns_usd")
         weights = pd.Series(request.portfolio)
         weights = weights / weights.sum()
 
         # Calculate portfolio returns
-        common = weights.index.intersection(RETURNS_USD.columns)
-        portfolio_returns = (RETURNS_USD[common] * weights[common]).sum(axis=1)
+        common = weights.index.intersection(returns.columns)
+        portfolio_returns = (returns[common] * weights[common]).sum(axis=1)
 
         result = calculate_var_cvar(
             returns=portfolio_returns,
@@ -721,19 +1471,24 @@ async def calculate_pcte_endpoint(request: PCTERequest):
     """
     Calculate Portfolio Contribution to Tracking Error (PCTE).
     """
+    _check_level(request.level)
     try:
+        risk_model = await _risk_inputs(request.level, request.use_ewma)
         portfolio = pd.Series(request.portfolio)
         benchmark = pd.Series(request.benchmark)
 
-        result = calculate_pcte(
+        result = await run_compute(
+            "risk",
+            calculate_pcte,
             portfolio_weights=portfolio,
             benchmark_weights=benchmark,
-            returns=RETURNS_USD,
-            use_ewma=request.use_ewma
+            **risk_model
         )
 
         return {"success": True, "data": result}
 
+    except ComputeBusyError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -744,28 +1499,36 @@ async def calculate_full_decomposition(request: FullDecompositionRequest):
     Full risk decomposition: systematic, specific, and active components.
     """
     try:
+        returns, factor_returns, factor_cov = get_datasets("returns_usd", "factor_returns", "factor_cov")
         portfolio = pd.Series(request.portfolio)
         benchmark = pd.Series(request.benchmark)
 
-        # Compute betas
-        betas, residual_var = compute_lasso_betas(
-            security_returns=RETURNS_USD,
-            factor_returns=FACTOR_RETURNS,
+        # LASSO betas (computed once per returns snapshot, then cached).
+        # Cache lookups stay in this process; misses fan out via LASSO_N_JOBS
+        betas, residual_var = await run_compute(
+            "lasso",
+            get_lasso_betas,
+            security_returns=returns,
+            factor_returns=factor_returns,
             min_observations=12
         )
 
-        result = compute_full_risk_decomposition(
+        result = await run_compute(
+            "risk",
+            compute_full_risk_decomposition,
             portfolio_weights=portfolio,
             benchmark_weights=benchmark,
-            security_returns=RETURNS_USD,
-            factor_returns=FACTOR_RETURNS,
+            security_returns=returns,
+            factor_returns=factor_returns,
             betas=betas,
-            factor_cov=FACTOR_COVARIANCE,
+            factor_cov=factor_cov,
             residual_var=residual_var
         )
 
         return {"success": True, "data": result}
 
+    except ComputeBusyError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -776,11 +1539,12 @@ async def calculate_segment_te_endpoint(request: SegmentTERequest):
     Calculate segment-level tracking error (Growth vs Stability).
     """
     try:
+        returns = get_dataset("returns_usd")
         portfolio = pd.Series(request.portfolio)
 
         result = calculate_segment_tracking_error(
             portfolio_weights=portfolio,
-            returns=RETURNS_USD,
+            returns=returns,
             growth_benchmark=request.growth_benchmark,
             stability_benchmark=request.stability_benchmark,
             growth_allocation=request.growth_allocation,
@@ -798,9 +1562,30 @@ async def calculate_segment_te_endpoint(request: SegmentTERequest):
 # Optimization Endpoints
 # ============================================================================
 
-# Load CMA data at startup
-CMA_DATA = load_cma_data()
-CORRELATION_MATRIX = load_correlation_matrix()
+def _check_solver(solver: str) -> None:
+    if solver not in FRONTIER_SOLVERS:
+        raise HTTPException(status_code=400, detail=f"Unknown solver: {solver}")
+
+
+async def _cached_frontier(
+    mode: str,
+    caps_template: str,
+    custom_assets: Optional[List[str]] = None,
+    n_points: int = 30,
+    solver: str = "slsqp"
+) -> Dict:
+    """Frontier from the cache, solving in the process pool on a miss."""
+    cma_data, correlation_matrix = get_datasets("cma", "correlation")
+    return await get_frontier(
+        cma_data,
+        correlation_matrix,
+        mode,
+        caps_template,
+        custom_assets,
+        n_points,
+        solver=solver,
+        solve=functools.partial(run_compute, "frontier", compute_efficient_frontier, kind="process")
+    )
 
 
 @app.post("/api/optimization/frontier")
@@ -808,18 +1593,23 @@ async def compute_frontier_endpoint(request: FrontierRequest):
     """
     Compute efficient frontier for given parameters.
     """
+    _check_solver(request.solver)
     try:
-        result = compute_efficient_frontier(
-            cma_data=CMA_DATA,
-            correlation_matrix=CORRELATION_MATRIX,
+        result = await _cached_frontier(
             mode=request.mode,
             caps_template=request.caps_template,
             custom_assets=request.custom_assets,
-            n_points=request.n_points
+            n_points=request.n_points,
+            solver=request.solver
         )
 
         return {"success": True, "data": result}
 
+    except ComputeBusyError:
+        raise
+    except ValueError as e:
+        # Infeasible caps or bucket constraints
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -830,9 +1620,10 @@ async def compute_benchmark_endpoint(request: BenchmarkRequest):
     Calculate blended benchmark risk/return.
     """
     try:
+        cma_data, correlation_matrix = get_datasets("cma", "correlation")
         result = calculate_blended_benchmark(
-            cma_data=CMA_DATA,
-            correlation_matrix=CORRELATION_MATRIX,
+            cma_data=cma_data,
+            correlation_matrix=correlation_matrix,
             equity_type=request.equity_type,
             fixed_income_type=request.fixed_income_type,
             equity_allocation=request.equity_allocation,
@@ -881,13 +1672,13 @@ async def find_optimal_portfolio_endpoint(request: OptimalPortfolioRequest):
     """
     Find optimal portfolio from efficient frontier.
     """
+    _check_solver(request.solver)
     try:
-        # Compute frontier
-        frontier = compute_efficient_frontier(
-            cma_data=CMA_DATA,
-            correlation_matrix=CORRELATION_MATRIX,
+        # Reuse the frontier from the cache (shared with /api/optimization/frontier)
+        frontier = await _cached_frontier(
             mode=request.mode,
-            caps_template=request.caps_template
+            caps_template=request.caps_template,
+            solver=request.solver
         )
 
         if not frontier["risks"]:
@@ -904,6 +1695,10 @@ async def find_optimal_portfolio_endpoint(request: OptimalPortfolioRequest):
 
         return {"success": True, "data": result}
 
+    except (ComputeBusyError, HTTPException):
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -914,11 +1709,12 @@ async def get_optimization_assets():
     Get available assets for optimization.
     """
     try:
+        cma_data = get_dataset("cma")
         return {
             "success": True,
             "data": {
-                "assets": CMA_DATA["ASSET CLASS"].tolist(),
-                "count": len(CMA_DATA)
+                "assets": cma_data["ASSET CLASS"].tolist(),
+                "count": len(cma_data)
             }
         }
     except Exception as e:
@@ -931,9 +1727,10 @@ async def get_cma_data():
     Get Capital Market Assumptions data with returns and risks.
     """
     try:
+        cma_data = get_dataset("cma")
         # Convert to list of dicts for JSON response
         cma_list = []
-        for _, row in CMA_DATA.iterrows():
+        for _, row in cma_data.iterrows():
             cma_list.append({
                 "asset_class": row["ASSET CLASS"],
                 "expected_return": float(row["RETURN"]),
@@ -959,19 +1756,20 @@ async def get_correlation_matrix():
     Get asset correlation matrix.
     """
     try:
+        correlation_matrix = get_dataset("correlation")
         # Convert to dict format
         corr_dict = {}
-        for asset in CORRELATION_MATRIX.index:
+        for asset in correlation_matrix.index:
             corr_dict[asset] = {
-                col: float(CORRELATION_MATRIX.loc[asset, col])
-                for col in CORRELATION_MATRIX.columns
+                col: float(correlation_matrix.loc[asset, col])
+                for col in correlation_matrix.columns
             }
 
         return {
             "success": True,
             "data": {
                 "correlation": corr_dict,
-                "assets": list(CORRELATION_MATRIX.index)
+                "assets": list(correlation_matrix.index)
             }
         }
     except Exception as e:
@@ -4,7 +4,8 @@ Ported from Dash app_eval.py for FastAPI service
 
 Contains:
 - Efficient frontier computation via mean-variance optimization
-- QP solver with scipy.optimize (SLSQP)
+- Critical Line Algorithm for exact frontier corner portfolios
+- QP solver with scipy.optimize (SLSQP) or a dedicated active-set backend
 - Asset universe selection (core/core_private/unconstrained)
 - Bucket allocation constraints (Stability/Growth/Diversified)
 - Blended benchmark calculation
@@ -12,7 +13,7 @@ Contains:
 
 import numpy as np
 import pandas as pd
-from scipy.optimize import minimize
+from scipy.optimize import minimize, linprog, OptimizeResult
 from typing import Dict, List, Tuple, Optional, Callable
 import warnings
 
@@ -46,6 +47,9 @@ PRIVATE_ASSETS = {
 
 SPECIAL_ASSETS = {"VENTURE", "CLO", "DEVELOPMENT", "SPECIAL SITS", "GROWTH"}
 
+# Frontier solvers accepted by compute_efficient_frontier
+FRONTIER_SOLVERS = ("slsqp", "active_set", "cla")
+
 
 # ============================================================================
 # Universe Selection
@@ -216,8 +220,14 @@ def mean_cov_from_assets(
     mu = assets["RETURN"].astype(float).values
     sig = assets["RISK"].astype(float).values
 
-    # Get correlation submatrix for selected assets
-    corr = correlation_matrix.reindex(index=asset_names, columns=asset_names).fillna(0.0).values
+    # Get correlation submatrix for selected assets (names matched case-insensitively).
+    # Assets missing from the matrix are treated as uncorrelated, not riskless.
+    corr_upper = correlation_matrix.rename(
+        index=lambda a: str(a).strip().upper(),
+        columns=lambda a: str(a).strip().upper()
+    )
+    corr = corr_upper.reindex(index=asset_names, columns=asset_names).fillna(0.0).values
+    np.fill_diagonal(corr, 1.0)
 
     # Build covariance: Sigma = outer(sig, sig) * Corr
     Sigma = np.outer(sig, sig) * corr
@@ -232,24 +242,199 @@ def mean_cov_from_assets(
 # QP Solver
 # ============================================================================
 
+def linear_constraints(
+    bounds: List[Tuple[float, float]],
+    bucket_env: Optional[List[Tuple[np.ndarray, float, float]]] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Stack box bounds and bucket limits into inequality form C @ w >= d.
+
+    Rows are ordered [w >= lo (n), -w >= -hi (n), bucket lo/hi pairs].
+
+    Args:
+        bounds: Per-asset (min, max) bounds
+        bucket_env: Optional bucket constraints [(indices, lo, hi), ...]
+
+    Returns:
+        Tuple of (C, d)
+    """
+    n = len(bounds)
+    lo = np.array([b[0] for b in bounds], dtype=float)
+    hi = np.array([b[1] for b in bounds], dtype=float)
+
+    rows = [np.eye(n), -np.eye(n)]
+    rhs = [lo, -hi]
+    for idxs, b_lo, b_hi in bucket_env or []:
+        a = np.zeros(n)
+        a[np.asarray(idxs, dtype=int)] = 1.0
+        rows += [a[None, :], -a[None, :]]
+        rhs += [[b_lo], [-b_hi]]
+
+    return np.vstack(rows), np.concatenate(rhs)
+
+
+def feasible_point(
+    C: np.ndarray,
+    d: np.ndarray,
+    x0: Optional[np.ndarray] = None,
+    tol: float = 1e-9
+) -> Optional[np.ndarray]:
+    """
+    Find weights that sum to 1 and satisfy C @ w >= d.
+
+    Returns x0 unchanged when it is already feasible; otherwise solves a
+    phase-1 LP.
+
+    Args:
+        C: Inequality constraint matrix
+        d: Inequality right-hand side
+        x0: Optional candidate point
+        tol: Feasibility tolerance
+
+    Returns:
+        Feasible weights, or None if the constraints are infeasible
+    """
+    n = C.shape[1]
+    if x0 is not None and abs(x0.sum() - 1.0) <= tol and np.all(C @ x0 - d >= -tol):
+        return x0.astype(float)
+
+    lp = linprog(
+        np.zeros(n),
+        A_ub=-C,
+        b_ub=-d,
+        A_eq=np.ones((1, n)),
+        b_eq=[1.0],
+        bounds=[(None, None)] * n,
+        method="highs"
+    )
+    return lp.x if lp.success else None
+
+
+def active_set_qp(
+    G: np.ndarray,
+    c: np.ndarray,
+    C: np.ndarray,
+    d: np.ndarray,
+    x0: np.ndarray,
+    max_iter: Optional[int] = None,
+    tol: float = 1e-10
+) -> OptimizeResult:
+    """
+    Primal active-set method for min 0.5 w'Gw + c'w s.t. sum(w) = 1, C @ w >= d.
+
+    Starting from a feasible x0, constraints active at x0 form the initial
+    working set, so a nearby previous solution (warm start) typically
+    converges in a handful of KKT solves.
+
+    Args:
+        G: Positive definite Hessian (n x n)
+        c: Linear term (n,)
+        C: Inequality constraint matrix (m x n)
+        d: Inequality right-hand side (m,)
+        x0: Feasible starting point
+        max_iter: Iteration limit (default 10 * (n + m))
+        tol: Step and multiplier tolerance
+
+    Returns:
+        OptimizeResult with x, fun, success, nit, message and active (working set indices)
+    """
+    n = len(c)
+    m = len(d)
+    max_iter = max_iter or 10 * (n + m)
+    x = x0.astype(float).copy()
+
+    # Initial working set: constraints active at x0, kept linearly independent.
+    # Box rows are unit vectors, so only a variable's first active bound is
+    # taken; bucket rows are rank-checked against the rows already chosen.
+    slack = C @ x - d
+    working: List[int] = []
+    fixed = set()
+    for i in np.where(slack <= 1e-9)[0]:
+        if i < 2 * n:
+            j = i % n
+            if j not in fixed and len(fixed) < n - 1:
+                fixed.add(j)
+                working.append(int(i))
+    for i in np.where(slack[2 * n:] <= 1e-9)[0] + 2 * n:
+        A = np.vstack([np.ones(n), C[working + [int(i)]]])
+        if np.linalg.matrix_rank(A) == A.shape[0]:
+            working.append(int(i))
+
+    for it in range(1, max_iter + 1):
+        A = np.vstack([np.ones((1, n)), C[working]])
+        k = A.shape[0]
+        g = G @ x + c
+
+        # KKT system: G p + A' lam = -g, A p = 0
+        K = np.zeros((n + k, n + k))
+        K[:n, :n] = G
+        K[:n, n:] = A.T
+        K[n:, :n] = A
+        rhs = np.concatenate([-g, np.zeros(k)])
+        try:
+            sol = np.linalg.solve(K, rhs)
+        except np.linalg.LinAlgError:
+            sol = np.linalg.lstsq(K, rhs, rcond=None)[0]
+        p = sol[:n]
+
+        if np.linalg.norm(p, np.inf) <= tol * (1.0 + np.linalg.norm(x, np.inf)):
+            # Multipliers of the inequality rows (>= 0 at the optimum)
+            y = -sol[n + 1:]
+            if len(working) == 0 or y.min() >= -tol:
+                return OptimizeResult(
+                    x=x, fun=float(0.5 * x @ G @ x + c @ x), success=True, status=0,
+                    nit=it, active=np.array(working, dtype=int), message="Optimization terminated successfully"
+                )
+            working.pop(int(np.argmin(y)))
+            continue
+
+        # Longest feasible step along p
+        Cp = C @ p
+        blocking = Cp < -1e-14
+        blocking[working] = False
+        alpha, block = 1.0, None
+        if np.any(blocking):
+            idx = np.where(blocking)[0]
+            ratios = (d[idx] - C[idx] @ x) / Cp[idx]
+            j = int(np.argmin(ratios))
+            if ratios[j] < 1.0:
+                alpha, block = max(float(ratios[j]), 0.0), int(idx[j])
+
+        x = x + alpha * p
+        if block is not None:
+            working.append(block)
+
+    return OptimizeResult(
+        x=x, fun=float(0.5 * x @ G @ x + c @ x), success=False, status=1,
+        nit=max_iter, active=np.array(working, dtype=int), message="Iteration limit reached"
+    )
+
+
 def qp_solver(
     mu: np.ndarray,
     Sigma: np.ndarray,
     bounds: List[Tuple[float, float]],
-    bucket_env: Optional[List[Tuple[np.ndarray, float, float]]] = None
+    bucket_env: Optional[List[Tuple[np.ndarray, float, float]]] = None,
+    backend: str = "slsqp"
 ) -> Callable:
     """
-    Create SLSQP solver for efficient frontier.
+    Create solver for efficient frontier.
 
     Args:
         mu: Expected returns vector
         Sigma: Covariance matrix
         bounds: Per-asset (min, max) bounds
         bucket_env: Optional bucket constraints [(indices, lo, hi), ...]
+        backend: "slsqp" (scipy.optimize.minimize) or "active_set" (exact QP)
 
     Returns:
         Callable solver(lambda, x0=None) -> OptimizeResult
     """
+    if backend == "active_set":
+        return _active_set_solver(mu, Sigma, bounds, bucket_env)
+    if backend != "slsqp":
+        raise ValueError(f"Unknown QP backend: {backend}")
+
     n = len(mu)
 
     def solve_for_lambda(lmbd: float, x0: Optional[np.ndarray] = None):
@@ -304,6 +489,176 @@ def qp_solver(
     return solve_for_lambda
 
 
+def _active_set_solver(
+    mu: np.ndarray,
+    Sigma: np.ndarray,
+    bounds: List[Tuple[float, float]],
+    bucket_env: Optional[List[Tuple[np.ndarray, float, float]]] = None
+) -> Callable:
+    """Active-set backend for qp_solver (same objective as SLSQP)."""
+    C, d = linear_constraints(bounds, bucket_env)
+    start = feasible_point(C, d)
+
+    def solve_for_lambda(lmbd: float, x0: Optional[np.ndarray] = None):
+        """
+        Solve mean-variance optimization for given risk aversion lambda.
+
+        Objective: minimize lambda * (w @ Sigma @ w) - mu @ w
+        """
+        x_start = start if x0 is None else feasible_point(C, d, np.asarray(x0, dtype=float))
+        if x_start is None:
+            return OptimizeResult(
+                x=np.full(len(mu), np.nan), fun=np.nan, success=False, status=2,
+                nit=0, message="Constraints are infeasible"
+            )
+
+        result = active_set_qp(2.0 * lmbd * Sigma, -mu, C, d, x_start)
+        result.fun = float(lmbd * (result.x @ Sigma @ result.x) - mu @ result.x)
+        return result
+
+    return solve_for_lambda
+
+
+# ============================================================================
+# Critical Line Algorithm
+# ============================================================================
+
+def critical_line(
+    mu: np.ndarray,
+    Sigma: np.ndarray,
+    bounds: List[Tuple[float, float]],
+    bucket_env: Optional[List[Tuple[np.ndarray, float, float]]] = None,
+    tol: float = 1e-10
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Trace every corner portfolio of the constrained efficient frontier.
+
+    Solves the parametric QP min 0.5 w'Sigma w - t mu'w s.t. sum(w) = 1,
+    C @ w >= d for all t >= 0. With a fixed active set the solution is
+    linear in t, w(t) = w0 + t w1, so the path is followed from the minimum
+    variance portfolio (t = 0) by jumping straight to the next t at which a
+    constraint becomes active or an active constraint's multiplier reaches
+    zero. The portfolios at those breakpoints are the corner portfolios.
+
+    Args:
+        mu: Expected returns vector
+        Sigma: Positive definite covariance matrix
+        bounds: Per-asset (min, max) bounds
+        bucket_env: Optional bucket constraints [(indices, lo, hi), ...]
+        tol: Numerical tolerance
+
+    Returns:
+        Tuple of (t values, corner weights (n_corners x n_assets)) in
+        increasing t (= increasing return). Risk aversion lambda = 1 / (2 t).
+
+    Raises:
+        ValueError: If the constraints are infeasible
+    """
+    n = len(mu)
+    C, d = linear_constraints(bounds, bucket_env)
+
+    start = feasible_point(C, d)
+    if start is None:
+        raise ValueError("Constraints are infeasible")
+
+    min_var = active_set_qp(Sigma, np.zeros(n), C, d, start)
+    working = [int(i) for i in min_var.active]
+
+    t = 0.0
+    w = min_var.x
+    ts = [t]
+    corners = [w]
+    dropped = None
+
+    for _ in range(10 * (n + len(d))):
+        A = np.vstack([np.ones((1, n)), C[working]])
+        k = A.shape[0]
+
+        # KKT: Sigma w - A' lam = t mu, A w = b  =>  [w; lam] = s0 + t s1
+        K = np.zeros((n + k, n + k))
+        K[:n, :n] = Sigma
+        K[:n, n:] = -A.T
+        K[n:, :n] = A
+        b = np.concatenate([[1.0], d[working]])
+        try:
+            s0 = np.linalg.solve(K, np.concatenate([np.zeros(n), b]))
+            s1 = np.linalg.solve(K, np.concatenate([mu, np.zeros(k)]))
+        except np.linalg.LinAlgError:
+            s0 = np.linalg.lstsq(K, np.concatenate([np.zeros(n), b]), rcond=None)[0]
+            s1 = np.linalg.lstsq(K, np.concatenate([mu, np.zeros(k)]), rcond=None)[0]
+        w0, w1 = s0[:n], s1[:n]
+        lam0, lam1 = s0[n + 1:], s1[n + 1:]
+
+        # Next breakpoint: an inactive constraint becomes binding ...
+        t_next, event, index = np.inf, None, None
+        Cw1 = C @ w1
+        inactive = np.ones(len(d), dtype=bool)
+        inactive[working] = False
+        if dropped is not None:
+            inactive[dropped] = False
+        candidates = np.where(inactive & (Cw1 < -tol))[0]
+        if len(candidates):
+            t_hit = (d[candidates] - C[candidates] @ w0) / Cw1[candidates]
+            j = int(np.argmin(t_hit))
+            t_next, event, index = t_hit[j], "add", int(candidates[j])
+
+        # ... or an active constraint's multiplier falls to zero
+        falling = np.where(lam1 < -tol)[0]
+        if len(falling):
+            t_zero = -lam0[falling] / lam1[falling]
+            j = int(np.argmin(t_zero))
+            if t_zero[j] < t_next:
+                t_next, event, index = t_zero[j], "drop", int(falling[j])
+
+        if event is None:
+            break  # Maximum-return portfolio reached
+
+        t = max(float(t_next), t)
+        w = w0 + t * w1
+        if np.max(np.abs(w - corners[-1])) > 1e-9:
+            ts.append(t)
+            corners.append(w)
+
+        if event == "add":
+            working.append(index)
+            dropped = None
+        else:
+            dropped = working.pop(index)
+
+    return np.array(ts), np.array(corners)
+
+
+def interpolate_frontier(
+    corners: np.ndarray,
+    mu: np.ndarray,
+    target_returns: np.ndarray
+) -> np.ndarray:
+    """
+    Frontier weights at arbitrary returns from the corner portfolios.
+
+    Between adjacent corners the efficient weights are linear in return, so
+    each point is an exact blend of the two corners around it.
+
+    Args:
+        corners: Corner weights in increasing return order
+        mu: Expected returns vector
+        target_returns: Returns to evaluate (clipped to the frontier range)
+
+    Returns:
+        Weights (len(target_returns) x n_assets)
+    """
+    corner_returns = corners @ mu
+    if len(corners) == 1:
+        return np.repeat(corners, len(target_returns), axis=0)
+
+    r = np.clip(target_returns, corner_returns[0], corner_returns[-1])
+    seg = np.clip(np.searchsorted(corner_returns, r, side="right") - 1, 0, len(corners) - 2)
+    span = corner_returns[seg + 1] - corner_returns[seg]
+    frac = np.where(span > 0, (r - corner_returns[seg]) / np.where(span > 0, span, 1.0), 0.0)
+
+    return corners[seg] + frac[:, None] * (corners[seg + 1] - corners[seg])
+
+
 # ============================================================================
 # Efficient Frontier
 # ============================================================================
@@ -315,7 +670,9 @@ def compute_efficient_frontier(
     caps_template: str = "std",
     custom_assets: Optional[List[str]] = None,
     n_points: int = 30,
-    lambdas: Optional[np.ndarray] = None
+    lambdas: Optional[np.ndarray] = None,
+    x0: Optional[np.ndarray] = None,
+    solver: str = "slsqp"
 ) -> Dict:
     """
     Compute full efficient frontier with lambda sweep.
@@ -328,9 +685,14 @@ def compute_efficient_frontier(
         custom_assets: Optional list of asset names to use
         n_points: Number of frontier points
         lambdas: Optional array of risk aversion parameters
+        x0: Optional initial guess for the first lambda (in universe order).
+            Later points are warm-started from the previous solution.
+        solver: "slsqp" | "active_set" (lambda sweep) or "cla" (corner
+            portfolios, n_points spaced evenly in return; lambdas and x0 unused)
 
     Returns:
-        Dict with frontier data: risks, returns, weights, assets
+        Dict with frontier data: risks, returns, weights, assets.
+        The "cla" solver also returns the corner portfolios under "corners".
     """
     # Select universe
     if custom_assets and len(custom_assets) >= 2:
@@ -362,8 +724,11 @@ def compute_efficient_frontier(
     # Bucket constraints
     bucket_env = build_bucket_env(sub)
 
+    if solver == "cla":
+        return _cla_frontier(mu, Sigma, bounds, bucket_env, asset_names, n_points, mode, caps_template)
+
     # Create solver
-    solver = qp_solver(mu, Sigma, bounds, bucket_env=bucket_env)
+    solve = qp_solver(mu, Sigma, bounds, bucket_env=bucket_env, backend=solver)
 
     # Lambda sweep (geometric spacing from low to high risk aversion)
     if lambdas is None:
@@ -373,10 +738,11 @@ def compute_efficient_frontier(
     risks = []
     rets = []
     weights_list = []
-    x0 = None
+    if x0 is not None and len(x0) != len(mu):
+        x0 = None
 
     for lam in lambdas:
-        result = solver(lam, x0=x0)
+        result = solve(lam, x0=x0)
         if result.success:
             w = result.x
             x0 = w  # Warm start for next iteration
@@ -395,7 +761,48 @@ def compute_efficient_frontier(
         "assets": asset_names,
         "n_portfolios": len(risks),
         "mode": mode,
-        "caps_template": caps_template
+        "caps_template": caps_template,
+        "solver": solver
+    }
+
+
+def _cla_frontier(
+    mu: np.ndarray,
+    Sigma: np.ndarray,
+    bounds: List[Tuple[float, float]],
+    bucket_env: List[Tuple[np.ndarray, float, float]],
+    asset_names: List[str],
+    n_points: int,
+    mode: str,
+    caps_template: str
+) -> Dict:
+    """Frontier from corner portfolios, highest return first like the lambda sweep."""
+    _, corners = critical_line(mu, Sigma, bounds, bucket_env)
+
+    corner_returns = corners @ mu
+    targets = np.linspace(corner_returns[-1], corner_returns[0], max(int(n_points), 1))
+    W = interpolate_frontier(corners, mu, targets)
+
+    def risks_of(weights: np.ndarray) -> List[float]:
+        return np.sqrt(np.maximum(np.einsum("ij,jk,ik->i", weights, Sigma, weights), 0.0)).tolist()
+
+    def weight_dicts(weights: np.ndarray) -> List[Dict]:
+        return [dict(zip(asset_names, w.tolist())) for w in weights]
+
+    return {
+        "risks": risks_of(W),
+        "returns": (W @ mu).tolist(),
+        "weights": weight_dicts(W),
+        "assets": asset_names,
+        "n_portfolios": len(W),
+        "mode": mode,
+        "caps_template": caps_template,
+        "solver": "cla",
+        "corners": {
+            "risks": risks_of(corners[::-1]),
+            "returns": corner_returns[::-1].tolist(),
+            "weights": weight_dicts(corners[::-1]),
+        }
     }
 
 
@@ -0,0 +1,123 @@
+"""
+Quantile Sketches
+Running percentile estimates for many series at once
+
+TDigestBank keeps one merging t-digest per series (e.g. one per simulated
+quarter) in two fixed-size (series x centroids) arrays, so memory does not
+grow with the number of observations. Batches are merged for all series in
+one pass: the batch is sorted, merged with the existing centroids and
+re-binned under the arcsine scale function, which keeps centroids small in
+the tails where the low percentiles live.
+"""
+
+import math
+from typing import Sequence
+
+import numpy as np
+
+
+class TDigestBank:
+    """
+    A bank of merging t-digests, one per series.
+
+    Attributes:
+        n_series: Number of series
+        compression: t-digest delta; about compression / 2 centroids per series
+        count: Observations per series so far
+    """
+
+    def __init__(self, n_series: int, compression: float = 500.0):
+        self.n_series = n_series
+        self.compression = float(compression)
+        self.n_centroids = int(math.ceil(compression / 2)) + 1
+        self.count = 0
+        self.means = np.empty((n_series, 0))
+        self.weights = np.empty((n_series, 0))
+        self.minimum = np.full(n_series, np.inf)
+        self.maximum = np.full(n_series, -np.inf)
+
+    def update(self, values: np.ndarray) -> None:
+        """
+        Add a batch of observations.
+
+        Args:
+            values: Observations (series x batch); sorted in place
+        """
+        n_rows, batch = values.shape
+        if batch == 0:
+            return
+        values.sort(axis=1)
+        np.minimum(self.minimum, values[:, 0], out=self.minimum)
+        np.maximum(self.maximum, values[:, -1], out=self.maximum)
+
+        # Compress the batch first: every row has the same ranks, so one set
+        # of bin boundaries serves all rows
+        starts = self._batch_bins(batch)
+        batch_weights = np.diff(np.append(starts, batch)).astype(np.float64)
+        batch_means = np.add.reduceat(values, starts, axis=1) / batch_weights
+
+        self._merge(batch_means, np.broadcast_to(batch_weights, batch_means.shape), batch)
+
+    def _batch_bins(self, batch: int) -> np.ndarray:
+        """First index of each bin of a sorted batch, at twice the compression."""
+        q = (np.arange(batch) + 0.5) / batch
+        bins = np.floor(self._scale(q, 2 * self.compression))
+        return np.flatnonzero(np.concatenate([[True], np.diff(bins) > 0]))
+
+    @staticmethod
+    def _scale(q: np.ndarray, compression: float) -> np.ndarray:
+        """Arcsine scale function k(q), from 0 to compression / 2."""
+        return compression / (2 * math.pi) * (np.arcsin(np.clip(2 * q - 1, -1.0, 1.0)) + math.pi / 2)
+
+    def _merge(self, means: np.ndarray, weights: np.ndarray, added: int) -> None:
+        """Merge sorted centroids into the digests and re-bin them."""
+        n_rows = self.n_series
+        # Two sorted runs per row, so the stable sort is a linear merge
+        means = np.concatenate([self.means, means], axis=1)
+        weights = np.concatenate([self.weights, weights], axis=1)
+        order = np.argsort(means, axis=1, kind="stable")
+        means = np.take_along_axis(means, order, axis=1)
+        weights = np.take_along_axis(weights, order, axis=1)
+
+        self.count += added
+        q = (np.cumsum(weights, axis=1) - 0.5 * weights) / self.count
+        bins = np.minimum(self._scale(q, self.compression).astype(np.int64), self.n_centroids - 1)
+        bins += np.arange(n_rows)[:, None] * self.n_centroids
+
+        size = n_rows * self.n_centroids
+        weight_sums = np.bincount(bins.ravel(), weights.ravel(), minlength=size).reshape(n_rows, -1)
+        value_sums = np.bincount(bins.ravel(), (means * weights).ravel(), minlength=size).reshape(n_rows, -1)
+
+        # Empty bins keep weight 0 and sit at the row maximum so they sort last
+        self.weights = weight_sums
+        self.means = np.where(
+            weight_sums > 0, value_sums / np.where(weight_sums > 0, weight_sums, 1.0), self.maximum[:, None]
+        )
+
+    def quantiles(self, percentiles: Sequence[float]) -> np.ndarray:
+        """
+        Estimated percentiles of every series.
+
+        Interpolates between centroid centres with the exact minimum and
+        maximum at the ends; with only singleton centroids this matches
+        np.percentile's linear interpolation.
+
+        Args:
+            percentiles: Percentiles (0-100)
+
+        Returns:
+            Array (len(percentiles) x series)
+        """
+        result = np.empty((len(percentiles), self.n_series))
+        if self.count == 0:
+            result.fill(np.nan)
+            return result
+
+        target = np.asarray(percentiles, dtype=np.float64) / 100 * (self.count - 1) + 0.5
+        centres = np.cumsum(self.weights, axis=1) - 0.5 * self.weights
+        for row in range(self.n_series):
+            used = self.weights[row] > 0
+            xp = np.concatenate([[0.5], centres[row, used], [self.count - 0.5]])
+            fp = np.concatenate([[self.minimum[row]], self.means[row, used], [self.maximum[row]]])
+            result[:, row] = np.interp(target, xp, fp)
+        return result
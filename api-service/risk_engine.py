@@ -4,10 +4,14 @@ Ported from Dash app risk_functions.py for FastAPI service
 Extended with EWMA shrinkage, VaR/CVaR, PCTE, and full risk decomposition
 """
 
+import time
+from functools import lru_cache
 import numpy as np
 import pandas as pd
+from joblib import Parallel, delayed
+from scipy.signal import lfilter
 from sklearn.linear_model import LassoCV
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Union
 import warnings
 
 warnings.filterwarnings('ignore')
@@ -89,67 +93,62 @@ def ewma_shrinkage_cov(
         return returns.cov()
 
     # Calculate EWMA covariance
-    weights = np.array([(1 - lambda_) * (lambda_ ** i) for i in range(n_obs)])
-    weights = weights[::-1]
-    weights = weights / weights.sum()
-
-    centered = returns - returns.mean()
-    weighted_returns = centered.multiply(np.sqrt(weights), axis=0)
-    ewma_cov = weighted_returns.T @ weighted_returns
+    ewma_cov = ewma_cov_kernel(returns.values, lambda_)
 
-    # Build shrinkage target
+    # Shrinkage target only differs from zero on the diagonal
     if shrink_target == "diagonal":
         # Diagonal matrix with EWMA variances
-        target = pd.DataFrame(
-            np.diag(np.diag(ewma_cov.values)),
-            index=ewma_cov.index,
-            columns=ewma_cov.columns
-        )
+        target_diag = np.diag(ewma_cov)
     else:  # identity
         # Scaled identity matrix
-        avg_var = np.mean(np.diag(ewma_cov.values))
-        target = pd.DataFrame(
-            np.eye(n_assets) * avg_var,
-            index=ewma_cov.index,
-            columns=ewma_cov.columns
-        )
+        target_diag = np.full(n_assets, np.mean(np.diag(ewma_cov)))
 
-    # Apply shrinkage
-    shrunk_cov = (1 - shrink_alpha) * ewma_cov + shrink_alpha * target
+    # Apply shrinkage: (1 - alpha) * cov + alpha * target
+    shrunk_cov = (1 - shrink_alpha) * ewma_cov
+    shrunk_cov[np.diag_indices(n_assets)] += shrink_alpha * target_diag
 
-    return shrunk_cov
+    return pd.DataFrame(shrunk_cov, index=returns.columns, columns=returns.columns)
 
 
 def calculate_pcte(
     portfolio_weights: pd.Series,
     benchmark_weights: pd.Series,
-    returns: pd.DataFrame,
+    returns: Optional[pd.DataFrame],
     use_ewma: bool = True,
-    ewma_decay: float = 0.94
+    ewma_decay: float = 0.94,
+    cov_matrix: Optional[pd.DataFrame] = None,
+    betas: Optional[pd.DataFrame] = None,
+    factor_cov: Optional[pd.DataFrame] = None,
+    residual_var: Optional[pd.Series] = None
 ) -> Dict:
     """
     Calculate Portfolio Contribution to Tracking Error (PCTE).
 
     Similar to PCTR but measures each asset's contribution to tracking error
-    vs benchmark rather than total portfolio risk.
+    vs benchmark rather than total portfolio risk. With betas and factor_cov
+    the factor-model covariance is used, as in calculate_contributions.
 
     Args:
         portfolio_weights: Portfolio weights
         benchmark_weights: Benchmark weights
-        returns: Asset returns
+        returns: Asset returns; NaN gaps (security-level histories) are allowed
         use_ewma: Use EWMA covariance
         ewma_decay: EWMA decay factor
+        cov_matrix: Optional precomputed PSD covariance covering the assets
+            (e.g. from covariance_cache); use_ewma/ewma_decay are then ignored
+        betas: Optional security-factor betas for the factor model
+        factor_cov: Factor covariance, required with betas
+        residual_var: Residual variance per security for the factor model
 
     Returns:
         Dict with pcte contributions per asset, total tracking error
     """
     # Align all inputs
     all_assets = portfolio_weights.index.union(benchmark_weights.index)
-    all_assets = all_assets.intersection(returns.columns)
+    all_assets = all_assets.intersection(betas.index if betas is not None else returns.columns)
 
     port_w = portfolio_weights.reindex(all_assets).fillna(0)
     bench_w = benchmark_weights.reindex(all_assets).fillna(0)
-    ret = returns[all_assets]
 
     # Normalize
     port_w = port_w / port_w.sum() if port_w.sum() > 0 else port_w
@@ -158,21 +157,24 @@ def calculate_pcte(
     # Active weights
     active_w = port_w - bench_w
 
-    # Covariance
-    if use_ewma:
-        cov = calculate_ewma_covariance(ret, decay=ewma_decay)
+    # Covariance applied to the active weights
+    a = active_w.values
+    if betas is not None:
+        cov_a = factor_cov_product(a, *factor_model_arrays(all_assets, betas, factor_cov, residual_var))
     else:
-        cov = ret.cov()
-
-    cov = pd.DataFrame(ensure_psd(cov.values), index=cov.index, columns=cov.columns)
+        if cov_matrix is not None:
+            cov = slice_covariance(cov_matrix, all_assets)
+        else:
+            cov = returns_covariance(returns[all_assets], use_ewma, ewma_decay)
+        cov_a = cov.values @ a
 
     # Tracking error variance
-    te_var = float(active_w.values @ cov.values @ active_w.values)
+    te_var = float(a @ cov_a)
     te_vol = np.sqrt(te_var) if te_var > 0 else 0
 
     # Marginal contribution to TE
     if te_vol > 0:
-        mcte = (cov.values @ active_w.values) / te_vol
+        mcte = cov_a / te_vol
         pcte = active_w.values * mcte
         pcte_normalized = pcte / np.abs(pcte).sum() if np.abs(pcte).sum() > 0 else pcte
     else:
@@ -383,6 +385,148 @@ def calculate_segment_tracking_error(
 # ============================================================================
 
 
+@lru_cache(maxsize=64)
+def ewma_weights(n_obs: int, decay: float) -> np.ndarray:
+    """
+    Normalized EWMA weights, oldest observation first.
+
+    Cached per (n_obs, decay); the returned array is read-only.
+
+    Args:
+        n_obs: Number of observations
+        decay: Exponential decay factor
+
+    Returns:
+        Array of n_obs weights summing to 1 (most recent gets highest weight)
+    """
+    # (1 - decay) scaling cancels in the normalization
+    weights = decay ** np.arange(n_obs - 1, -1, -1, dtype=np.float64)
+    weights /= weights.sum()
+    weights.setflags(write=False)
+    return weights
+
+
+def ewma_cov_kernel(returns: np.ndarray, decay: float = 0.94) -> np.ndarray:
+    """
+    EWMA covariance on a raw (dates x assets) array.
+
+    Returns are centred on their simple mean and weighted by ewma_weights.
+    Shared by calculate_ewma_covariance and ewma_shrinkage_cov; callers wrap
+    the result in a DataFrame if they need labels.
+
+    Args:
+        returns: Array of asset returns (dates x assets)
+        decay: Exponential decay factor
+
+    Returns:
+        Covariance matrix (assets x assets) as a float64 ndarray
+    """
+    X = np.ascontiguousarray(returns, dtype=np.float64)
+    sqrt_w = np.sqrt(ewma_weights(X.shape[0], float(decay)))
+
+    weighted = (X - X.mean(axis=0)) * sqrt_w[:, None]
+    return weighted.T @ weighted
+
+
+class EWMACovarianceState:
+    """
+    Running sums behind ewma_cov_kernel, updatable one period at a time.
+
+    Keeps the decayed weight sum, decayed first and second moments and the
+    plain sum used for the (simple) mean. Adding a period is a rank-one
+    update, O(N^2), and covariance() reproduces ewma_cov_kernel over the
+    whole history seen so far, so refresh cost does not grow with T.
+    """
+
+    def __init__(self, decay: float, n_assets: int):
+        self.decay = float(decay)
+        self.n_obs = 0
+        self.weight_sum = 0.0
+        self.weighted_sum = np.zeros(n_assets)
+        self.weighted_outer = np.zeros((n_assets, n_assets))
+        self.total = np.zeros(n_assets)
+
+    @classmethod
+    def from_covariance(
+        cls,
+        cov: np.ndarray,
+        returns: np.ndarray,
+        decay: float = 0.94
+    ) -> "EWMACovarianceState":
+        """
+        Seed from an existing ewma_cov_kernel / calculate_ewma_covariance result.
+
+        Only the O(T*N) vector sums are recomputed from returns; the second
+        moment is recovered from cov instead of another O(T*N^2) pass.
+
+        Args:
+            cov: EWMA covariance of returns with the same decay
+            returns: Array of asset returns (dates x assets) cov was built from
+            decay: Exponential decay factor
+
+        Returns:
+            State equivalent to having updated with every row of returns
+        """
+        X = np.ascontiguousarray(returns, dtype=np.float64)
+        n_obs = X.shape[0]
+        weights = ewma_weights(n_obs, float(decay))
+
+        state = cls(decay, X.shape[1])
+        state.n_obs = n_obs
+        state.weight_sum = float(np.sum(decay ** np.arange(n_obs, dtype=np.float64)))
+        state.total = X.sum(axis=0)
+
+        mean = state.total / n_obs
+        first = weights @ X  # Normalized first moment
+        second = np.asarray(cov, dtype=np.float64) + np.outer(mean, first) + np.outer(first, mean) - np.outer(mean, mean)
+
+        state.weighted_sum = first * state.weight_sum
+        state.weighted_outer = second * state.weight_sum
+        return state
+
+    @classmethod
+    def from_returns(cls, returns: np.ndarray, decay: float = 0.94) -> "EWMACovarianceState":
+        """State after every row of returns (dates x assets)."""
+        return cls.from_covariance(ewma_cov_kernel(returns, decay), returns, decay)
+
+    def update(self, returns: np.ndarray) -> None:
+        """
+        Add one period (N,) or several (k x N), oldest first.
+
+        A single period is a rank-one update; k periods cost one
+        (N x k) @ (k x N) product.
+        """
+        X = np.atleast_2d(np.asarray(returns, dtype=np.float64))
+        k = X.shape[0]
+        if k == 0:
+            return
+
+        # Newest row gets weight 1, the one before decay, ...
+        new_weights = self.decay ** np.arange(k - 1, -1, -1, dtype=np.float64)
+        carry = self.decay ** k
+
+        self.weight_sum = carry * self.weight_sum + new_weights.sum()
+        self.weighted_sum = carry * self.weighted_sum + new_weights @ X
+        self.weighted_outer *= carry
+        if k == 1:
+            self.weighted_outer += np.outer(X[0], X[0])
+        else:
+            self.weighted_outer += (X.T * new_weights) @ X
+        self.total += X.sum(axis=0)
+        self.n_obs += k
+
+    @property
+    def mean(self) -> np.ndarray:
+        return self.total / self.n_obs
+
+    def covariance(self) -> np.ndarray:
+        """EWMA covariance (assets x assets), equal to ewma_cov_kernel on the full history."""
+        mean = self.mean
+        first = self.weighted_sum / self.weight_sum
+        cross = np.outer(mean, first)
+        return self.weighted_outer / self.weight_sum - cross - cross.T + np.outer(mean, mean)
+
+
 def calculate_ewma_covariance(
     returns: pd.DataFrame,
     decay: float = 0.94,
@@ -403,74 +547,298 @@ def calculate_ewma_covariance(
     if n_obs < min_periods:
         return returns.cov()
 
-    # Generate exponential weights (most recent gets highest weight)
-    weights = np.array([(1 - decay) * (decay ** i) for i in range(n_obs)])
-    weights = weights[::-1]  # Reverse so recent data has higher weight
-    weights = weights / weights.sum()  # Normalize
+    cov_matrix = ewma_cov_kernel(returns.values, decay)
 
-    # Center returns
-    centered = returns - returns.mean()
+    return pd.DataFrame(cov_matrix, index=returns.columns, columns=returns.columns)
 
-    # Weighted covariance
-    weighted_returns = centered.multiply(np.sqrt(weights), axis=0)
-    cov_matrix = weighted_returns.T @ weighted_returns
 
-    return pd.DataFrame(cov_matrix, index=returns.columns, columns=returns.columns)
+def pairwise_covariance(
+    returns: pd.DataFrame,
+    method: str = "sample",
+    decay: float = 0.94,
+    min_periods: int = 12,
+    block_size: int = 256
+) -> pd.DataFrame:
+    """
+    Pairwise-complete covariance of returns with gaps (NaN).
+
+    Each pair (i, j) uses only the dates where both assets have a return,
+    centred on the simple mean over those dates. All sums are masked matrix
+    products over blocks of block_size columns, so there is no per-pair
+    Python loop and temporaries are (block_size x n_assets). On complete
+    data this equals returns.cov() ("sample") or calculate_ewma_covariance
+    ("ewma").
+
+    Pairs sharing fewer than min_periods dates are treated as uncorrelated.
+    The result is not PSD in general; repair it with ensure_psd.
+
+    Args:
+        returns: DataFrame of asset returns (dates x assets), NaN where missing
+        method: "sample" (unbiased) or "ewma" (weights renormalized per pair)
+        decay: EWMA decay factor (ignored for "sample")
+        min_periods: Minimum overlapping observations for a covariance term
+        block_size: Columns per block
+
+    Returns:
+        Covariance matrix (assets x assets) as DataFrame
+    """
+    X = returns.to_numpy(dtype=np.float64)
+    observed = ~np.isnan(X)
+    M = observed.astype(np.float64)
+    Xz = np.where(observed, X, 0.0)
+
+    if method == "ewma":
+        w = ewma_weights(X.shape[0], float(decay))
+    elif method == "sample":
+        w = np.ones(X.shape[0])
+    else:
+        raise ValueError(f"Unknown covariance method: {method}")
+
+    Mw = M * w[:, None]
+    Xw = Xz * w[:, None]
+    n_assets = X.shape[1]
+    cov = np.empty((n_assets, n_assets))
+
+    for start in range(0, n_assets, block_size):
+        cols = slice(start, start + block_size)
+        # Each term is (block x n_assets), summed over dates both observed
+        count = M[:, cols].T @ M
+        sum_i = Xz[:, cols].T @ M
+        sum_j = M[:, cols].T @ Xz
+        wsum_ij = Xw[:, cols].T @ Xz
+        if method == "sample":
+            wsum_i, wsum_j, weight = sum_i, sum_j, count
+        else:
+            wsum_i = Xw[:, cols].T @ M
+            wsum_j = Mw[:, cols].T @ Xz
+            weight = Mw[:, cols].T @ M
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean_i = sum_i / count
+            mean_j = sum_j / count
+            centred = wsum_ij - mean_j * wsum_i - mean_i * wsum_j + mean_i * mean_j * weight
+            block = centred / (count - 1) if method == "sample" else centred / weight
+
+        # Variances use every observation an asset has, even below min_periods
+        rows = np.arange(block.shape[0])
+        variances = block[rows, start + rows]
+        block[count < min_periods] = 0.0
+        block[rows, start + rows] = variances
+        cov[cols] = block
+
+    cov = np.nan_to_num(cov, nan=0.0, posinf=0.0, neginf=0.0)
+
+    return pd.DataFrame(cov, index=returns.columns, columns=returns.columns)
+
+
+def returns_covariance(
+    returns: pd.DataFrame,
+    use_ewma: bool = True,
+    ewma_decay: float = 0.94
+) -> pd.DataFrame:
+    """
+    PSD-repaired covariance of returns.
+
+    Returns with gaps (security-level histories of different lengths) use
+    pairwise_covariance; complete ones the usual EWMA or sample estimate.
+
+    Args:
+        returns: DataFrame of asset returns (dates x assets)
+        use_ewma: Use EWMA covariance vs simple covariance
+        ewma_decay: Decay factor for EWMA
+
+    Returns:
+        Covariance matrix (assets x assets) as DataFrame
+    """
+    if np.isnan(returns.to_numpy(dtype=np.float64)).any():
+        cov = pairwise_covariance(returns, method="ewma" if use_ewma else "sample", decay=ewma_decay)
+    elif use_ewma:
+        cov = calculate_ewma_covariance(returns, decay=ewma_decay)
+    else:
+        cov = returns.cov()
+
+    return pd.DataFrame(ensure_psd(cov.values), index=cov.index, columns=cov.columns)
 
 
 def ensure_psd(matrix: np.ndarray, epsilon: float = 1e-10) -> np.ndarray:
     """Ensure matrix is positive semi-definite via eigenvalue clipping."""
     eigenvalues, eigenvectors = np.linalg.eigh(matrix)
     eigenvalues = np.maximum(eigenvalues, epsilon)
-    return eigenvectors @ np.diag(eigenvalues) @ eigenvectors.T
+    return (eigenvectors * eigenvalues) @ eigenvectors.T
+
+
+def slice_covariance(cov_matrix: pd.DataFrame, assets) -> pd.DataFrame:
+    """
+    Extract the (assets x assets) sub-block of a labelled covariance matrix.
+
+    Positional slicing, so it stays cheap on large matrices. A principal
+    sub-block of a PSD matrix is itself PSD, so no further repair is needed.
+
+    Args:
+        cov_matrix: Covariance matrix (assets x assets)
+        assets: Asset labels to keep, in the desired order
+
+    Returns:
+        Covariance sub-block as DataFrame
+    """
+    assets = pd.Index(assets)
+    idx = cov_matrix.index.get_indexer(assets)
+    if (idx < 0).any():
+        missing = list(assets[idx < 0][:5])
+        raise KeyError(f"Assets not in covariance matrix: {missing}")
+
+    block = cov_matrix.values[np.ix_(idx, idx)]
+    return pd.DataFrame(block, index=assets, columns=assets)
+
+
+def factor_model_arrays(
+    assets,
+    betas: pd.DataFrame,
+    factor_cov: pd.DataFrame,
+    residual_var: Optional[pd.Series] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Arrays of the factor model Sigma = B F B' + diag(eps) for some assets.
+
+    Args:
+        assets: Security labels, all present in betas.index
+        betas: Security-factor betas (securities x factors)
+        factor_cov: Factor covariance matrix (factors x factors)
+        residual_var: Residual variance per security (0 where missing)
+
+    Returns:
+        Tuple of (B: assets x factors, F: PSD factors x factors, eps: per asset)
+    """
+    common_factors = betas.columns.intersection(factor_cov.index)
+    rows = betas.index.get_indexer(pd.Index(assets))
+    if (rows < 0).any():
+        raise KeyError(f"Securities not in beta matrix: {list(pd.Index(assets)[rows < 0][:5])}")
+
+    B = betas[common_factors].to_numpy(dtype=np.float64)[rows]
+    F = ensure_psd(factor_cov.loc[common_factors, common_factors].to_numpy(dtype=np.float64))
+    if residual_var is None:
+        eps = np.zeros(len(rows))
+    else:
+        eps = residual_var.reindex(assets).fillna(0.0).to_numpy(dtype=np.float64)
+
+    return B, F, eps
+
+
+def factor_cov_product(W: np.ndarray, B: np.ndarray, F: np.ndarray, eps: np.ndarray) -> np.ndarray:
+    """
+    Sigma @ w for Sigma = B F B' + diag(eps), without forming Sigma.
+
+    O(N*K) per portfolio instead of O(N^2).
+
+    Args:
+        W: Weights, one portfolio (N,) or a stack (P x N)
+        B: Betas (N x K)
+        F: Factor covariance (K x K)
+        eps: Residual variances (N,)
+
+    Returns:
+        Array shaped like W
+    """
+    return ((W @ B) @ F) @ B.T + W * eps
+
+
+def factor_residual_variance(
+    security_returns: pd.DataFrame,
+    factor_returns: pd.DataFrame,
+    betas: pd.DataFrame,
+    min_observations: int = 12
+) -> pd.Series:
+    """
+    Specific (residual) variance per security for a given beta matrix.
+
+    Residuals r - B f are taken on the dates where the factors are all
+    observed; each security uses its own non-missing dates. Securities with
+    fewer than min_observations residuals get the cross-sectional median.
+
+    Args:
+        security_returns: Security returns (dates x securities), NaN gaps allowed
+        factor_returns: Factor returns on the same date index
+        betas: Security-factor betas (securities x factors)
+        min_observations: Minimum residuals for a security's own estimate
+
+    Returns:
+        Series of monthly residual variances indexed like betas
+    """
+    securities = betas.index.intersection(security_returns.columns)
+    factors = betas.columns.intersection(factor_returns.columns)
+    dates = security_returns.index.intersection(factor_returns.index)
+
+    F_ret = factor_returns.loc[dates, factors].to_numpy(dtype=np.float64)
+    complete = ~np.isnan(F_ret).any(axis=1)
+    R = security_returns.loc[dates, securities].to_numpy(dtype=np.float64)[complete]
+
+    resid = R - F_ret[complete] @ betas.loc[securities, factors].to_numpy(dtype=np.float64).T
+    n_obs = (~np.isnan(resid)).sum(axis=0)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        variance = np.nanvar(resid, axis=0, ddof=1)
+    variance[n_obs < min_observations] = np.nan
+
+    result = pd.Series(variance, index=securities).reindex(betas.index)
+    return result.fillna(result.median() if result.notna().any() else 0.0)
 
 
 def calculate_contributions(
-    returns: pd.DataFrame,
+    returns: Optional[pd.DataFrame],
     weights: pd.Series,
     use_ewma: bool = True,
-    ewma_decay: float = 0.94
+    ewma_decay: float = 0.94,
+    cov_matrix: Optional[pd.DataFrame] = None,
+    betas: Optional[pd.DataFrame] = None,
+    factor_cov: Optional[pd.DataFrame] = None,
+    residual_var: Optional[pd.Series] = None
 ) -> Dict:
     """
     Calculate PCTR (Percentage Contribution to Risk) and MCTR (Marginal CTR).
 
+    With betas and factor_cov the covariance is the factor model
+    B F B' + diag(residual_var), applied to the weights without forming the
+    N x N matrix; returns is then not used.
+
     Args:
-        returns: DataFrame of asset returns
+        returns: DataFrame of asset returns; NaN gaps are allowed
         weights: Series of portfolio weights (should sum to 1)
         use_ewma: Use EWMA covariance vs simple covariance
         ewma_decay: Decay factor for EWMA
+        cov_matrix: Optional precomputed PSD covariance covering the assets
+            (e.g. from covariance_cache); use_ewma/ewma_decay are then ignored
+        betas: Optional security-factor betas for the factor model
+        factor_cov: Factor covariance, required with betas
+        residual_var: Residual variance per security for the factor model
 
     Returns:
         Dict with pctr, mctr, portfolio_vol
     """
-    # Align weights with returns columns
-    common_assets = returns.columns.intersection(weights.index)
-    returns = returns[common_assets]
+    # Align weights with the asset universe
+    universe = betas.index if betas is not None else returns.columns
+    common_assets = universe.intersection(weights.index)
     weights = weights[common_assets]
 
     # Normalize weights
     weights = weights / weights.sum()
+    w = weights.values
 
-    # Calculate covariance matrix
-    if use_ewma:
-        cov_matrix = calculate_ewma_covariance(returns, decay=ewma_decay)
+    # Covariance applied to the weights
+    if betas is not None:
+        cov_w = factor_cov_product(w, *factor_model_arrays(common_assets, betas, factor_cov, residual_var))
     else:
-        cov_matrix = returns.cov()
-
-    cov_matrix = pd.DataFrame(
-        ensure_psd(cov_matrix.values),
-        index=cov_matrix.index,
-        columns=cov_matrix.columns
-    )
+        if cov_matrix is not None:
+            cov_matrix = slice_covariance(cov_matrix, common_assets)
+        else:
+            cov_matrix = returns_covariance(returns[common_assets], use_ewma, ewma_decay)
+        cov_w = cov_matrix.values @ w
 
     # Portfolio variance and volatility
-    w = weights.values
-    cov = cov_matrix.values
-    portfolio_var = w @ cov @ w
+    portfolio_var = w @ cov_w
     portfolio_vol = np.sqrt(portfolio_var)
 
     # Marginal Contribution to Risk
-    mctr = (cov @ w) / portfolio_vol if portfolio_vol > 0 else np.zeros_like(w)
+    mctr = cov_w / portfolio_vol if portfolio_vol > 0 else np.zeros_like(w)
 
     # Percentage Contribution to Risk
     pctr = w * mctr
@@ -484,23 +852,83 @@ def calculate_contributions(
     }
 
 
+def _fit_security_lasso(
+    security: str,
+    y: np.ndarray,
+    X: np.ndarray,
+    min_observations: int,
+    cv_folds: int
+) -> Tuple[str, Optional[np.ndarray], float, Dict]:
+    """
+    Fit one security's LASSO regression (unit of work for compute_lasso_betas).
+
+    Returns:
+        Tuple of (security, coefficients or None, residual variance, diagnostics)
+    """
+    start = time.perf_counter()
+
+    # Handle NaNs
+    valid_mask = ~(np.isnan(y) | np.any(np.isnan(X), axis=1))
+    n_valid = int(valid_mask.sum())
+    diagnostics = {'status': 'ok', 'n_obs': n_valid, 'alpha': np.nan, 'error': None}
+
+    if n_valid < min_observations:
+        diagnostics['status'] = 'insufficient_data'
+        diagnostics['fit_time_ms'] = (time.perf_counter() - start) * 1000
+        return security, None, np.nan, diagnostics
+
+    X_valid = X[valid_mask]
+    y_valid = y[valid_mask]
+
+    try:
+        lasso = LassoCV(cv=min(cv_folds, len(y_valid) // 2), max_iter=5000)
+        with warnings.catch_warnings():
+            # Worker processes don't inherit this module's filter
+            warnings.simplefilter('ignore')
+            lasso.fit(X_valid, y_valid)
+        coef = lasso.coef_
+        resid_var = float(np.var(y_valid - lasso.predict(X_valid)))
+        diagnostics['alpha'] = float(lasso.alpha_)
+    except Exception as e:
+        coef = None
+        resid_var = float(np.var(y_valid)) if len(y_valid) > 0 else np.nan
+        diagnostics['status'] = 'failed'
+        diagnostics['error'] = f"{type(e).__name__}: {e}"
+
+    diagnostics['fit_time_ms'] = (time.perf_counter() - start) * 1000
+    return security, coef, resid_var, diagnostics
+
+
 def compute_lasso_betas(
     security_returns: pd.DataFrame,
     factor_returns: pd.DataFrame,
     min_observations: int = 24,
-    cv_folds: int = 5
-) -> pd.DataFrame:
+    cv_folds: int = 5,
+    n_jobs: int = 1,
+    backend: str = "loky",
+    return_diagnostics: bool = False
+):
     """
     Compute factor betas using LASSO regression with cross-validation.
 
+    Each security is fitted independently, so with n_jobs != 1 the fits are
+    spread across a joblib worker pool. Results are collected in column
+    order and are identical to the serial run.
+
     Args:
         security_returns: DataFrame of security returns (dates x securities)
         factor_returns: DataFrame of factor returns (dates x factors)
         min_observations: Minimum overlapping observations required
         cv_folds: Number of cross-validation folds
+        n_jobs: Worker count (1 = serial, -1 = all cores)
+        backend: joblib backend ("loky" processes or "threading")
+        return_diagnostics: Also return per-security fit diagnostics
 
     Returns:
-        DataFrame of betas (securities x factors)
+        Tuple of (betas DataFrame (securities x factors), residual variance Series).
+        With return_diagnostics=True a third element is added: DataFrame indexed
+        by security with status ("ok" | "insufficient_data" | "failed"), n_obs,
+        alpha, fit_time_ms and error. Securities that are not "ok" get zero betas.
     """
     # Align dates
     common_dates = security_returns.index.intersection(factor_returns.index)
@@ -510,34 +938,39 @@ def compute_lasso_betas(
     sec_ret = security_returns.loc[common_dates]
     fac_ret = factor_returns.loc[common_dates]
 
-    betas = pd.DataFrame(index=sec_ret.columns, columns=fac_ret.columns, dtype=float)
-    residual_var = pd.Series(index=sec_ret.columns, dtype=float)
-
-    X = fac_ret.values
+    X = np.ascontiguousarray(fac_ret.values, dtype=float)
+    Y = sec_ret.values.astype(float)
+    tasks = [(security, Y[:, i], X, min_observations, cv_folds) for i, security in enumerate(sec_ret.columns)]
 
-    for security in sec_ret.columns:
-        y = sec_ret[security].values
+    if n_jobs == 1 or len(tasks) <= 1:
+        results = [_fit_security_lasso(*task) for task in tasks]
+    else:
+        results = Parallel(n_jobs=n_jobs, backend=backend)(
+            delayed(_fit_security_lasso)(*task) for task in tasks
+        )
 
-        # Handle NaNs
-        valid_mask = ~(np.isnan(y) | np.any(np.isnan(X), axis=1))
-        if valid_mask.sum() < min_observations:
-            betas.loc[security] = 0.0
-            residual_var[security] = np.nan
-            continue
+    betas = pd.DataFrame(0.0, index=sec_ret.columns, columns=fac_ret.columns)
+    residual_var = pd.Series(index=sec_ret.columns, dtype=float)
+    diagnostics = {}
 
-        X_valid = X[valid_mask]
-        y_valid = y[valid_mask]
+    for i, (security, coef, resid_var, diag) in enumerate(results):
+        if coef is not None:
+            betas.iloc[i] = coef
+        residual_var.iloc[i] = resid_var
+        diagnostics[security] = diag
 
-        try:
-            lasso = LassoCV(cv=min(cv_folds, len(y_valid) // 2), max_iter=5000)
-            lasso.fit(X_valid, y_valid)
-            betas.loc[security] = lasso.coef_
-            residual_var[security] = np.var(y_valid - lasso.predict(X_valid))
-        except Exception:
-            betas.loc[security] = 0.0
-            residual_var[security] = np.var(y_valid) if len(y_valid) > 0 else np.nan
+    diagnostics = pd.DataFrame.from_dict(diagnostics, orient='index').reindex(
+        index=sec_ret.columns, columns=['status', 'n_obs', 'alpha', 'fit_time_ms', 'error']
+    )
+    failed = diagnostics.index[diagnostics['status'] == 'failed']
+    if len(failed) > 0:
+        print(f"Warning: LASSO fit failed for {len(failed)} securities "
+              f"(zero betas used): {', '.join(map(str, failed[:5]))}")
 
-    return betas.fillna(0.0), residual_var
+    betas = betas.fillna(0.0)
+    if return_diagnostics:
+        return betas, residual_var, diagnostics
+    return betas, residual_var
 
 
 def compute_factor_risk_decomposition(
@@ -600,48 +1033,62 @@ def compute_factor_risk_decomposition(
 def compute_tracking_error(
     portfolio_weights: pd.Series,
     benchmark_weights: pd.Series,
-    returns: pd.DataFrame,
-    use_ewma: bool = True
+    returns: Optional[pd.DataFrame],
+    use_ewma: bool = True,
+    cov_matrix: Optional[pd.DataFrame] = None,
+    betas: Optional[pd.DataFrame] = None,
+    factor_cov: Optional[pd.DataFrame] = None,
+    residual_var: Optional[pd.Series] = None
 ) -> Dict:
     """
     Compute tracking error between portfolio and benchmark.
 
+    With betas and factor_cov the factor model B F B' + diag(residual_var)
+    is used without forming the N x N matrix; returns is then not used.
+
     Args:
         portfolio_weights: Portfolio weights
         benchmark_weights: Benchmark weights
-        returns: Asset returns
+        returns: Asset returns; NaN gaps (security-level histories) are allowed
         use_ewma: Use EWMA covariance
+        cov_matrix: Optional precomputed PSD covariance covering the assets
+            (e.g. from covariance_cache); use_ewma is then ignored
+        betas: Optional security-factor betas for the factor model
+        factor_cov: Factor covariance, required with betas
+        residual_var: Residual variance per security for the factor model
 
     Returns:
         Dict with tracking_error, active_weights, contributions
     """
     # Align all inputs
     all_assets = portfolio_weights.index.union(benchmark_weights.index)
-    all_assets = all_assets.intersection(returns.columns)
+    all_assets = all_assets.intersection(betas.index if betas is not None else returns.columns)
 
     port_w = portfolio_weights.reindex(all_assets).fillna(0)
     bench_w = benchmark_weights.reindex(all_assets).fillna(0)
-    ret = returns[all_assets]
 
     # Active weights
     active_w = port_w - bench_w
+    a = active_w.values
 
-    # Covariance
-    if use_ewma:
-        cov = calculate_ewma_covariance(ret)
+    # Covariance applied to the active weights
+    if betas is not None:
+        cov_a = factor_cov_product(a, *factor_model_arrays(all_assets, betas, factor_cov, residual_var))
     else:
-        cov = ret.cov()
-
-    cov = pd.DataFrame(ensure_psd(cov.values), index=cov.index, columns=cov.columns)
+        if cov_matrix is not None:
+            cov = slice_covariance(cov_matrix, all_assets)
+        else:
+            cov = returns_covariance(returns[all_assets], use_ewma)
+        cov_a = cov.values @ a
 
     # Tracking error
-    te_var = active_w.values @ cov.values @ active_w.values
+    te_var = a @ cov_a
     te = np.sqrt(te_var) * np.sqrt(12)  # Annualized
 
     # Contributions to TE
     if te > 0:
-        mcte = (cov.values @ active_w.values) / np.sqrt(te_var)
-        te_contrib = active_w.values * mcte
+        mcte = cov_a / np.sqrt(te_var)
+        te_contrib = a * mcte
         te_contrib = te_contrib / te_contrib.sum() if te_contrib.sum() != 0 else te_contrib
     else:
         te_contrib = np.zeros(len(active_w))
@@ -710,67 +1157,334 @@ def compute_performance_stats(
 
 
 def compute_diversification_metrics(
-    weights: pd.Series,
+    weights: Union[pd.Series, pd.DataFrame],
     returns: pd.DataFrame,
-    use_ewma: bool = True
+    use_ewma: bool = True,
+    cov_matrix: Optional[pd.DataFrame] = None
 ) -> Dict:
     """
     Compute portfolio diversification metrics.
 
+    All metrics come from one covariance matrix in closed form (see
+    diversification_from_cov); correlations are derived from it rather
+    than estimated separately.
+
     Args:
-        weights: Portfolio weights
+        weights: Portfolio weights, or a (portfolios x assets) DataFrame to
+            evaluate many portfolios against the same covariance
         returns: Asset returns
         use_ewma: Use EWMA covariance
+        cov_matrix: Optional precomputed covariance covering the assets
+            (e.g. from covariance_cache); use_ewma is then ignored
 
     Returns:
-        Dict with diversification_ratio, avg_correlation, benefit_pct
+        Dict with diversification_ratio, avg_correlation, benefit_pct. For a
+        DataFrame of weights, the same keys hold per-portfolio lists and
+        "portfolios" the row names.
     """
-    common = weights.index.intersection(returns.columns)
-    w = weights[common]
-    ret = returns[common]
+    batch = isinstance(weights, pd.DataFrame)
+    weight_rows = weights if batch else weights.to_frame().T
 
-    w = w / w.sum()  # Normalize
+    common = weight_rows.columns.intersection(returns.columns)
+    W = weight_rows.reindex(columns=common).fillna(0.0).to_numpy(dtype=np.float64)
+    totals = W.sum(axis=1, keepdims=True)
+    W = np.divide(W, totals, out=np.zeros_like(W), where=totals != 0)  # Normalize
 
-    if use_ewma:
-        cov = calculate_ewma_covariance(ret)
+    if cov_matrix is not None:
+        cov = slice_covariance(cov_matrix, common)
     else:
-        cov = ret.cov()
+        cov = returns_covariance(returns[common], use_ewma)
+
+    metrics = diversification_from_cov(W, cov.values)
+    result = {
+        'diversification_ratio': metrics['diversification_ratio'],
+        'diversification_benefit_pct': metrics['diversification_benefit_pct'],
+        'weighted_avg_correlation': metrics['weighted_avg_correlation'],
+        'portfolio_vol_annualized': metrics['portfolio_vol'] * np.sqrt(12),
+        'weighted_avg_vol_annualized': metrics['weighted_avg_vol'] * np.sqrt(12)
+    }
 
-    # Individual volatilities
-    individual_vols = np.sqrt(np.diag(cov.values))
+    if batch:
+        return {'portfolios': [str(n) for n in weight_rows.index], **{k: v.tolist() for k, v in result.items()}}
+    return {k: float(v[0]) for k, v in result.items()}
 
-    # Weighted average volatility (undiversified)
-    weighted_avg_vol = np.sum(w.values * individual_vols)
 
-    # Portfolio volatility (diversified)
-    portfolio_var = w.values @ cov.values @ w.values
-    portfolio_vol = np.sqrt(portfolio_var)
+# ============================================================================
+# Batch Portfolio Risk
+# ============================================================================
 
-    # Diversification ratio
-    div_ratio = weighted_avg_vol / portfolio_vol if portfolio_vol > 0 else 1.0
+def diversification_from_cov(
+    W: np.ndarray,
+    cov: np.ndarray
+) -> Dict[str, np.ndarray]:
+    """
+    Closed-form diversification metrics for a stack of portfolios.
 
-    # Diversification benefit
-    div_benefit_pct = (1 - portfolio_vol / weighted_avg_vol) * 100 if weighted_avg_vol > 0 else 0
-
-    # Weighted average pairwise correlation
-    corr = ret.corr()
-    n = len(w)
-    if n > 1:
-        total_weight = 0
-        weighted_corr = 0
-        for i in range(n):
-            for j in range(i + 1, n):
-                pair_weight = w.iloc[i] * w.iloc[j]
-                weighted_corr += pair_weight * corr.iloc[i, j]
-                total_weight += pair_weight
-        avg_corr = weighted_corr / total_weight if total_weight > 0 else 0
-    else:
-        avg_corr = 1.0
+    Correlations are taken from the covariance itself, and the weighted
+    average pairwise correlation uses
+        sum_{i<j} w_i w_j rho_ij / sum_{i<j} w_i w_j
+        = (w' rho w - sum w_i^2) / ((sum w)^2 - sum w_i^2)
+    so no pairwise loop or explicit correlation matrix is needed.
+
+    Args:
+        W: Weights (portfolios x assets), rows normalized to sum to 1
+        cov: Covariance matrix (assets x assets)
+
+    Returns:
+        Dict of per-portfolio arrays: portfolio_vol, weighted_avg_vol,
+        diversification_ratio, diversification_benefit_pct, weighted_avg_correlation
+    """
+    W = np.atleast_2d(W)
+    vols = np.sqrt(np.maximum(np.diag(cov), 0.0))
+
+    portfolio_var = np.einsum('pi,ij,pj->p', W, cov, W)
+    portfolio_vol = np.sqrt(np.maximum(portfolio_var, 0.0))
+    weighted_avg_vol = W @ vols
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        div_ratio = np.where(portfolio_vol > 0, weighted_avg_vol / portfolio_vol, 1.0)
+        div_benefit_pct = np.where(
+            weighted_avg_vol > 0, (1 - portfolio_vol / weighted_avg_vol) * 100, 0.0
+        )
+
+        # w' rho w with rho = cov / outer(vols, vols), zero-vol assets dropped
+        scaled = np.where(vols > 0, W / vols, 0.0)
+        w_rho_w = np.einsum('pi,ij,pj->p', scaled, cov, scaled)
+        sum_sq = np.sum(W ** 2, axis=1)
+        pair_weight = np.sum(W, axis=1) ** 2 - sum_sq
+        avg_corr = np.where(pair_weight > 1e-15, (w_rho_w - sum_sq) / pair_weight, 1.0)
+
+    return {
+        'portfolio_vol': portfolio_vol,
+        'weighted_avg_vol': weighted_avg_vol,
+        'diversification_ratio': div_ratio,
+        'diversification_benefit_pct': div_benefit_pct,
+        'weighted_avg_correlation': avg_corr,
+    }
+
+
+def calculate_batch_contributions(
+    weights: pd.DataFrame,
+    cov_matrix: pd.DataFrame
+) -> Dict:
+    """
+    Volatility, MCTR, PCTR and diversification for many portfolios at once.
+
+    All portfolios are stacked into one (portfolios x assets) matrix and
+    evaluated with a handful of matrix products against a single shared
+    covariance, instead of one calculate_contributions call each.
+
+    Args:
+        weights: Weights (portfolios x assets). Assets missing from the
+            covariance are dropped; each row is renormalized over the rest.
+        cov_matrix: PSD covariance matrix (assets x assets)
+
+    Returns:
+        Columnar dict: portfolio names, asset names, per-portfolio vol /
+        diversification lists, and (portfolios x assets) mctr / pctr matrices.
+        Portfolios with no matching assets are listed under "unmatched".
+    """
+    common_assets = weights.columns.intersection(cov_matrix.index)
+    W_all = weights.reindex(columns=common_assets).fillna(0.0).values.astype(float)
+
+    gross = weights.sum(axis=1).values
+    matched = W_all.sum(axis=1)
+    has_match = matched > 0
+
+    names = weights.index[has_match]
+    W = W_all[has_match] / matched[has_match, None]
+    cov = slice_covariance(cov_matrix, common_assets).values
+
+    # Sigma @ w for every portfolio in one product
+    cov_w = W @ cov
+    portfolio_var = np.sum(W * cov_w, axis=1)
+    portfolio_vol = np.sqrt(np.maximum(portfolio_var, 0.0))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mctr = np.where(portfolio_vol[:, None] > 0, cov_w / portfolio_vol[:, None], 0.0)
+        pctr = W * mctr
+        pctr_sum = pctr.sum(axis=1, keepdims=True)
+        pctr = np.where(pctr_sum != 0, pctr / pctr_sum, pctr)
+
+    diversification = diversification_from_cov(W, cov)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        matched_pct = np.where(gross[has_match] != 0, matched[has_match] / gross[has_match], 0.0)
 
     return {
-        'diversification_ratio': float(div_ratio),
-        'diversification_benefit_pct': float(div_benefit_pct),
-        'weighted_avg_correlation': float(avg_corr),
-        'portfolio_vol_annualized': float(portfolio_vol * np.sqrt(12)),
-        'weighted_avg_vol_annualized': float(weighted_avg_vol * np.sqrt(12))
+        'portfolios': [str(n) for n in names],
+        'assets': [str(a) for a in common_assets],
+        'portfolio_vol': portfolio_vol.tolist(),
+        'portfolio_vol_annualized': (portfolio_vol * np.sqrt(12)).tolist(),
+        'mctr': mctr.tolist(),
+        'pctr': pctr.tolist(),
+        'diversification': {
+            'diversification_ratio': diversification['diversification_ratio'].tolist(),
+            'diversification_benefit_pct': diversification['diversification_benefit_pct'].tolist(),
+            'weighted_avg_correlation': diversification['weighted_avg_correlation'].tolist(),
+            'weighted_avg_vol_annualized': (diversification['weighted_avg_vol'] * np.sqrt(12)).tolist(),
+        },
+        'matched_weight_pct': (matched_pct * 100).tolist(),
+        'unmatched': [str(n) for n in weights.index[~has_match]],
     }
+
+
+# ============================================================================
+# Rolling Window Risk
+# ============================================================================
+
+def _window_sums(Z: np.ndarray, window: int, decay: Optional[float] = None) -> np.ndarray:
+    """
+    Sums of Z over every window of consecutive rows, one pass.
+
+    Plain sums are differences of a cumulative sum. With decay each window
+    is weighted decay**(end - t), newest row first at weight 1; the running
+    recursion y_t = decay * y_{t-1} + z_t is one lfilter call and the row
+    that falls out of the window is removed with decay**window * y_{t-window}.
+
+    Args:
+        Z: Array (dates x k)
+        window: Rows per window
+        decay: Optional EWMA decay factor
+
+    Returns:
+        Array (dates - window + 1, k); row j covers rows j .. j + window - 1
+    """
+    if decay is None:
+        csum = np.cumsum(Z, axis=0)
+        sums = csum[window - 1:].copy()
+        sums[1:] -= csum[:-window]
+        return sums
+
+    y = lfilter([1.0], [1.0, -decay], Z, axis=0)
+    sums = y[window - 1:].copy()
+    sums[1:] -= decay ** window * y[:-window]
+    return sums
+
+
+def _rolling_cross_cov(
+    X: np.ndarray,
+    y: np.ndarray,
+    window: int,
+    use_ewma: bool = True,
+    ewma_decay: float = 0.94
+) -> np.ndarray:
+    """
+    Covariance of each column of X with y over every rolling window.
+
+    Matches returns_covariance on each window: unbiased sample covariance,
+    or the ewma_cov_kernel estimate (simple mean, normalized EWMA weights)
+    with the same fall back to sample below 12 periods. Costs O(T * k)
+    in total, whatever the number of windows.
+
+    Args:
+        X: Array (dates x k)
+        y: Array (dates,)
+        window: Periods per window
+        use_ewma: EWMA vs sample covariance
+        ewma_decay: EWMA decay factor
+
+    Returns:
+        Array (windows x k)
+    """
+    y = y[:, None]
+    # Plain sums of x, y and x*y in one pass
+    plain = _window_sums(np.hstack([X, y, X * y]), window)
+    k = X.shape[1]
+    sum_x, sum_y, sum_xy = plain[:, :k], plain[:, k:k + 1], plain[:, k + 1:]
+
+    if not use_ewma or window < 12:
+        return (sum_xy - sum_x * sum_y / window) / (window - 1)
+
+    # cov = E_w[xy] - m_x f_y - f_x m_y + m_x m_y, with m the simple mean and f the EWMA mean
+    total_weight = np.sum(ewma_decay ** np.arange(window, dtype=np.float64))
+    weighted = _window_sums(np.hstack([X, y, X * y]), window, ewma_decay) / total_weight
+    f_x, f_y, e_xy = weighted[:, :k], weighted[:, k:k + 1], weighted[:, k + 1:]
+    m_x, m_y = sum_x / window, sum_y / window
+    return e_xy - m_x * f_y - f_x * m_y + m_x * m_y
+
+
+def calculate_rolling_risk(
+    returns: pd.DataFrame,
+    weights: pd.Series,
+    benchmark_weights: Optional[pd.Series] = None,
+    window: int = 36,
+    use_ewma: bool = True,
+    ewma_decay: float = 0.94
+) -> Dict:
+    """
+    Rolling volatility, PCTR and tracking error through time.
+
+    Each window gives what calculate_contributions / compute_tracking_error
+    would on that slice of returns. With the weights fixed, Sigma @ w is the
+    covariance of each asset with the portfolio return series, so every
+    window comes from running sums of cross-products with that one series:
+    O(T * N) for the whole history instead of O(N^2) per window. The PSD
+    repair of the per-request path is skipped (it changes nothing for
+    full-rank windows).
+
+    Args:
+        returns: DataFrame of asset returns (dates x assets), no gaps
+        weights: Portfolio weights; normalized over the matched assets
+        benchmark_weights: Optional benchmark weights for tracking error
+        window: Periods per window (36 = three years of monthly data)
+        use_ewma: EWMA vs sample covariance within each window
+        ewma_decay: EWMA decay factor
+
+    Returns:
+        Columnar dict: window end dates, assets, per-window vol lists and a
+        (windows x assets) pctr matrix; with a benchmark also te_assets,
+        tracking_error and te_contributions
+    """
+    common_assets = returns.columns.intersection(weights.index)
+    if len(common_assets) == 0:
+        raise ValueError("No matching assets found in returns data")
+    if window < 2 or window > len(returns):
+        raise ValueError(f"Window must be between 2 and {len(returns)} periods")
+
+    w = weights[common_assets].values.astype(float)
+    w = w / w.sum()
+    X = returns[common_assets].to_numpy(dtype=np.float64)
+    if np.isnan(X).any():
+        raise ValueError("Rolling risk needs complete return histories")
+
+    port_ret = X @ w
+    cov_w = _rolling_cross_cov(X, port_ret, window, use_ewma, ewma_decay)
+    portfolio_var = cov_w @ w
+    portfolio_vol = np.sqrt(np.maximum(portfolio_var, 0.0))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mctr = np.where(portfolio_vol[:, None] > 0, cov_w / portfolio_vol[:, None], 0.0)
+        pctr = w * mctr
+        pctr_sum = pctr.sum(axis=1, keepdims=True)
+        pctr = np.where(pctr_sum != 0, pctr / pctr_sum, pctr)
+
+    result = {
+        'dates': [str(d.date()) if hasattr(d, 'date') else str(d) for d in returns.index[window - 1:]],
+        'window': window,
+        'assets': [str(a) for a in common_assets],
+        'portfolio_vol': portfolio_vol.tolist(),
+        'portfolio_vol_annualized': (portfolio_vol * np.sqrt(12)).tolist(),
+        'pctr': pctr.tolist(),
+    }
+
+    if benchmark_weights is not None:
+        te_assets = weights.index.union(benchmark_weights.index).intersection(returns.columns)
+        a = (weights.reindex(te_assets).fillna(0) - benchmark_weights.reindex(te_assets).fillna(0)).values
+        X_te = returns[te_assets].to_numpy(dtype=np.float64)
+
+        cov_a = _rolling_cross_cov(X_te, X_te @ a, window, use_ewma, ewma_decay)
+        te_var = np.maximum(cov_a @ a, 0.0)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            te_contrib = np.where(te_var[:, None] > 0, a * cov_a / np.sqrt(te_var)[:, None], 0.0)
+            contrib_sum = te_contrib.sum(axis=1, keepdims=True)
+            te_contrib = np.where(contrib_sum != 0, te_contrib / contrib_sum, te_contrib)
+
+        result.update({
+            'te_assets': [str(name) for name in te_assets],
+            'tracking_error': (np.sqrt(te_var) * np.sqrt(12)).tolist(),
+            'te_contributions': te_contrib.tolist(),
+        })
+
+    return result
@@ -0,0 +1,936 @@
+"""
+Monte Carlo Simulation Engine
+Server-side port of lib/simulation.ts (runSimulation, runSimulationPiecewise)
+
+Paths are simulated as arrays: quarterly returns for a chunk of paths are
+drawn in one call from a seeded numpy.random.Generator, and the spending
+recursion steps through the quarters with every path of the chunk updated
+at once. Percentile bands and probabilities are taken over the stored
+(quarters x paths) wealth matrix.
+
+The multi-asset mode draws correlated asset returns from the CMA returns,
+risks and correlation matrix. Its Cholesky factor is cached per (asset set,
+data version) and shared by every request on that universe.
+
+The bootstrap mode resamples historical months in stationary-bootstrap
+blocks. Each chunk of paths has its own spawned seed, so chunks can run in
+separate worker processes and still reproduce a seeded run exactly.
+
+The bootstrap and stream_monte_carlo fold each chunk into a WealthSketch
+(per-quarter quantile sketches and exact outcome counters) instead of
+storing paths, so their memory is O(quarters) for any number of paths.
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from frontier_cache import data_version
+from optimization_engine import mean_cov_from_assets
+from quantile_sketch import TDigestBank
+
+
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+
+# Paths drawn per Generator call; bounds the (paths x quarters) return block
+CHUNK_PATHS = 25_000
+
+# Random draws per multi-asset chunk (paths x quarters x assets)
+CHUNK_DRAWS = 2_000_000
+
+# Paths per bootstrap chunk (the unit of work sent to a worker process)
+BOOTSTRAP_CHUNK_PATHS = 10_000
+
+# Upper bound on paths x months per bootstrap chunk; longer horizons get fewer paths per chunk
+BOOTSTRAP_CHUNK_CELLS = 3_600_000
+
+# Cholesky factors kept in memory
+MAX_CHOLESKY_ENTRIES = 64
+
+# (sorted asset names, data version) -> (mu, cholesky factor)
+CholeskyKey = Tuple[Tuple[str, ...], str]
+_CHOLESKY_CACHE: "OrderedDict[CholeskyKey, Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
+_CHOLESKY_LOCK = threading.Lock()
+_CHOLESKY_STATS = {"hits": 0, "misses": 0}
+
+
+def quarterly_regimes(
+    num_quarters: int,
+    annual_return: float,
+    annual_volatility: float,
+    after_tax_rate: float = 0.0,
+    piecewise: Optional[Dict] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Quarterly mean and volatility for every quarter of the horizon.
+
+    Without piecewise every quarter uses the same values. With piecewise the
+    return/vol switch at update1_year and update2_year, as in
+    runSimulationPiecewise: missing updates inherit the previous phase.
+
+    Args:
+        num_quarters: Number of simulated quarters
+        annual_return: Annual return (decimal); piecewise return_initial if given
+        annual_volatility: Annual volatility (decimal); piecewise vol_initial if given
+        after_tax_rate: Annual tax drag subtracted from the returns
+        piecewise: Optional dict with return_update1/2, vol_update1/2,
+            update1_year, update2_year, start_year (default: this year)
+
+    Returns:
+        (means, vols) arrays of length num_quarters; entry t-1 is quarter t
+    """
+    returns = [annual_return]
+    vols = [annual_volatility]
+    boundaries = [num_quarters + 1, num_quarters + 1]
+
+    if piecewise:
+        returns.append(piecewise.get("return_update1") if piecewise.get("return_update1") is not None else returns[-1])
+        returns.append(piecewise.get("return_update2") if piecewise.get("return_update2") is not None else returns[-1])
+        vols.append(piecewise.get("vol_update1") if piecewise.get("vol_update1") is not None else vols[-1])
+        vols.append(piecewise.get("vol_update2") if piecewise.get("vol_update2") is not None else vols[-1])
+
+        start_year = piecewise.get("start_year") or date.today().year
+
+        def year_to_quarter(year):
+            return num_quarters + 1 if year is None else max(1, 4 * (year - start_year))
+
+        u1 = year_to_quarter(piecewise.get("update1_year"))
+        boundaries = [u1, max(u1 + 1, year_to_quarter(piecewise.get("update2_year")))]
+
+    phase_means = (1 + np.asarray(returns, dtype=np.float64) - after_tax_rate) ** 0.25 - 1
+    phase_vols = np.asarray(vols, dtype=np.float64) / 2.0
+
+    quarters = np.arange(1, num_quarters + 1)
+    phase = np.searchsorted(np.asarray(boundaries), quarters, side="right")
+    return phase_means[phase], phase_vols[phase]
+
+
+def spending_schedule(
+    num_quarters: int,
+    one_time_spend: float = 0.0,
+    one_time_quarter: int = 1,
+    custom_spending: Optional[Dict[int, float]] = None
+) -> np.ndarray:
+    """
+    Extra spending per quarter on top of the fixed and percentage spending.
+
+    Returns:
+        Array of length num_quarters; entry t-1 is quarter t
+    """
+    extra = np.zeros(num_quarters)
+    if one_time_spend and 1 <= one_time_quarter <= num_quarters:
+        extra[one_time_quarter - 1] += one_time_spend
+    for quarter, amount in (custom_spending or {}).items():
+        quarter = int(quarter)
+        if 1 <= quarter <= num_quarters:
+            extra[quarter - 1] += amount
+    return extra
+
+
+def simulate_wealth(
+    initial_value: float,
+    quarterly_returns: np.ndarray,
+    fixed_spending: float = 0.0,
+    percent_spending: float = 0.0,
+    extra_spending: Optional[np.ndarray] = None,
+    out: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Wealth paths for a block of quarterly returns.
+
+    Each quarter V <- max(V * (1 + r) - (fixed + V * pct) - extra, 0), the
+    runSimulation recursion, applied to every path at once.
+
+    Args:
+        initial_value: Starting wealth
+        quarterly_returns: Returns (paths x quarters)
+        fixed_spending: Fixed spending per quarter
+        percent_spending: Spending per quarter as a fraction of wealth
+        extra_spending: Optional one-off spending per quarter (quarters,)
+        out: Optional (quarters + 1 x paths) array to write into
+
+    Returns:
+        Wealth (quarters + 1 x paths), row 0 the initial value
+    """
+    n_paths, n_quarters = quarterly_returns.shape
+    if out is None:
+        out = np.empty((n_quarters + 1, n_paths))
+    if extra_spending is None:
+        extra_spending = np.zeros(n_quarters)
+
+    # Quarter-major copy so each step reads one contiguous row
+    growth = np.ascontiguousarray(quarterly_returns.T)
+    growth += 1.0 - percent_spending
+    spend = fixed_spending + extra_spending
+
+    out[0] = initial_value
+    for t in range(n_quarters):
+        np.multiply(out[t], growth[t], out=out[t + 1])
+        out[t + 1] -= spend[t]
+        np.maximum(out[t + 1], 0.0, out=out[t + 1])
+    return out
+
+
+def sorted_percentiles(sorted_rows: np.ndarray, percentiles: Sequence[float]) -> np.ndarray:
+    """
+    Percentiles of each row of an already sorted matrix.
+
+    Same linear interpolation as np.percentile. Sorting rows once is faster
+    than np.percentile's partition for several bands over many paths.
+
+    Returns:
+        Array (len(percentiles) x rows)
+    """
+    n = sorted_rows.shape[1]
+    position = np.asarray(percentiles, dtype=np.float64) / 100 * (n - 1)
+    lower = np.floor(position).astype(np.int64)
+    upper = np.minimum(lower + 1, n - 1)
+    frac = (position - lower)[:, None]
+    below = sorted_rows[:, lower].T
+    return below + frac * (sorted_rows[:, upper].T - below)
+
+
+def summarize_wealth(
+    wealth: np.ndarray,
+    initial_value: float,
+    inflation_rate: float,
+    percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+    sample_paths: int = 0
+) -> Dict:
+    """
+    Percentile bands and outcome probabilities from a wealth matrix.
+
+    wealth is sorted in place along the paths axis.
+
+    Args:
+        wealth: Wealth (quarters + 1 x paths)
+        initial_value: Starting wealth
+        inflation_rate: Annual inflation (decimal) for the inflation line
+        percentiles: Percentile bands to report (0-100)
+        sample_paths: Number of evenly spaced paths to include for charting
+
+    Returns:
+        Dict with years, percentiles (band -> list), median, inflation_line,
+        probabilities and sample_paths
+    """
+    n_quarters = wealth.shape[0] - 1
+    n_paths = wealth.shape[1]
+    quarters = np.arange(n_quarters + 1)
+
+    inflation_line = initial_value * (1 + inflation_rate / 4) ** quarters
+
+    final = wealth[-1]
+    probabilities = {
+        "outperform_inflation": float(np.mean(final > inflation_line[-1])),
+        "significant_loss": float(np.mean(final < 0.5 * initial_value)),
+        "portfolio_depletion": float(np.mean(final == 0)),
+        "maintain_value": float(np.mean(final >= initial_value)),
+    }
+
+    # Sample paths before sorting breaks them up
+    step = max(1, n_paths // sample_paths) if sample_paths else 0
+    samples = wealth[:, ::step][:, :sample_paths].T.tolist() if sample_paths else []
+
+    wealth.sort(axis=1)
+    bands = sorted_percentiles(wealth, percentiles)
+    percentile_lines = {f"{p:g}": band.tolist() for p, band in zip(percentiles, bands)}
+    median = percentile_lines.get("50") or sorted_percentiles(wealth, [50])[0].tolist()
+
+    return {
+        "years": (quarters / 4).tolist(),
+        "percentiles": percentile_lines,
+        "median": median,
+        "inflation_line": inflation_line.tolist(),
+        "final_value_percentiles": {key: band[-1] for key, band in percentile_lines.items()},
+        "probabilities": probabilities,
+        "sample_paths": samples,
+    }
+
+
+def _normal_wealth_blocks(
+    rng: np.random.Generator,
+    initial_value: float,
+    means: np.ndarray,
+    vols: np.ndarray,
+    fixed_spending: float,
+    percent_spending: float,
+    extra_spending: np.ndarray,
+    num_simulations: int,
+    chunk_size: int,
+    out: Optional[np.ndarray] = None
+) -> Iterator[np.ndarray]:
+    """
+    Wealth blocks of chunk_size paths with normal quarterly returns.
+
+    Blocks are written into the matching columns of out when it is given.
+    """
+    for lo in range(0, num_simulations, chunk_size):
+        hi = min(lo + chunk_size, num_simulations)
+        draws = rng.standard_normal((hi - lo, len(means)))
+        draws *= vols
+        draws += means
+        yield simulate_wealth(
+            initial_value, draws, fixed_spending, percent_spending, extra_spending,
+            out=None if out is None else out[:, lo:hi]
+        )
+
+
+def run_monte_carlo(
+    initial_value: float,
+    annual_return: float,
+    annual_volatility: float,
+    quarterly_fixed_spending: float = 0.0,
+    quarterly_percent_spending: float = 0.0,
+    duration_years: int = 30,
+    num_simulations: int = 1000,
+    inflation_rate: float = 0.025,
+    after_tax_rate: float = 0.0,
+    one_time_spend: float = 0.0,
+    one_time_quarter: int = 1,
+    custom_spending: Optional[Dict[int, float]] = None,
+    piecewise: Optional[Dict] = None,
+    seed: Optional[int] = None,
+    percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+    sample_paths: int = 0,
+    chunk_size: int = CHUNK_PATHS
+) -> Dict:
+    """
+    Monte Carlo simulation of portfolio wealth with spending.
+
+    Same model as runSimulation / runSimulationPiecewise in the frontend:
+    normal quarterly returns, fixed + percentage + one-off spending, wealth
+    floored at zero. Returns are drawn chunk_size paths at a time from
+    numpy.random.default_rng(seed); draws are path-major, so a given seed
+    gives the same paths whatever the chunk size.
+
+    Args:
+        initial_value: Starting wealth
+        annual_return: Annual return (decimal)
+        annual_volatility: Annual volatility (decimal)
+        quarterly_fixed_spending: Fixed spending per quarter
+        quarterly_percent_spending: Spending per quarter as a fraction of wealth
+        duration_years: Horizon in years
+        num_simulations: Number of paths
+        inflation_rate: Annual inflation (decimal)
+        after_tax_rate: Annual tax drag subtracted from the returns
+        one_time_spend: One-off spending amount
+        one_time_quarter: Quarter (1-based) of the one-off spending
+        custom_spending: Quarter (1-based) -> extra spending
+        piecewise: Optional regime changes (see quarterly_regimes)
+        seed: Seed for numpy.random.default_rng; None for fresh entropy
+        percentiles: Percentile bands to report (0-100)
+        sample_paths: Number of paths to return for charting
+        chunk_size: Paths drawn per Generator call
+
+    Returns:
+        Dict from summarize_wealth plus num_simulations and seed
+    """
+    if num_simulations < 1 or duration_years < 1:
+        raise ValueError("num_simulations and duration_years must be positive")
+
+    num_quarters = int(duration_years * 4)
+    means, vols = quarterly_regimes(num_quarters, annual_return, annual_volatility, after_tax_rate, piecewise)
+    extra = spending_schedule(num_quarters, one_time_spend, one_time_quarter, custom_spending)
+
+    rng = np.random.default_rng(seed)
+    wealth = np.empty((num_quarters + 1, num_simulations))
+    for _ in _normal_wealth_blocks(
+        rng, initial_value, means, vols, quarterly_fixed_spending, quarterly_percent_spending,
+        extra, num_simulations, chunk_size, out=wealth
+    ):
+        pass
+
+    result = summarize_wealth(wealth, initial_value, inflation_rate, percentiles, sample_paths)
+    result["num_simulations"] = num_simulations
+    result["seed"] = seed
+    return result
+
+
+class WealthSketch:
+    """
+    Percentile bands and outcome probabilities over chunks of wealth paths.
+
+    Chunks are folded into one t-digest per quarter (TDigestBank) and into
+    exact outcome counters, so memory is O(quarters) however many paths are
+    added. The first sample_paths paths added are kept for charting.
+    """
+
+    def __init__(
+        self,
+        num_quarters: int,
+        initial_value: float,
+        inflation_rate: float,
+        compression: float = 500.0,
+        sample_paths: int = 0
+    ):
+        quarters = np.arange(num_quarters + 1)
+        self.initial_value = initial_value
+        self.years = (quarters / 4).tolist()
+        self.inflation_line = initial_value * (1 + inflation_rate / 4) ** quarters
+        self.digest = TDigestBank(num_quarters + 1, compression)
+        self.counts = {"outperform_inflation": 0, "significant_loss": 0, "portfolio_depletion": 0, "maintain_value": 0}
+        self.sample_paths = sample_paths
+        self.samples: List[List[float]] = []
+
+    def update(self, wealth: np.ndarray) -> None:
+        """
+        Add a chunk of paths.
+
+        Args:
+            wealth: Wealth (quarters + 1 x paths); sorted in place
+        """
+        final = wealth[-1]
+        self.counts["outperform_inflation"] += int(np.count_nonzero(final > self.inflation_line[-1]))
+        self.counts["significant_loss"] += int(np.count_nonzero(final < 0.5 * self.initial_value))
+        self.counts["portfolio_depletion"] += int(np.count_nonzero(final == 0))
+        self.counts["maintain_value"] += int(np.count_nonzero(final >= self.initial_value))
+        if len(self.samples) < self.sample_paths:
+            self.samples.extend(wealth[:, :self.sample_paths - len(self.samples)].T.tolist())
+        self.digest.update(wealth)
+
+    def summary(self, percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> Dict:
+        """
+        Bands and probabilities so far, in the summarize_wealth layout.
+
+        Returns:
+            Dict with paths_completed, years, percentiles, median,
+            inflation_line, final_value_percentiles, probabilities and
+            sample_paths
+        """
+        estimates = self.digest.quantiles(list(percentiles) + [50])
+        percentile_lines = {f"{p:g}": band.tolist() for p, band in zip(percentiles, estimates)}
+        count = self.digest.count
+        return {
+            "paths_completed": count,
+            "years": self.years,
+            "percentiles": percentile_lines,
+            "median": estimates[-1].tolist(),
+            "inflation_line": self.inflation_line.tolist(),
+            "final_value_percentiles": {key: band[-1] for key, band in percentile_lines.items()},
+            "probabilities": {name: n / count if count else 0.0 for name, n in self.counts.items()},
+            "sample_paths": self.samples,
+        }
+
+
+def stream_monte_carlo(
+    initial_value: float,
+    annual_return: float,
+    annual_volatility: float,
+    quarterly_fixed_spending: float = 0.0,
+    quarterly_percent_spending: float = 0.0,
+    duration_years: int = 30,
+    num_simulations: int = 1000,
+    inflation_rate: float = 0.025,
+    after_tax_rate: float = 0.0,
+    one_time_spend: float = 0.0,
+    one_time_quarter: int = 1,
+    custom_spending: Optional[Dict[int, float]] = None,
+    piecewise: Optional[Dict] = None,
+    seed: Optional[int] = None,
+    percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+    chunk_size: int = CHUNK_PATHS,
+    compression: float = 500.0
+) -> Iterator[Dict]:
+    """
+    run_monte_carlo that reports after every chunk of paths.
+
+    Paths are not kept: each chunk is folded into a WealthSketch, so memory
+    is O(quarters)
+    whatever num_simulations is. A seed draws the same paths as
+    run_monte_carlo; bands are t-digest estimates, probabilities are exact.
+
+    Args:
+        Same as run_monte_carlo, plus
+        compression: t-digest compression (higher is more accurate)
+
+    Yields:
+        Dict from WealthSketch.summary plus num_simulations and seed
+    """
+    if num_simulations < 1 or duration_years < 1:
+        raise ValueError("num_simulations and duration_years must be positive")
+
+    num_quarters = int(duration_years * 4)
+    means, vols = quarterly_regimes(num_quarters, annual_return, annual_volatility, after_tax_rate, piecewise)
+    extra = spending_schedule(num_quarters, one_time_spend, one_time_quarter, custom_spending)
+
+    sketch = WealthSketch(num_quarters, initial_value, inflation_rate, compression)
+    rng = np.random.default_rng(seed)
+    for wealth in _normal_wealth_blocks(
+        rng, initial_value, means, vols, quarterly_fixed_spending, quarterly_percent_spending,
+        extra, num_simulations, chunk_size
+    ):
+        sketch.update(wealth)
+        yield {
+            **sketch.summary(percentiles),
+            "num_simulations": num_simulations,
+            "seed": seed,
+        }
+
+
+# ============================================================================
+# Correlated Multi-Asset Simulation
+# ============================================================================
+
+def asset_cholesky(
+    cma_data: pd.DataFrame,
+    correlation_matrix: pd.DataFrame,
+    assets: Sequence[str]
+) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """
+    Annual expected returns and Cholesky factor of the covariance for a set of CMA assets.
+
+    The covariance is built and PSD-repaired by mean_cov_from_assets. Results
+    are cached per (sorted upper-cased asset names, data_version of the CMA
+    and correlation frames), so a reload never serves a stale factor.
+
+    Args:
+        cma_data: CMA data with ASSET CLASS, RETURN, RISK columns
+        correlation_matrix: Asset correlation matrix
+        assets: Asset class names (case-insensitive)
+
+    Returns:
+        (asset names in sorted upper case, mu, L) with L @ L.T the annual covariance
+
+    Raises:
+        ValueError: An asset is not in the CMA data
+    """
+    names = tuple(sorted({str(a).strip().upper() for a in assets}))
+    key = (names, data_version(cma_data, correlation_matrix))
+
+    with _CHOLESKY_LOCK:
+        entry = _CHOLESKY_CACHE.get(key)
+        if entry is not None:
+            _CHOLESKY_CACHE.move_to_end(key)
+            _CHOLESKY_STATS["hits"] += 1
+            return list(names), entry[0], entry[1]
+
+    cma_names = cma_data["ASSET CLASS"].astype(str).str.strip().str.upper()
+    missing = sorted(set(names) - set(cma_names))
+    if missing:
+        raise ValueError(f"Assets not in CMA data: {missing}")
+
+    rows = cma_data.assign(_NAME=cma_names.values).drop_duplicates("_NAME").set_index("_NAME").loc[list(names)]
+    mu, sigma, _ = mean_cov_from_assets(rows.reset_index(drop=True), correlation_matrix)
+    try:
+        factor = np.linalg.cholesky(sigma)
+    except np.linalg.LinAlgError:
+        # Numerically singular after repair: any square root of sigma works for sampling
+        eigenvalues, eigenvectors = np.linalg.eigh(sigma)
+        factor = eigenvectors * np.sqrt(np.maximum(eigenvalues, 0.0))
+
+    mu.setflags(write=False)
+    factor.setflags(write=False)
+    with _CHOLESKY_LOCK:
+        _CHOLESKY_CACHE[key] = (mu, factor)
+        _CHOLESKY_CACHE.move_to_end(key)
+        while len(_CHOLESKY_CACHE) > MAX_CHOLESKY_ENTRIES:
+            _CHOLESKY_CACHE.popitem(last=False)
+        _CHOLESKY_STATS["misses"] += 1
+
+    return list(names), mu, factor
+
+
+def clear_cholesky_cache() -> None:
+    """Drop all cached Cholesky factors and reset the counters."""
+    with _CHOLESKY_LOCK:
+        _CHOLESKY_CACHE.clear()
+        for name in _CHOLESKY_STATS:
+            _CHOLESKY_STATS[name] = 0
+
+
+def cholesky_cache_stats() -> Dict:
+    """Hit/miss counters and current entry count."""
+    with _CHOLESKY_LOCK:
+        return {**_CHOLESKY_STATS, "entries": len(_CHOLESKY_CACHE)}
+
+
+def simulate_multi_asset_wealth(
+    initial_value: float,
+    asset_returns: np.ndarray,
+    weights: np.ndarray,
+    fixed_spending: float = 0.0,
+    percent_spending: float = 0.0,
+    extra_spending: Optional[np.ndarray] = None,
+    rebalance_quarters: int = 4,
+    out: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Wealth paths of a rebalanced multi-asset portfolio.
+
+    Holdings grow with their own asset returns. Spending follows the
+    simulate_wealth recursion on the total and is taken pro rata, and every
+    rebalance_quarters quarters the holdings are reset to the target weights
+    (0 = never rebalance).
+
+    Args:
+        initial_value: Starting wealth
+        asset_returns: Quarterly returns (quarters x paths x assets)
+        weights: Target weights (assets,), summing to 1
+        fixed_spending: Fixed spending per quarter
+        percent_spending: Spending per quarter as a fraction of wealth
+        extra_spending: Optional one-off spending per quarter (quarters,)
+        rebalance_quarters: Quarters between rebalances
+        out: Optional (quarters + 1 x paths) array to write into
+
+    Returns:
+        Wealth (quarters + 1 x paths), row 0 the initial value
+    """
+    n_quarters, n_paths, _ = asset_returns.shape
+    if out is None:
+        out = np.empty((n_quarters + 1, n_paths))
+    if extra_spending is None:
+        extra_spending = np.zeros(n_quarters)
+
+    holdings = np.outer(np.full(n_paths, float(initial_value)), weights)
+    scale = np.empty(n_paths)
+    out[0] = initial_value
+    for t in range(n_quarters):
+        holdings *= 1.0 + asset_returns[t]
+        grown = holdings.sum(axis=1)
+        value = out[t + 1]
+        np.maximum(grown - (fixed_spending + extra_spending[t]) - percent_spending * out[t], 0.0, out=value)
+
+        if rebalance_quarters and (t + 1) % rebalance_quarters == 0:
+            np.multiply(value[:, None], weights, out=holdings)
+        else:
+            scale.fill(0.0)
+            np.divide(value, grown, out=scale, where=grown > 0)
+            holdings *= scale[:, None]
+    return out
+
+
+def run_multi_asset_monte_carlo(
+    cma_data: pd.DataFrame,
+    correlation_matrix: pd.DataFrame,
+    weights: Dict[str, float],
+    initial_value: float,
+    quarterly_fixed_spending: float = 0.0,
+    quarterly_percent_spending: float = 0.0,
+    duration_years: int = 30,
+    num_simulations: int = 1000,
+    inflation_rate: float = 0.025,
+    after_tax_rate: float = 0.0,
+    one_time_spend: float = 0.0,
+    one_time_quarter: int = 1,
+    custom_spending: Optional[Dict[int, float]] = None,
+    rebalance_quarters: int = 4,
+    shortfall_thresholds: Optional[Sequence[float]] = None,
+    seed: Optional[int] = None,
+    percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+    sample_paths: int = 0,
+    chunk_draws: int = CHUNK_DRAWS
+) -> Dict:
+    """
+    Monte Carlo simulation of a multi-asset portfolio from the CMA assumptions.
+
+    Quarterly asset returns are normal with mean (1 + RETURN - tax)^(1/4) - 1
+    and covariance Sigma / 4 (Sigma from RISK and the correlation matrix),
+    drawn as Z @ L.T / 2 with the cached Cholesky factor L. Paths are
+    generated in chunks of at most chunk_draws draws; draws are path-major,
+    so a seed gives the same result for any chunk size.
+
+    Args:
+        cma_data: CMA data with ASSET CLASS, RETURN, RISK columns
+        correlation_matrix: Asset correlation matrix
+        weights: Asset class -> target weight; normalized to sum to 1
+        initial_value: Starting wealth
+        quarterly_fixed_spending: Fixed spending per quarter
+        quarterly_percent_spending: Spending per quarter as a fraction of wealth
+        duration_years: Horizon in years
+        num_simulations: Number of paths
+        inflation_rate: Annual inflation (decimal)
+        after_tax_rate: Annual tax drag subtracted from each asset's return
+        one_time_spend: One-off spending amount
+        one_time_quarter: Quarter (1-based) of the one-off spending
+        custom_spending: Quarter (1-based) -> extra spending
+        rebalance_quarters: Quarters between rebalances to the target weights (0 = never)
+        shortfall_thresholds: Wealth levels for the shortfall probabilities
+            (default: the initial value and half of it)
+        seed: Seed for numpy.random.default_rng; None for fresh entropy
+        percentiles: Percentile bands to report (0-100)
+        sample_paths: Number of paths to return for charting
+        chunk_draws: Max random draws generated at once
+
+    Returns:
+        Dict from summarize_wealth plus assets, weights, expected_return,
+        volatility and shortfall (thresholds, probability of ending below,
+        probability of ever falling below)
+    """
+    if num_simulations < 1 or duration_years < 1:
+        raise ValueError("num_simulations and duration_years must be positive")
+
+    target = pd.Series(weights, dtype=float)
+    target.index = [str(a).strip().upper() for a in target.index]
+    target = target.groupby(level=0).sum()
+    if target.sum() <= 0:
+        raise ValueError("Weights must sum to a positive value")
+
+    names, mu, factor = asset_cholesky(cma_data, correlation_matrix, list(target.index))
+    w = target.reindex(names).values
+    w = w / w.sum()
+
+    num_quarters = int(duration_years * 4)
+    n_assets = len(names)
+    quarterly_mean = (1 + mu - after_tax_rate) ** 0.25 - 1
+    quarterly_factor = factor / 2.0
+    extra = spending_schedule(num_quarters, one_time_spend, one_time_quarter, custom_spending)
+
+    rng = np.random.default_rng(seed)
+    chunk = max(1, chunk_draws // (num_quarters * n_assets))
+    wealth = np.empty((num_quarters + 1, num_simulations))
+    for lo in range(0, num_simulations, chunk):
+        hi = min(lo + chunk, num_simulations)
+        draws = rng.standard_normal((hi - lo, num_quarters, n_assets))
+        # Correlate straight into a quarter-major block for the time loop
+        asset_returns = np.empty((num_quarters, hi - lo, n_assets))
+        np.matmul(draws.transpose(1, 0, 2), quarterly_factor.T, out=asset_returns)
+        asset_returns += quarterly_mean
+        simulate_multi_asset_wealth(
+            initial_value, asset_returns, w, quarterly_fixed_spending, quarterly_percent_spending,
+            extra, rebalance_quarters, out=wealth[:, lo:hi]
+        )
+
+    if shortfall_thresholds is None:
+        shortfall_thresholds = [initial_value, 0.5 * initial_value]
+    thresholds = np.asarray(shortfall_thresholds, dtype=np.float64)
+    lowest = wealth.min(axis=0)
+    shortfall = {
+        "thresholds": thresholds.tolist(),
+        "final_below": np.mean(wealth[-1][None, :] < thresholds[:, None], axis=1).tolist(),
+        "ever_below": np.mean(lowest[None, :] < thresholds[:, None], axis=1).tolist(),
+    }
+
+    result = summarize_wealth(wealth, initial_value, inflation_rate, percentiles, sample_paths)
+    result.update({
+        "assets": names,
+        "weights": w.tolist(),
+        "expected_return": float(w @ mu),
+        "volatility": float(np.sqrt(w @ factor @ factor.T @ w)),
+        "shortfall": shortfall,
+        "rebalance_quarters": rebalance_quarters,
+        "num_simulations": num_simulations,
+        "seed": seed,
+    })
+    return result
+
+
+# ============================================================================
+# Historical Block Bootstrap
+# ============================================================================
+
+def stationary_bootstrap_indices(
+    rng: np.random.Generator,
+    n_paths: int,
+    n_periods: int,
+    n_obs: int,
+    block_length: float
+) -> np.ndarray:
+    """
+    Row indices for the stationary bootstrap (Politis & Romano).
+
+    Each path is a sequence of blocks of consecutive observations, wrapping
+    around the end of the history. Blocks start at uniform random rows and
+    have geometric lengths with mean block_length; block_length=1 is the
+    i.i.d. bootstrap.
+
+    Args:
+        rng: Random generator
+        n_paths: Number of paths
+        n_periods: Periods per path
+        n_obs: Number of historical observations
+        block_length: Mean block length in periods (>= 1)
+
+    Returns:
+        Indices (paths x periods) into the history
+    """
+    new_block = rng.random((n_paths, n_periods)) < 1.0 / block_length
+    new_block[:, 0] = True
+
+    # Every path opens a block, so numbering blocks over the flattened
+    # array never lets a block run across two paths
+    flat = new_block.ravel()
+    first = np.flatnonzero(flat)
+    block = np.cumsum(flat) - 1
+    starts = rng.integers(0, n_obs, size=len(first))
+
+    indices = np.arange(flat.size) - first[block]
+    indices += starts[block]
+    np.remainder(indices, n_obs, out=indices)
+    return indices.reshape(n_paths, n_periods)
+
+
+def bootstrap_wealth_chunk(
+    monthly_returns: np.ndarray,
+    n_paths: int,
+    seed: np.random.SeedSequence,
+    initial_value: float,
+    num_quarters: int,
+    block_length: float,
+    quarterly_after_tax: float,
+    fixed_spending: float,
+    percent_spending: float,
+    extra_spending: np.ndarray
+) -> np.ndarray:
+    """
+    Wealth paths for one chunk of bootstrapped histories.
+
+    Module-level so it can be sent to a worker process.
+
+    Args:
+        monthly_returns: Historical monthly portfolio returns (decimal)
+        n_paths: Paths in this chunk
+        seed: Seed of this chunk
+        initial_value: Starting wealth
+        num_quarters: Horizon in quarters
+        block_length: Mean block length in months
+        quarterly_after_tax: Tax drag subtracted from each quarterly return
+        fixed_spending: Fixed spending per quarter
+        percent_spending: Spending per quarter as a fraction of wealth
+        extra_spending: One-off spending per quarter (quarters,)
+
+    Returns:
+        Wealth (quarters + 1 x paths)
+    """
+    rng = np.random.default_rng(seed)
+    indices = stationary_bootstrap_indices(rng, n_paths, num_quarters * 3, len(monthly_returns), block_length)
+
+    growth = (1.0 + monthly_returns)[indices].reshape(n_paths, num_quarters, 3)
+    quarterly = growth.prod(axis=2)
+    quarterly -= 1.0 + quarterly_after_tax
+    return simulate_wealth(initial_value, quarterly, fixed_spending, percent_spending, extra_spending)
+
+
+def portfolio_history(returns: pd.DataFrame, weights: Dict[str, float]) -> Tuple[np.ndarray, Dict[str, float]]:
+    """
+    Monthly returns of a monthly-rebalanced portfolio over the return history.
+
+    Weighting the assets month by month before resampling keeps their
+    cross-sectional correlation: every asset is drawn from the same month.
+
+    Args:
+        returns: Monthly returns in percent (months x assets)
+        weights: Asset -> weight; normalized to sum to 1
+
+    Returns:
+        (portfolio returns in decimal over the months with data for every
+        held asset, normalized weights)
+
+    Raises:
+        ValueError: Unknown assets, non-positive total weight or no complete months
+    """
+    missing = sorted(set(weights) - set(returns.columns))
+    if missing:
+        raise ValueError(f"Assets not in return series: {missing}")
+    total = float(sum(weights.values()))
+    if total <= 0:
+        raise ValueError("Weights must sum to a positive value")
+
+    normalized = {asset: float(w) / total for asset, w in weights.items()}
+    held = returns[list(normalized)].dropna()
+    if held.empty:
+        raise ValueError("No months with returns for every asset")
+    history = held.values @ np.array(list(normalized.values())) / 100.0
+    return history, normalized
+
+
+def run_bootstrap_monte_carlo(
+    returns: pd.DataFrame,
+    weights: Dict[str, float],
+    initial_value: float,
+    quarterly_fixed_spending: float = 0.0,
+    quarterly_percent_spending: float = 0.0,
+    duration_years: int = 30,
+    num_simulations: int = 1000,
+    inflation_rate: float = 0.025,
+    after_tax_rate: float = 0.0,
+    one_time_spend: float = 0.0,
+    one_time_quarter: int = 1,
+    custom_spending: Optional[Dict[int, float]] = None,
+    block_length: float = 12.0,
+    seed: Optional[int] = None,
+    percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+    sample_paths: int = 0,
+    chunk_paths: int = BOOTSTRAP_CHUNK_PATHS,
+    map_fn: Callable = map,
+    compression: float = 500.0
+) -> Dict:
+    """
+    Historical simulation by stationary block bootstrap (runSimulationBootstrap).
+
+    Months are resampled in blocks of mean length block_length, which keeps
+    the serial correlation of the history, and compounded into quarters.
+    Paths are generated in chunks of chunk_paths (fewer for horizons where
+    a chunk would exceed BOOTSTRAP_CHUNK_CELLS path-months), each with a
+    seed spawned from seed; map_fn runs bootstrap_wealth_chunk over the chunks, e.g. in
+    a process pool. Chunks are folded into a WealthSketch as they arrive,
+    so memory is O(quarters) rather than O(paths x quarters): bands are
+    t-digest estimates and probabilities are exact. A seed gives the same
+    result for any map_fn.
+
+    Args:
+        returns: Monthly returns in percent (months x assets)
+        weights: Asset -> weight; normalized to sum to 1
+        initial_value: Starting wealth
+        quarterly_fixed_spending: Fixed spending per quarter
+        quarterly_percent_spending: Spending per quarter as a fraction of wealth
+        duration_years: Horizon in years
+        num_simulations: Number of paths
+        inflation_rate: Annual inflation (decimal)
+        after_tax_rate: Annual tax drag, applied quarterly
+        one_time_spend: One-off spending amount
+        one_time_quarter: Quarter (1-based) of the one-off spending
+        custom_spending: Quarter (1-based) -> extra spending
+        block_length: Mean block length in months (1 = i.i.d. months)
+        seed: Root seed; None for fresh entropy
+        percentiles: Percentile bands to report (0-100)
+        sample_paths: Number of paths to return for charting
+        chunk_paths: Paths per chunk
+        map_fn: map-like callable used to run the chunks; must yield in order
+        compression: t-digest compression (higher is more accurate)
+
+    Returns:
+        Dict from WealthSketch.summary (sample_paths are the first paths
+        generated) plus weights, history_months, block_length,
+        num_simulations and seed
+    """
+    if num_simulations < 1 or duration_years < 1:
+        raise ValueError("num_simulations and duration_years must be positive")
+    if block_length < 1:
+        raise ValueError("block_length must be at least 1 month")
+
+    history, normalized = portfolio_history(returns, weights)
+    num_quarters = int(duration_years * 4)
+    extra = spending_schedule(num_quarters, one_time_spend, one_time_quarter, custom_spending)
+    quarterly_after_tax = (1 + after_tax_rate) ** 0.25 - 1
+
+    chunk_paths = max(1, min(chunk_paths, BOOTSTRAP_CHUNK_CELLS // (num_quarters * 3)))
+    offsets = list(range(0, num_simulations, chunk_paths))
+    sizes = [min(chunk_paths, num_simulations - lo) for lo in offsets]
+    seeds = np.random.SeedSequence(seed).spawn(len(offsets))
+
+    def repeat(value):
+        return [value] * len(offsets)
+
+    blocks = map_fn(
+        bootstrap_wealth_chunk, repeat(history), sizes, seeds, repeat(initial_value),
+        repeat(num_quarters), repeat(block_length), repeat(quarterly_after_tax),
+        repeat(quarterly_fixed_spending), repeat(quarterly_percent_spending), repeat(extra)
+    )
+    # Chunks arrive in order, so the sketch (and the result) is seed-stable
+    sketch = WealthSketch(num_quarters, initial_value, inflation_rate, compression, sample_paths)
+    for block in blocks:
+        sketch.update(block)
+
+    result = sketch.summary(percentiles)
+    result.update({
+        "weights": normalized,
+        "history_months": len(history),
+        "block_length": block_length,
+        "num_simulations": num_simulations,
+        "seed": seed,
+    })
+    return result
@@ -166,6 +166,137 @@ def compute_scenario_metrics(
     }
 
 
+def scenario_index_ranges(
+    index: pd.DatetimeIndex,
+    scenarios: List[Dict]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Integer row ranges of each scenario's dates on a sorted DatetimeIndex.
+
+    Row range [starts[i], ends[i]) holds the same dates as the
+    get_scenario_returns mask, found with two binary searches per scenario
+    instead of a pass over the whole index.
+
+    Args:
+        index: Sorted DatetimeIndex of the returns
+        scenarios: List of scenario dictionaries with start, end
+
+    Returns:
+        (starts, ends) integer arrays, one entry per scenario
+    """
+    dates = pd.to_datetime([s.get("start") for s in scenarios] + [s.get("end") for s in scenarios])
+    starts = index.searchsorted(dates[:len(scenarios)], side="left")
+    ends = index.searchsorted(dates[len(scenarios):], side="right")
+    return np.asarray(starts, dtype=np.int64), np.maximum(np.asarray(ends, dtype=np.int64), starts)
+
+
+def stacked_scenario_metrics(
+    paths: np.ndarray,
+    starts: np.ndarray,
+    ends: np.ndarray,
+    tail_metrics: bool = True
+) -> Dict[str, np.ndarray]:
+    """
+    compute_scenario_metrics for every scenario and return series at once.
+
+    Scenario slices are gathered into one zero-padded (scenarios x periods x
+    series) array, so cumulative growth, drawdown, volatility and VaR/CVaR
+    for all of them are a few vectorized passes. Padding sits after each
+    slice and is neutral: a zero return leaves growth and drawdown unchanged.
+
+    Args:
+        paths: Return series (dates x series), e.g. portfolio and benchmark
+        starts: First row of each scenario
+        ends: One past the last row of each scenario (ends - starts >= 1)
+        tail_metrics: Also compute var_95 / cvar_95 (needs a sort per slice)
+
+    Returns:
+        Dict of (scenarios x series) arrays as decimals: total_return,
+        annualized_return, volatility, max_drawdown, sharpe_ratio and, with
+        tail_metrics, var_95, cvar_95; plus periods (scenarios,)
+    """
+    paths = np.asarray(paths, dtype=np.float64)
+    if paths.ndim == 1:
+        paths = paths[:, None]
+    periods = ends - starts
+    n_max = int(periods.max()) if len(periods) else 0
+
+    rows = starts[:, None] + np.arange(n_max)
+    valid = rows < ends[:, None]
+    window = np.where(valid[:, :, None], paths[np.minimum(rows, len(paths) - 1)], 0.0)
+    n = periods[:, None].astype(np.float64)
+
+    # Growth and drawdown
+    cumulative = np.cumprod(1.0 + window, axis=1)
+    total_return = cumulative[:, -1, :] - 1.0
+    running_max = np.maximum.accumulate(cumulative, axis=1)
+    max_drawdown = ((cumulative - running_max) / running_max).min(axis=1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        annualized_return = (1.0 + total_return) ** (12.0 / n) - 1.0
+
+        # Sample volatility over each slice only
+        mean = window.sum(axis=1) / n
+        deviations = np.where(valid[:, :, None], window - mean[:, None, :], 0.0)
+        volatility = np.sqrt((deviations ** 2).sum(axis=1) / (n - 1)) * np.sqrt(12)
+        sharpe = np.where(volatility > 0, annualized_return / volatility, 0.0)
+
+    metrics = {
+        "periods": periods,
+        "total_return": total_return,
+        "annualized_return": annualized_return,
+        "volatility": volatility,
+        "max_drawdown": max_drawdown,
+        "sharpe_ratio": sharpe,
+    }
+    if not tail_metrics:
+        return metrics
+
+    # 5th percentile with numpy's linear interpolation; padding sorts last
+    ordered = np.sort(np.where(valid[:, :, None], window, np.inf), axis=1)
+    position = 0.05 * (n - 1)
+    lower = np.floor(position).astype(np.int64)
+    upper = np.minimum(lower + 1, n.astype(np.int64) - 1)
+    below = np.take_along_axis(ordered, np.broadcast_to(lower[:, :, None], (len(n), 1, paths.shape[1])), axis=1)[:, 0]
+    above = np.take_along_axis(ordered, np.broadcast_to(upper[:, :, None], (len(n), 1, paths.shape[1])), axis=1)[:, 0]
+    var_95 = below + (above - below) * (position - lower)
+
+    tail = valid[:, :, None] & (window <= var_95[:, None, :])
+    metrics["var_95"] = var_95
+    metrics["cvar_95"] = (window * tail).sum(axis=1) / tail.sum(axis=1)
+    return metrics
+
+
+def _metrics_record(
+    metrics: Dict[str, np.ndarray],
+    i: int,
+    k: int,
+    scenario_name: str,
+    start_date: str,
+    end_date: str
+) -> Dict:
+    """One scenario / series from stacked_scenario_metrics, formatted like compute_scenario_metrics."""
+    record = {
+        "scenario": scenario_name,
+        "start": start_date,
+        "end": end_date,
+        "periods": int(metrics["periods"][i]),
+    }
+    for name in ("total_return", "annualized_return", "volatility", "max_drawdown", "var_95", "cvar_95"):
+        record[name] = round(float(metrics[name][i, k]) * 100, 2)
+    record["sharpe_ratio"] = round(float(metrics["sharpe_ratio"][i, k]), 2)
+    return record
+
+
+def _weighted_returns(returns: pd.DataFrame, weights: pd.Series) -> Optional[np.ndarray]:
+    """Return series of weights normalized over the assets in returns (NaN counts as 0), or None."""
+    common = weights.index.intersection(returns.columns)
+    if len(common) == 0:
+        return None
+    w = weights[common] / weights[common].sum()
+    return np.nan_to_num(returns[common].to_numpy(dtype=np.float64)) @ w.values
+
+
 def apply_stress_scenario(
     portfolio_weights: pd.Series,
     returns: pd.DataFrame,
@@ -175,6 +306,11 @@ def apply_stress_scenario(
     """
     Apply multiple stress scenarios to a portfolio.
 
+    Portfolio and benchmark return series are formed once over the full
+    history; scenario dates become row ranges (scenario_index_ranges) and
+    all scenarios x {portfolio, benchmark} are evaluated in one
+    stacked_scenario_metrics pass.
+
     Args:
         portfolio_weights: Portfolio weights (asset -> weight)
         returns: Historical returns DataFrame
@@ -184,22 +320,28 @@ def apply_stress_scenario(
     Returns:
         List of scenario results with portfolio and benchmark metrics
     """
-    # Normalize weights
-    portfolio_weights = portfolio_weights / portfolio_weights.sum()
-    if benchmark_weights is not None:
-        benchmark_weights = benchmark_weights / benchmark_weights.sum()
+    if not returns.index.is_monotonic_increasing:
+        returns = returns.sort_index()
 
-    results = []
+    portfolio_returns = _weighted_returns(returns, portfolio_weights)
+    benchmark_returns = _weighted_returns(returns, benchmark_weights) if benchmark_weights is not None else None
+
+    starts, ends = scenario_index_ranges(returns.index, scenarios)
+    available = (ends - starts) >= 2
 
-    for scenario in scenarios:
+    metrics = None
+    if portfolio_returns is not None and available.any():
+        series = [portfolio_returns] if benchmark_returns is None else [portfolio_returns, benchmark_returns]
+        metrics = stacked_scenario_metrics(np.column_stack(series), starts[available], ends[available])
+
+    results = []
+    row = 0
+    for scenario, has_data in zip(scenarios, available):
         scenario_name = scenario.get("name", "Unknown")
         start_date = scenario.get("start")
         end_date = scenario.get("end")
 
-        # Filter returns to scenario period
-        scenario_returns = get_scenario_returns(returns, start_date, end_date)
-
-        if len(scenario_returns) < 2:
+        if not has_data:
             # No data for this period
             results.append({
                 "scenario": scenario_name,
@@ -213,46 +355,173 @@ def apply_stress_scenario(
             })
             continue
 
-        # Calculate portfolio returns
-        common_assets = portfolio_weights.index.intersection(scenario_returns.columns)
-        if len(common_assets) == 0:
+        if metrics is None:
+            # No portfolio asset has returns
             continue
 
-        port_weights = portfolio_weights[common_assets]
-        port_weights = port_weights / port_weights.sum()
-        portfolio_returns = (scenario_returns[common_assets] * port_weights).sum(axis=1)
-
-        # Calculate portfolio metrics
-        port_metrics = compute_scenario_metrics(
-            portfolio_returns, scenario_name, start_date, end_date
-        )
+        port_metrics = _metrics_record(metrics, row, 0, scenario_name, start_date, end_date)
         port_metrics["data_available"] = True
 
-        # Calculate benchmark metrics if provided
-        if benchmark_weights is not None:
-            bench_common = benchmark_weights.index.intersection(scenario_returns.columns)
-            if len(bench_common) > 0:
-                bench_weights = benchmark_weights[bench_common]
-                bench_weights = bench_weights / bench_weights.sum()
-                benchmark_returns = (scenario_returns[bench_common] * bench_weights).sum(axis=1)
-
-                bench_metrics = compute_scenario_metrics(
-                    benchmark_returns, scenario_name, start_date, end_date
-                )
-
-                # Add benchmark and excess return
-                port_metrics["benchmark_return"] = bench_metrics["total_return"]
-                port_metrics["benchmark_volatility"] = bench_metrics["volatility"]
-                port_metrics["benchmark_max_drawdown"] = bench_metrics["max_drawdown"]
-                port_metrics["excess_return"] = round(
-                    port_metrics["total_return"] - bench_metrics["total_return"], 2
-                )
+        if benchmark_returns is not None:
+            bench_metrics = _metrics_record(metrics, row, 1, scenario_name, start_date, end_date)
+            port_metrics["benchmark_return"] = bench_metrics["total_return"]
+            port_metrics["benchmark_volatility"] = bench_metrics["volatility"]
+            port_metrics["benchmark_max_drawdown"] = bench_metrics["max_drawdown"]
+            port_metrics["excess_return"] = round(
+                port_metrics["total_return"] - bench_metrics["total_return"], 2
+            )
 
         results.append(port_metrics)
+        row += 1
 
     return results
 
 
+def _weight_matrix(weights: pd.DataFrame, assets: pd.Index) -> Tuple[np.ndarray, np.ndarray]:
+    """Rows of weights over assets, each normalized over its matched assets, and which rows matched."""
+    W = weights.reindex(columns=assets).fillna(0.0).to_numpy(dtype=np.float64)
+    matched = W.sum(axis=1)
+    has_match = matched != 0
+    W[has_match] /= matched[has_match, None]
+    return W, has_match
+
+
+def _percent_grid(
+    values: np.ndarray,
+    rows: np.ndarray,
+    n_rows: int,
+    scale: float = 100.0
+) -> List[List[Optional[float]]]:
+    """values * scale rounded to 2 dp, scattered into n_rows rows; None where missing or not finite."""
+    grid = np.full((n_rows, values.shape[1]), np.nan)
+    grid[rows] = np.round(values * scale, 2)
+
+    missing = ~np.isfinite(grid)
+    out = grid.tolist()
+    for i in np.flatnonzero(missing.any(axis=1)):
+        out[i] = [None if gap else v for v, gap in zip(out[i], missing[i])]
+    return out
+
+
+def _window_counts(X: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Non-missing observations of each column of X in each [start, end) window (windows x columns)."""
+    observed = np.vstack([np.zeros(X.shape[1]), np.cumsum(~np.isnan(X), axis=0)])
+    return observed[ends] - observed[starts]
+
+
+def batch_stress_test(
+    portfolio_weights: pd.DataFrame,
+    returns: pd.DataFrame,
+    scenarios: List[Dict],
+    benchmark_weights: Optional[pd.DataFrame] = None,
+    benchmark_map: Optional[Dict[str, Optional[str]]] = None
+) -> Dict:
+    """
+    Every scenario against every portfolio, with each portfolio's benchmark.
+
+    All portfolio (and needed benchmark) return paths come from one
+    (dates x assets) @ (assets x portfolios) product, and the scenarios x
+    paths metrics from one stacked_scenario_metrics pass. Missing returns
+    count as 0, as in apply_stress_scenario; weight_coverage_pct and
+    benchmark_coverage_pct report the share of each portfolio's (and its
+    benchmark's) weight with returns over the whole window. A benchmark
+    with no returns at all in a window has no benchmark or excess return
+    there rather than a flat 0.
+
+    Args:
+        portfolio_weights: Weights (portfolios x assets)
+        returns: Historical returns (dates x assets), NaN where missing
+        scenarios: List of scenario dictionaries with name, start, end
+        benchmark_weights: Optional benchmark weights (benchmarks x assets)
+        benchmark_map: Portfolio name -> benchmark name (None or absent = no benchmark)
+
+    Returns:
+        Columnar dict: scenario names, data_available flags, portfolio and
+        benchmark names, and (scenarios x portfolios) grids of metrics in
+        percent. Grid entries are None for scenarios without data, and
+        benchmark entries for portfolios without a benchmark or whose
+        benchmark has no data in the window. Portfolios with no matching
+        assets are listed under "unmatched".
+    """
+    if not returns.index.is_monotonic_increasing:
+        returns = returns.sort_index()
+    benchmark_map = benchmark_map or {}
+
+    assets = portfolio_weights.columns.intersection(returns.columns)
+    W, has_match = _weight_matrix(portfolio_weights, assets)
+    names = [str(n) for n in portfolio_weights.index[has_match]]
+    W = W[has_match]
+
+    # Benchmarks referenced by a matched portfolio, each evaluated once
+    used = []
+    if benchmark_weights is not None:
+        used = [b for b in dict.fromkeys(benchmark_map.get(n) for n in names) if b in benchmark_weights.index]
+    if used:
+        bench_assets = benchmark_weights.columns.intersection(returns.columns)
+        B, bench_match = _weight_matrix(benchmark_weights.loc[used], bench_assets)
+        used = [b for b, ok in zip(used, bench_match) if ok]
+        B = B[bench_match]
+
+    X = returns[assets].to_numpy(dtype=np.float64)
+    paths = np.nan_to_num(X) @ W.T
+    if used:
+        XB = returns[bench_assets].to_numpy(dtype=np.float64)
+        paths = np.hstack([paths, np.nan_to_num(XB) @ B.T])
+
+    starts, ends = scenario_index_ranges(returns.index, scenarios)
+    available = (ends - starts) >= 2
+    rows = np.flatnonzero(available)
+    n_scen, n_port = len(scenarios), len(names)
+
+    result = {
+        "scenarios": [s.get("name", "Unknown") for s in scenarios],
+        "data_available": available.tolist(),
+        "periods": np.where(available, ends - starts, 0).tolist(),
+        "portfolios": names,
+        "benchmarks": [benchmark_map.get(n) if benchmark_map.get(n) in used else None for n in names],
+        "unmatched": [str(n) for n in portfolio_weights.index[~has_match]],
+    }
+    if n_port == 0 or len(rows) == 0:
+        empty = [[None] * n_port for _ in range(n_scen)]
+        for key in ("total_return", "annualized_return", "volatility", "max_drawdown", "var_95", "cvar_95",
+                    "benchmark_return", "excess_return", "weight_coverage_pct", "benchmark_coverage_pct"):
+            result[key] = empty
+        return result
+
+    metrics = stacked_scenario_metrics(paths, starts[rows], ends[rows])
+    for key in ("total_return", "annualized_return", "volatility", "max_drawdown", "var_95", "cvar_95"):
+        result[key] = _percent_grid(metrics[key][:, :n_port], rows, n_scen)
+
+    lengths = ends[rows] - starts[rows]
+    observed = _window_counts(X, starts[rows], ends[rows])
+    # Share of weight in assets observed on every date of the window
+    result["weight_coverage_pct"] = _percent_grid((observed == lengths[:, None]) @ W.T, rows, n_scen)
+
+    # Benchmark columns per portfolio (NaN where no benchmark)
+    column = {b: j for j, b in enumerate(used)}
+    bench_cols = np.array([column.get(b, -1) for b in result["benchmarks"]], dtype=np.int64)
+    has_bench = bench_cols >= 0
+    if used:
+        bench_observed = _window_counts(XB, starts[rows], ends[rows])
+        bench_complete = (bench_observed == lengths[:, None]) @ B.T
+        bench_any = (bench_observed > 0) @ B.T
+    else:
+        bench_complete = bench_any = np.zeros((len(rows), 1))
+    cols = np.maximum(bench_cols, 0)
+    bench_total = metrics["total_return"][:, n_port + cols] if used else np.zeros((len(rows), n_port))
+    bench_total = np.where(has_bench & (bench_any[:, cols] > 0), bench_total, np.nan)
+
+    result["benchmark_return"] = _percent_grid(bench_total, rows, n_scen)
+    # Difference of the rounded percentages, as in apply_stress_scenario
+    excess = np.round(metrics["total_return"][:, :n_port] * 100, 2) - np.round(bench_total * 100, 2)
+    result["excess_return"] = _percent_grid(excess, rows, n_scen, scale=1.0)
+    result["benchmark_coverage_pct"] = _percent_grid(
+        np.where(has_bench, bench_complete[:, cols], np.nan), rows, n_scen
+    )
+
+    return result
+
+
 def create_custom_scenario(
     name: str,
     shock_magnitudes: Dict[str, float],
@@ -324,67 +593,138 @@ def apply_custom_scenario(
     return result
 
 
-def compute_stress_contribution(
+def _observed_volatility(X: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Annualized sample volatility of each column over its non-missing rows in each window; NaN below two."""
+    volatility = np.full((len(starts), X.shape[1]), np.nan)
+    for i, (start, end) in enumerate(zip(starts, ends)):
+        block = X[start:end]
+        valid = ~np.isnan(block)
+        n = valid.sum(axis=0)
+        ok = n >= 2
+        mean = np.where(valid, block, 0.0).sum(axis=0) / np.maximum(n, 1)
+        deviations = np.where(valid, block - mean, 0.0)
+        volatility[i, ok] = np.sqrt((deviations[:, ok] ** 2).sum(axis=0) / (n[ok] - 1)) * np.sqrt(12)
+    return volatility
+
+
+def _observed_drawdown(X: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Max drawdown of each column over its non-missing rows in each window; NaN with no observations."""
+    drawdown = np.full((len(starts), X.shape[1]), np.nan)
+    for i, (start, end) in enumerate(zip(starts, ends)):
+        block = X[start:end]
+        valid = ~np.isnan(block)
+        ok = valid.any(axis=0)
+        # The peak is taken over observed months only, so a gap never acts as a 1.0 peak
+        growth = np.where(valid, np.cumprod(1.0 + np.where(valid, block, 0.0), axis=0), np.nan)
+        peak = np.fmax.accumulate(growth, axis=0)
+        with np.errstate(invalid='ignore'):
+            losses = np.where(valid, (growth - peak) / peak, np.inf)
+        drawdown[i, ok] = losses[:, ok].min(axis=0)
+    return drawdown
+
+
+def stress_contribution_arrays(
     portfolio_weights: pd.Series,
     returns: pd.DataFrame,
-    scenario_start: str,
-    scenario_end: str
-) -> pd.DataFrame:
+    scenarios: List[Dict]
+) -> Dict:
     """
-    Calculate each asset's contribution to portfolio stress.
+    Each asset's contribution to portfolio stress, for several scenarios at once.
+
+    Asset columns are the series of one stacked_scenario_metrics pass, so
+    every asset's total return, volatility and drawdown in every scenario
+    come out of a few array operations; contributions are those times the
+    asset weight. As in the per-asset pandas formulas, missing months are
+    skipped: they leave growth unchanged, and volatility (sample std) and
+    drawdown (peak = running max) use the observed months only. Volatility
+    is None with fewer than two observations, drawdown with none.
 
     Args:
         portfolio_weights: Portfolio weights
         returns: Historical returns
-        scenario_start: Scenario start date
-        scenario_end: Scenario end date
+        scenarios: List of scenario dictionaries with name, start, end
 
     Returns:
-        DataFrame with asset-level stress contributions
+        Columnar dict: scenario names, data_available flags, assets, weight
+        (percent) and (scenarios x assets) return_contribution,
+        volatility_contribution and drawdown_contribution grids in percent
+        (None rows for scenarios with fewer than two periods)
     """
-    # Get scenario returns
-    scenario_returns = get_scenario_returns(returns, scenario_start, scenario_end)
+    if not returns.index.is_monotonic_increasing:
+        returns = returns.sort_index()
 
-    if len(scenario_returns) < 2:
-        return pd.DataFrame()
+    common = portfolio_weights.index.intersection(returns.columns)
+    total = portfolio_weights.sum()
+    weights = (portfolio_weights[common] / total).to_numpy(dtype=np.float64)
 
-    # Normalize weights
-    weights = portfolio_weights / portfolio_weights.sum()
-    common = weights.index.intersection(scenario_returns.columns)
+    starts, ends = scenario_index_ranges(returns.index, scenarios)
+    available = (ends - starts) >= 2
+    rows = np.flatnonzero(available)
 
-    if len(common) == 0:
-        return pd.DataFrame()
+    result = {
+        "scenarios": [s.get("name", "Unknown") for s in scenarios],
+        "data_available": available.tolist(),
+        "assets": [str(a) for a in common],
+        "weight": np.round(weights * 100, 2).tolist(),
+    }
+    keys = {
+        "return_contribution": "total_return",
+        "volatility_contribution": "volatility",
+        "drawdown_contribution": "max_drawdown",
+    }
+    if len(common) == 0 or len(rows) == 0:
+        for key in keys:
+            result[key] = [[None] * len(common) for _ in scenarios]
+        return result
+
+    # Only the rows some scenario covers, only the portfolio's columns
+    first, last = starts[rows].min(), ends[rows].max()
+    columns = returns.columns.get_indexer(common)
+    raw = returns.iloc[first:last].to_numpy(dtype=np.float64)[:, columns]
+    window_starts, window_ends = starts[rows] - first, ends[rows] - first
+    metrics = stacked_scenario_metrics(np.nan_to_num(raw), window_starts, window_ends, tail_metrics=False)
+    if np.isnan(raw).any():
+        metrics["volatility"] = _observed_volatility(raw, window_starts, window_ends)
+        metrics["max_drawdown"] = _observed_drawdown(raw, window_starts, window_ends)
+    for key, metric in keys.items():
+        result[key] = _percent_grid(metrics[metric] * weights, rows, len(scenarios))
 
-    # Calculate contributions
-    contributions = []
+    return result
 
-    for asset in common:
-        asset_returns = scenario_returns[asset]
-        weight = weights[asset]
 
-        # Total return contribution
-        cumulative = (1 + asset_returns).prod() - 1
-        contribution = weight * cumulative
+def compute_stress_contribution(
+    portfolio_weights: pd.Series,
+    returns: pd.DataFrame,
+    scenario_start: str,
+    scenario_end: str
+) -> pd.DataFrame:
+    """
+    Calculate each asset's contribution to portfolio stress.
 
-        # Volatility contribution (approximate)
-        asset_vol = asset_returns.std() * np.sqrt(12)
-        vol_contribution = weight * asset_vol
+    Single-scenario view of stress_contribution_arrays.
 
-        # Drawdown contribution
-        asset_cumulative = (1 + asset_returns).cumprod()
-        asset_peak = asset_cumulative.cummax()
-        asset_dd = ((asset_cumulative - asset_peak) / asset_peak).min()
-        dd_contribution = weight * asset_dd
+    Args:
+        portfolio_weights: Portfolio weights
+        returns: Historical returns
+        scenario_start: Scenario start date
+        scenario_end: Scenario end date
 
-        contributions.append({
-            "asset": asset,
-            "weight": round(weight * 100, 2),
-            "return_contribution": round(contribution * 100, 2),
-            "volatility_contribution": round(vol_contribution * 100, 2),
-            "drawdown_contribution": round(dd_contribution * 100, 2)
-        })
+    Returns:
+        DataFrame with asset-level stress contributions
+    """
+    arrays = stress_contribution_arrays(
+        portfolio_weights, returns, [{"start": scenario_start, "end": scenario_end}]
+    )
+    if not arrays["data_available"][0] or len(arrays["assets"]) == 0:
+        return pd.DataFrame()
 
-    df = pd.DataFrame(contributions)
+    df = pd.DataFrame({
+        "asset": arrays["assets"],
+        "weight": arrays["weight"],
+        "return_contribution": arrays["return_contribution"][0],
+        "volatility_contribution": arrays["volatility_contribution"][0],
+        "drawdown_contribution": arrays["drawdown_contribution"][0],
+    })
     df = df.sort_values("drawdown_contribution", ascending=True)
 
     return df
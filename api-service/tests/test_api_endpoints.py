@@ -2,12 +2,15 @@
 Tests for FastAPI endpoints in main.py
 """
 
+import json
+
 import pytest
 from fastapi.testclient import TestClient
 import pandas as pd
 import numpy as np
 
 from main import app
+from data_registry import get_dataset
 
 
 @pytest.fixture
@@ -75,6 +78,27 @@ class TestHealthEndpoints:
         assert "date_range" in data
         assert len(data["assets"]) > 0
 
+    def test_data_stats_endpoint(self, client):
+        """Datasets report whether and how fast they loaded."""
+        client.get("/assets")
+        response = client.get("/api/system/data")
+
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert data["returns_usd"]["loaded"] is True
+        assert data["returns_usd"]["load_ms"] >= 0
+        assert "returns_gbp" in data
+
+    def test_data_reload_endpoint(self, client):
+        """Reloading unchanged data keeps the current snapshot."""
+        version = client.get("/api/system/data/version").json()["data"]["version"]
+        response = client.post("/api/system/data/reload")
+
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert data["reloaded"] is False
+        assert data["version"] == version
+
 
 class TestRiskContributions:
     """Test risk contribution endpoints."""
@@ -101,6 +125,44 @@ class TestRiskContributions:
         assert "portfolio_vol" in result
         assert "portfolio_vol_annualized" in result
 
+    def test_security_level_contributions(self, client):
+        """level=security runs on the instrument universe."""
+        instruments = get_dataset("instrument_returns")
+        if instruments.empty:
+            pytest.skip("No instrument returns file")
+        portfolio = {name: 0.25 for name in instruments.columns[:4]}
+
+        for level in ("security", "security_proxied"):
+            response = client.post(
+                "/api/risk/contributions",
+                json={"portfolio": portfolio, "level": level}
+            )
+            assert response.status_code == 200
+            assert response.json()["data"]["portfolio_vol"] > 0
+
+    def test_factor_level_contributions(self, client):
+        """level=factor uses the beta file and factor covariance."""
+        betas = get_dataset("betas")
+        portfolio = {name: 0.2 for name in betas.index[:5]}
+
+        response = client.post(
+            "/api/risk/contributions",
+            json={"portfolio": portfolio, "level": "factor"}
+        )
+
+        assert response.status_code == 200
+        result = response.json()["data"]
+        assert result["portfolio_vol"] > 0
+        assert np.isclose(sum(result["pctr"].values()), 1.0)
+
+    def test_unknown_level(self, client, sample_portfolio):
+        """Unknown risk levels are rejected."""
+        response = client.post(
+            "/api/risk/contributions",
+            json={"portfolio": sample_portfolio, "level": "fund_of_funds"}
+        )
+        assert response.status_code == 400
+
     @pytest.mark.skip(reason="API returns 500 for invalid data - acceptable for now")
     def test_contributions_invalid_weights(self, client):
         """Test with zero/negative weights."""
@@ -130,6 +192,83 @@ class TestRiskContributions:
         assert response.status_code in [400, 500]
 
 
+class TestBatchRisk:
+    """Test batch portfolio risk endpoint."""
+
+    def test_batch_explicit_portfolios(self, client, sample_portfolio, sample_benchmark):
+        """Several portfolios are evaluated in one call."""
+        response = client.post(
+            "/api/risk/batch",
+            json={"portfolios": {"a": sample_portfolio, "b": sample_benchmark}}
+        )
+
+        assert response.status_code == 200
+        result = response.json()["data"]
+        assert result["portfolios"] == ["a", "b"]
+        assert len(result["pctr"]) == 2
+        assert len(result["pctr"][0]) == len(result["assets"])
+        assert len(result["diversification"]["diversification_ratio"]) == 2
+
+    def test_batch_universe_reference(self, client):
+        """Universe portfolios are matched against the instrument covariance."""
+        from data_registry import get_dataset
+        universe = get_dataset("portfolio_universe")
+        response = client.post("/api/risk/batch", json={"universe": "portfolio"})
+
+        assert response.status_code == 200
+        result = response.json()["data"]
+        assert result["level"] == "security"
+        assert len(result["portfolios"]) > 0
+        assert len(result["portfolios"]) + len(result["unmatched"]) == len(universe)
+        assert all(np.isfinite(result["portfolio_vol"]))
+
+    def test_batch_unknown_level(self, client):
+        """Levels without a covariance matrix are rejected."""
+        response = client.post("/api/risk/batch", json={"universe": "portfolio", "level": "factor"})
+        assert response.status_code == 400
+
+    def test_batch_requires_input(self, client):
+        """Empty requests are rejected."""
+        response = client.post("/api/risk/batch", json={})
+        assert response.status_code == 400
+
+
+
+class TestRollingRisk:
+    """Test rolling risk time series endpoint."""
+
+    def test_rolling_columnar(self, client, sample_portfolio, sample_benchmark):
+        """One call returns the whole series."""
+        response = client.post(
+            "/api/risk/rolling",
+            json={"portfolio": sample_portfolio, "benchmark": sample_benchmark, "window": 24}
+        )
+
+        assert response.status_code == 200
+        result = response.json()["data"]
+        assert len(result["dates"]) == len(result["portfolio_vol_annualized"]) == len(result["tracking_error"])
+        assert len(result["pctr"][0]) == len(result["assets"])
+
+    def test_rolling_stream(self, client, sample_portfolio):
+        """stream=true sends a header line and one line per window."""
+        response = client.post(
+            "/api/risk/rolling",
+            json={"portfolio": sample_portfolio, "window": 24, "stream": True}
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert lines[0]["window"] == 24
+        assert all("date" in row and "pctr" in row for row in lines[1:])
+        assert len(lines) > 1
+
+    def test_rolling_window_too_long(self, client, sample_portfolio):
+        """Windows longer than the history are rejected."""
+        response = client.post("/api/risk/rolling", json={"portfolio": sample_portfolio, "window": 100000})
+        assert response.status_code == 400
+
+
 class TestTrackingError:
     """Test tracking error endpoints."""
 
@@ -215,6 +354,23 @@ class TestDiversification:
         assert "diversification_benefit_pct" in result
         assert "weighted_avg_correlation" in result
 
+    def test_diversification_batch(self, client, sample_portfolio, sample_benchmark):
+        """Several portfolios in one request come back as lists."""
+        response = client.post(
+            "/api/risk/diversification",
+            json={"portfolios": {"P": sample_portfolio, "B": sample_benchmark}}
+        )
+
+        assert response.status_code == 200
+        result = response.json()["data"]
+        assert result["portfolios"] == ["P", "B"]
+        assert len(result["diversification_ratio"]) == 2
+
+    def test_diversification_requires_input(self, client):
+        """Empty requests are rejected."""
+        response = client.post("/api/risk/diversification", json={})
+        assert response.status_code == 400
+
 
 class TestPerformance:
     """Test performance endpoints."""
@@ -340,6 +496,75 @@ class TestStressScenarios:
         assert len(result) == 1
         assert "benchmark_return" in result[0]
 
+    def test_batch_stress_universe(self, client):
+        """The portfolio universe is stressed against every historical scenario in one call."""
+        benchmark = get_dataset("benchmark_universe").index[0]
+        response = client.post("/api/stress/batch", json={"default_benchmark": benchmark})
+
+        assert response.status_code == 200
+        result = response.json()["data"]
+        assert len(result["total_return"]) == len(result["scenarios"])
+        assert all(len(row) == len(result["portfolios"]) for row in result["total_return"])
+        assert set(result["benchmarks"]) <= {benchmark}
+
+    def test_batch_stress_unknown_benchmark(self, client, sample_portfolio):
+        """Benchmark names must exist in the benchmark universe."""
+        response = client.post(
+            "/api/stress/batch",
+            json={"universe": None, "portfolios": {"p": sample_portfolio}, "default_benchmark": "nope",
+                  "level": "asset_class"}
+        )
+        assert response.status_code == 400
+
+    def test_stress_contribution_multi_scenario(self, client, sample_portfolio):
+        """Several scenarios return columnar contribution grids."""
+        dates = get_dataset("returns_usd").index
+        scenarios = [
+            {"name": "A", "start": str(dates[0].date()), "end": str(dates[12].date())},
+            {"name": "B", "start": str(dates[-13].date()), "end": str(dates[-1].date())},
+        ]
+        response = client.post(
+            "/api/stress/contribution",
+            json={"portfolio": sample_portfolio, "scenarios": scenarios}
+        )
+
+        assert response.status_code == 200
+        result = response.json()["data"]
+        assert result["scenarios"] == ["A", "B"]
+        assert len(result["drawdown_contribution"]) == 2
+        assert len(result["drawdown_contribution"][0]) == len(result["assets"])
+
+    def test_stress_contribution_requires_dates(self, client, sample_portfolio):
+        """A date range or a scenario list is required."""
+        response = client.post("/api/stress/contribution", json={"portfolio": sample_portfolio})
+        assert response.status_code == 400
+
+    def test_stress_contribution_security_level(self, client):
+        """level=security evaluates instrument portfolios."""
+        instruments = get_dataset("instrument_returns")
+        if instruments.empty:
+            pytest.skip("No instrument returns file")
+        portfolio = {name: 1.0 for name in instruments.columns[:200]}
+        scenarios = [{"name": "Recent", "start": str(instruments.index[-24].date()),
+                      "end": str(instruments.index[-1].date())}]
+
+        response = client.post(
+            "/api/stress/contribution",
+            json={"portfolio": portfolio, "scenarios": scenarios, "level": "security"}
+        )
+
+        assert response.status_code == 200
+        assert len(response.json()["data"]["assets"]) == 200
+
+    def test_stress_contribution_unknown_level(self, client, sample_portfolio):
+        """Unknown levels are rejected."""
+        response = client.post(
+            "/api/stress/contribution",
+            json={"portfolio": sample_portfolio, "scenario_start": "2020-01-01",
+                  "scenario_end": "2020-12-31", "level": "factor"}
+        )
+        assert response.status_code == 400
+
 
 class TestExtendedRiskEndpoints:
     """Test extended risk endpoints."""
@@ -533,6 +758,45 @@ class TestOptimizationEndpoints:
         assert "sharpe_ratio" in result
         assert "weights" in result
 
+    def test_frontier_active_set_solver(self, client):
+        """Frontier can be solved with the active-set backend."""
+        response = client.post("/api/optimization/frontier", json={"n_points": 15, "solver": "active_set"})
+
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert data["solver"] == "active_set"
+        assert data["n_portfolios"] == 15
+
+    def test_frontier_unknown_solver(self, client):
+        """Unknown solvers are rejected before any solve."""
+        for path in ("/api/optimization/frontier", "/api/optimization/optimal-portfolio"):
+            response = client.post(path, json={"solver": "bogus"})
+            assert response.status_code == 400
+
+    def test_frontier_infeasible_caps(self, client):
+        """Caps that cannot sum to 100% are a client error."""
+        response = client.post(
+            "/api/optimization/frontier",
+            json={"custom_assets": ["US Cash", "Global Cash"], "caps_template": "tight", "solver": "cla"}
+        )
+        assert response.status_code == 400
+        assert "infeasible" in response.json()["detail"]
+
+    def test_optimal_portfolio_reuses_cached_frontier(self, client):
+        """Optimal portfolio is picked from the frontier cached by the frontier endpoint."""
+        client.post("/api/optimization/frontier", json={"mode": "core", "caps_template": "tight"})
+        before = client.get("/api/system/caches").json()["data"]["frontier"]
+
+        response = client.post(
+            "/api/optimization/optimal-portfolio",
+            json={"mode": "core", "caps_template": "tight"}
+        )
+        after = client.get("/api/system/caches").json()["data"]["frontier"]
+
+        assert response.status_code == 200
+        assert after["hits"] == before["hits"] + 1
+        assert after["misses"] == before["misses"]
+
     def test_get_optimization_assets(self, client):
         """Test optimization assets endpoint."""
         response = client.get("/api/optimization/assets")
@@ -545,6 +809,172 @@ class TestOptimizationEndpoints:
         assert "count" in data["data"]
 
 
+class TestMonteCarlo:
+    """Test server-side Monte Carlo endpoint."""
+
+    def test_monte_carlo_seeded(self, client):
+        """Seeded runs return identical bands."""
+        body = {
+            "initial_value": 1000000,
+            "annual_return": 0.07,
+            "annual_volatility": 0.12,
+            "quarterly_percent_spending": 0.01,
+            "duration_years": 5,
+            "num_simulations": 2000,
+            "seed": 42,
+            "use_piecewise": True,
+            "return_update1": 0.05,
+            "update1_year": 2030,
+            "start_year": 2028,
+        }
+        first = client.post("/api/simulation/monte-carlo", json=body)
+        second = client.post("/api/simulation/monte-carlo", json=body)
+
+        assert first.status_code == 200
+        result = first.json()["data"]
+        assert len(result["median"]) == 21
+        assert result == second.json()["data"]
+
+    def test_monte_carlo_too_large(self, client):
+        """Requests over the path budget are rejected."""
+        response = client.post(
+            "/api/simulation/monte-carlo",
+            json={"initial_value": 1, "annual_return": 0.05, "annual_volatility": 0.1,
+                  "duration_years": 100, "num_simulations": 10000000}
+        )
+        assert response.status_code == 400
+
+    @pytest.mark.parametrize("endpoint,body", [
+        ("monte-carlo", {"annual_return": 0.05, "annual_volatility": 0.1}),
+        ("multi-asset", {"portfolio": {"GLOBAL": 1.0}}),
+        ("bootstrap", {"portfolio": {"Bitcoin": 1.0}}),
+    ])
+    @pytest.mark.parametrize("sample_paths", [-1, 100000])
+    def test_invalid_sample_paths(self, client, endpoint, body, sample_paths):
+        """Negative or oversized sample_paths are rejected."""
+        response = client.post(
+            f"/api/simulation/{endpoint}",
+            json={**body, "initial_value": 100, "num_simulations": 100, "sample_paths": sample_paths}
+        )
+        assert response.status_code == 400
+        assert "sample_paths" in response.json()["detail"]
+
+    def test_monte_carlo_stream(self, client):
+        """The stream sends progress events and ends with complete."""
+        body = {
+            "initial_value": 1000000,
+            "annual_return": 0.07,
+            "annual_volatility": 0.12,
+            "duration_years": 5,
+            "num_simulations": 60000,
+            "seed": 3,
+        }
+        response = client.post("/api/simulation/monte-carlo/stream", json=body)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [
+            (message.split("\n")[0][len("event: "):], json.loads(message.split("\n")[1][len("data: "):]))
+            for message in response.text.strip().split("\n\n")
+        ]
+        assert [name for name, _ in events] == ["progress", "progress", "complete"]
+        assert events[-1][1]["paths_completed"] == 60000
+        assert len(events[-1][1]["median"]) == 21
+
+    def test_monte_carlo_stream_too_large(self, client):
+        """Path counts over the streaming cap are rejected before streaming."""
+        response = client.post(
+            "/api/simulation/monte-carlo/stream",
+            json={"initial_value": 1, "annual_return": 0.05, "annual_volatility": 0.1,
+                  "num_simulations": 10**9}
+        )
+        assert response.status_code == 400
+
+    def test_monte_carlo_stream_horizon_cap(self, client):
+        """Horizons over the cap are rejected before any chunk is allocated."""
+        response = client.post(
+            "/api/simulation/monte-carlo/stream",
+            json={"initial_value": 1, "annual_return": 0.05, "annual_volatility": 0.1,
+                  "duration_years": 100000, "num_simulations": 1}
+        )
+        assert response.status_code == 400
+        assert "duration_years" in response.json()["detail"]
+
+    def test_multi_asset_seeded(self, client):
+        """Multi-asset runs return bands, shortfall and the normalized weights."""
+        from data_registry import get_dataset
+        assets = get_dataset("cma")["ASSET CLASS"].tolist()[:3]
+        body = {
+            "portfolio": {name: 1.0 for name in assets},
+            "initial_value": 1000000,
+            "quarterly_percent_spending": 0.01,
+            "duration_years": 5,
+            "num_simulations": 1000,
+            "seed": 7,
+        }
+        first = client.post("/api/simulation/multi-asset", json=body)
+        second = client.post("/api/simulation/multi-asset", json=body)
+
+        assert first.status_code == 200
+        result = first.json()["data"]
+        assert len(result["median"]) == 21
+        assert np.isclose(sum(result["weights"]), 1.0)
+        assert len(result["shortfall"]["final_below"]) == 2
+        assert result == second.json()["data"]
+
+    def test_multi_asset_unknown_asset(self, client):
+        """Assets outside the CMA data are a client error."""
+        response = client.post(
+            "/api/simulation/multi-asset",
+            json={"portfolio": {"NOT AN ASSET": 1.0}, "initial_value": 100}
+        )
+        assert response.status_code == 400
+
+    def test_bootstrap_seeded(self, client):
+        """Bootstrap runs are reproducible and report their history."""
+        from data_registry import get_dataset
+        assets = get_dataset("returns_eur").columns[:2].tolist()
+        body = {
+            "portfolio": {assets[0]: 0.5, assets[1]: 0.5},
+            "currency": "eur",
+            "initial_value": 1000000,
+            "duration_years": 4,
+            "num_simulations": 1500,
+            "block_length": 6,
+            "seed": 5,
+        }
+        first = client.post("/api/simulation/bootstrap", json=body)
+        second = client.post("/api/simulation/bootstrap", json=body)
+
+        assert first.status_code == 200
+        result = first.json()["data"]
+        assert result["currency"] == "EUR"
+        assert len(result["median"]) == 17
+        assert result == second.json()["data"]
+
+    def test_bootstrap_invalid_currency(self, client):
+        """Only the loaded return currencies are accepted."""
+        response = client.post(
+            "/api/simulation/bootstrap",
+            json={"portfolio": {"Bitcoin": 1.0}, "currency": "JPY", "initial_value": 100}
+        )
+        assert response.status_code == 400
+
+    def test_bootstrap_path_cap(self, client, monkeypatch):
+        """The bootstrap caps the path count and the horizon separately."""
+        import main
+        monkeypatch.setattr(main, "MAX_STREAM_SIMULATIONS", 1000)
+        body = {"portfolio": {"Bitcoin": 1.0}, "initial_value": 100, "duration_years": 50}
+
+        response = client.post("/api/simulation/bootstrap", json={**body, "num_simulations": 1001})
+        assert response.status_code == 400
+        assert "1000 paths" in response.json()["detail"]
+
+        response = client.post("/api/simulation/bootstrap", json={**body, "num_simulations": 100, "duration_years": 100000})
+        assert response.status_code == 400
+        assert "duration_years" in response.json()["detail"]
+
+
 class TestFileUpload:
     """Test file upload endpoints."""
 
@@ -0,0 +1,157 @@
+"""
+Tests for beta_cache.py
+"""
+
+import os
+
+import pytest
+import pandas as pd
+import numpy as np
+
+import beta_cache
+from beta_cache import (
+    lasso_cache_key,
+    get_lasso_betas,
+    load_persisted_betas,
+    clear_beta_cache,
+    beta_cache_stats,
+)
+
+
+@pytest.fixture
+def lasso_inputs():
+    """Aligned security and factor returns for LASSO fits."""
+    np.random.seed(42)
+    dates = pd.date_range(end="2025-09-30", periods=48, freq='ME')
+
+    fac_returns = pd.DataFrame({
+        "F1": np.random.randn(48) * 0.03,
+        "F2": np.random.randn(48) * 0.04
+    }, index=dates)
+
+    sec_returns = pd.DataFrame({
+        "A": 0.8 * fac_returns["F1"] + np.random.randn(48) * 0.01,
+        "B": -0.5 * fac_returns["F2"] + np.random.randn(48) * 0.01
+    }, index=dates)
+
+    return sec_returns, fac_returns
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    """Start and end every test with an empty in-memory cache."""
+    clear_beta_cache()
+    yield
+    clear_beta_cache()
+
+
+class TestCacheKey:
+    """Test content-hash cache keys."""
+
+    def test_key_is_stable(self, lasso_inputs):
+        """Same data and parameters give the same key."""
+        sec, fac = lasso_inputs
+        assert lasso_cache_key(sec, fac, 12, 5) == lasso_cache_key(sec.copy(), fac.copy(), 12, 5)
+
+    def test_key_changes_with_parameters(self, lasso_inputs):
+        """Fit parameters are part of the key."""
+        sec, fac = lasso_inputs
+        assert lasso_cache_key(sec, fac, 12, 5) != lasso_cache_key(sec, fac, 24, 5)
+        assert lasso_cache_key(sec, fac, 12, 5) != lasso_cache_key(sec, fac, 12, 3)
+
+    def test_key_changes_with_data(self, lasso_inputs):
+        """Any change in the returns invalidates the key."""
+        sec, fac = lasso_inputs
+        changed = sec.copy()
+        changed.iloc[0, 0] += 1e-6
+        assert lasso_cache_key(sec, fac, 12, 5) != lasso_cache_key(changed, fac, 12, 5)
+
+    def test_key_ignores_date_labels(self, lasso_inputs):
+        """Relabelled dates covering the same observations share a key."""
+        sec, fac = lasso_inputs
+        shifted = pd.date_range(end="2026-09-30", periods=len(sec), freq='ME')
+        assert lasso_cache_key(sec, fac) == lasso_cache_key(
+            sec.set_axis(shifted), fac.set_axis(shifted)
+        )
+
+
+class TestGetLassoBetas:
+    """Test cached beta lookups."""
+
+    def test_matches_uncached_fit(self, lasso_inputs, tmp_path):
+        """Cached result equals a direct compute_lasso_betas call."""
+        sec, fac = lasso_inputs
+        betas, residual_var = get_lasso_betas(sec, fac, min_observations=12, cache_dir=tmp_path)
+        expected_betas, expected_resid = beta_cache.compute_lasso_betas(sec, fac, min_observations=12)
+
+        pd.testing.assert_frame_equal(betas, expected_betas)
+        pd.testing.assert_series_equal(residual_var, expected_resid, check_names=False)
+
+    def test_second_call_is_memory_hit(self, lasso_inputs, tmp_path, monkeypatch):
+        """Only the first call fits; the second is served from memory."""
+        sec, fac = lasso_inputs
+        get_lasso_betas(sec, fac, min_observations=12, cache_dir=tmp_path)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("LASSO refit on cache hit")
+
+        monkeypatch.setattr(beta_cache, "compute_lasso_betas", fail)
+        get_lasso_betas(sec, fac, min_observations=12, cache_dir=tmp_path)
+
+        stats = beta_cache_stats()
+        assert stats["misses"] == 1
+        assert stats["hits"] == 1
+
+    def test_persisted_entry_survives_restart(self, lasso_inputs, tmp_path, monkeypatch):
+        """Entries written to disk are reloaded without refitting."""
+        sec, fac = lasso_inputs
+        betas, residual_var = get_lasso_betas(sec, fac, min_observations=12, cache_dir=tmp_path)
+        assert len(list(tmp_path.glob("*.npz"))) == 1
+
+        clear_beta_cache()  # Simulate a fresh process
+        monkeypatch.setattr(beta_cache, "compute_lasso_betas", None)
+
+        assert load_persisted_betas(tmp_path) == 1
+        reloaded_betas, reloaded_resid = get_lasso_betas(sec, fac, min_observations=12, cache_dir=tmp_path)
+
+        np.testing.assert_allclose(reloaded_betas.values, betas.values)
+        np.testing.assert_allclose(reloaded_resid.values, residual_var.values)
+        assert list(reloaded_betas.index) == list(betas.index)
+
+    def test_entries_are_bounded(self, lasso_inputs, tmp_path, monkeypatch):
+        """Only the most recently used fits stay in memory and on disk."""
+        monkeypatch.setattr(beta_cache, "MAX_ENTRIES", 2)
+        sec, fac = lasso_inputs
+        for min_observations in (10, 11, 12):
+            get_lasso_betas(sec, fac, min_observations=min_observations, cache_dir=tmp_path)
+
+        assert beta_cache_stats()["entries"] == 2
+        assert sorted(p.stem for p in tmp_path.glob("*.npz")) == sorted(
+            lasso_cache_key(sec, fac, m, 5) for m in (11, 12)
+        )
+
+    def test_reload_keeps_most_recent(self, lasso_inputs, tmp_path, monkeypatch):
+        """Startup reload loads the newest files only and deletes the rest."""
+        sec, fac = lasso_inputs
+        for min_observations in (10, 11, 12):
+            get_lasso_betas(sec, fac, min_observations=min_observations, cache_dir=tmp_path)
+        for age, min_observations in enumerate((12, 11, 10)):
+            path = tmp_path / f"{lasso_cache_key(sec, fac, min_observations, 5)}.npz"
+            os.utime(path, (1_000_000 - age, 1_000_000 - age))
+
+        clear_beta_cache()
+        monkeypatch.setattr(beta_cache, "MAX_ENTRIES", 2)
+
+        assert load_persisted_betas(tmp_path) == 2
+        assert len(list(tmp_path.glob("*.npz"))) == 2
+        assert list(beta_cache._MEMORY_CACHE) == [lasso_cache_key(sec, fac, m, 5) for m in (11, 12)]
+
+    def test_clear_persisted(self, lasso_inputs, tmp_path):
+        """clear_beta_cache(persisted=True) removes files on disk."""
+        sec, fac = lasso_inputs
+        get_lasso_betas(sec, fac, min_observations=12, cache_dir=tmp_path)
+
+        clear_beta_cache(cache_dir=tmp_path, persisted=True)
+
+        assert list(tmp_path.glob("*.npz")) == []
+        assert beta_cache_stats()["entries"] == 0
@@ -0,0 +1,185 @@
+"""
+Tests for covariance_cache.py
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+
+import covariance_cache
+from covariance_cache import (
+    build_covariance,
+    get_covariance,
+    warm_covariance_cache,
+    clear_covariance_cache,
+    covariance_cache_stats,
+)
+from risk_engine import (
+    calculate_contributions,
+    calculate_pcte,
+    compute_tracking_error,
+    compute_diversification_metrics,
+    calculate_ewma_covariance,
+    slice_covariance,
+)
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    """Start and end every test with an empty cache."""
+    clear_covariance_cache()
+    yield
+    clear_covariance_cache()
+
+
+class TestBuildCovariance:
+    """Test full-universe covariance construction."""
+
+    def test_ewma_matches_risk_engine(self, sample_returns):
+        """EWMA method wraps calculate_ewma_covariance."""
+        cov = build_covariance(sample_returns, method="ewma", decay=0.94)
+        expected = calculate_ewma_covariance(sample_returns, decay=0.94)
+
+        np.testing.assert_allclose(cov.values, expected.values, atol=1e-9)
+
+    def test_result_is_psd(self, sample_returns):
+        """Cached matrices are already PSD-repaired."""
+        cov = build_covariance(sample_returns, method="sample")
+        assert np.all(np.linalg.eigvalsh(cov.values) > 0)
+
+    def test_gaps_use_pairwise_estimate(self, sample_returns):
+        """Returns with missing history still give a finite PSD matrix."""
+        ragged = sample_returns.copy()
+        ragged.iloc[:30, 1] = np.nan
+
+        for method in ("ewma", "sample"):
+            cov = build_covariance(ragged, method=method, shrinkage=0.1)
+            assert np.isfinite(cov.values).all()
+            assert np.all(np.linalg.eigvalsh(cov.values) > 0)
+
+    def test_unknown_method(self, sample_returns):
+        """Unknown methods are rejected."""
+        with pytest.raises(ValueError, match="Unknown covariance method"):
+            build_covariance(sample_returns, method="garch")
+
+
+class TestGetCovariance:
+    """Test cache lookups and invalidation."""
+
+    def test_hit_returns_same_matrix(self, sample_returns):
+        """Second lookup with the same returns object is a hit."""
+        first = get_covariance(sample_returns, "USD", "ewma", 0.94)
+        second = get_covariance(sample_returns, "USD", "ewma", 0.94)
+
+        assert first is second
+        assert covariance_cache_stats() == {"hits": 1, "misses": 1, "updates": 0, "entries": 1}
+
+    def test_key_includes_method_and_decay(self, sample_returns):
+        """Different parameters produce separate entries."""
+        ewma = get_covariance(sample_returns, "USD", "ewma", 0.94)
+        slower = get_covariance(sample_returns, "USD", "ewma", 0.97)
+        sample = get_covariance(sample_returns, "USD", "sample", 0.94)
+
+        assert not np.allclose(ewma.values, slower.values)
+        assert not np.allclose(ewma.values, sample.values)
+        assert covariance_cache_stats()["entries"] == 3
+
+    def test_reloaded_returns_rebuild(self, sample_returns):
+        """A new returns frame for the currency invalidates the entry."""
+        get_covariance(sample_returns, "USD")
+        get_covariance(sample_returns * 2, "USD")
+
+        assert covariance_cache_stats()["misses"] == 2
+
+    def test_appended_periods_roll_ewma_forward(self, sample_returns):
+        """A reload that only appends periods updates EWMA entries in place."""
+        history = sample_returns.iloc[:50]
+        get_covariance(history, "USD", "ewma", 0.94)
+        get_covariance(history, "USD", "ewma", 0.94, shrinkage=0.2)
+        get_covariance(history, "USD", "sample")
+
+        ewma = get_covariance(sample_returns, "USD", "ewma", 0.94)
+        shrunk = get_covariance(sample_returns, "USD", "ewma", 0.94, shrinkage=0.2)
+        get_covariance(sample_returns, "USD", "sample")
+
+        np.testing.assert_allclose(ewma.values, build_covariance(sample_returns, "ewma", 0.94).values, atol=1e-12)
+        np.testing.assert_allclose(
+            shrunk.values, build_covariance(sample_returns, "ewma", 0.94, shrinkage=0.2).values, atol=1e-12
+        )
+        assert covariance_cache_stats()["updates"] == 2
+
+    def test_revised_history_is_rebuilt(self, sample_returns):
+        """Changed past values are not an extension, so the state is reseeded."""
+        get_covariance(sample_returns.iloc[:50], "USD", "ewma")
+        revised = sample_returns.copy()
+        revised.iloc[0, 0] += 0.01
+
+        cov = get_covariance(revised, "USD", "ewma")
+
+        np.testing.assert_allclose(cov.values, build_covariance(revised, "ewma").values, atol=1e-12)
+        assert covariance_cache_stats()["updates"] == 0
+
+    def test_entry_count_is_bounded(self, sample_returns, monkeypatch):
+        """Least recently used entries are evicted."""
+        monkeypatch.setattr(covariance_cache, "MAX_ENTRIES", 2)
+        for decay in (0.90, 0.92, 0.94):
+            get_covariance(sample_returns, "USD", "ewma", decay)
+
+        assert covariance_cache_stats()["entries"] == 2
+
+    def test_warm_cache(self, sample_returns):
+        """Warm-up builds one matrix per currency and method."""
+        built = warm_covariance_cache({"USD": sample_returns, "EUR": sample_returns})
+
+        assert built == 4
+        get_covariance(sample_returns, "EUR", "sample")
+        assert covariance_cache_stats()["hits"] == 1
+
+
+class TestSlicedRiskFunctions:
+    """Risk functions give the same answer from a cached covariance."""
+
+    def test_slice_covariance(self, sample_returns):
+        """Sub-block follows the requested asset order."""
+        cov = build_covariance(sample_returns)
+        block = slice_covariance(cov, ["EM", "GLOBAL"])
+
+        assert list(block.index) == ["EM", "GLOBAL"]
+        assert block.loc["EM", "GLOBAL"] == cov.loc["EM", "GLOBAL"]
+
+        with pytest.raises(KeyError):
+            slice_covariance(cov, ["NOT AN ASSET"])
+
+    def test_contributions(self, sample_returns, sample_portfolio_weights):
+        """PCTR/MCTR match the per-request covariance path."""
+        cov = get_covariance(sample_returns)
+        cached = calculate_contributions(sample_returns, sample_portfolio_weights, cov_matrix=cov)
+        direct = calculate_contributions(sample_returns, sample_portfolio_weights)
+
+        assert np.isclose(cached["portfolio_vol"], direct["portfolio_vol"])
+        for asset, value in direct["pctr"].items():
+            assert np.isclose(cached["pctr"][asset], value)
+
+    def test_tracking_error_and_pcte(self, sample_returns, sample_portfolio_weights, sample_benchmark_weights):
+        """Tracking error and PCTE match the per-request covariance path."""
+        cov = get_covariance(sample_returns)
+
+        te_cached = compute_tracking_error(
+            sample_portfolio_weights, sample_benchmark_weights, sample_returns, cov_matrix=cov
+        )
+        te_direct = compute_tracking_error(sample_portfolio_weights, sample_benchmark_weights, sample_returns)
+        assert np.isclose(te_cached["tracking_error"], te_direct["tracking_error"])
+
+        pcte_cached = calculate_pcte(
+            sample_portfolio_weights, sample_benchmark_weights, sample_returns, cov_matrix=cov
+        )
+        pcte_direct = calculate_pcte(sample_portfolio_weights, sample_benchmark_weights, sample_returns)
+        assert np.isclose(pcte_cached["tracking_error"], pcte_direct["tracking_error"])
+
+    def test_diversification(self, sample_returns, sample_portfolio_weights):
+        """Diversification ratio matches the per-request covariance path."""
+        cov = get_covariance(sample_returns)
+        cached = compute_diversification_metrics(sample_portfolio_weights, sample_returns, cov_matrix=cov)
+        direct = compute_diversification_metrics(sample_portfolio_weights, sample_returns)
+
+        assert np.isclose(cached["diversification_ratio"], direct["diversification_ratio"])
@@ -14,6 +14,12 @@ from data_loader import (
     load_beta_matrix,
     load_factor_covariance,
     load_all_data,
+    load_portfolio_universe,
+    load_factor_returns,
+    load_factor_metadata,
+    load_instrument_returns,
+    align_factor_returns,
+    recent_month_ends,
     _generate_mock_cma_data,
     _generate_mock_correlation_matrix,
     _generate_mock_returns,
@@ -217,6 +223,124 @@ class TestLoadFactorCovariance:
         assert np.allclose(df.values, df.values.T)  # Symmetric
 
 
+class TestFactorReturns:
+    """Test factor returns loading and alignment."""
+
+    def test_parse_day_first_dates(self, tmp_path):
+        """dd/mm/yyyy dates parse to month-ends, sorted, as float64."""
+        file_path = tmp_path / "factor_returns.csv"
+        file_path.write_text(
+            "Date,US_Equity,Rates_US_Long\n"
+            "31/05/2025,0.01,-0.002\n"
+            "30/04/2025,0.02,0.001\n"
+        )
+
+        df = load_factor_returns(file_path=str(file_path))
+
+        assert list(df.index) == [pd.Timestamp("2025-04-30"), pd.Timestamp("2025-05-31")]
+        assert (df.dtypes == np.float64).all()
+        assert df.loc["2025-04-30", "US_Equity"] == 0.02
+
+    def test_missing_files(self):
+        """Missing returns fall back to mock data; missing metadata is empty."""
+        assert not load_factor_returns(file_path="/nonexistent/factor_returns.csv").empty
+        assert load_factor_metadata(file_path="/nonexistent/metadata_factors.csv").empty
+
+    def test_align_by_month(self, sample_factor_returns):
+        """Dated security returns are matched by calendar month."""
+        dates = pd.date_range("2020-01-31", periods=6, freq="ME")
+        factors = sample_factor_returns.iloc[:4].set_axis(dates[1:5] - pd.offsets.BDay(1))
+        securities = pd.DataFrame({"A": np.arange(6.0)}, index=dates)
+
+        aligned = align_factor_returns(factors, securities)
+
+        assert aligned.index.equals(securities.index)
+        assert aligned.iloc[[0, 5]].isna().all().all()
+        np.testing.assert_array_equal(aligned.iloc[1:5].values, factors.values)
+
+    def test_align_generated_dates_by_position(self, sample_factor_returns):
+        """Undated security returns take the most recent factor rows."""
+        securities = pd.DataFrame({"A": np.arange(10.0)}, index=recent_month_ends(10))
+        securities.attrs["generated_dates"] = True
+
+        aligned = align_factor_returns(sample_factor_returns, securities)
+
+        assert aligned.index.equals(securities.index)
+        np.testing.assert_array_equal(aligned.values, sample_factor_returns.values[-10:])
+
+    def test_aligned_matrix_is_contiguous(self, sample_factor_returns, sample_returns):
+        """One C-contiguous block, ordered as in the metadata, in the requested dtype."""
+        metadata = pd.DataFrame(
+            {"Asset Class": ["Rates", "Equity"]},
+            index=pd.Index(["US_Rates", "US_Equity"], name="Factor")
+        )
+
+        aligned = align_factor_returns(
+            sample_factor_returns, sample_returns, metadata, dtype=np.float32
+        )
+
+        assert list(aligned.columns[:2]) == ["US_Rates", "US_Equity"]
+        assert set(aligned.columns) == set(sample_factor_returns.columns)
+        values = aligned.to_numpy()
+        assert values.dtype == np.float32
+        assert values.flags.c_contiguous
+
+
+class TestLoadInstrumentReturns:
+    """Test security-level return loading."""
+
+    def test_short_histories_dropped(self, tmp_path):
+        """Instruments below min_observations are dropped; gaps stay NaN."""
+        dates = pd.date_range("2020-01-31", periods=24, freq="ME")
+        df = pd.DataFrame({
+            "Fund A": np.linspace(-0.02, 0.02, 24),
+            "Fund B": [np.nan] * 12 + [0.01] * 12,
+            "Fund C": [np.nan] * 20 + [0.01] * 4,
+        }, index=dates.strftime("%d/%m/%Y"))
+        file_path = tmp_path / "instruments_returns.csv"
+        df.to_csv(file_path, index_label="Date")
+
+        result = load_instrument_returns(file_path=str(file_path), min_observations=12)
+
+        assert list(result.columns) == ["Fund A", "Fund B"]
+        assert result.index.equals(pd.DatetimeIndex(dates, name="Date"))
+        assert result["Fund B"].isna().sum() == 12
+
+    def test_missing_file(self):
+        """Missing instrument file gives an empty frame."""
+        assert load_instrument_returns(file_path="/nonexistent/instruments.csv").empty
+
+
+class TestLoadPortfolioUniverse:
+    """Test model portfolio universe loading."""
+
+    def test_pivot_long_format(self, tmp_path):
+        """Long (Tier4, Weight, Name) rows become one row per portfolio."""
+        file_path = tmp_path / "universe.csv"
+        pd.DataFrame({
+            "Tier4": ["Fund A", "Fund B", "Fund A", "Fund A"],
+            "Weight": [0.6, 0.4, 0.7, 0.3],
+            "Portfolio Name": ["P1", "P1", "P2", "P2"]
+        }).to_csv(file_path, index=False)
+
+        df = load_portfolio_universe(file_path=str(file_path))
+
+        assert list(df.index) == ["P1", "P2"]
+        assert df.loc["P1", "Fund B"] == 0.4
+        assert df.loc["P2", "Fund B"] == 0.0
+        assert df.loc["P2", "Fund A"] == 1.0  # Duplicate rows summed
+
+    def test_missing_file(self):
+        """Missing universe file gives an empty frame."""
+        df = load_portfolio_universe(file_path="/nonexistent/universe.csv")
+        assert df.empty
+
+    def test_unknown_kind(self):
+        """Only portfolio and benchmark universes exist."""
+        with pytest.raises(ValueError):
+            load_portfolio_universe(kind="fund")
+
+
 class TestLoadAllData:
     """Test loading all data at once."""
 
@@ -0,0 +1,243 @@
+"""
+Tests for data_registry.py
+"""
+
+import os
+import threading
+import time
+
+import pytest
+import pandas as pd
+
+import data_loader
+import data_registry
+import data_store
+from data_registry import (
+    register_dataset,
+    get_dataset,
+    get_datasets,
+    preload_datasets,
+    clear_datasets,
+    dataset_stats,
+    add_swap_listener,
+    reload_datasets,
+    current_snapshot,
+    start_data_watcher,
+    stop_data_watcher,
+)
+
+
+@pytest.fixture
+def counting_loader():
+    """Loader that records how often it runs."""
+    calls = []
+
+    def load():
+        calls.append(1)
+        time.sleep(0.01)
+        return pd.DataFrame({"A": [1.0, 2.0]})
+
+    load.calls = calls
+    return load
+
+
+class TestLazyLoading:
+    """Test on-demand, memoized loads."""
+
+    def test_not_loaded_until_requested(self, counting_loader):
+        """Registering a dataset does not load it."""
+        register_dataset("test_lazy", counting_loader)
+
+        assert counting_loader.calls == []
+        assert dataset_stats()["test_lazy"]["loaded"] is False
+
+    def test_memoized(self, counting_loader):
+        """The same object is returned and the loader runs once."""
+        register_dataset("test_memo", counting_loader)
+
+        first = get_dataset("test_memo")
+        assert get_dataset("test_memo") is first
+        assert len(counting_loader.calls) == 1
+
+    def test_concurrent_first_use_loads_once(self, counting_loader):
+        """Concurrent first calls share a single load."""
+        register_dataset("test_concurrent", counting_loader)
+
+        threads = [threading.Thread(target=get_dataset, args=("test_concurrent",)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(counting_loader.calls) == 1
+
+    def test_clear_reloads(self, counting_loader):
+        """Cleared datasets load again on next use."""
+        register_dataset("test_clear", counting_loader)
+        get_dataset("test_clear")
+        clear_datasets(["test_clear"])
+        get_dataset("test_clear")
+
+        assert len(counting_loader.calls) == 2
+
+    def test_preload(self, counting_loader):
+        """preload_datasets loads ahead of first use."""
+        register_dataset("test_preload", counting_loader)
+        preload_datasets(["test_preload"])
+
+        assert dataset_stats()["test_preload"]["loaded"] is True
+
+    def test_unknown_dataset(self):
+        """Unregistered names raise KeyError."""
+        with pytest.raises(KeyError):
+            get_dataset("no_such_dataset")
+
+
+class TestFallback:
+    """Test mock-data fallback."""
+
+    def test_fallback_on_error(self):
+        """A failing loader falls back and is flagged in the stats."""
+        def broken():
+            raise ValueError("bad file")
+
+        register_dataset("test_broken", broken, lambda: pd.DataFrame({"A": [0.0]}))
+
+        assert list(get_dataset("test_broken").columns) == ["A"]
+        assert dataset_stats()["test_broken"]["fallback"] is True
+
+    def test_no_fallback_raises(self):
+        """Without a fallback the loader's error propagates."""
+        def broken():
+            raise ValueError("bad file")
+
+        register_dataset("test_broken_no_fallback", broken)
+        with pytest.raises(ValueError):
+            get_dataset("test_broken_no_fallback")
+
+
+class TestStats:
+    """Test load timing stats."""
+
+    def test_timings_recorded(self, counting_loader):
+        """Loaded datasets report their load time and shape."""
+        register_dataset("test_timed", counting_loader)
+        get_dataset("test_timed")
+
+        stats = dataset_stats()["test_timed"]
+        assert stats["load_ms"] >= 10
+        assert stats["shape"] == [2, 1]
+
+    def test_service_datasets_registered(self):
+        """The API's datasets are registered, currencies separately."""
+        stats = dataset_stats()
+        for name in ("cma", "correlation", "returns_usd", "returns_eur", "returns_gbp",
+                     "betas", "factor_cov", "portfolio_universe", "benchmark_universe",
+                     "factor_returns", "factor_metadata"):
+            assert name in stats
+
+    def test_factor_returns_share_security_dates(self):
+        """Factor returns come aligned to the USD security returns."""
+        returns, factor_returns = get_datasets("returns_usd", "factor_returns")
+
+        assert factor_returns.index.equals(returns.index)
+        assert factor_returns.to_numpy().flags.c_contiguous
+        assert factor_returns.abs().sum().sum() > 0
+
+
+@pytest.fixture
+def isolated_snapshot(temp_data_dir, tmp_path, monkeypatch):
+    """Empty current snapshot over a temporary DATA_DIR, restored afterwards."""
+    pd.DataFrame({"A": [1.0, 2.0]}).to_csv(temp_data_dir / "cma_data.csv", index=False)
+
+    monkeypatch.setattr(data_loader, "DATA_DIR", temp_data_dir)
+    monkeypatch.setattr(data_store, "STORE_DIR", tmp_path / "store")
+    monkeypatch.setattr(data_registry, "_CURRENT", None)
+    monkeypatch.setattr(data_registry, "_SWAP_LISTENERS", [])
+
+    register_dataset("test_file", lambda: pd.read_csv(data_loader.DATA_DIR / "cma_data.csv"))
+    yield temp_data_dir
+    stop_data_watcher()
+
+
+def _rewrite(path, values):
+    """Rewrite the test file with a guaranteed new mtime."""
+    pd.DataFrame({"A": values}).to_csv(path, index=False)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+class TestHotReload:
+    """Test snapshot swaps when the source files change."""
+
+    def test_unchanged_data_keeps_snapshot(self, isolated_snapshot):
+        """No file change, no swap."""
+        snapshot = current_snapshot()
+        assert reload_datasets() is False
+        assert current_snapshot() is snapshot
+
+    def test_changed_file_swaps_snapshot(self, isolated_snapshot):
+        """A changed file produces a new version with the new data."""
+        old_frame = get_dataset("test_file")
+        old_version = current_snapshot().version
+
+        _rewrite(isolated_snapshot / "cma_data.csv", [5.0, 6.0])
+
+        assert reload_datasets() is True
+        assert current_snapshot().version != old_version
+        assert get_dataset("test_file")["A"].tolist() == [5.0, 6.0]
+        # Frames already handed out are untouched
+        assert old_frame["A"].tolist() == [1.0, 2.0]
+
+    def test_prewarm_loads_before_swap(self, isolated_snapshot):
+        """Datasets loaded in the old snapshot are already loaded in the new one."""
+        get_dataset("test_file")
+        _rewrite(isolated_snapshot / "cma_data.csv", [5.0, 6.0])
+
+        reload_datasets()
+        assert "test_file" in current_snapshot().loaded()
+
+    def test_no_prewarm(self, isolated_snapshot):
+        """prewarm=False swaps in an empty snapshot."""
+        get_dataset("test_file")
+        reload_datasets(force=True, prewarm=False)
+        assert current_snapshot().loaded() == []
+
+    def test_listeners_get_old_and_new(self, isolated_snapshot):
+        """Swap listeners see both snapshots."""
+        seen = []
+        add_swap_listener(lambda old, new: seen.append((old.version, new.version)))
+        old_version = current_snapshot().version
+
+        _rewrite(isolated_snapshot / "cma_data.csv", [5.0, 6.0])
+        reload_datasets()
+
+        assert seen == [(old_version, current_snapshot().version)]
+
+    def test_dependent_dataset_uses_loading_snapshot(self, isolated_snapshot):
+        """Derived datasets read their inputs from the snapshot being filled."""
+        register_dataset("test_derived", lambda: get_dataset("test_file") * 10)
+        get_dataset("test_derived")
+
+        _rewrite(isolated_snapshot / "cma_data.csv", [5.0, 6.0])
+        reload_datasets()
+
+        derived, source = get_datasets("test_derived", "test_file")
+        assert derived["A"].tolist() == [50.0, 60.0]
+        assert source["A"].tolist() == [5.0, 6.0]
+
+    def test_watcher_picks_up_changes(self, isolated_snapshot):
+        """The polling thread swaps snapshots on its own."""
+        old_version = current_snapshot().version
+        assert start_data_watcher(interval=0.02) is True
+
+        _rewrite(isolated_snapshot / "cma_data.csv", [5.0, 6.0])
+        deadline = time.time() + 5
+        while current_snapshot().version == old_version and time.time() < deadline:
+            time.sleep(0.02)
+
+        assert current_snapshot().version != old_version
+
+    def test_watcher_disabled_with_zero_interval(self, isolated_snapshot):
+        """DATA_POLL_SECONDS=0 turns the watcher off."""
+        assert start_data_watcher(interval=0) is False
@@ -0,0 +1,179 @@
+"""
+Tests for data_store.py
+"""
+
+import os
+
+import pytest
+import pandas as pd
+import numpy as np
+from pandas.testing import assert_frame_equal
+
+import data_loader
+import data_store
+from data_loader import (
+    load_cma_data,
+    load_correlation_matrix,
+    load_return_series,
+    load_beta_matrix,
+    load_portfolio_universe,
+    load_factor_returns,
+    load_factor_metadata,
+)
+from data_store import (
+    compile_data_store,
+    open_data_store,
+    get_data_store,
+    clear_data_store_cache,
+)
+
+
+@pytest.fixture
+def store_dirs(temp_data_dir, tmp_path, monkeypatch, sample_cma_data, sample_correlation_matrix,
+               sample_returns, sample_betas, sample_factor_returns):
+    """Data directory with one file per source kind, and an empty store directory."""
+    sample_cma_data.to_csv(temp_data_dir / "cma_data.csv", index=False)
+    sample_correlation_matrix.to_csv(temp_data_dir / "correlation_matrix.csv")
+    # Undated, like the real return_series files
+    sample_returns.to_csv(temp_data_dir / "return_series.csv", index=False)
+
+    cov_dir = temp_data_dir / "Covariance_Matrix"
+    cov_dir.mkdir()
+    sample_betas.to_csv(cov_dir / "betas_2025_09.csv")
+
+    portfolios_dir = temp_data_dir / "Portfolios"
+    portfolios_dir.mkdir()
+    pd.DataFrame({
+        "Tier4": ["Fund A", "Fund B", "Fund A"],
+        "Weight": [0.6, 0.4, 1.0],
+        "Portfolio Name": ["P1", "P1", "P2"]
+    }).to_csv(portfolios_dir / "Portfolio Universe.csv", index=False)
+
+    returns_dir = temp_data_dir / "Returns"
+    returns_dir.mkdir()
+    sample_factor_returns.to_csv(returns_dir / "factor_returns.csv", date_format="%d/%m/%Y")
+    pd.DataFrame({
+        "Factor": list(sample_factor_returns.columns),
+        "Asset Class": ["Equity", "Equity", "Equity", "Rates", "Credit"]
+    }).to_csv(returns_dir / "metadata_factors.csv", index=False)
+
+    store_dir = tmp_path / "store"
+    monkeypatch.setattr(data_loader, "DATA_DIR", temp_data_dir)
+    monkeypatch.setattr(data_store, "STORE_DIR", store_dir)
+    monkeypatch.setattr(data_store, "DATA_STORE_MODE", "auto")
+    return temp_data_dir, store_dir
+
+
+@pytest.fixture(autouse=True)
+def fresh_store_cache():
+    """Every test opens the store itself."""
+    clear_data_store_cache()
+    yield
+    clear_data_store_cache()
+
+
+def _load_all():
+    return [
+        load_cma_data(),
+        load_correlation_matrix(),
+        load_return_series("USD"),
+        load_beta_matrix(),
+        load_portfolio_universe("portfolio"),
+        load_factor_returns(),
+        load_factor_metadata(),
+    ]
+
+
+class TestCompile:
+    """Test compiling and reopening the store."""
+
+    def test_round_trip_matches_csv(self, store_dirs, monkeypatch):
+        """Frames served from the store equal the parsed CSVs."""
+        monkeypatch.setattr(data_store, "DATA_STORE_MODE", "off")
+        parsed = _load_all()
+
+        monkeypatch.setattr(data_store, "DATA_STORE_MODE", "auto")
+        clear_data_store_cache()
+        stored = _load_all()
+
+        assert get_data_store() is not None
+        for expected, actual in zip(parsed, stored):
+            assert_frame_equal(actual, expected)
+
+    def test_undated_returns_get_month_ends(self, store_dirs, sample_returns):
+        """Row labels are regenerated relative to today, not frozen at compile time."""
+        compile_data_store()
+        df = load_return_series("USD")
+
+        assert isinstance(df.index, pd.DatetimeIndex)
+        assert len(df) == len(sample_returns)
+        assert df.index[-1] == data_loader.recent_month_ends(1)[0]
+
+    def test_arrays_are_memory_mapped(self, store_dirs):
+        """Numeric blocks come from a copy-on-write memory map."""
+        compile_data_store()
+        df = load_correlation_matrix()
+
+        base = df.values
+        while base is not None and not isinstance(base, np.memmap):
+            base = base.base
+        assert isinstance(base, np.memmap)
+
+        # Writes stay private to the caller
+        df.iloc[0, 1] = 99.0
+        assert load_correlation_matrix().iloc[0, 1] != 99.0
+
+    def test_version_is_content_addressed(self, store_dirs):
+        """Recompiling unchanged data gives the same version."""
+        data_dir, _ = store_dirs
+        first = compile_data_store()
+
+        os.utime(data_dir / "cma_data.csv")
+        assert compile_data_store().version == first.version
+
+    def test_files_outside_data_dir_are_parsed(self, store_dirs, tmp_path):
+        """Explicit paths outside DATA_DIR never hit the store."""
+        store = compile_data_store()
+        assert store.frame("cma", tmp_path / "elsewhere.csv") is None
+
+
+class TestFreshness:
+    """Test that stale stores are not used."""
+
+    def test_changed_source_invalidates(self, store_dirs):
+        """Editing a source makes the compiled version stale."""
+        data_dir, store_dir = store_dirs
+        compile_data_store()
+        assert open_data_store() is not None
+
+        cma = pd.read_csv(data_dir / "cma_data.csv")
+        cma.loc[0, "RETURN"] = 0.5
+        cma.to_csv(data_dir / "cma_data.csv", index=False)
+
+        assert open_data_store() is None
+        assert load_cma_data().loc[0, "RETURN"] == 0.5
+
+    def test_new_file_invalidates(self, store_dirs, sample_betas):
+        """A new monthly drop makes the store stale."""
+        data_dir, _ = store_dirs
+        compile_data_store()
+
+        (sample_betas * 2).to_csv(data_dir / "Covariance_Matrix" / "betas_2025_10.csv")
+
+        assert open_data_store() is None
+        assert_frame_equal(load_beta_matrix(), sample_betas * 2, check_freq=False)
+
+    def test_readonly_mode_never_compiles(self, store_dirs, monkeypatch):
+        """readonly mode falls back to parsing when no store exists."""
+        _, store_dir = store_dirs
+        monkeypatch.setattr(data_store, "DATA_STORE_MODE", "readonly")
+
+        assert get_data_store() is None
+        assert not load_cma_data().empty
+        assert not store_dir.exists()
+
+    def test_off_mode(self, store_dirs, monkeypatch):
+        """off mode ignores even a fresh store."""
+        compile_data_store()
+        monkeypatch.setattr(data_store, "DATA_STORE_MODE", "off")
+        assert get_data_store() is None
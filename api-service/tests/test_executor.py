@@ -0,0 +1,186 @@
+"""
+Tests for executor.py
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import executor
+from executor import ComputeBusyError, run_compute, process_map, executor_stats
+
+
+def _slow_add(a, b, delay=0.0):
+    time.sleep(delay)
+    return a + b
+
+
+def _fail(delay=0.0):
+    time.sleep(delay)
+    raise ValueError("boom")
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats():
+    """Reset per-endpoint counters around each test."""
+    executor._stats.clear()
+    yield
+    executor._stats.clear()
+
+
+class TestRunCompute:
+    """Test dispatch, limits and load shedding."""
+
+    def test_runs_in_thread_pool(self):
+        """Thread jobs run off the event loop thread."""
+        async def main():
+            loop_thread = threading.get_ident()
+            worker_thread = await run_compute("risk", threading.get_ident)
+            return loop_thread, worker_thread
+
+        loop_thread, worker_thread = asyncio.run(main())
+        assert loop_thread != worker_thread
+
+    def test_passes_arguments(self):
+        """Positional and keyword arguments reach the function."""
+        assert asyncio.run(run_compute("risk", _slow_add, 2, b=3)) == 5
+
+    def test_process_pool(self):
+        """Process jobs return picklable results."""
+        result = asyncio.run(run_compute("frontier", _slow_add, 1, 2, kind="process"))
+        assert result == 3
+
+    def test_event_loop_stays_responsive(self):
+        """A slow job does not block other coroutines."""
+        async def main():
+            job = asyncio.ensure_future(run_compute("risk", _slow_add, 1, 1, delay=0.3))
+            start = time.perf_counter()
+            await asyncio.sleep(0.01)
+            elapsed = time.perf_counter() - start
+            await job
+            return elapsed
+
+        assert asyncio.run(main()) < 0.2
+
+    def test_endpoint_limit(self, monkeypatch):
+        """No more than the endpoint limit run at once."""
+        monkeypatch.setitem(executor.ENDPOINT_LIMITS, "limited", 2)
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def job():
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.pop()
+
+        async def main():
+            await asyncio.gather(*[run_compute("limited", job) for _ in range(6)])
+
+        asyncio.run(main())
+        assert max(peak) == 2
+
+    def test_queue_full_rejects(self, monkeypatch):
+        """Calls beyond the queue depth raise ComputeBusyError."""
+        monkeypatch.setattr(executor, "MAX_QUEUE_DEPTH", 1)
+
+        async def main():
+            first = asyncio.ensure_future(run_compute("risk", _slow_add, 1, 1, delay=0.2))
+            await asyncio.sleep(0.01)
+            with pytest.raises(ComputeBusyError):
+                await run_compute("risk", _slow_add, 1, 1)
+            return await first
+
+        assert asyncio.run(main()) == 2
+        assert executor_stats()["endpoints"]["risk"]["rejected"] == 1
+        assert executor_stats()["in_flight"] == 0
+
+    def test_errors_propagate(self):
+        """Exceptions from the job surface to the caller and are counted."""
+        with pytest.raises(ValueError, match="boom"):
+            asyncio.run(run_compute("risk", _fail))
+
+        assert executor_stats()["endpoints"]["risk"]["failed"] == 1
+
+    def test_failures_not_timed(self):
+        """Failed calls do not count towards avg_ms."""
+        asyncio.run(run_compute("risk", _slow_add, 1, 1))
+        with pytest.raises(ValueError):
+            asyncio.run(run_compute("risk", _fail, delay=0.3))
+
+        stats = executor_stats()["endpoints"]["risk"]
+        assert stats["failed"] == 1
+        assert stats["avg_ms"] == stats["max_ms"] < 300
+
+    def test_inline_mode(self, monkeypatch):
+        """Inline mode runs on the calling thread."""
+        monkeypatch.setattr(executor, "EXECUTOR_MODE", "inline")
+
+        async def main():
+            return threading.get_ident(), await run_compute("risk", threading.get_ident)
+
+        loop_thread, worker_thread = asyncio.run(main())
+        assert loop_thread == worker_thread
+
+
+class TestProcessMap:
+    """Test fanning work out to the process pool."""
+
+    def test_results_in_order(self):
+        """Results come back in argument order."""
+        assert list(process_map(_slow_add, [1, 2, 3], [10, 20, 30])) == [11, 22, 33]
+
+    def test_inline_mode(self, monkeypatch):
+        """Inline mode maps on the calling thread."""
+        monkeypatch.setattr(executor, "EXECUTOR_MODE", "inline")
+        assert list(process_map(_slow_add, [1, 2], [3, 4])) == [4, 6]
+
+    def test_bounded_submission(self, monkeypatch):
+        """Only max_pending calls are submitted ahead of the consumer."""
+        pool = executor._get_pool("process")
+        submitted = []
+        original = pool.submit
+
+        def counting_submit(fn, *args):
+            submitted.append(args)
+            return original(fn, *args)
+
+        monkeypatch.setattr(pool, "submit", counting_submit)
+        results = process_map(_slow_add, range(10), range(10), max_pending=3)
+
+        assert next(results) == 0
+        assert len(submitted) == 4
+        assert list(results) == [2 * i for i in range(1, 10)]
+        assert len(submitted) == 10
+
+
+class TestExecutorEndpoints:
+    """Test the API side of the executor."""
+
+    def test_busy_maps_to_503(self, monkeypatch):
+        """A full queue returns 503 with Retry-After."""
+        from main import app
+
+        monkeypatch.setattr(executor, "MAX_QUEUE_DEPTH", 0)
+        client = TestClient(app)
+        assets = client.get("/assets").json()["assets"][:2]
+
+        response = client.post("/api/risk/contributions", json={"portfolio": {a: 0.5 for a in assets}})
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+
+    def test_stats_endpoint(self):
+        """Executor stats are exposed."""
+        from main import app
+
+        response = TestClient(app).get("/api/system/executor")
+
+        assert response.status_code == 200
+        assert "limits" in response.json()["data"]
@@ -0,0 +1,119 @@
+"""
+Tests for frontier_cache.py
+"""
+
+import asyncio
+
+import pytest
+import numpy as np
+
+import frontier_cache
+from frontier_cache import (
+    frontier_cache_key,
+    get_frontier,
+    warm_start_for,
+    clear_frontier_cache,
+    frontier_cache_stats,
+)
+from optimization_engine import compute_efficient_frontier, find_optimal_portfolio
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    """Start and end every test with an empty cache."""
+    clear_frontier_cache()
+    yield
+    clear_frontier_cache()
+
+
+class TestFrontierCacheKey:
+    """Test key construction."""
+
+    def test_custom_assets_order_and_case(self, sample_cma_data, sample_correlation_matrix):
+        """Custom asset lists are normalized."""
+        a = frontier_cache_key(sample_cma_data, sample_correlation_matrix, custom_assets=["EM", "global"])
+        b = frontier_cache_key(sample_cma_data, sample_correlation_matrix, custom_assets=["GLOBAL", "em"])
+        assert a == b
+
+    def test_data_version_changes_with_content(self, sample_cma_data, sample_correlation_matrix):
+        """Edited CMA data produces a different key."""
+        before = frontier_cache_key(sample_cma_data, sample_correlation_matrix)
+
+        edited = sample_cma_data.copy()
+        edited.loc[0, "RETURN"] = 0.03
+        after = frontier_cache_key(edited, sample_correlation_matrix)
+
+        assert before != after
+
+    def test_lambdas_override_n_points(self, sample_cma_data, sample_correlation_matrix):
+        """Explicit lambdas are part of the key."""
+        lambdas = np.geomspace(0.1, 200.0, 5)
+        key = frontier_cache_key(sample_cma_data, sample_correlation_matrix, n_points=30, lambdas=lambdas)
+
+        assert key[3] == 5
+        assert key[4] == tuple(lambdas)
+
+
+class TestGetFrontier:
+    """Test cached lookups."""
+
+    def test_matches_direct_computation(self, sample_cma_data, sample_correlation_matrix):
+        """Cached frontier equals a fresh compute_efficient_frontier call."""
+        cached = asyncio.run(get_frontier(sample_cma_data, sample_correlation_matrix, n_points=10))
+        direct = compute_efficient_frontier(sample_cma_data, sample_correlation_matrix, n_points=10)
+
+        np.testing.assert_allclose(cached["risks"], direct["risks"], atol=1e-6)
+        np.testing.assert_allclose(cached["returns"], direct["returns"], atol=1e-6)
+
+    def test_second_call_is_hit(self, sample_cma_data, sample_correlation_matrix):
+        """Repeated requests are served from memory."""
+        first = asyncio.run(get_frontier(sample_cma_data, sample_correlation_matrix, n_points=10))
+        second = asyncio.run(get_frontier(sample_cma_data, sample_correlation_matrix, n_points=10))
+
+        assert first is second
+        stats = frontier_cache_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_lru_eviction(self, sample_cma_data, sample_correlation_matrix, monkeypatch):
+        """Least recently used frontiers are evicted."""
+        monkeypatch.setattr(frontier_cache, "MAX_ENTRIES", 2)
+        for n_points in (5, 6, 7):
+            asyncio.run(get_frontier(sample_cma_data, sample_correlation_matrix, n_points=n_points))
+
+        assert frontier_cache_stats()["entries"] == 2
+
+    def test_warm_start_from_same_universe(self, sample_cma_data, sample_correlation_matrix):
+        """A miss can seed its first solve from a cached frontier over the same assets."""
+        key = frontier_cache_key(sample_cma_data, sample_correlation_matrix, n_points=12)
+        assert warm_start_for(key) is None
+
+        cached = asyncio.run(get_frontier(sample_cma_data, sample_correlation_matrix, n_points=10))
+        x0 = warm_start_for(key)
+
+        assert len(x0) == len(cached["assets"])
+        assert np.isclose(x0.sum(), 1.0)
+
+    def test_optimal_portfolio_from_cached_frontier(self, sample_cma_data, sample_correlation_matrix):
+        """Optimal portfolio selection works on a cached frontier."""
+        frontier = asyncio.run(get_frontier(sample_cma_data, sample_correlation_matrix, n_points=10))
+        result = find_optimal_portfolio(frontier["risks"], frontier["returns"], frontier["weights"])
+
+        assert result["selection_method"] == "max_sharpe"
+        assert frontier_cache_stats()["entries"] == 1
+
+    def test_custom_solve_called_on_miss_only(self, sample_cma_data, sample_correlation_matrix):
+        """The solve coroutine runs for a miss and is skipped on a hit."""
+        calls = []
+
+        async def solve(**kwargs):
+            calls.append(kwargs)
+            return compute_efficient_frontier(**kwargs)
+
+        first = asyncio.run(get_frontier(sample_cma_data, sample_correlation_matrix, n_points=10, solve=solve))
+        second = asyncio.run(get_frontier(sample_cma_data, sample_correlation_matrix, n_points=10, solve=solve))
+
+        assert first is second
+        assert len(calls) == 1
+        assert calls[0]["n_points"] == 10 and calls[0]["x0"] is None
@@ -18,6 +18,10 @@ from optimization_engine import (
     ensure_psd,
     mean_cov_from_assets,
     qp_solver,
+    linear_constraints,
+    feasible_point,
+    critical_line,
+    interpolate_frontier,
     compute_efficient_frontier,
     calculate_blended_benchmark,
     detect_inefficiencies,
@@ -238,6 +242,18 @@ class TestMeanCovarianceParameters:
         assert len(mu) == len(sample_cma_data)
         assert Sigma.shape[0] == len(sample_cma_data)
 
+        # Unmatched assets keep their own variance
+        np.testing.assert_allclose(np.diag(Sigma), sample_cma_data["RISK"].values ** 2, rtol=1e-6)
+
+    def test_mean_cov_matches_names_case_insensitively(self, sample_cma_data, sample_correlation_matrix):
+        """Mixed-case correlation labels (as in the real file) are matched."""
+        mixed = sample_correlation_matrix.rename(index=str.title, columns=str.title)
+
+        _, Sigma_upper, _ = mean_cov_from_assets(sample_cma_data, sample_correlation_matrix)
+        _, Sigma_mixed, _ = mean_cov_from_assets(sample_cma_data, mixed)
+
+        np.testing.assert_allclose(Sigma_mixed, Sigma_upper)
+
 
 class TestQPSolver:
     """Test quadratic programming solver."""
@@ -294,6 +310,158 @@ class TestQPSolver:
             assert weights[0] + weights[1] >= 0.39  # Allow small tolerance
 
 
+class TestActiveSetSolver:
+    """Test the active-set QP backend."""
+
+    @pytest.fixture
+    def problem(self):
+        """Four-asset problem with a binding bucket and a binding cap."""
+        mu = np.array([0.08, 0.10, 0.05, 0.06])
+        vols = np.array([0.16, 0.22, 0.06, 0.10])
+        corr = np.full((4, 4), 0.3) + np.eye(4) * 0.7
+        Sigma = np.outer(vols, vols) * corr
+        bounds = [(0.0, 1.0), (0.0, 0.3), (0.0, 1.0), (0.0, 1.0)]
+        bucket_env = [(np.array([2, 3]), 0.4, 1.0)]
+        return mu, Sigma, bounds, bucket_env
+
+    def test_linear_constraints_layout(self, problem):
+        """Bounds and buckets are stacked as C @ w >= d."""
+        _, _, bounds, bucket_env = problem
+        C, d = linear_constraints(bounds, bucket_env)
+
+        assert C.shape == (10, 4)
+        assert d[5] == -0.3
+        np.testing.assert_array_equal(C[8], [0, 0, 1, 1])
+        assert d[8] == 0.4 and d[9] == -1.0
+
+    def test_feasible_point(self, problem):
+        """Phase-1 LP finds a point satisfying every constraint."""
+        _, _, bounds, bucket_env = problem
+        C, d = linear_constraints(bounds, bucket_env)
+        x = feasible_point(C, d)
+
+        assert np.isclose(x.sum(), 1.0)
+        assert np.all(C @ x - d >= -1e-9)
+
+    def test_infeasible_constraints(self):
+        """Caps that cannot reach a fully invested portfolio are reported."""
+        solver = qp_solver(np.array([0.05, 0.06]), np.eye(2) * 0.01, [(0.0, 0.3), (0.0, 0.3)], backend="active_set")
+        result = solver(1.0)
+
+        assert not result.success
+
+    @pytest.mark.parametrize("lmbd", [0.1, 1.0, 10.0, 200.0])
+    def test_matches_or_beats_slsqp(self, problem, lmbd):
+        """Active-set solution is feasible and at least as good as SLSQP."""
+        mu, Sigma, bounds, bucket_env = problem
+        exact = qp_solver(mu, Sigma, bounds, bucket_env, backend="active_set")(lmbd)
+        slsqp = qp_solver(mu, Sigma, bounds, bucket_env)(lmbd)
+
+        C, d = linear_constraints(bounds, bucket_env)
+        assert exact.success
+        assert np.isclose(exact.x.sum(), 1.0)
+        assert np.all(C @ exact.x - d >= -1e-9)
+        assert exact.fun <= slsqp.fun + 1e-9
+
+    def test_kkt_conditions(self, problem):
+        """Gradient is balanced by non-negative multipliers on the active set."""
+        mu, Sigma, bounds, bucket_env = problem
+        lmbd = 5.0
+        result = qp_solver(mu, Sigma, bounds, bucket_env, backend="active_set")(lmbd)
+
+        C, _ = linear_constraints(bounds, bucket_env)
+        A = np.vstack([np.ones(4), C[result.active]]).T
+        grad = 2 * lmbd * Sigma @ result.x - mu
+        multipliers = np.linalg.lstsq(A, grad, rcond=None)[0]
+
+        np.testing.assert_allclose(A @ multipliers, grad, atol=1e-10)
+        assert np.all(multipliers[1:] >= -1e-10)
+
+    def test_unknown_backend(self, problem):
+        """Unknown backends are rejected."""
+        mu, Sigma, bounds, _ = problem
+        with pytest.raises(ValueError, match="Unknown QP backend"):
+            qp_solver(mu, Sigma, bounds, backend="cvxopt")
+
+    def test_frontier_has_no_failed_points(self, sample_cma_data, sample_correlation_matrix):
+        """Every lambda of the sweep produces a frontier point."""
+        result = compute_efficient_frontier(
+            cma_data=sample_cma_data,
+            correlation_matrix=sample_correlation_matrix,
+            n_points=25,
+            solver="active_set"
+        )
+
+        assert result["n_portfolios"] == 25
+        assert result["solver"] == "active_set"
+        assert np.all(np.diff(result["risks"]) <= 1e-10)
+
+
+class TestCriticalLine:
+    """Test the Critical Line Algorithm frontier."""
+
+    @pytest.fixture
+    def problem(self, sample_cma_data, sample_correlation_matrix):
+        """Sample universe with caps and buckets."""
+        mu, Sigma, _ = mean_cov_from_assets(sample_cma_data, sample_correlation_matrix)
+        bounds = caps_from_template(sample_cma_data, "tight")
+        return mu, Sigma, bounds, build_bucket_env(sample_cma_data)
+
+    def test_corners_are_optimal(self, problem):
+        """Each corner matches the exact QP solution at its risk aversion."""
+        mu, Sigma, bounds, bucket_env = problem
+        ts, corners = critical_line(mu, Sigma, bounds, bucket_env)
+        solver = qp_solver(mu, Sigma, bounds, bucket_env, backend="active_set")
+
+        for t, w in zip(ts[1:], corners[1:]):
+            np.testing.assert_allclose(w, solver(1.0 / (2.0 * t)).x, atol=1e-8)
+
+    def test_corners_span_min_variance_to_max_return(self, problem):
+        """Path runs from the minimum-variance to the maximum-return portfolio."""
+        mu, Sigma, bounds, bucket_env = problem
+        ts, corners = critical_line(mu, Sigma, bounds, bucket_env)
+
+        assert ts[0] == 0.0
+        assert np.all(np.diff(corners @ mu) > 0)
+
+        # Max return with tight caps: fill the highest-return assets to 25%
+        best = np.sort(mu)[::-1][:4] @ np.array([0.25, 0.25, 0.25, 0.25])
+        assert np.isclose(corners[-1] @ mu, best)
+
+    def test_interpolation_is_exact(self, problem):
+        """Points between corners are efficient portfolios."""
+        mu, Sigma, bounds, bucket_env = problem
+        ts, corners = critical_line(mu, Sigma, bounds, bucket_env)
+
+        # Midpoint in t of the second segment maps to the midpoint in return
+        t_mid = 0.5 * (ts[1] + ts[2])
+        target = 0.5 * (corners[1] @ mu + corners[2] @ mu)
+        w = interpolate_frontier(corners, mu, np.array([target]))[0]
+
+        exact = qp_solver(mu, Sigma, bounds, bucket_env, backend="active_set")(1.0 / (2.0 * t_mid)).x
+        np.testing.assert_allclose(w, exact, atol=1e-8)
+
+    def test_cla_frontier(self, sample_cma_data, sample_correlation_matrix):
+        """Dense CLA frontier has exactly n_points, ordered like the lambda sweep."""
+        result = compute_efficient_frontier(
+            cma_data=sample_cma_data,
+            correlation_matrix=sample_correlation_matrix,
+            n_points=500,
+            solver="cla"
+        )
+
+        assert result["n_portfolios"] == 500
+        assert np.all(np.diff(result["returns"]) < 0)
+        assert np.all(np.diff(result["risks"]) <= 1e-12)
+        assert result["returns"][0] == pytest.approx(result["corners"]["returns"][0])
+        assert result["returns"][-1] == pytest.approx(result["corners"]["returns"][-1])
+
+    def test_infeasible_constraints(self):
+        """Infeasible caps raise."""
+        with pytest.raises(ValueError, match="infeasible"):
+            critical_line(np.array([0.05, 0.06]), np.eye(2) * 0.01, [(0.0, 0.3), (0.0, 0.3)])
+
+
 class TestEfficientFrontier:
     """Test efficient frontier computation."""
 
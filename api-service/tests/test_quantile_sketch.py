@@ -0,0 +1,71 @@
+"""
+Tests for quantile_sketch.py
+"""
+
+import pytest
+import numpy as np
+
+from quantile_sketch import TDigestBank
+
+
+class TestTDigestBank:
+    """Test the per-series t-digests."""
+
+    def test_small_batch_is_exact(self):
+        """With fewer observations than centroids the digest matches np.percentile."""
+        values = np.random.default_rng(0).normal(size=(3, 40))
+        bank = TDigestBank(3)
+        bank.update(values.copy())
+
+        percentiles = [0, 5, 37.5, 50, 95, 100]
+        assert np.allclose(bank.quantiles(percentiles), np.percentile(values, percentiles, axis=1))
+
+    def test_streamed_batches_are_accurate(self):
+        """Estimates over many batches stay within a small rank error."""
+        rng = np.random.default_rng(1)
+        bank = TDigestBank(2, compression=200)
+        batches = [np.exp(rng.normal(size=(2, 5000))) for _ in range(20)]
+        for batch in batches:
+            bank.update(batch.copy())
+        values = np.concatenate(batches, axis=1)
+
+        percentiles = [1, 5, 25, 50, 75, 95, 99]
+        estimates = bank.quantiles(percentiles)
+        for row in range(2):
+            ranks = np.mean(values[row][:, None] < estimates[:, row], axis=0)
+            assert np.all(np.abs(ranks - np.array(percentiles) / 100) < 0.002)
+
+    def test_memory_is_bounded(self):
+        """The centroid arrays do not grow with the number of observations."""
+        rng = np.random.default_rng(2)
+        bank = TDigestBank(4, compression=100)
+        for _ in range(10):
+            bank.update(rng.random((4, 3000)))
+
+        assert bank.count == 30000
+        assert bank.means.shape == (4, bank.n_centroids)
+        assert np.isclose(bank.weights.sum(axis=1), 30000).all()
+
+    def test_extremes_are_exact(self):
+        """The 0th and 100th percentiles are the observed minimum and maximum."""
+        rng = np.random.default_rng(3)
+        bank = TDigestBank(1, compression=50)
+        values = rng.normal(size=(1, 10000))
+        bank.update(values[:, :6000].copy())
+        bank.update(values[:, 6000:].copy())
+
+        low, high = bank.quantiles([0, 100])[:, 0]
+        assert low == values.min()
+        assert high == values.max()
+
+    def test_constant_series(self):
+        """A series of identical values reports that value everywhere."""
+        bank = TDigestBank(1)
+        bank.update(np.zeros((1, 1000)))
+        bank.update(np.zeros((1, 1000)))
+
+        assert np.all(bank.quantiles([5, 50, 95]) == 0)
+
+    def test_empty_bank(self):
+        """Without observations every estimate is NaN."""
+        assert np.isnan(TDigestBank(2).quantiles([50])).all()
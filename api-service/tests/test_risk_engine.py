@@ -13,13 +13,23 @@ from risk_engine import (
     compute_full_risk_decomposition,
     calculate_segment_tracking_error,
     calculate_ewma_covariance,
+    ewma_weights,
+    ewma_cov_kernel,
+    EWMACovarianceState,
     ensure_psd,
+    pairwise_covariance,
+    factor_model_arrays,
+    factor_cov_product,
+    factor_residual_variance,
     calculate_contributions,
     compute_lasso_betas,
     compute_factor_risk_decomposition,
     compute_tracking_error,
     compute_performance_stats,
     compute_diversification_metrics,
+    calculate_batch_contributions,
+    diversification_from_cov,
+    calculate_rolling_risk,
 )
 
 
@@ -328,6 +338,71 @@ class TestEWMACovariance:
         expected = returns.cov()
         pd.testing.assert_frame_equal(result, expected)
 
+    def test_ewma_weights_cached_and_normalized(self):
+        """Weights sum to one, favour recent data and are memoized."""
+        weights = ewma_weights(60, 0.94)
+
+        assert np.isclose(weights.sum(), 1.0)
+        assert np.all(np.diff(weights) > 0)
+        assert ewma_weights(60, 0.94) is weights
+        assert not weights.flags.writeable
+
+    def test_kernel_matches_reference_formula(self, sample_returns):
+        """NumPy kernel reproduces the weighted pandas formulation."""
+        decay = 0.94
+        n_obs = len(sample_returns)
+        weights = np.array([(1 - decay) * (decay ** i) for i in range(n_obs)])[::-1]
+        weights = weights / weights.sum()
+        centered = sample_returns - sample_returns.mean()
+        weighted = centered.multiply(np.sqrt(weights), axis=0)
+        expected = weighted.T @ weighted
+
+        result = ewma_cov_kernel(sample_returns.values, decay)
+
+        assert isinstance(result, np.ndarray)
+        np.testing.assert_allclose(result, expected.values, rtol=1e-10)
+
+    def test_shrinkage_uses_same_kernel(self, sample_returns):
+        """Zero shrinkage equals the plain EWMA covariance."""
+        plain = calculate_ewma_covariance(sample_returns, decay=0.9)
+        unshrunk = ewma_shrinkage_cov(sample_returns, lambda_=0.9, shrink_alpha=0.0)
+
+        pd.testing.assert_frame_equal(plain, unshrunk)
+
+
+class TestEWMACovarianceState:
+    """Test streaming EWMA covariance updates."""
+
+    def test_seeded_state_matches_kernel(self, sample_returns):
+        """A fresh state reproduces the batch covariance."""
+        state = EWMACovarianceState.from_returns(sample_returns.values, 0.94)
+
+        np.testing.assert_allclose(state.covariance(), ewma_cov_kernel(sample_returns.values, 0.94), atol=1e-14)
+        np.testing.assert_allclose(state.mean, sample_returns.values.mean(axis=0))
+
+    def test_rank_one_updates_match_full_rebuild(self, sample_returns):
+        """Rolling forward one period at a time equals recomputing over the full history."""
+        X = sample_returns.values
+        state = EWMACovarianceState.from_covariance(
+            calculate_ewma_covariance(sample_returns.iloc[:40], decay=0.94).values, X[:40], 0.94
+        )
+        for row in X[40:]:
+            state.update(row)
+
+        assert state.n_obs == len(X)
+        np.testing.assert_allclose(state.covariance(), ewma_cov_kernel(X, 0.94), atol=1e-14)
+
+    def test_block_update_matches_row_updates(self, sample_returns):
+        """Several periods at once equal the same periods one by one."""
+        X = sample_returns.values
+        by_row = EWMACovarianceState.from_returns(X[:30], 0.9)
+        by_block = EWMACovarianceState.from_returns(X[:30], 0.9)
+        for row in X[30:]:
+            by_row.update(row)
+        by_block.update(X[30:])
+
+        np.testing.assert_allclose(by_block.covariance(), by_row.covariance(), atol=1e-14)
+
 
 class TestEnsurePSD:
     """Test PSD repair function."""
@@ -357,6 +432,132 @@ class TestEnsurePSD:
         assert (eigenvalues >= 0).all()
 
 
+class TestPairwiseCovariance:
+    """Test the masked pairwise-complete covariance."""
+
+    @pytest.fixture
+    def ragged_returns(self, sample_returns):
+        """Returns with random gaps and one short history."""
+        rng = np.random.default_rng(7)
+        ragged = sample_returns.mask(rng.random(sample_returns.shape) < 0.2)
+        ragged.iloc[:50, 0] = np.nan  # 10 observations left
+        return ragged
+
+    def test_complete_data_matches_standard_estimates(self, sample_returns):
+        """Without gaps: sample equals .cov(), EWMA equals the kernel."""
+        np.testing.assert_allclose(
+            pairwise_covariance(sample_returns).values, sample_returns.cov().values, atol=1e-12
+        )
+        np.testing.assert_allclose(
+            pairwise_covariance(sample_returns, method="ewma", decay=0.9).values,
+            calculate_ewma_covariance(sample_returns, decay=0.9).values,
+            atol=1e-12
+        )
+
+    def test_matches_pandas_pairwise(self, ragged_returns):
+        """Gaps are handled like pandas' pairwise-complete .cov()."""
+        result = pairwise_covariance(ragged_returns, min_periods=5, block_size=2)
+        # pandas leaves too-short pairs NaN; here they are uncorrelated
+        expected = ragged_returns.cov(min_periods=5).fillna(0.0)
+
+        np.testing.assert_allclose(result.values, expected.values, atol=1e-12)
+
+    def test_short_overlap_is_uncorrelated(self, ragged_returns):
+        """Pairs below min_periods get zero covariance; variances are kept."""
+        result = pairwise_covariance(ragged_returns, min_periods=12)
+
+        assert (result.iloc[0, 1:] == 0).all()
+        assert np.isclose(result.iloc[0, 0], ragged_returns.iloc[:, 0].var())
+
+    def test_block_size_does_not_change_result(self, ragged_returns):
+        """Blocking only bounds memory."""
+        np.testing.assert_allclose(
+            pairwise_covariance(ragged_returns, method="ewma", block_size=1).values,
+            pairwise_covariance(ragged_returns, method="ewma", block_size=256).values
+        )
+
+    def test_contributions_on_ragged_returns(self, ragged_returns, sample_portfolio_weights):
+        """Risk functions accept security-level returns with gaps."""
+        result = calculate_contributions(ragged_returns, sample_portfolio_weights)
+
+        assert np.isfinite(result["portfolio_vol"]) and result["portfolio_vol"] > 0
+        assert np.isclose(sum(result["pctr"].values()), 1.0)
+
+
+class TestFactorModel:
+    """Test the factor-model covariance path (B F B' + diag(eps))."""
+
+    @pytest.fixture
+    def residual_var(self, sample_betas):
+        return pd.Series(np.linspace(1e-4, 5e-4, len(sample_betas)), index=sample_betas.index)
+
+    @pytest.fixture
+    def full_cov(self, sample_betas, sample_factor_cov, residual_var):
+        """The N x N matrix the factor path avoids building."""
+        B, F, eps = factor_model_arrays(sample_betas.index, sample_betas, sample_factor_cov, residual_var)
+        return pd.DataFrame(B @ F @ B.T + np.diag(eps), index=sample_betas.index, columns=sample_betas.index)
+
+    def test_product_matches_full_matrix(self, sample_betas, sample_factor_cov, residual_var, full_cov):
+        """Sigma @ w without Sigma, for one portfolio or a stack."""
+        B, F, eps = factor_model_arrays(sample_betas.index, sample_betas, sample_factor_cov, residual_var)
+        W = np.random.default_rng(1).random((3, len(B)))
+
+        np.testing.assert_allclose(factor_cov_product(W, B, F, eps), W @ full_cov.values)
+        np.testing.assert_allclose(factor_cov_product(W[0], B, F, eps), full_cov.values @ W[0])
+
+    def test_contributions_match_full_matrix(
+        self, sample_betas, sample_factor_cov, residual_var, full_cov, sample_portfolio_weights
+    ):
+        """calculate_contributions gives the same answer either way."""
+        factor = calculate_contributions(
+            None, sample_portfolio_weights,
+            betas=sample_betas, factor_cov=sample_factor_cov, residual_var=residual_var
+        )
+        dense = calculate_contributions(
+            pd.DataFrame(columns=full_cov.columns), sample_portfolio_weights, cov_matrix=full_cov
+        )
+
+        assert np.isclose(factor["portfolio_vol"], dense["portfolio_vol"])
+        for asset, value in dense["pctr"].items():
+            assert np.isclose(factor["pctr"][asset], value)
+
+    def test_tracking_error_matches_full_matrix(
+        self, sample_betas, sample_factor_cov, residual_var, full_cov,
+        sample_portfolio_weights, sample_benchmark_weights
+    ):
+        """compute_tracking_error and calculate_pcte agree with the dense path."""
+        kwargs = dict(portfolio_weights=sample_portfolio_weights, benchmark_weights=sample_benchmark_weights)
+        model = dict(betas=sample_betas, factor_cov=sample_factor_cov, residual_var=residual_var)
+        returns = pd.DataFrame(columns=full_cov.columns)
+
+        te = compute_tracking_error(returns=None, **kwargs, **model)
+        te_dense = compute_tracking_error(returns=returns, cov_matrix=full_cov, **kwargs)
+        assert np.isclose(te["tracking_error"], te_dense["tracking_error"])
+
+        pcte = calculate_pcte(returns=None, **kwargs, **model)
+        pcte_dense = calculate_pcte(returns=returns, cov_matrix=full_cov, **kwargs)
+        assert np.isclose(pcte["tracking_error"], pcte_dense["tracking_error"])
+
+    def test_residual_variance_recovered(self, sample_factor_returns):
+        """Residual variance of r = B f + e is the variance of e."""
+        rng = np.random.default_rng(3)
+        betas = pd.DataFrame(
+            rng.normal(0, 0.5, (4, sample_factor_returns.shape[1])),
+            index=["A", "B", "C", "D"], columns=sample_factor_returns.columns
+        )
+        noise = rng.normal(0, 0.01, (len(sample_factor_returns), 4))
+        returns = pd.DataFrame(
+            sample_factor_returns.values @ betas.values.T + noise,
+            index=sample_factor_returns.index, columns=betas.index
+        )
+        returns.iloc[:55, 3] = np.nan  # Too short: gets the median
+
+        result = factor_residual_variance(returns, sample_factor_returns, betas)
+
+        np.testing.assert_allclose(result.iloc[:3], noise[:, :3].var(axis=0, ddof=1))
+        assert result["D"] == result.iloc[:3].median()
+
+
 class TestContributions:
     """Test risk contribution calculations."""
 
@@ -435,6 +636,75 @@ class TestLassoBetas:
         with pytest.raises(ValueError, match="Insufficient data"):
             compute_lasso_betas(sec_returns, fac_returns, min_observations=12)
 
+    def _universe(self, n_securities=8, n_periods=48):
+        np.random.seed(7)
+        dates = pd.date_range(end="2025-09-30", periods=n_periods, freq='ME')
+        fac_returns = pd.DataFrame(
+            np.random.randn(n_periods, 3) * 0.03, index=dates, columns=["F1", "F2", "F3"]
+        )
+        loadings = np.random.randn(3, n_securities)
+        noise = np.random.randn(n_periods, n_securities) * 0.01
+        sec_returns = pd.DataFrame(
+            fac_returns.values @ loadings + noise,
+            index=dates,
+            columns=[f"S{i}" for i in range(n_securities)]
+        )
+        return sec_returns, fac_returns
+
+    def test_parallel_matches_serial(self):
+        """Parallel fitting returns exactly the serial result."""
+        sec_returns, fac_returns = self._universe()
+
+        serial = compute_lasso_betas(sec_returns, fac_returns, min_observations=12)
+        parallel = compute_lasso_betas(sec_returns, fac_returns, min_observations=12, n_jobs=2)
+
+        pd.testing.assert_frame_equal(serial[0], parallel[0])
+        pd.testing.assert_series_equal(serial[1], parallel[1])
+
+    def test_threading_backend_matches_serial(self):
+        """Threading backend is an alternative to process workers."""
+        sec_returns, fac_returns = self._universe()
+
+        serial = compute_lasso_betas(sec_returns, fac_returns, min_observations=12)
+        threaded = compute_lasso_betas(
+            sec_returns, fac_returns, min_observations=12, n_jobs=4, backend="threading"
+        )
+
+        pd.testing.assert_frame_equal(serial[0], threaded[0])
+
+    def test_diagnostics_report_status_and_timing(self):
+        """Diagnostics flag short histories instead of silently zeroing."""
+        sec_returns, fac_returns = self._universe()
+        sec_returns.iloc[:40, 0] = np.nan  # S0 keeps only 8 observations
+
+        betas, residual_var, diagnostics = compute_lasso_betas(
+            sec_returns, fac_returns, min_observations=12, return_diagnostics=True
+        )
+
+        assert list(diagnostics.index) == list(sec_returns.columns)
+        assert diagnostics.loc["S0", "status"] == "insufficient_data"
+        assert diagnostics.loc["S0", "n_obs"] == 8
+        assert (betas.loc["S0"] == 0).all()
+        assert np.isnan(residual_var["S0"])
+
+        fitted = diagnostics.drop(index="S0")
+        assert (fitted["status"] == "ok").all()
+        assert (fitted["fit_time_ms"] > 0).all()
+        assert fitted["alpha"].notna().all()
+
+    def test_empty_universe(self):
+        """A security frame with no columns gives empty outputs."""
+        sec_returns, fac_returns = self._universe()
+
+        betas, residual_var, diagnostics = compute_lasso_betas(
+            sec_returns.iloc[:, :0], fac_returns, min_observations=12, return_diagnostics=True
+        )
+
+        assert betas.shape == (0, 3)
+        assert residual_var.empty
+        assert diagnostics.empty
+        assert "status" in diagnostics.columns
+
 
 class TestFactorRiskDecomposition:
     """Test factor risk decomposition."""
@@ -596,6 +866,124 @@ class TestDiversificationMetrics:
         assert np.isclose(result["diversification_ratio"], 1.0)
         assert np.isclose(result["weighted_avg_correlation"], 1.0)
 
+    def test_avg_correlation_matches_pairwise_definition(self, sample_portfolio_weights, sample_returns):
+        """Closed form equals sum_{i<j} w_i w_j rho_ij / sum_{i<j} w_i w_j."""
+        cov = calculate_ewma_covariance(sample_returns)
+        result = compute_diversification_metrics(sample_portfolio_weights, sample_returns, cov_matrix=cov)
+
+        assets = sample_portfolio_weights.index
+        w = (sample_portfolio_weights / sample_portfolio_weights.sum()).values
+        sub = cov.loc[assets, assets].values
+        corr = sub / np.sqrt(np.outer(np.diag(sub), np.diag(sub)))
+        upper = np.triu_indices(len(w), k=1)
+        pair_weights = np.outer(w, w)[upper]
+        expected = np.sum(pair_weights * corr[upper]) / np.sum(pair_weights)
+
+        assert np.isclose(result["weighted_avg_correlation"], expected)
+
+    def test_batch_matches_single(self, sample_portfolio_weights, sample_benchmark_weights, sample_returns):
+        """A DataFrame of portfolios gives the per-portfolio results as lists."""
+        weights = pd.DataFrame([sample_portfolio_weights, sample_benchmark_weights], index=["P", "B"]).fillna(0.0)
+        batch = compute_diversification_metrics(weights, sample_returns)
+
+        assert batch["portfolios"] == ["P", "B"]
+        for i, single_weights in enumerate([sample_portfolio_weights, sample_benchmark_weights]):
+            single = compute_diversification_metrics(single_weights, sample_returns)
+            for key, value in single.items():
+                assert np.isclose(batch[key][i], value)
+
+
+class TestBatchContributions:
+    """Test stacked multi-portfolio risk."""
+
+    def _cov(self, returns):
+        return pd.DataFrame(ensure_psd(returns.cov().values), index=returns.columns, columns=returns.columns)
+
+    def test_batch_matches_single_portfolio(self, sample_returns, sample_portfolio_weights, sample_benchmark_weights):
+        """Each batch row equals calculate_contributions on the same covariance."""
+        cov = self._cov(sample_returns)
+        weights = pd.DataFrame(
+            [sample_portfolio_weights, sample_benchmark_weights], index=["port", "bench"]
+        ).fillna(0.0)
+
+        batch = calculate_batch_contributions(weights, cov)
+
+        assert batch["portfolios"] == ["port", "bench"]
+        for row, name in enumerate(batch["portfolios"]):
+            single = calculate_contributions(sample_returns, weights.loc[name], cov_matrix=cov)
+            assert np.isclose(batch["portfolio_vol"][row], single["portfolio_vol"])
+            for col, asset in enumerate(batch["assets"]):
+                assert np.isclose(batch["pctr"][row][col], single["pctr"][asset])
+                assert np.isclose(batch["mctr"][row][col], single["mctr"][asset])
+
+    def test_batch_diversification_matches_single(self, sample_returns, sample_portfolio_weights):
+        """Closed-form diversification agrees with the pairwise version."""
+        cov = self._cov(sample_returns)
+        batch = calculate_batch_contributions(sample_portfolio_weights.to_frame("port").T, cov)
+        single = compute_diversification_metrics(sample_portfolio_weights, sample_returns, cov_matrix=cov)
+
+        div = batch["diversification"]
+        assert np.isclose(div["diversification_ratio"][0], single["diversification_ratio"])
+        assert np.isclose(div["weighted_avg_correlation"][0], single["weighted_avg_correlation"], atol=1e-6)
+
+    def test_unmatched_portfolios_reported(self, sample_returns, sample_portfolio_weights):
+        """Portfolios with no known assets are listed, not computed."""
+        cov = self._cov(sample_returns)
+        weights = pd.DataFrame(
+            {"GLOBAL": [0.5, 0.0], "UNKNOWN FUND": [0.5, 1.0]}, index=["partial", "none"]
+        )
+
+        batch = calculate_batch_contributions(weights, cov)
+
+        assert batch["portfolios"] == ["partial"]
+        assert batch["unmatched"] == ["none"]
+        assert np.isclose(batch["matched_weight_pct"][0], 50.0)
+        assert np.isclose(batch["pctr"][0][0], 1.0)
+
+    def test_single_asset_correlation(self):
+        """Single-asset portfolios report correlation 1."""
+        result = diversification_from_cov(np.array([[1.0, 0.0]]), np.array([[0.04, 0.01], [0.01, 0.09]]))
+
+        assert np.isclose(result["weighted_avg_correlation"][0], 1.0)
+        assert np.isclose(result["diversification_ratio"][0], 1.0)
+
+
+
+class TestRollingRisk:
+    """Test single-pass rolling window risk."""
+
+    @pytest.mark.parametrize("use_ewma", [True, False])
+    def test_windows_match_per_window_calls(
+        self, sample_returns, sample_portfolio_weights, sample_benchmark_weights, use_ewma
+    ):
+        """Every window equals calculate_contributions / compute_tracking_error on that slice."""
+        result = calculate_rolling_risk(
+            sample_returns, sample_portfolio_weights, sample_benchmark_weights, window=36, use_ewma=use_ewma
+        )
+
+        assert len(result["dates"]) == len(sample_returns) - 35
+        for j in (0, 10, len(result["dates"]) - 1):
+            window = sample_returns.iloc[j:j + 36]
+            single = calculate_contributions(window, sample_portfolio_weights, use_ewma=use_ewma)
+            te = compute_tracking_error(sample_portfolio_weights, sample_benchmark_weights, window, use_ewma=use_ewma)
+
+            assert np.isclose(result["portfolio_vol"][j], single["portfolio_vol"])
+            assert np.allclose(result["pctr"][j], [single["pctr"][a] for a in result["assets"]])
+            assert np.isclose(result["tracking_error"][j], te["tracking_error"])
+            assert np.allclose(result["te_contributions"][j], [te["te_contributions"][a] for a in result["te_assets"]])
+
+    def test_short_window_falls_back_to_sample(self, sample_returns, sample_portfolio_weights):
+        """EWMA windows under 12 periods use the sample covariance, as calculate_ewma_covariance does."""
+        ewma = calculate_rolling_risk(sample_returns, sample_portfolio_weights, window=6, use_ewma=True)
+        sample = calculate_rolling_risk(sample_returns, sample_portfolio_weights, window=6, use_ewma=False)
+
+        assert np.allclose(ewma["portfolio_vol"], sample["portfolio_vol"])
+        assert "tracking_error" not in ewma
+
+    def test_invalid_window(self, sample_returns, sample_portfolio_weights):
+        """Windows longer than the history are rejected."""
+        with pytest.raises(ValueError, match="Window"):
+            calculate_rolling_risk(sample_returns, sample_portfolio_weights, window=len(sample_returns) + 1)
 
 class TestEdgeCases:
     """Test edge cases and error handling."""
@@ -0,0 +1,403 @@
+"""
+Tests for simulation_engine.py
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import numpy as np
+import pandas as pd
+
+from simulation_engine import (
+    quarterly_regimes,
+    spending_schedule,
+    simulate_wealth,
+    sorted_percentiles,
+    summarize_wealth,
+    WealthSketch,
+    run_monte_carlo,
+    stream_monte_carlo,
+    asset_cholesky,
+    clear_cholesky_cache,
+    cholesky_cache_stats,
+    simulate_multi_asset_wealth,
+    run_multi_asset_monte_carlo,
+    stationary_bootstrap_indices,
+    bootstrap_wealth_chunk,
+    portfolio_history,
+    run_bootstrap_monte_carlo,
+)
+
+
+@pytest.fixture
+def params():
+    """Typical endowment-style simulation inputs."""
+    return {
+        "initial_value": 1_000_000,
+        "annual_return": 0.07,
+        "annual_volatility": 0.12,
+        "quarterly_fixed_spending": 5_000,
+        "quarterly_percent_spending": 0.01,
+        "duration_years": 10,
+        "inflation_rate": 0.025,
+    }
+
+
+class TestRegimes:
+    """Test per-quarter return/vol parameters."""
+
+    def test_constant_regime(self):
+        """Without piecewise every quarter has the same parameters."""
+        means, vols = quarterly_regimes(8, 0.08, 0.16, after_tax_rate=0.02)
+
+        assert np.allclose(means, 1.06 ** 0.25 - 1)
+        assert np.allclose(vols, 0.08)
+
+    def test_piecewise_phases(self):
+        """Parameters switch at the update years and inherit missing values."""
+        piecewise = {"return_update1": 0.05, "vol_update2": 0.20, "update1_year": 2031, "update2_year": 2033,
+                     "start_year": 2030}
+        means, vols = quarterly_regimes(20, 0.08, 0.10, piecewise=piecewise)
+
+        assert np.isclose(means[2], 1.08 ** 0.25 - 1)  # quarter 3, before quarter 4
+        assert np.isclose(means[3], 1.05 ** 0.25 - 1)  # quarter 4 = update1
+        assert np.isclose(means[11], 1.05 ** 0.25 - 1)  # quarter 12 = update2, keeps the update1 return
+        assert np.isclose(vols[10], 0.05)
+        assert np.isclose(vols[11], 0.10)
+
+    def test_spending_schedule(self):
+        """One-off and custom spending land in their quarters."""
+        extra = spending_schedule(8, one_time_spend=100.0, one_time_quarter=3, custom_spending={"3": 5.0, 9: 1.0})
+
+        assert extra[2] == 105.0
+        assert extra.sum() == 105.0
+
+
+class TestSimulateWealth:
+    """Test the vectorized spending recursion."""
+
+    def test_matches_scalar_recursion(self):
+        """Every path equals the per-path loop from lib/simulation.ts."""
+        rng = np.random.default_rng(0)
+        returns = rng.normal(0.01, 0.08, (50, 12))
+        extra = np.zeros(12)
+        extra[4] = 20_000
+
+        wealth = simulate_wealth(100_000, returns, fixed_spending=2_000, percent_spending=0.01, extra_spending=extra)
+
+        for p in range(50):
+            value = 100_000
+            for t in range(12):
+                value = max(value * (1 + returns[p, t]) - (2_000 + value * 0.01) - extra[t], 0)
+                assert np.isclose(wealth[t + 1, p], value)
+
+    def test_sorted_percentiles_match_numpy(self):
+        """Row percentiles equal np.percentile's linear method."""
+        x = np.random.default_rng(1).random((4, 101))
+        expected = np.percentile(x, [5, 50, 97.5], axis=1)
+
+        assert np.allclose(sorted_percentiles(np.sort(x, axis=1), [5, 50, 97.5]), expected)
+
+
+class TestRunMonteCarlo:
+    """Test the full simulation."""
+
+    def test_seed_is_reproducible_across_chunks(self, params):
+        """The same seed gives the same bands whatever the chunk size."""
+        a = run_monte_carlo(num_simulations=3_000, seed=7, **params)
+        b = run_monte_carlo(num_simulations=3_000, seed=7, chunk_size=499, **params)
+
+        assert a["percentiles"] == b["percentiles"]
+        assert a["probabilities"] == b["probabilities"]
+
+    def test_output_shape(self, params):
+        """Bands have one point per quarter plus the start."""
+        result = run_monte_carlo(num_simulations=500, seed=1, sample_paths=10, **params)
+
+        assert len(result["years"]) == 41
+        assert set(result["percentiles"]) == {"5", "25", "50", "75", "95"}
+        assert result["median"] == result["percentiles"]["50"]
+        assert result["percentiles"]["5"][0] == params["initial_value"]
+        assert len(result["sample_paths"]) == 10
+        assert all(0 <= p <= 1 for p in result["probabilities"].values())
+
+    def test_zero_volatility_is_deterministic(self, params):
+        """Without volatility every path follows the expected-return recursion."""
+        params = {**params, "annual_volatility": 0.0, "quarterly_fixed_spending": 0.0,
+                  "quarterly_percent_spending": 0.0}
+        result = run_monte_carlo(num_simulations=100, seed=3, **params)
+
+        assert np.isclose(result["percentiles"]["5"][-1], 1_000_000 * 1.07 ** 10)
+        assert result["percentiles"]["5"] == result["percentiles"]["95"]
+
+    def test_heavy_spending_depletes(self, params):
+        """Spending more than the portfolio can sustain drives paths to zero."""
+        params = {**params, "quarterly_fixed_spending": 200_000}
+        result = run_monte_carlo(num_simulations=200, seed=3, **params)
+
+        assert result["probabilities"]["portfolio_depletion"] == 1.0
+
+
+class TestStreamMonteCarlo:
+    """Test the chunked, sketch-based simulation."""
+
+    def test_one_update_per_chunk(self, params):
+        """Progress is reported after every chunk."""
+        updates = list(stream_monte_carlo(num_simulations=2500, seed=1, chunk_size=1000, **params))
+
+        assert [u["paths_completed"] for u in updates] == [1000, 2000, 2500]
+        assert all(len(u["median"]) == 41 for u in updates)
+
+    def test_matches_batch_run(self, params):
+        """The same seed gives exact probabilities and close bands."""
+        batch = run_monte_carlo(num_simulations=20000, seed=6, **params)
+        final = list(stream_monte_carlo(num_simulations=20000, seed=6, chunk_size=3000, **params))[-1]
+
+        assert final["probabilities"] == batch["probabilities"]
+        for key, band in batch["percentiles"].items():
+            assert np.allclose(final["percentiles"][key], band, rtol=5e-3)
+
+    def test_median_without_50th_band(self, params):
+        """The median line is reported even when 50 is not a requested band."""
+        final = list(stream_monte_carlo(num_simulations=500, seed=2, percentiles=[10, 90], **params))[-1]
+
+        assert set(final["percentiles"]) == {"10", "90"}
+        assert final["median"][0] == params["initial_value"]
+
+
+class TestAssetCholesky:
+    """Test the cached Cholesky factors."""
+
+    def test_factor_reproduces_covariance(self, sample_cma_data, sample_correlation_matrix):
+        """L @ L.T has the CMA risks on its diagonal."""
+        clear_cholesky_cache()
+        names, mu, factor = asset_cholesky(
+            sample_cma_data, sample_correlation_matrix, ["em", "GLOBAL", "Global Cash"]
+        )
+
+        assert names == ["EM", "GLOBAL", "GLOBAL CASH"]
+        assert np.allclose(mu, [0.10, 0.08, 0.025])
+        assert np.allclose(np.sqrt(np.diag(factor @ factor.T)), [0.22, 0.16, 0.01])
+
+    def test_cache_hit_ignores_order(self, sample_cma_data, sample_correlation_matrix):
+        """The same asset set in any order is served from the cache."""
+        clear_cholesky_cache()
+        asset_cholesky(sample_cma_data, sample_correlation_matrix, ["GLOBAL", "EM"])
+        asset_cholesky(sample_cma_data, sample_correlation_matrix, ["EM", "GLOBAL"])
+
+        assert cholesky_cache_stats() == {"hits": 1, "misses": 1, "entries": 1}
+
+    def test_new_data_version_misses(self, sample_cma_data, sample_correlation_matrix):
+        """Changed CMA values produce a new factor."""
+        clear_cholesky_cache()
+        asset_cholesky(sample_cma_data, sample_correlation_matrix, ["GLOBAL", "EM"])
+        changed = sample_cma_data.copy()
+        changed["RISK"] = changed["RISK"] * 2
+        _, _, factor = asset_cholesky(changed, sample_correlation_matrix, ["GLOBAL", "EM"])
+
+        assert cholesky_cache_stats()["misses"] == 2
+        assert np.allclose(np.sqrt(np.diag(factor @ factor.T)), [0.44, 0.32])
+
+    def test_unknown_asset_raises(self, sample_cma_data, sample_correlation_matrix):
+        """Assets missing from the CMA data are rejected."""
+        with pytest.raises(ValueError, match="NOT AN ASSET"):
+            asset_cholesky(sample_cma_data, sample_correlation_matrix, ["GLOBAL", "Not an asset"])
+
+
+class TestSimulateMultiAssetWealth:
+    """Test the rebalanced holdings recursion."""
+
+    def test_rebalancing_matches_single_asset_recursion(self):
+        """Quarterly rebalancing equals the recursion on the weighted return."""
+        rng = np.random.default_rng(0)
+        returns = rng.normal(0.02, 0.05, size=(8, 50, 3))
+        weights = np.array([0.5, 0.3, 0.2])
+
+        multi = simulate_multi_asset_wealth(100.0, returns, weights, 1.0, 0.01, rebalance_quarters=1)
+        single = simulate_wealth(100.0, (returns @ weights).T, 1.0, 0.01, np.zeros(8))
+
+        assert np.allclose(multi, single)
+
+    def test_buy_and_hold_drifts(self):
+        """Without rebalancing each holding compounds on its own."""
+        returns = np.zeros((4, 1, 2))
+        returns[:, :, 0] = 0.10
+        wealth = simulate_multi_asset_wealth(100.0, returns, np.array([0.5, 0.5]), rebalance_quarters=0)
+
+        assert np.isclose(wealth[-1, 0], 50 * 1.1 ** 4 + 50)
+
+
+class TestRunMultiAssetMonteCarlo:
+    """Test the correlated multi-asset simulation."""
+
+    def test_seed_reproducible_across_chunks(self, sample_cma_data, sample_correlation_matrix):
+        """The chunk size does not change seeded results."""
+        kwargs = dict(weights={"GLOBAL": 0.6, "GLOBAL AGGREGATE": 0.4}, initial_value=1_000_000,
+                      duration_years=5, num_simulations=700, seed=11)
+        a = run_multi_asset_monte_carlo(sample_cma_data, sample_correlation_matrix, chunk_draws=1000, **kwargs)
+        b = run_multi_asset_monte_carlo(sample_cma_data, sample_correlation_matrix, **kwargs)
+
+        assert a["percentiles"] == b["percentiles"]
+        assert a["shortfall"] == b["shortfall"]
+
+    def test_portfolio_moments(self, sample_cma_data, sample_correlation_matrix):
+        """Weights are normalized and the reported moments use them."""
+        result = run_multi_asset_monte_carlo(
+            sample_cma_data, sample_correlation_matrix, {"GLOBAL": 3, "EM": 1},
+            initial_value=100, duration_years=2, num_simulations=100, seed=1
+        )
+
+        assert result["assets"] == ["EM", "GLOBAL"]
+        assert result["weights"] == [0.25, 0.75]
+        assert np.isclose(result["expected_return"], 0.25 * 0.10 + 0.75 * 0.08)
+        assert 0 < result["volatility"] < 0.25 * 0.22 + 0.75 * 0.16 + 1e-12
+
+    def test_shortfall_probabilities(self, sample_cma_data, sample_correlation_matrix):
+        """Ever-below is at least final-below, and both are probabilities."""
+        result = run_multi_asset_monte_carlo(
+            sample_cma_data, sample_correlation_matrix, {"EM": 1.0},
+            initial_value=100, quarterly_percent_spending=0.02, duration_years=10,
+            num_simulations=2000, seed=2, shortfall_thresholds=[100, 50, 0]
+        )
+        shortfall = result["shortfall"]
+
+        assert shortfall["thresholds"] == [100, 50, 0]
+        assert all(0 <= p <= 1 for p in shortfall["final_below"] + shortfall["ever_below"])
+        assert all(e >= f for e, f in zip(shortfall["ever_below"], shortfall["final_below"]))
+        assert shortfall["final_below"][2] == 0.0
+
+    def test_sample_mean_matches_cma(self, sample_cma_data, sample_correlation_matrix):
+        """Mean growth of a single asset tracks its CMA return."""
+        result = run_multi_asset_monte_carlo(
+            sample_cma_data, sample_correlation_matrix, {"GLOBAL AGGREGATE": 1.0},
+            initial_value=1.0, duration_years=1, num_simulations=20000, seed=4, percentiles=[50]
+        )
+
+        assert abs(result["percentiles"]["50"][-1] - 1.045) < 0.01
+
+
+@pytest.fixture
+def monthly_returns():
+    """Five years of monthly returns in percent for three assets."""
+    rng = np.random.default_rng(8)
+    index = pd.date_range("2019-01-31", periods=60, freq="M")
+    data = rng.normal(0.5, 3.0, size=(60, 3))
+    return pd.DataFrame(data, index=index, columns=["Equity", "Bonds", "Cash"])
+
+
+class TestWealthSketch:
+    """Test the chunked wealth summary."""
+
+    def test_matches_exact_summary(self):
+        """Chunked sketches match the bands and probabilities of the full matrix."""
+        wealth = 100 * np.cumprod(1 + np.random.default_rng(4).normal(0.01, 0.08, size=(13, 4000)), axis=0)
+        sketch = WealthSketch(12, 100.0, 0.02, sample_paths=3)
+        for chunk in np.array_split(wealth, 7, axis=1):
+            sketch.update(chunk.copy())
+        approx = sketch.summary([5, 50, 95])
+        exact = summarize_wealth(wealth.copy(), 100.0, 0.02, [5, 50, 95])
+
+        assert approx["paths_completed"] == 4000
+        assert approx["probabilities"] == exact["probabilities"]
+        assert np.allclose(approx["median"], exact["median"], rtol=5e-3)
+        assert np.allclose(approx["sample_paths"], wealth[:, :3].T)
+
+
+class TestStationaryBootstrap:
+    """Test the block index generator."""
+
+    def test_indices_in_range(self):
+        """Indices stay inside the history."""
+        indices = stationary_bootstrap_indices(np.random.default_rng(0), 100, 50, 17, 4.0)
+
+        assert indices.shape == (100, 50)
+        assert indices.min() >= 0 and indices.max() < 17
+
+    def test_mean_block_length(self):
+        """Blocks continue with probability 1 - 1/block_length."""
+        indices = stationary_bootstrap_indices(np.random.default_rng(1), 2000, 120, 500, 6.0)
+        continued = np.mean(np.diff(indices, axis=1) % 500 == 1)
+
+        assert abs(continued - 5 / 6) < 0.01
+
+    def test_block_length_one_is_iid(self):
+        """With block_length=1 every period starts a new block."""
+        indices = stationary_bootstrap_indices(np.random.default_rng(2), 2000, 60, 1000, 1.0)
+        continued = np.mean(np.diff(indices, axis=1) % 1000 == 1)
+
+        assert continued < 0.01
+
+    def test_blocks_wrap_around(self):
+        """A block running past the last observation continues at the first."""
+        indices = stationary_bootstrap_indices(np.random.default_rng(3), 50, 40, 3, 1e9)
+        steps = np.diff(indices, axis=1)
+
+        assert np.all((steps == 1) | (steps == -2))
+
+
+class TestBootstrapSimulation:
+    """Test the historical bootstrap simulation."""
+
+    def test_portfolio_history(self, monthly_returns):
+        """Weights are normalized and returns converted to decimals."""
+        history, weights = portfolio_history(monthly_returns, {"Equity": 3, "Bonds": 1})
+
+        assert weights == {"Equity": 0.75, "Bonds": 0.25}
+        expected = (0.75 * monthly_returns["Equity"] + 0.25 * monthly_returns["Bonds"]) / 100
+        assert np.allclose(history, expected.values)
+
+    def test_unknown_asset_raises(self, monthly_returns):
+        """Assets without a return series are rejected."""
+        with pytest.raises(ValueError, match="Gold"):
+            portfolio_history(monthly_returns, {"Gold": 1.0})
+
+    def test_chunk_compounds_months(self):
+        """A constant history compounds three months into each quarter."""
+        wealth = bootstrap_wealth_chunk(
+            np.full(5, 0.01), 4, np.random.SeedSequence(0), 100.0, 4, 3.0, 0.0, 0.0, 0.0, np.zeros(4)
+        )
+
+        assert np.allclose(wealth[-1], 100 * 1.01 ** 12)
+
+    def test_seed_reproducible_across_maps(self, monthly_returns):
+        """The map used to run the chunks does not change seeded results."""
+        kwargs = dict(weights={"Equity": 0.6, "Bonds": 0.4}, initial_value=1_000, duration_years=3,
+                      num_simulations=2500, seed=9, chunk_paths=1000)
+        serial = run_bootstrap_monte_carlo(monthly_returns, **kwargs)
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            mapped = run_bootstrap_monte_carlo(monthly_returns, map_fn=pool.map, **kwargs)
+
+        assert serial["percentiles"] == mapped["percentiles"]
+        assert serial["probabilities"] == mapped["probabilities"]
+
+    def test_output(self, monthly_returns):
+        """Bands, history length and weights are reported."""
+        result = run_bootstrap_monte_carlo(
+            monthly_returns, {"Cash": 1.0}, 100.0, duration_years=2, num_simulations=300,
+            seed=1, sample_paths=5, block_length=6
+        )
+
+        assert len(result["median"]) == 9
+        assert result["history_months"] == 60
+        assert result["weights"] == {"Cash": 1.0}
+        assert len(result["sample_paths"]) == 5
+
+    def test_long_horizon_shrinks_chunks(self, monthly_returns, monkeypatch):
+        """Chunks are cut to the cell budget, so long horizons use more, smaller chunks."""
+        import simulation_engine
+        monkeypatch.setattr(simulation_engine, "BOOTSTRAP_CHUNK_CELLS", 12 * 10 * 50)
+        sizes = []
+
+        def recording_map(fn, history, chunk_sizes, *rest):
+            sizes.extend(chunk_sizes)
+            return map(fn, history, chunk_sizes, *rest)
+
+        run_bootstrap_monte_carlo(monthly_returns, {"Cash": 1.0}, 100.0, duration_years=10,
+                                  num_simulations=120, chunk_paths=100, map_fn=recording_map)
+
+        assert sizes == [50, 50, 20]
+
+    def test_invalid_block_length(self, monthly_returns):
+        """Blocks shorter than one month are rejected."""
+        with pytest.raises(ValueError, match="block_length"):
+            run_bootstrap_monte_carlo(monthly_returns, {"Cash": 1.0}, 100.0, block_length=0.5)
@@ -0,0 +1,241 @@
+"""
+Tests for stress_engine.py
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+
+from stress_engine import (
+    get_scenario_returns,
+    compute_scenario_metrics,
+    scenario_index_ranges,
+    stacked_scenario_metrics,
+    apply_stress_scenario,
+    batch_stress_test,
+    stress_contribution_arrays,
+    compute_stress_contribution,
+)
+
+
+METRICS = ["total_return", "annualized_return", "volatility", "max_drawdown", "sharpe_ratio", "var_95", "cvar_95"]
+
+
+@pytest.fixture
+def windows(sample_returns):
+    """Scenario windows over the sample dates, including one with no data."""
+    dates = sample_returns.index
+    scenarios = [
+        {"name": f"W{i}", "start": str(dates[i].date()), "end": str(dates[i + length].date())}
+        for i, length in [(0, 5), (3, 20), (10, 2), (30, 29), (44, 1)]
+    ]
+    scenarios.append({"name": "Before history", "start": "1990-01-01", "end": "1990-12-31"})
+    return scenarios
+
+
+def _reference(weights, returns, scenario):
+    """Portfolio metrics for one scenario via the per-scenario pandas path."""
+    window = get_scenario_returns(returns, scenario["start"], scenario["end"])
+    common = weights.index.intersection(window.columns)
+    w = weights[common] / weights[common].sum()
+    return compute_scenario_metrics((window[common] * w).sum(axis=1), scenario["name"], scenario["start"], scenario["end"])
+
+
+class TestScenarioRanges:
+    """Test date-to-row range conversion."""
+
+    def test_ranges_match_date_mask(self, sample_returns, windows):
+        """Row ranges select the same dates as get_scenario_returns."""
+        starts, ends = scenario_index_ranges(sample_returns.index, windows)
+
+        for scenario, start, end in zip(windows, starts, ends):
+            expected = get_scenario_returns(sample_returns, scenario["start"], scenario["end"])
+            assert sample_returns.index[start:end].equals(expected.index)
+
+
+class TestStackedMetrics:
+    """Test the vectorized metric pass."""
+
+    def test_matches_compute_scenario_metrics(self, sample_returns, windows):
+        """Every scenario and series equals the pandas metrics."""
+        starts, ends = scenario_index_ranges(sample_returns.index, windows[:-1])
+        paths = sample_returns.values[:, :2]
+
+        metrics = stacked_scenario_metrics(paths, starts, ends)
+
+        for i, scenario in enumerate(windows[:-1]):
+            for k, asset in enumerate(sample_returns.columns[:2]):
+                window = get_scenario_returns(sample_returns, scenario["start"], scenario["end"])[asset]
+                expected = compute_scenario_metrics(window, scenario["name"], scenario["start"], scenario["end"])
+                for name in METRICS:
+                    scale = 1 if name == "sharpe_ratio" else 100
+                    assert np.isclose(round(metrics[name][i, k] * scale, 2), expected[name], equal_nan=True), (scenario["name"], name)
+
+
+class TestApplyStressScenario:
+    """Test multi-scenario stress application."""
+
+    def test_matches_per_scenario_path(self, sample_returns, windows, sample_portfolio_weights, sample_benchmark_weights):
+        """Results equal the per-scenario pandas computation."""
+        results = apply_stress_scenario(sample_portfolio_weights, sample_returns, windows, sample_benchmark_weights)
+
+        assert [r["scenario"] for r in results] == [s["name"] for s in windows]
+        for result, scenario in zip(results[:-2], windows[:-2]):
+            expected = _reference(sample_portfolio_weights, sample_returns, scenario)
+            bench = _reference(sample_benchmark_weights, sample_returns, scenario)
+            assert result["data_available"] is True
+            for name in METRICS:
+                assert np.isclose(result[name], expected[name])
+            assert np.isclose(result["benchmark_return"], bench["total_return"])
+            assert np.isclose(result["excess_return"], round(expected["total_return"] - bench["total_return"], 2))
+
+    def test_short_and_empty_windows(self, sample_returns, windows, sample_portfolio_weights):
+        """Windows with fewer than two periods are reported without data."""
+        results = apply_stress_scenario(sample_portfolio_weights, sample_returns, windows)
+
+        assert results[-2]["data_available"] is False
+        assert results[-1]["data_available"] is False
+        assert results[-1]["benchmark_return"] is None
+
+    def test_no_matching_assets(self, sample_returns, windows):
+        """Portfolios outside the universe only get the no-data entries."""
+        results = apply_stress_scenario(pd.Series({"UNKNOWN": 1.0}), sample_returns, windows)
+
+        assert all(r["data_available"] is False for r in results)
+
+
+class TestBatchStressTest:
+    """Test the scenarios x portfolios grid."""
+
+    @pytest.fixture
+    def universe(self, sample_portfolio_weights, sample_benchmark_weights):
+        portfolios = pd.DataFrame(
+            [sample_portfolio_weights, sample_benchmark_weights, pd.Series({"UNKNOWN": 1.0})],
+            index=["P1", "P2", "P3"]
+        ).fillna(0.0)
+        benchmarks = pd.DataFrame([sample_benchmark_weights], index=["B1"]).fillna(0.0)
+        return portfolios, benchmarks
+
+    def test_grid_matches_apply_stress_scenario(self, sample_returns, windows, universe):
+        """Each grid column equals apply_stress_scenario for that portfolio and benchmark."""
+        portfolios, benchmarks = universe
+        result = batch_stress_test(portfolios, sample_returns, windows, benchmarks, {"P1": "B1"})
+
+        assert result["portfolios"] == ["P1", "P2"]
+        assert result["benchmarks"] == ["B1", None]
+        assert result["unmatched"] == ["P3"]
+
+        for p, name in enumerate(result["portfolios"]):
+            bench = benchmarks.loc["B1"] if name == "P1" else None
+            single = apply_stress_scenario(portfolios.loc[name], sample_returns, windows, bench)
+            for s, expected in enumerate(single):
+                assert result["data_available"][s] == expected["data_available"]
+                if not expected["data_available"]:
+                    assert result["total_return"][s][p] is None
+                    continue
+                for key in ("total_return", "volatility", "max_drawdown", "var_95", "cvar_95"):
+                    assert np.isclose(result[key][s][p], expected[key])
+                if bench is not None:
+                    assert np.isclose(result["benchmark_return"][s][p], expected["benchmark_return"])
+                    assert np.isclose(result["excess_return"][s][p], expected["excess_return"])
+                else:
+                    assert result["benchmark_return"][s][p] is None
+
+    def test_weight_coverage(self, sample_returns, windows, universe):
+        """Coverage drops by the weight of an asset missing inside the window."""
+        portfolios, _ = universe
+        gappy = sample_returns.copy()
+        gappy.iloc[:10, gappy.columns.get_loc("EM")] = np.nan
+
+        result = batch_stress_test(portfolios, gappy, windows)
+
+        assert np.isclose(result["weight_coverage_pct"][0][0], 80.0)
+        assert np.isclose(result["weight_coverage_pct"][3][0], 100.0)
+
+    def test_benchmark_missing_whole_window(self, sample_returns, windows, universe):
+        """A benchmark with no returns in a window has no benchmark or excess return there."""
+        portfolios, _ = universe
+        gappy = sample_returns.copy()
+        gappy.iloc[:10, gappy.columns.get_loc("EM")] = np.nan
+        benchmarks = pd.DataFrame([{"EM": 1.0}], index=["EM only"])
+
+        result = batch_stress_test(portfolios, gappy, windows, benchmarks, {"P1": "EM only"})
+
+        assert result["benchmark_return"][0][0] is None
+        assert result["excess_return"][0][0] is None
+        assert result["benchmark_coverage_pct"][0][0] == 0.0
+        assert result["total_return"][0][0] is not None
+        assert result["benchmark_return"][3][0] is not None
+        assert result["benchmark_coverage_pct"][3][0] == 100.0
+        assert result["benchmark_coverage_pct"][3][1] is None
+
+
+class TestStressContribution:
+    """Test per-asset stress contributions."""
+
+    @staticmethod
+    def _assert_matches_reference(result, weights, returns, windows):
+        """Every scenario and asset equals the per-asset pandas formulas (NaN as None)."""
+        def check(actual, expected):
+            if np.isnan(expected):
+                assert actual is None
+            else:
+                assert np.isclose(actual, round(expected, 2))
+
+        for s, scenario in enumerate(windows):
+            window = get_scenario_returns(returns, scenario["start"], scenario["end"])
+            if len(window) < 2:
+                assert result["data_available"][s] is False
+                continue
+            for a, asset in enumerate(result["assets"]):
+                r = window[asset]
+                growth = (1 + r).cumprod()
+                drawdown = ((growth - growth.cummax()) / growth.cummax()).min()
+                check(result["return_contribution"][s][a], weights[asset] * ((1 + r).prod() - 1) * 100)
+                check(result["volatility_contribution"][s][a], weights[asset] * r.std() * np.sqrt(12) * 100)
+                check(result["drawdown_contribution"][s][a], weights[asset] * drawdown * 100)
+
+    def test_matches_per_asset_reference(self, sample_returns, windows, sample_portfolio_weights):
+        """Every scenario and asset equals the per-asset pandas formulas."""
+        result = stress_contribution_arrays(sample_portfolio_weights, sample_returns, windows)
+        weights = sample_portfolio_weights / sample_portfolio_weights.sum()
+
+        assert result["assets"] == list(sample_portfolio_weights.index)
+        self._assert_matches_reference(result, weights, sample_returns, windows)
+
+    def test_missing_months_are_skipped(self, sample_returns, windows, sample_portfolio_weights):
+        """Gaps are skipped as pandas does: vol over observed months, no drawdown without data."""
+        gappy = sample_returns.copy()
+        gappy.iloc[:10, gappy.columns.get_loc("EM")] = np.nan
+        gappy.iloc[3:40:3, gappy.columns.get_loc("GLOBAL")] = np.nan
+        result = stress_contribution_arrays(sample_portfolio_weights, gappy, windows)
+        weights = sample_portfolio_weights / sample_portfolio_weights.sum()
+
+        self._assert_matches_reference(result, weights, gappy, windows)
+        em = result["assets"].index("EM")
+        assert result["volatility_contribution"][0][em] is None
+        assert result["drawdown_contribution"][0][em] is None
+        assert result["return_contribution"][0][em] == 0.0
+
+    def test_leading_gap_is_not_a_peak(self):
+        """A history starting inside the window takes its peak from the first observed month."""
+        index = pd.date_range("2020-01-31", periods=6, freq="ME")
+        returns = pd.DataFrame({
+            "a": [np.nan, -0.05, 0.01, 0.02, -0.01, 0.0],
+            "b": [0.01, -0.02, 0.03, -0.01, 0.02, 0.01],
+        }, index=index)
+        weights = pd.Series({"a": 0.5, "b": 0.5})
+        window = [{"name": "all", "start": "2020-01-01", "end": "2020-06-30"}]
+        result = stress_contribution_arrays(weights, returns, window)
+
+        self._assert_matches_reference(result, weights, returns, window)
+        assert result["drawdown_contribution"][0][0] == -0.5
+
+    def test_single_scenario_frame(self, sample_returns, sample_portfolio_weights):
+        """compute_stress_contribution keeps its sorted DataFrame output."""
+        dates = sample_returns.index
+        df = compute_stress_contribution(sample_portfolio_weights, sample_returns, str(dates[5].date()), str(dates[30].date()))
+
+        assert set(df["asset"]) == set(sample_portfolio_weights.index)
+        assert df["drawdown_contribution"].is_monotonic_increasing
+        assert compute_stress_contribution(sample_portfolio_weights, sample_returns, "1990-01-01", "1990-12-31").empty